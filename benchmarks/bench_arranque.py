@@ -0,0 +1,86 @@
+# benchmarks/bench_arranque.py
+"""
+Tiempo de arranque: importaciones (python -X importtime) y tiempo hasta
+la primera ventana dibujada. "antes" simula el gateway anterior, que
+importaba de entrada los módulos de predicción y gráficos; "después"
+es el gateway con carga perezosa.
+
+Uso:
+    python -m benchmarks.bench_arranque [--sin-ventana]
+"""
+import subprocess
+import sys
+
+_IMPORTAR_ANTES = (
+    "import importlib\n"
+    "from gateway.AppGraficaFinanzas.main import _MODULOS_PESADOS\n"
+    "for m in _MODULOS_PESADOS: importlib.import_module(m)\n"
+)
+
+_CREAR_GATEWAY = (
+    "import time; t0 = time.perf_counter()\n"
+    "{antes}"
+    "from gateway.AppGraficaFinanzas.main import crear_gateway\n"
+    "gateway = crear_gateway()\n"
+    "print(f'gateway {{time.perf_counter() - t0:.4f}}')\n"
+)
+
+_PRIMERA_VENTANA = (
+    "import time; t0 = time.perf_counter()\n"
+    "{antes}"
+    "from gateway.AppGraficaFinanzas.main import crear_gateway\n"
+    "from ui.AppGraficaFinanzas.components.app import AppGraficaFinanzas\n"
+    "app = AppGraficaFinanzas(crear_gateway())\n"
+    "while not app.winfo_ismapped(): app.update()\n"
+    "app.update_idletasks()\n"
+    "print(f'ventana {{time.perf_counter() - t0:.4f}}')\n"
+    "app.destroy()\n"
+)
+
+
+def ejecutar(codigo: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    argumentos = [sys.executable]
+    if importtime:
+        argumentos += ["-X", "importtime"]
+    return subprocess.run(argumentos + ["-c", codigo],
+                          capture_output=True, text=True)
+
+
+def importaciones_mas_costosas(salida: str, cantidad: int = 8):
+    """Módulos de primer nivel con mayor tiempo acumulado (microsegundos)."""
+    totales = {}
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "|" not in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        if not acumulado.strip().isdigit():
+            continue  # encabezado
+        if nombre.startswith(" ") and not nombre.startswith("  "):
+            totales[nombre.strip()] = int(acumulado)
+    return sorted(totales.items(), key=lambda item: item[1], reverse=True)[:cantidad]
+
+
+def main() -> None:
+    con_ventana = "--sin-ventana" not in sys.argv
+    for etiqueta, antes in (("antes (carga inmediata)", _IMPORTAR_ANTES),
+                            ("después (carga perezosa)", "")):
+        print(f"== {etiqueta}")
+        proceso = ejecutar(_CREAR_GATEWAY.format(antes=antes), importtime=True)
+        if proceso.returncode:
+            print(proceso.stderr.strip().splitlines()[-1])
+            continue
+        print(f"  {proceso.stdout.strip()} s")
+        for modulo, microsegundos in importaciones_mas_costosas(proceso.stderr):
+            print(f"  {modulo:<40} {microsegundos / 1000:8.1f} ms")
+
+        if con_ventana:
+            proceso = ejecutar(_PRIMERA_VENTANA.format(antes=antes))
+            if proceso.returncode:
+                print("  (no se pudo abrir la ventana: "
+                      f"{proceso.stderr.strip().splitlines()[-1]})")
+            else:
+                print(f"  {proceso.stdout.strip()} s")
+
+
+if __name__ == "__main__":
+    main()
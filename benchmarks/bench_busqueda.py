@@ -0,0 +1,137 @@
+# benchmarks/bench_busqueda.py
+"""
+Búsqueda mientras se escribe (servicio_transaccion/IndiceBusqueda.py).
+
+1. Tiempo de construir el índice sobre el libro sintético.
+2. Latencia por tecla: se "escriben" varias búsquedas letra por letra y
+   en cada tecla se hace lo que hace la tabla de la UI, contar los
+   resultados y pedir la primera página. También una página del medio.
+3. Lo mismo con un filtro en Python sobre obtener_transacciones(), la
+   alternativa sin índice (solo algunas teclas: es lento).
+4. Costo de agregar una transacción con el índice suscrito.
+
+Los totales se comparan con el filtro en Python: si no coinciden, el
+benchmark falla.
+
+Uso:
+    python -m benchmarks.bench_busqueda [filas] [repeticiones]
+"""
+import statistics
+import sys
+import time
+from typing import Callable, List
+
+from benchmarks.libro_sintetico import generar_libro
+from common.models.transaccion import Transaccion
+from common.texto import normalizar
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+
+# (texto que se escribe, categoría)
+BUSQUEDAS = [
+    ("supermercado", None),
+    ("tienda de ropa", None),
+    ("alquiler de auto", None),
+    ("farmacia", "Salud"),
+    ("ria", None),
+    ("e", "Compras"),
+]
+FILAS_VISIBLES = 25
+OBJETIVO_MS = 10.0
+
+
+def coincide_en_python(texto: str, categoria) -> Callable[[Transaccion], bool]:
+    """Filtro sin índice con la misma regla que IndiceBusqueda."""
+    terminos = normalizar(texto).split()
+    buscada = normalizar(categoria) if categoria is not None else None
+
+    def coincide(transaccion: Transaccion) -> bool:
+        if buscada is not None and normalizar(transaccion.categoria) != buscada:
+            return False
+        descripcion = normalizar(transaccion.descripcion)
+        palabras = descripcion.split()
+        return all(termino in descripcion if len(termino) >= 3
+                   else any(palabra.startswith(termino) for palabra in palabras)
+                   for termino in terminos)
+    return coincide
+
+
+def percentil(valores: List[float], p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(int(len(valores) * p), len(valores) - 1)]
+
+
+def main() -> None:
+    argumentos = sys.argv[1:]
+    filas = int(argumentos[0]) if argumentos else 1_000_000
+    repeticiones = int(argumentos[1]) if len(argumentos) > 1 else 20
+
+    libro = generar_libro(filas)
+    gateway = FinanzasGateway(crear_repositorio("memoria"), datos_ejemplo=False)
+    for inicio, fin in libro.tramos(100_000):
+        gateway.agregar_columnas(*libro.columnas(inicio, fin))
+    fila = libro.filas(0, 1)[0]
+
+    # --- 4 (antes): inserción sin índice ---
+    veces = 2_000
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        gateway.agregar_transaccion_centavos(*fila)
+    sin_indice = (time.perf_counter() - inicio) / veces
+
+    # --- 1. Construcción ---
+    inicio = time.perf_counter()
+    gateway.preparar_busqueda().result()
+    print(f"{gateway.contar_transacciones():,} transacciones; índice construido en "
+          f"{time.perf_counter() - inicio:.2f} s")
+
+    # --- 2. Latencia por tecla ---
+    print(f"\npor tecla: contar + primera página de {FILAS_VISIBLES} filas (ms)")
+    print(f"  {'búsqueda':<28} {'teclas':>6} {'p50':>7} {'p99':>7} {'máx':>7} "
+          f"{'resultados':>10} {'página medio':>13}")
+    todas_las_teclas: List[float] = []
+    for texto, categoria in BUSQUEDAS:
+        tiempos = []
+        for largo in range(1, len(texto) + 1):
+            parcial = texto[:largo]
+            for _ in range(repeticiones):
+                inicio = time.perf_counter()
+                total = gateway.buscar(parcial, categoria, 0, 0).total
+                gateway.buscar(parcial, categoria, 0, FILAS_VISIBLES)
+                tiempos.append(time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        gateway.buscar(texto, categoria, total // 2, FILAS_VISIBLES)
+        medio = time.perf_counter() - inicio
+        todas_las_teclas.extend(tiempos)
+        nombre = texto if categoria is None else f"{texto} [{categoria}]"
+        print(f"  {nombre:<28} {len(texto):>6} {statistics.median(tiempos) * 1000:>7.3f} "
+              f"{percentil(tiempos, 0.99) * 1000:>7.3f} {max(tiempos) * 1000:>7.3f} "
+              f"{total:>10,} {medio * 1000:>13.3f}")
+    p99 = percentil(todas_las_teclas, 0.99) * 1000
+    print(f"  p99 de todas las teclas: {p99:.3f} ms "
+          f"({'dentro' if p99 < OBJETIVO_MS else 'fuera'} del objetivo de {OBJETIVO_MS:.0f} ms)")
+
+    # --- 3. Filtro en Python, y comprobación de los totales ---
+    transacciones = list(gateway.obtener_transacciones())
+    print("\nfiltro en Python sobre obtener_transacciones() (una tecla, ms)")
+    for texto, categoria in BUSQUEDAS:
+        coincide = coincide_en_python(texto, categoria)
+        inicio = time.perf_counter()
+        esperado = sum(1 for transaccion in transacciones if coincide(transaccion))
+        segundos = time.perf_counter() - inicio
+        obtenido = gateway.buscar(texto, categoria, 0, 0).total
+        if obtenido != esperado:
+            raise AssertionError(f"{texto!r}: el índice da {obtenido}, el filtro {esperado}")
+        print(f"  {texto:<28} {segundos * 1000:>10.1f}")
+
+    # --- 4. Inserción con el índice suscrito ---
+    inicio = time.perf_counter()
+    for _ in range(veces):
+        gateway.agregar_transaccion_centavos(*fila)
+    con_indice = (time.perf_counter() - inicio) / veces
+    print(f"\nagregar_transaccion_centavos: {sin_indice * 1e6:.1f} µs sin índice, "
+          f"{con_indice * 1e6:.1f} µs con el índice suscrito")
+    gateway.cerrar()
+
+
+if __name__ == "__main__":
+    main()
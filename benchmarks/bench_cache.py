@@ -0,0 +1,56 @@
+# benchmarks/bench_cache.py
+"""
+Caché de resultados del gateway: primera consulta (se calcula) frente a
+las siguientes con los mismos datos (se sirven de la caché), y qué pasa
+tras una escritura.
+
+Uso:
+    python -m benchmarks.bench_cache [filas]
+"""
+import datetime
+import sys
+import time
+
+from benchmarks.bench_insercion import generar_transacciones
+from gateway.AppGraficaFinanzas.main import FinanzasGateway
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+REPETICIONES = 1000
+
+
+def cronometrar(funcion) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    repositorio = TransactionRepository()
+    repositorio.agregar_lote(generar_transacciones(cantidad))
+    gateway = FinanzasGateway(repositorio)
+
+    consultas = [("resumen por categoría", gateway.obtener_resumen_por_categoria),
+                 ("últimos 12 meses", gateway.obtener_resumen_ultimos_meses)]
+    try:
+        import numpy  # noqa: F401
+        consultas.append(("predicción 30 días", gateway.analisis_predictivo))
+    except ImportError:
+        print("(sin numpy: se omite la predicción)")
+
+    print(f"filas: {cantidad:,}")
+    for nombre, consulta in consultas:
+        t_frio = cronometrar(consulta)
+        t_caliente = cronometrar(lambda: [consulta() for _ in range(REPETICIONES)]) / REPETICIONES
+        gateway.agregar_transaccion_centavos(datetime.date.today(), "Nueva", -1_000, "General")
+        t_tras_escritura = cronometrar(consulta)
+        print(f"{nombre:<24} primera: {t_frio * 1000:9.3f} ms  "
+              f"en caché: {t_caliente * 1e6:7.2f} µs  "
+              f"tras escribir: {t_tras_escritura * 1000:9.3f} ms")
+
+    print(gateway.estadisticas_cache())
+    gateway.cerrar()
+
+
+if __name__ == "__main__":
+    main()
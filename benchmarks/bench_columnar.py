@@ -0,0 +1,62 @@
+# benchmarks/bench_columnar.py
+"""
+Compara el repositorio de objetos con el columnar: memoria por
+transacción y tiempo de resumen y predicción sobre un libro sintético.
+
+Uso:
+    python -m benchmarks.bench_columnar [filas]
+"""
+import sys
+import time
+import tracemalloc
+
+from benchmarks.bench_insercion import generar_transacciones
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.ColumnarTransactionRepository import ColumnarTransactionRepository
+from servicio_reporte.GeneradorReporte import GeneradorReporte
+from servicio_reporte.ControladorResumen import ControladorResumen
+from servicio_prediccion.SklearnAdapter import SklearnPredictorAdapter
+from servicio_prediccion.ServicioPrediccion import ServicioPrediccion
+
+
+def cargar(clase, cantidad: int):
+    """Crea los objetos y los carga, midiendo la memoria retenida."""
+    tracemalloc.start()
+    repositorio = clase()
+    repositorio.agregar_lote(generar_transacciones(cantidad))
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return repositorio, memoria
+
+
+def cronometrar(funcion) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return time.perf_counter() - inicio
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    generador = GeneradorReporte()
+    adaptador = SklearnPredictorAdapter()
+
+    for clase in (TransactionRepository, ColumnarTransactionRepository):
+        repositorio, memoria = cargar(clase, cantidad)
+        resumen = ControladorResumen(repositorio, generador)
+        prediccion = ServicioPrediccion(repositorio, adaptador)
+
+        # Ruta anterior: copiar todo y recorrer objetos
+        t_anterior = cronometrar(
+            lambda: generador.generar_resumen(list(repositorio.obtener_todas())))
+        t_resumen = cronometrar(resumen.obtener_resumen_por_categoria)
+        t_prediccion = cronometrar(prediccion.analisis_predictivo)
+
+        print(f"{clase.__name__}")
+        print(f"  memoria retenida:        {memoria / cantidad:8.1f} bytes/transacción")
+        print(f"  resumen (copia+objetos): {t_anterior * 1000:8.1f} ms")
+        print(f"  resumen (repositorio):   {t_resumen * 1000:8.1f} ms")
+        print(f"  predicción:              {t_prediccion * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# benchmarks/bench_concurrencia.py
+"""
+Repositorios con lectores y escritores en varios hilos a la vez.
+
+La consistencia de las lecturas concurrentes (en los cuatro backends)
+y de Subject.notify desde varios hilos se comprueba en
+tests/test_concurrencia.py; aquí solo se mide.
+
+Mide lecturas por segundo (una página y una consulta de 90
+días) sin escritor y con un escritor concurrente, frente a la versión
+anterior del repositorio (lista ordenada y copia completa con cerrojo
+en cada lectura).
+
+Uso:
+    python -m benchmarks.bench_concurrencia [filas] [segundos por medición]
+"""
+import datetime
+import random
+import sys
+import threading
+import time
+from bisect import insort
+from itertools import count
+from typing import Callable, Iterator, Optional
+
+from common.models.transaccion import Transaccion
+from servicio_transaccion.ColumnarTransactionRepository import ColumnarTransactionRepository
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+CATEGORIAS = ("Alimentación", "Transporte", "Ocio", "Vivienda", "Salud")
+PRIMER_DIA = datetime.date(2015, 1, 1).toordinal()
+HASTA = datetime.date(2024, 12, 31)
+DESDE = HASTA - datetime.timedelta(days=89)
+
+
+def generar(cantidad: Optional[int], prefijo: str, semilla: int) -> Iterator[Transaccion]:
+    """Transacciones al azar con descripción única; sin cantidad, sin fin."""
+    aleatorio = random.Random(semilla)
+    fabrica = TransaccionFactory()
+    for i in range(cantidad) if cantidad is not None else count():
+        yield fabrica.crear(datetime.date.fromordinal(PRIMER_DIA + aleatorio.randrange(3650)),
+                            f"{prefijo}-{i}", aleatorio.randint(-50_000, 50_000),
+                            aleatorio.choice(CATEGORIAS))
+
+
+# --- Medición ---
+
+class RepositorioConCopia:
+    """Versión anterior, como referencia: lista ordenada y copia en cada lectura."""
+    def __init__(self) -> None:
+        self._transacciones = []
+        self._cerrojo = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._transacciones)
+
+    def agregar(self, transaccion) -> None:
+        with self._cerrojo:
+            insort(self._transacciones, transaccion, key=lambda t: -t.fecha.toordinal())
+
+    def agregar_lote(self, transacciones) -> int:
+        with self._cerrojo:
+            self._transacciones.extend(transacciones)
+            self._transacciones.sort(key=lambda t: -t.fecha.toordinal())
+        return len(transacciones)
+
+    def obtener_todas(self):
+        with self._cerrojo:
+            return list(self._transacciones)
+
+    def obtener_rango(self, inicio: int, cantidad: int):
+        return self.obtener_todas()[inicio:inicio + cantidad]
+
+    def consultar(self, desde, hasta, limit):
+        return [t for t in self.obtener_todas() if desde <= t.fecha <= hasta][:limit]
+
+
+def medir_lecturas(repositorio, leer: Callable[[], object], segundos: float,
+                   con_escritor: bool, lectores: int = 2):
+    detener = threading.Event()
+    lecturas = [0] * lectores
+    escrituras = [0]
+
+    def lector(i: int) -> None:
+        while not detener.is_set():
+            leer()
+            lecturas[i] += 1
+
+    def escritor() -> None:
+        # Unas mil escrituras por segundo, una a una
+        for transaccion in generar(None, "escritor", 9):
+            if detener.wait(0.001):
+                return
+            repositorio.agregar(transaccion)
+            escrituras[0] += 1
+
+    hilos = [threading.Thread(target=lector, args=(i,)) for i in range(lectores)]
+    if con_escritor:
+        hilos.append(threading.Thread(target=escritor))
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(segundos)
+    detener.set()
+    for hilo in hilos:
+        hilo.join()
+    return sum(lecturas) / segundos, escrituras[0] / segundos
+
+
+def main() -> None:
+    argumentos = sys.argv[1:]
+    filas = int(argumentos[0]) if argumentos else 200_000
+    segundos = float(argumentos[1]) if len(argumentos) > 1 else 2.0
+
+    print(f"filas: {filas:,}  lectores: 2  (lecturas/s)")
+    lecturas = {
+        "página de 50": lambda r: r.obtener_rango(0, 50),
+        "90 días, 50 filas": lambda r: r.consultar(DESDE, HASTA, limit=50),
+    }
+    iniciales = list(generar(filas, "inicial", 1))
+    for nombre, crear in (("anterior (copia)", RepositorioConCopia),
+                          ("memoria", TransactionRepository),
+                          ("columnar", ColumnarTransactionRepository)):
+        for lectura, leer in lecturas.items():
+            repositorio = crear()
+            repositorio.agregar_lote(iniciales)
+            solo, _ = medir_lecturas(repositorio, lambda: leer(repositorio), segundos, False)
+            con, escrituras = medir_lecturas(repositorio, lambda: leer(repositorio),
+                                             segundos, True)
+            print(f"{nombre:<17} {lectura:<18} sin escritor: {solo:>10,.0f}  "
+                  f"con escritor: {con:>10,.0f}  ({escrituras:,.0f} escrituras/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_consultas.py
+"""
+Consultas por ventana de fechas, categoría y tipo: consultar() frente a
+copiar todo con obtener_todas() y filtrar en Python (el camino anterior).
+
+Uso:
+    python -m benchmarks.bench_consultas [filas]
+"""
+import datetime
+import sys
+import time
+
+from benchmarks.bench_insercion import generar_transacciones
+from common.models.resumen import ResumenTotales
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+REPETICIONES = 20
+
+
+def cronometrar(funcion) -> float:
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        funcion()
+    return (time.perf_counter() - inicio) / REPETICIONES
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    repositorio = TransactionRepository()
+    repositorio.agregar_lote(generar_transacciones(cantidad))
+    # generar_transacciones reparte las fechas en 10 años desde 2015
+    hasta = datetime.date(2024, 12, 31)
+    desde = hasta - datetime.timedelta(days=89)
+
+    def filtrar_copiando(categoria=None, solo_gastos=False):
+        return [t for t in list(repositorio.obtener_todas())
+                if desde <= t.fecha <= hasta
+                and (categoria is None or t.categoria == categoria)
+                and (not solo_gastos or t.centavos < 0)]
+
+    casos = [
+        ("últimos 90 días",
+         lambda: filtrar_copiando(),
+         lambda: list(repositorio.consultar(desde, hasta))),
+        ("90 días, gastos de una categoría",
+         lambda: filtrar_copiando("General", True),
+         lambda: list(repositorio.consultar(desde, hasta, ["General"], "gasto"))),
+        ("90 días, página de 50",
+         lambda: filtrar_copiando()[100:150],
+         lambda: list(repositorio.consultar(desde, hasta, offset=100, limit=50))),
+        ("resumen de 90 días",
+         lambda: ResumenTotales.desde_transacciones(filtrar_copiando()),
+         lambda: ResumenTotales.desde_transacciones(repositorio.consultar(desde, hasta))),
+    ]
+
+    print(f"filas: {cantidad:,}")
+    for nombre, anterior, nuevo in casos:
+        assert anterior() == nuevo(), nombre
+        t_anterior = cronometrar(anterior)
+        t_nuevo = cronometrar(nuevo)
+        print(f"{nombre:<34} copiar y filtrar: {t_anterior * 1000:9.2f} ms  "
+              f"consultar: {t_nuevo * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_cuentas.py
+"""
+Libro de varias cuentas: pronóstico y resumen de todas las cuentas en
+el proceso actual frente a un ProcessPoolExecutor con 1, 2, 4, ...
+procesos (hasta el número de núcleos). Compara también lo que pesa
+enviar una cuenta como columnas NumPy o como objetos Transaccion.
+
+Uso:
+    python -m benchmarks.bench_cuentas [cuentas] [filas por cuenta]
+"""
+import datetime
+import os
+import pickle
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from servicio_prediccion.PronosticoCuentas import pronosticar_cuentas
+from servicio_reporte.ResumenCuentas import resumir_cuentas
+from servicio_transaccion.ColumnarTransactionRepository import ColumnarTransactionRepository
+from servicio_transaccion.LibroCuentas import LibroCuentas
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+
+CATEGORIAS = ["Comida", "Transporte", "Vivienda", "Ocio", "Salud", "Servicios"]
+
+
+def generar_libro(cuentas: int, filas: int, semilla: int = 42) -> LibroCuentas:
+    aleatorio = np.random.default_rng(semilla)
+    fabrica = TransaccionFactory()
+    primer_dia = datetime.date(2023, 1, 1).toordinal()
+    libro = LibroCuentas(lambda cuenta: ColumnarTransactionRepository())
+    for numero in range(cuentas):
+        dias = primer_dia + aleatorio.integers(0, 730, filas)
+        centavos = np.rint(aleatorio.normal(-4_000, 6_000, filas)).astype(np.int64)
+        categorias = aleatorio.integers(0, len(CATEGORIAS), filas)
+        libro.agregar_lote(f"cuenta-{numero}", fabrica.crear_lote(
+            [datetime.date.fromordinal(int(d)) for d in dias],
+            ["Movimiento"] * filas,
+            centavos,
+            [CATEGORIAS[c] for c in categorias]))
+    return libro
+
+
+def calentar(procesos: ProcessPoolExecutor, trabajadores: int) -> None:
+    # Arranca los procesos (e importa NumPy en ellos) antes de medir
+    list(procesos.map(abs, range(trabajadores * 4)))
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def main() -> None:
+    argumentos = [int(a) for a in sys.argv[1:]]
+    cuentas, filas = (argumentos + [2_000, 400][len(argumentos):])[:2]
+    libro = generar_libro(cuentas, filas)
+    nucleos = os.cpu_count() or 1
+    print(f"cuentas: {cuentas:,}  filas por cuenta: {filas:,}  núcleos: {nucleos}")
+
+    cuenta = libro.cuentas()[0]
+    como_columnas = len(pickle.dumps(libro.columnas(cuenta)))
+    como_objetos = len(pickle.dumps(list(libro.particion(cuenta).obtener_todas())))
+    print(f"una cuenta serializada: columnas {como_columnas:,} B  "
+          f"objetos Transaccion {como_objetos:,} B")
+
+    t_resumen, resumenes = cronometrar(lambda: resumir_cuentas(libro))
+    t_serial, referencia = cronometrar(lambda: pronosticar_cuentas(libro))
+    print(f"{'en el proceso actual':<22} pronóstico: {t_serial * 1000:9.1f} ms  "
+          f"resumen: {t_resumen * 1000:8.1f} ms")
+
+    trabajadores = 1
+    while trabajadores <= nucleos:
+        with ProcessPoolExecutor(max_workers=trabajadores) as procesos:
+            calentar(procesos, trabajadores)
+            t_paralelo, pronosticos = cronometrar(
+                lambda: pronosticar_cuentas(libro, ejecutor=procesos))
+            t_resumen, paralelos = cronometrar(
+                lambda: resumir_cuentas(libro, ejecutor=procesos))
+        assert pronosticos == referencia and paralelos == resumenes
+        print(f"{trabajadores:>2} procesos{'':<11} pronóstico: {t_paralelo * 1000:9.1f} ms  "
+              f"resumen: {t_resumen * 1000:8.1f} ms  "
+              f"aceleración: {t_serial / t_paralelo:5.2f}x")
+        trabajadores *= 2
+
+    predecibles = [p for p, mensaje in referencia.values() if p is not None]
+    print(f"total predicho 30 días (todas las cuentas): "
+          f"${sum(p.total_predicho for p in predecibles):,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_diario.py
+"""
+Backend "diario": tiempo hasta estar listo al arrancar con una
+instantánea mapeada más la cola del diario, frente a reproducir el
+diario completo. Mide también el group commit frente a un fsync por
+fila. La recuperación ante caídas la comprueba
+tests/test_diario_recuperacion.py.
+
+Uso:
+    python -m benchmarks.bench_diario [filas] [filas en la cola]
+"""
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from servicio_transaccion.DiarioTransactionRepository import DiarioTransactionRepository
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+
+SIN_INSTANTANEA = 10 ** 12
+TAMANO_LOTE = 500_000
+
+
+def generar_columnas(cantidad: int, semilla: int = 42):
+    aleatorio = np.random.default_rng(semilla)
+    primer_dia = datetime.date(2015, 1, 1).toordinal()
+    nombres = [f"Categoría {i}" for i in range(20)]
+    textos = [f"Comercio {i}" for i in range(1000)]
+    return (primer_dia + aleatorio.integers(0, 3650, cantidad, dtype=np.int32),
+            [textos[i] for i in aleatorio.integers(0, len(textos), cantidad)],
+            aleatorio.integers(-50_000, 50_000, cantidad),
+            [nombres[i] for i in aleatorio.integers(0, len(nombres), cantidad)])
+
+
+def llenar(repositorio: DiarioTransactionRepository, columnas, tamano_lote: int) -> None:
+    fechas, descripciones, centavos, categorias = columnas
+    for inicio in range(0, len(fechas), tamano_lote):
+        fin = inicio + tamano_lote
+        repositorio.agregar_columnas(fechas[inicio:fin], descripciones[inicio:fin],
+                                     centavos[inicio:fin], categorias[inicio:fin])
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def main() -> None:
+    argumentos = [int(a) for a in sys.argv[1:]]
+    cantidad, cola = (argumentos + [5_000_000, 50_000][len(argumentos):])[:2]
+    base = tempfile.mkdtemp(prefix="bench_diario_")
+    directorio = os.path.join(base, "datos")
+    try:
+        columnas = generar_columnas(cantidad + cola)
+        historial = [c[:cantidad] for c in columnas]
+        repositorio = DiarioTransactionRepository(directorio,
+                                                  filas_por_instantanea=SIN_INSTANTANEA)
+        t_escritura, _ = cronometrar(lambda: llenar(repositorio, historial, TAMANO_LOTE))
+        repositorio.cerrar()
+        print(f"filas: {cantidad:,}  cola del diario: {cola:,}")
+        print(f"escribir el diario por lotes:        {t_escritura:8.2f} s  "
+              f"({cantidad / t_escritura:,.0f} filas/s)")
+
+        t_reproducir, repositorio = cronometrar(lambda: DiarioTransactionRepository(directorio))
+        print(f"arranque reproduciendo todo el diario: {t_reproducir:8.3f} s")
+        t_instantanea, _ = cronometrar(repositorio.instantanea)
+        print(f"escribir la instantánea:             {t_instantanea:8.3f} s")
+        llenar(repositorio, [c[cantidad:] for c in columnas], 1_000)
+        repositorio.cerrar()
+        referencia = repositorio.resumen_totales()
+
+        t_listo, repositorio = cronometrar(lambda: DiarioTransactionRepository(directorio))
+        t_resumen, resumen = cronometrar(repositorio.resumen_totales)
+        assert len(repositorio) == cantidad + cola and resumen == referencia
+        repositorio.cerrar()
+        print(f"arranque con instantánea + cola:     {t_listo:8.3f} s  "
+              f"(primer resumen: {t_resumen * 1000:.0f} ms)")
+
+        # Group commit frente a un fsync por fila
+        fabrica = TransaccionFactory()
+        hoy = datetime.date.today()
+        filas = 2_000
+        for etiqueta, por_grupo in (("group commit (256)", 256), ("fsync por fila", 1)):
+            ruta = os.path.join(base, f"grupo_{por_grupo}")
+            repositorio = DiarioTransactionRepository(ruta, registros_por_grupo=por_grupo)
+            transacciones = [fabrica.crear(hoy, "Café", -350, "Comida") for _ in range(filas)]
+
+            def agregar_una_a_una():
+                for transaccion in transacciones:
+                    repositorio.agregar(transaccion)
+                repositorio.sincronizar()
+
+            t_agregar, _ = cronometrar(agregar_una_a_una)
+            repositorio.cerrar()
+            print(f"agregar una a una, {etiqueta:<18} {filas / t_agregar:12,.0f} filas/s")
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
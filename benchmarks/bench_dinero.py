@@ -0,0 +1,103 @@
+# benchmarks/bench_dinero.py
+"""
+Importes en centavos enteros frente a float: exactitud y velocidad de
+los totales.
+
+- Exactitud: N cafés de 0.10 sumados como float se desvían del total
+  real; en centavos el total es exacto.
+- Velocidad: el resumen por objetos (sumas de Python) y el columnar
+  (reducciones NumPy) con int frente a la versión anterior con float.
+
+Uso:
+    python -m benchmarks.bench_dinero [filas]
+"""
+import sys
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+
+from common.dinero import a_unidades, formatear
+from common.models.resumen import ResumenTotales
+from servicio_transaccion.ColumnarTransactionRepository import (
+    ColumnasTransacciones, resumen_columnas
+)
+from benchmarks.bench_insercion import generar_transacciones
+
+
+def cronometrar(funcion, repeticiones: int = 5):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def resumen_filas(filas, cero):
+    """El bucle de ResumenTotales.desde_transacciones, sobre (importe, categoría)."""
+    ingresos = gastos = cero
+    por_categoria = defaultdict(type(cero))
+    for monto, categoria in filas:
+        if monto >= 0:
+            ingresos += monto
+        else:
+            gastos += monto
+            por_categoria[categoria] += monto
+    return ingresos, gastos, dict(por_categoria)
+
+
+# --- Camino columnar anterior (float en unidades), como referencia ---
+
+def resumen_columnas_float(columnas: ColumnasTransacciones, montos: np.ndarray):
+    es_gasto = montos < 0
+    por_categoria = np.bincount(columnas.categorias[es_gasto], weights=montos[es_gasto],
+                                minlength=len(columnas.nombres_categoria))
+    return float(montos[~es_gasto].sum()), float(montos[es_gasto].sum()), por_categoria
+
+
+def comprobar_exactitud(cantidad: int) -> None:
+    suma_float = 0.0
+    for _ in range(cantidad):
+        suma_float += 0.10
+    suma_centavos = sum(10 for _ in range(cantidad))
+    esperado = Decimal("0.10") * cantidad
+    assert Decimal(suma_centavos) / 100 == esperado
+    print(f"{cantidad:,} cafés de $0.10")
+    print(f"  float:    {suma_float!r}  (error {abs(Decimal(suma_float) - esperado):.2e})")
+    print(f"  centavos: {formatear(suma_centavos)}  (exacto)")
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    comprobar_exactitud(cantidad)
+
+    transacciones = generar_transacciones(cantidad)
+    columnas = ColumnasTransacciones.desde_transacciones(transacciones)
+    # Los importes se preparan fuera de la medición
+    filas_float = [(t.monto, t.categoria) for t in transacciones]
+    filas_centavos = [(t.centavos, t.categoria) for t in transacciones]
+    montos_float = a_unidades(columnas.centavos)
+
+    t_objetos_float, (ingresos, gastos, _) = cronometrar(lambda: resumen_filas(filas_float, 0.0))
+    t_objetos_int, _ = cronometrar(lambda: resumen_filas(filas_centavos, 0))
+    resumen = ResumenTotales.desde_transacciones(transacciones)
+    t_columnas_float, _ = cronometrar(
+        lambda: resumen_columnas_float(columnas, montos_float))
+    t_columnas_int, resumen_columnar = cronometrar(lambda: resumen_columnas(columnas))
+
+    assert resumen == resumen_columnar
+    print(f"\nfilas: {cantidad:,}")
+    print(f"ingresos: {formatear(resumen.ingreso_centavos)} "
+          f"(float: {ingresos:,.6f})")
+    print(f"gastos:   {formatear(resumen.gasto_centavos)} "
+          f"(float: {gastos:,.6f})")
+    print(f"resumen por filas      float: {t_objetos_float * 1000:8.1f} ms  "
+          f"centavos: {t_objetos_int * 1000:8.1f} ms")
+    print(f"resumen columnar       float: {t_columnas_float * 1000:8.1f} ms  "
+          f"centavos: {t_columnas_int * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
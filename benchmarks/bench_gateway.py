@@ -0,0 +1,248 @@
+# benchmarks/bench_gateway.py
+"""
+Medición de punta a punta de FinanzasGateway sobre un libro sintético
+reproducible (benchmarks/libro_sintetico.py).
+
+Fases:
+- insercion_lote: el libro entra por agregar_columnas en lotes;
+- obtener_transacciones: pedir la vista completa y recorrerla;
+- resumen_inicial / resumen_cache / resumen_tras_escritura: el primer
+  resumen por categoría (crea el agregador), aciertos de caché y el
+  resumen después de una escritura (caché invalidada);
+- prediccion_inicial, prediccion_<N>d y prediccion_horizontes: la
+  primera predicción (crea el servicio) y, para cada horizonte, la
+  predicción después de una escritura.
+
+Cada fase guarda muestras, rendimiento, latencias (p50, p90, p99,
+máxima) y el pico de memoria del proceso (RSS) hasta ese momento; con
+--tracemalloc también el pico de memoria Python de la fase, a costa de
+tiempos más lentos. Todo se escribe en un JSON; con --comparar se
+muestran las diferencias con otro JSON (p. ej. el del commit anterior).
+
+Uso:
+    python -m benchmarks.bench_gateway [--filas 1000000] [--backend memoria]
+        [--horizontes 7,30,90,365] [--salida bench_gateway.json]
+        [--comparar anterior.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.libro_sintetico import generar_libro
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+VERSION_FORMATO = 1
+# Diferencia (en proporción) a partir de la cual --comparar marca la fase
+UMBRAL_REGRESION = 0.10
+
+
+def pico_rss_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso hasta ahora, en MB."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return pico / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def commit_actual() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Medicion:
+    """Registra las fases y arma el informe."""
+    def __init__(self, con_tracemalloc: bool) -> None:
+        self.fases: Dict[str, Dict[str, Any]] = {}
+        self._tracemalloc = con_tracemalloc
+        if con_tracemalloc:
+            tracemalloc.start()
+
+    def fase(self, nombre: str, operacion: Callable[[], Any], repeticiones: int = 1,
+             unidades: int = 1, unidad: str = "operaciones",
+             preparar: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Ejecuta `operacion` varias veces (con `preparar` antes de cada
+        una, fuera del tiempo) y guarda la fase. `unidades` es lo que
+        procesa cada ejecución (filas, llamadas...).
+        """
+        self.iniciar_fase()
+        latencias = []
+        resultado = None
+        for _ in range(repeticiones):
+            if preparar is not None:
+                preparar()
+            inicio = time.perf_counter()
+            resultado = operacion()
+            latencias.append(time.perf_counter() - inicio)
+        self.registrar(nombre, latencias, unidades, unidad)
+        return resultado
+
+    def iniciar_fase(self) -> None:
+        if self._tracemalloc:
+            tracemalloc.reset_peak()
+
+    def registrar(self, nombre: str, latencias: List[float], unidades: float,
+                  unidad: str) -> None:
+        """Guarda una fase medida a mano (`unidades` por muestra)."""
+        tiempos = np.asarray(latencias) * 1000
+        datos = {
+            "muestras": len(tiempos),
+            "unidad": unidad,
+            "por_segundo": unidades * len(tiempos) / (tiempos.sum() / 1000),
+            "total_s": float(tiempos.sum() / 1000),
+            "media_ms": float(tiempos.mean()),
+            "p50_ms": float(np.percentile(tiempos, 50)),
+            "p90_ms": float(np.percentile(tiempos, 90)),
+            "p99_ms": float(np.percentile(tiempos, 99)),
+            "max_ms": float(tiempos.max()),
+            "pico_rss_mb": pico_rss_mb(),
+        }
+        if self._tracemalloc:
+            datos["pico_python_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        self.fases[nombre] = datos
+        print(f"{nombre:<26} {datos['por_segundo']:>14,.1f} {unidad + '/s':<14} "
+              f"p50 {datos['p50_ms']:>9.2f} ms  p99 {datos['p99_ms']:>9.2f} ms  "
+              f"RSS {datos['pico_rss_mb'] or 0:>7,.0f} MB", flush=True)
+
+
+def medir_gateway(opciones: argparse.Namespace) -> Dict[str, Any]:
+    medicion = Medicion(opciones.tracemalloc)
+    libro = medicion.fase("generar_libro",
+                          lambda: generar_libro(opciones.filas, opciones.anios, opciones.semilla),
+                          unidades=opciones.filas, unidad="filas")
+
+    directorio = None
+    ruta = None
+    if opciones.backend in ("sqlite", "diario"):
+        directorio = tempfile.mkdtemp(prefix="bench_gateway_")
+        ruta = os.path.join(directorio, "datos.db") if opciones.backend == "sqlite" else directorio
+    gateway = FinanzasGateway(crear_repositorio(opciones.backend, ruta), datos_ejemplo=False)
+    try:
+        # --- Inserción masiva (la conversión a columnas queda fuera del tiempo) ---
+        medicion.iniciar_fase()
+        latencias = []
+        for inicio, fin in libro.tramos(opciones.lote):
+            columnas = libro.columnas(inicio, fin)
+            comienzo = time.perf_counter()
+            gateway.agregar_columnas(*columnas)
+            latencias.append(time.perf_counter() - comienzo)
+        medicion.registrar("insercion_lote", latencias, len(libro) / len(latencias), "filas")
+        assert gateway.contar_transacciones() == len(libro)
+
+        # --- Lectura completa ---
+        def leer_todo() -> int:
+            return sum(1 for _ in gateway.obtener_transacciones())
+        medicion.fase("obtener_transacciones", leer_todo,
+                      repeticiones=opciones.repeticiones_lentas,
+                      unidades=len(libro), unidad="filas")
+
+        # Cada escritura invalida la caché; se repite una fila del libro
+        fila = libro.filas(0, 1)[0]
+
+        def escribir() -> None:
+            gateway.agregar_transaccion_centavos(*fila)
+
+        # --- Resumen por categoría ---
+        medicion.fase("resumen_inicial", gateway.obtener_resumen_por_categoria)
+        medicion.fase("resumen_cache", gateway.obtener_resumen_por_categoria,
+                      repeticiones=opciones.repeticiones)
+        medicion.fase("resumen_tras_escritura", gateway.obtener_resumen_por_categoria,
+                      repeticiones=opciones.repeticiones, preparar=escribir)
+
+        # --- Predicción ---
+        horizontes = opciones.horizontes
+        _, mensaje = medicion.fase("prediccion_inicial",
+                                   lambda: gateway.analisis_predictivo(horizontes[0]))
+        if mensaje:
+            raise RuntimeError(f"La predicción falló: {mensaje}")
+        for dias in horizontes:
+            medicion.fase(f"prediccion_{dias}d", lambda: gateway.analisis_predictivo(dias),
+                          repeticiones=opciones.repeticiones, preparar=escribir)
+        medicion.fase("prediccion_horizontes",
+                      lambda: gateway.analisis_predictivo_horizontes(horizontes),
+                      repeticiones=opciones.repeticiones, unidades=len(horizontes),
+                      unidad="horizontes", preparar=escribir)
+    finally:
+        gateway.cerrar()
+        if directorio is not None:
+            shutil.rmtree(directorio, ignore_errors=True)
+
+    return {
+        "version_formato": VERSION_FORMATO,
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_actual(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "parametros": {clave: valor for clave, valor in vars(opciones).items()
+                       if clave not in ("salida", "comparar")},
+        "fases": medicion.fases,
+    }
+
+
+def comparar(actual: Dict[str, Any], anterior: Dict[str, Any]) -> None:
+    """Diferencias de p50 y de rendimiento por fase (+ es más lento)."""
+    print(f"\nfrente a {anterior.get('commit') or '?'} ({anterior.get('fecha')}):")
+    if anterior.get("parametros") != actual["parametros"]:
+        print("  aviso: los parámetros no coinciden, la comparación es orientativa")
+    for nombre, datos in actual["fases"].items():
+        previo = anterior.get("fases", {}).get(nombre)
+        if previo is None:
+            print(f"  {nombre:<26} (nueva)")
+            continue
+        cambio_p50 = datos["p50_ms"] / previo["p50_ms"] - 1 if previo["p50_ms"] else 0.0
+        cambio_ritmo = datos["por_segundo"] / previo["por_segundo"] - 1
+        marca = "  REGRESIÓN" if cambio_p50 > UMBRAL_REGRESION else ""
+        print(f"  {nombre:<26} p50 {cambio_p50:>+7.1%}   ritmo {cambio_ritmo:>+7.1%}{marca}")
+
+
+def main(argumentos: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Medición de punta a punta del gateway")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--anios", type=int, default=5)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--backend", default="memoria",
+                        choices=("memoria", "columnar", "sqlite", "diario"))
+    parser.add_argument("--lote", type=int, default=100_000, help="filas por inserción")
+    parser.add_argument("--horizontes", default="7,30,90,365",
+                        type=lambda texto: [int(h) for h in texto.split(",")])
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--repeticiones-lentas", type=int, default=3,
+                        help="repeticiones de obtener_transacciones")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="pico de memoria Python por fase (más lento)")
+    parser.add_argument("--salida", default="bench_gateway.json")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior")
+    opciones = parser.parse_args(argumentos)
+
+    informe = medir_gateway(opciones)
+    with open(opciones.salida, "w", encoding="utf-8") as archivo:
+        json.dump(informe, archivo, indent=2, ensure_ascii=False)
+    print(f"\nresultados en {opciones.salida}")
+    if opciones.comparar:
+        with open(opciones.comparar, encoding="utf-8") as archivo:
+            comparar(informe, json.load(archivo))
+
+
+if __name__ == "__main__":
+    main()
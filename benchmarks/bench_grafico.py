@@ -0,0 +1,127 @@
+# benchmarks/bench_grafico.py
+"""
+Redibujo del gráfico de la predicción con años de historial.
+
+En cada repetición se agrega una transacción, se vuelve a pedir la
+predicción al gateway y se dibuja el resultado (backend Agg), como
+cuando el usuario repite el análisis en la interfaz:
+
+- figura nueva por predicción con todos los puntos, dejando abiertas
+  las anteriores (una ventana por predicción, lo que hacía la UI)
+- figura nueva por predicción, submuestreada, cerrada al terminar
+- una sola figura reutilizada, submuestreada con lttb y con min_max
+
+Se informa el tiempo de actualizar + dibujar (p50 y p99), los puntos
+dibujados y, en una segunda pasada con tracemalloc, la memoria que
+queda retenida al final y el pico.
+
+Uso:
+    python -m benchmarks.bench_grafico [--filas N] [--anios N] [--repeticiones N]
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from typing import Callable, List, Tuple
+
+from benchmarks.libro_sintetico import generar_libro
+from common import config
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+from servicio_prediccion.GraficoPrediccion import GraficoPrediccion
+
+
+def figuras_nuevas(metodo, cerrar: bool) -> Callable:
+    """Una figura por predicción (con su lienzo Agg)."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    abiertas: List[GraficoPrediccion] = []
+
+    def dibujar(resultado) -> int:
+        grafico = GraficoPrediccion(metodo)
+        FigureCanvasAgg(grafico.figura)
+        grafico.actualizar(resultado)
+        grafico.dibujar()
+        if cerrar:
+            grafico.cerrar()
+        else:
+            abiertas.append(grafico)
+        return grafico.puntos_dibujados
+    return dibujar
+
+
+def figura_reutilizada(metodo) -> Callable:
+    """Un solo gráfico; cada predicción cambia los datos de sus artistas."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    grafico = GraficoPrediccion(metodo)
+    FigureCanvasAgg(grafico.figura)
+
+    def dibujar(resultado) -> int:
+        grafico.actualizar(resultado)
+        grafico.dibujar()
+        return grafico.puntos_dibujados
+    return dibujar
+
+
+ESCENARIOS: List[Tuple[str, Callable[[], Callable]]] = [
+    ("nueva por predicción, todos los puntos", lambda: figuras_nuevas(None, cerrar=False)),
+    ("nueva por predicción, lttb, cerrada", lambda: figuras_nuevas("lttb", cerrar=True)),
+    ("reutilizada, lttb", lambda: figura_reutilizada("lttb")),
+    ("reutilizada, min_max", lambda: figura_reutilizada("min_max")),
+]
+
+
+def repetir(gateway: FinanzasGateway, fila, dibujar: Callable, repeticiones: int):
+    """Tiempos de dibujo (s) y puntos de la última repetición."""
+    tiempos = []
+    puntos = 0
+    for _ in range(repeticiones):
+        gateway.agregar_transaccion_centavos(*fila)
+        resultado, mensaje = gateway.analisis_predictivo(config.DIAS_POR_DEFECTO_PREDICCION)
+        if mensaje:
+            raise RuntimeError(mensaje)
+        inicio = time.perf_counter()
+        puntos = dibujar(resultado)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, puntos
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=300_000)
+    parser.add_argument("--anios", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    opciones = parser.parse_args()
+
+    libro = generar_libro(opciones.filas, anios=opciones.anios)
+    gateway = FinanzasGateway(crear_repositorio("memoria"), datos_ejemplo=False)
+    for inicio, fin in libro.tramos(100_000):
+        gateway.agregar_columnas(*libro.columnas(inicio, fin))
+    fila = libro.filas(0, 1)[0]
+    resultado, _ = gateway.analisis_predictivo(config.DIAS_POR_DEFECTO_PREDICCION)
+    print(f"{opciones.filas:,} filas, {len(resultado.dias_historicos):,} días de historial, "
+          f"{opciones.repeticiones} predicciones por escenario")
+
+    print(f"\n  {'escenario':<40} {'puntos':>7} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'retenida MB':>12} {'pico MB':>8}")
+    for nombre, crear in ESCENARIOS:
+        # Calentamiento: importa Matplotlib y carga las fuentes
+        repetir(gateway, fila, crear(), 1)
+        tiempos, puntos = repetir(gateway, fila, crear(), opciones.repeticiones)
+        tiempos.sort()
+        p99 = tiempos[min(int(len(tiempos) * 0.99), len(tiempos) - 1)]
+
+        # Memoria aparte: tracemalloc hace más lento cada reserva
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        dibujar = crear()
+        repetir(gateway, fila, dibujar, opciones.repeticiones)
+        retenida, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del dibujar
+
+        print(f"  {nombre:<40} {puntos:>7,} {statistics.median(tiempos) * 1000:>8.1f} "
+              f"{p99 * 1000:>8.1f} {(retenida - base) / 1e6:>12.1f} {(pico - base) / 1e6:>8.1f}")
+    gateway.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/bench_importacion.py
+"""
+Importación de un extracto CSV grande: filas/s del análisis solo y de
+la importación completa (fábrica + repositorio + notificación por lote),
+con un 0,1 % de líneas mal formadas.
+
+Uso:
+    python -m benchmarks.bench_importacion [filas]
+"""
+import os
+import random
+import resource
+import sys
+import tempfile
+
+from servicio_transaccion.ImportadorExtractos import ImportadorExtractos, leer_csv
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+from benchmarks.bench_insercion import medir
+
+CATEGORIAS = ("Alimentación", "Transporte", "Ocio", "Vivienda", "Salud")
+
+
+def escribir_csv(ruta: str, cantidad: int, semilla: int = 42) -> None:
+    aleatorio = random.Random(semilla)
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        archivo.write("fecha;descripcion;monto;categoria\n")
+        for i in range(cantidad):
+            if i % 1000 == 999:
+                archivo.write("no es una fecha;roto\n")
+                continue
+            anio = 2015 + aleatorio.randrange(10)
+            mes = 1 + aleatorio.randrange(12)
+            dia = 1 + aleatorio.randrange(28)
+            archivo.write(f"{dia:02d}/{mes:02d}/{anio};Movimiento {i % 97};"
+                          f"{aleatorio.uniform(-500, 500):.2f};"
+                          f"{aleatorio.choice(CATEGORIAS)}\n")
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "extracto.csv")
+        escribir_csv(ruta, cantidad)
+        print(f"archivo: {os.path.getsize(ruta) / 1e6:,.1f} MB")
+
+        def solo_analizar():
+            with open(ruta, newline="", encoding="utf-8") as archivo:
+                for _ in leer_csv(archivo):
+                    pass
+        medir("análisis CSV", cantidad, solo_analizar)
+
+        logica = LogicaFinanciera(TransaccionFactory(), TransactionRepository())
+        importador = ImportadorExtractos(logica)
+        resultados = []
+        medir("importación completa", cantidad,
+              lambda: resultados.append(importador.importar(ruta)))
+
+        resultado = resultados[0]
+        print(f"importadas: {resultado.filas_importadas:,}  "
+              f"inválidas: {resultado.lineas_invalidas:,}  "
+              f"({resultado.filas_por_segundo:,.0f} filas/s según el importador)")
+        # ru_maxrss está en KB en Linux
+        print(f"memoria máxima del proceso: "
+              f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
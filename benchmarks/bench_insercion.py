@@ -0,0 +1,70 @@
+# benchmarks/bench_insercion.py
+"""
+Rendimiento de inserción en TransactionRepository.
+
+Uso (desde la raíz del proyecto):
+    python -m benchmarks.bench_insercion
+"""
+import datetime
+import random
+import sys
+import time
+
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+TAMANOS = (10_000, 100_000, 1_000_000)
+
+
+def generar_transacciones(cantidad: int, semilla: int = 42):
+    aleatorio = random.Random(semilla)
+    fabrica = TransaccionFactory()
+    inicio = datetime.date(2015, 1, 1).toordinal()
+    return [
+        fabrica.crear(datetime.date.fromordinal(inicio + aleatorio.randrange(3650)),
+                      "Movimiento", aleatorio.randint(-50_000, 50_000), "General")
+        for _ in range(cantidad)
+    ]
+
+
+def medir(etiqueta: str, cantidad: int, operacion) -> None:
+    inicio = time.perf_counter()
+    operacion()
+    segundos = time.perf_counter() - inicio
+    print(f"{etiqueta:<28} {cantidad:>10,} filas  {segundos:8.3f} s  "
+          f"{cantidad / segundos:>12,.0f} filas/s")
+
+
+def main() -> None:
+    tamanos = [int(a) for a in sys.argv[1:]] or TAMANOS
+    for cantidad in tamanos:
+        transacciones = generar_transacciones(cantidad)
+
+        repositorio = TransactionRepository()
+        medir("agregar (una a una)", cantidad,
+              lambda: [repositorio.agregar(t) for t in transacciones])
+
+        repositorio = TransactionRepository()
+        medir("agregar_lote (desordenado)", cantidad,
+              lambda: repositorio.agregar_lote(transacciones))
+
+        ordenadas = sorted(transacciones, key=lambda t: t.fecha)
+        repositorio = TransactionRepository()
+        medir("agregar_lote (ordenado)", cantidad,
+              lambda: repositorio.agregar_lote(ordenadas))
+
+        # Referencia: el esquema anterior (append + sort en cada inserción)
+        # es cuadrático, así que solo se mide en el tamaño pequeño.
+        if cantidad <= 10_000:
+            lista = []
+
+            def reordenar_siempre():
+                for t in transacciones:
+                    lista.append(t)
+                    lista.sort(key=lambda x: x.fecha, reverse=True)
+            medir("append + sort (anterior)", cantidad, reordenar_siempre)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# benchmarks/bench_metricas.py
+"""
+Costo de la instrumentación (common/metricas.py) y ejemplo de lo que
+registra.
+
+1. Una función vacía sin decorar, decorada con las métricas
+   desactivadas, activadas y con el muestreo de llamadas lentas.
+2. Operaciones frecuentes del gateway (página de 50 filas, resumen
+   desde la caché, inserción de una fila) con las métricas desactivadas
+   y activadas.
+3. Desglose por etapa de la primera predicción con sklearn y las
+   llamadas lentas capturadas.
+
+Uso:
+    python -m benchmarks.bench_metricas [filas] [llamadas]
+"""
+import sys
+import time
+from typing import Callable
+
+from benchmarks.libro_sintetico import generar_libro
+from common import config, metricas
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+
+
+def ns_por_llamada(funcion: Callable[[], object], llamadas: int) -> float:
+    """Mejor de tres pasadas, en nanosegundos por llamada."""
+    mejor = float("inf")
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for _ in range(llamadas):
+            funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / llamadas * 1e9
+
+
+def vacia() -> None:
+    pass
+
+
+def main() -> None:
+    argumentos = sys.argv[1:]
+    filas = int(argumentos[0]) if argumentos else 200_000
+    llamadas = int(argumentos[1]) if len(argumentos) > 1 else 200_000
+
+    # --- 1. Función vacía ---
+    decorada = metricas.medido("bench.vacia")(vacia)
+    print("función vacía (ns por llamada)")
+    print(f"  {'sin decorar':<34} {ns_por_llamada(vacia, llamadas):>8.0f}")
+    metricas.desactivar()
+    print(f"  {'decorada, desactivadas':<34} {ns_por_llamada(decorada, llamadas):>8.0f}")
+
+    def con_cronometro() -> None:
+        with metricas.cronometro("bench.bloque"):
+            pass
+    print(f"  {'cronometro(), desactivadas':<34} {ns_por_llamada(con_cronometro, llamadas):>8.0f}")
+    metricas.activar()
+    print(f"  {'decorada, activadas':<34} {ns_por_llamada(decorada, llamadas):>8.0f}")
+    metricas.activar(umbral_lento=1.0)
+    print(f"  {'decorada, activadas + muestreo':<34} {ns_por_llamada(decorada, llamadas):>8.0f}")
+    metricas.desactivar()
+    metricas.reiniciar()
+
+    # --- 2. Operaciones del gateway ---
+    libro = generar_libro(filas)
+    gateway = FinanzasGateway(crear_repositorio("memoria"), datos_ejemplo=False)
+    for inicio, fin in libro.tramos(100_000):
+        gateway.agregar_columnas(*libro.columnas(inicio, fin))
+    gateway.obtener_resumen_por_categoria()
+    fila = libro.filas(0, 1)[0]
+    operaciones = [
+        ("obtener_pagina(0, 50)", lambda: gateway.obtener_pagina(0, 50)),
+        ("resumen por categoría (caché)", gateway.obtener_resumen_por_categoria),
+        ("contar_transacciones", gateway.contar_transacciones),
+        ("agregar_transaccion_centavos", lambda: gateway.agregar_transaccion_centavos(*fila)),
+    ]
+    veces = max(llamadas // 20, 1)
+    print(f"\ngateway con {filas:,} filas (µs por llamada)")
+    print(f"  {'operación':<34} {'desactivadas':>12} {'activadas':>10} {'costo':>8}")
+    for nombre, operacion in operaciones:
+        metricas.desactivar()
+        apagadas = ns_por_llamada(operacion, veces) / 1000
+        metricas.activar()
+        encendidas = ns_por_llamada(operacion, veces) / 1000
+        print(f"  {nombre:<34} {apagadas:>12.2f} {encendidas:>10.2f} "
+              f"{encendidas / apagadas - 1:>+8.1%}")
+    gateway.cerrar()
+
+    # --- 3. Desglose de una predicción ---
+    metricas.reiniciar()
+    metricas.activar(umbral_lento=0.05)
+    modo = config.MODO_PREDICCION
+    config.MODO_PREDICCION = "sklearn"
+    try:
+        gateway = FinanzasGateway(crear_repositorio("memoria"), datos_ejemplo=False)
+        for inicio, fin in libro.tramos(100_000):
+            gateway.agregar_columnas(*libro.columnas(inicio, fin))
+        gateway.analisis_predictivo(30)
+        gateway.agregar_transaccion_centavos(*fila)
+        gateway.analisis_predictivo(30)
+    finally:
+        config.MODO_PREDICCION = modo
+    duraciones = gateway.obtener_metricas()["duraciones"]
+    print("\npredicción con sklearn (total por operación, ms)")
+    for nombre, datos in sorted(duraciones.items(), key=lambda item: -item[1]["suma"]):
+        if nombre.startswith(("gateway.analisis", "prediccion", "repositorio.memoria.gastos")):
+            print(f"  {nombre:<46} {datos['cantidad']:>4} {datos['suma'] * 1000:>10.2f}")
+    print("\nllamadas lentas (> 50 ms)")
+    for lenta in metricas.llamadas_lentas():
+        print(lenta.texto(3))
+    gateway.cerrar()
+
+    texto = metricas.texto_prometheus()
+    print(f"\ntexto para Prometheus: {len(texto.splitlines())} líneas, {len(texto):,} bytes")
+    metricas.desactivar()
+
+
+if __name__ == "__main__":
+    main()
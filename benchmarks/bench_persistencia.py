@@ -0,0 +1,61 @@
+# benchmarks/bench_persistencia.py
+"""
+Repositorio SQLite frente al repositorio en memoria: arranque en frío,
+velocidad de inserción y latencia del resumen.
+
+Uso:
+    python -m benchmarks.bench_persistencia [filas]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_insercion import generar_transacciones
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.SqliteTransactionRepository import SqliteTransactionRepository
+from servicio_reporte.GeneradorReporte import GeneradorReporte
+from servicio_reporte.ControladorResumen import ControladorResumen
+
+
+def cronometrar(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return time.perf_counter() - inicio, resultado
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    transacciones = generar_transacciones(cantidad)
+    generador = GeneradorReporte()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "bench.db")
+
+        t_mem, memoria = cronometrar(lambda: TransactionRepository())
+        t_ins_mem, _ = cronometrar(lambda: memoria.agregar_lote(transacciones))
+
+        sqlite = SqliteTransactionRepository(ruta)
+        t_ins_sql, _ = cronometrar(lambda: sqlite.agregar_lote(transacciones))
+        sqlite.cerrar()
+
+        # Arranque en frío: abrir el archivo existente frente a recargar en memoria
+        t_frio_sql, sqlite = cronometrar(lambda: SqliteTransactionRepository(ruta))
+
+        print(f"filas: {cantidad:,}")
+        print(f"inserción en memoria:  {cantidad / t_ins_mem:>12,.0f} filas/s")
+        print(f"inserción en SQLite:   {cantidad / t_ins_sql:>12,.0f} filas/s")
+        print(f"arranque en memoria (recarga): {(t_mem + t_ins_mem) * 1000:8.1f} ms")
+        print(f"arranque SQLite (abrir):       {t_frio_sql * 1000:8.1f} ms")
+
+        for nombre, repositorio in (("memoria", memoria), ("SQLite", sqlite)):
+            controlador = ControladorResumen(repositorio, generador)
+            t_resumen, _ = cronometrar(controlador.obtener_resumen_por_categoria)
+            t_diario, _ = cronometrar(repositorio.gastos_diarios)
+            print(f"resumen ({nombre}):      {t_resumen * 1000:8.1f} ms")
+            print(f"gastos diarios ({nombre}): {t_diario * 1000:8.1f} ms")
+        sqlite.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# benchmarks/bench_prediccion.py
+"""
+Regresión incremental frente al reentrenamiento con sklearn: costo de
+predecir después de agregar una transacción. Que los coeficientes
+coincidan lo comprueba tests/test_regresion_incremental.py.
+
+Uso:
+    python -m benchmarks.bench_prediccion [filas]
+"""
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.bench_insercion import generar_transacciones
+from common.dinero import a_unidades
+from common.models.resumen import calcular_gastos_diarios
+from servicio_prediccion.RegresionIncremental import PronosticoIncremental
+from servicio_prediccion.SklearnAdapter import SklearnPredictorAdapter
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    transacciones = generar_transacciones(cantidad)
+    adaptador = SklearnPredictorAdapter()
+    pronostico = PronosticoIncremental()
+
+    for transaccion in transacciones:
+        pronostico.acumular(transaccion)
+
+    dias, centavos = calcular_gastos_diarios(transacciones)
+    referencia = adaptador.ajustar(dias, a_unidades(np.asarray(centavos)))
+    incremental = pronostico.coeficientes()
+    print(f"coeficientes sklearn:     {referencia}")
+    print(f"coeficientes incremental: {incremental}")
+
+    repeticiones = 20
+    inicio = time.perf_counter()
+    for transaccion in transacciones[:repeticiones]:
+        transacciones.append(transaccion)
+        dias, centavos = calcular_gastos_diarios(transacciones)
+        adaptador.ajustar(dias, a_unidades(np.asarray(centavos)))
+    t_sklearn = (time.perf_counter() - inicio) / repeticiones
+
+    inicio = time.perf_counter()
+    for transaccion in transacciones[:repeticiones]:
+        pronostico.acumular(transaccion)
+        pronostico.predecir(30)
+    t_incremental = (time.perf_counter() - inicio) / repeticiones
+
+    print(f"filas: {cantidad:,}")
+    print(f"agregar + reentrenar (sklearn): {t_sklearn * 1000:10.3f} ms")
+    print(f"agregar + predecir (incremental): {t_incremental * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
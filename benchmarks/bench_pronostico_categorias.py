@@ -0,0 +1,67 @@
+# benchmarks/bench_pronostico_categorias.py
+"""
+Pronóstico por categoría: matriz categoría × día resuelta de una vez
+con NumPy frente a un LinearRegression de sklearn por categoría en un
+bucle. Comprueba que las tendencias coinciden.
+
+Uso:
+    python -m benchmarks.bench_pronostico_categorias [categorías] [días] [gastos]
+"""
+import datetime
+import sys
+import time
+
+import numpy as np
+from sklearn.linear_model import LinearRegression
+
+from servicio_prediccion.PronosticoCategorias import (
+    matriz_categoria_dia, pronosticar_categorias
+)
+
+
+def generar_gastos(categorias: int, dias: int, cantidad: int, semilla: int = 42):
+    aleatorio = np.random.default_rng(semilla)
+    primer_dia = datetime.date(2020, 1, 1).toordinal()
+    codigos = aleatorio.integers(0, categorias, cantidad)
+    x = aleatorio.integers(0, dias, cantidad)
+    # Cada categoría con su propio nivel y tendencia, más ruido
+    nivel = aleatorio.uniform(5, 200, categorias)
+    tendencia = aleatorio.uniform(-0.02, 0.05, categorias)
+    montos = np.maximum(nivel[codigos] + tendencia[codigos] * x
+                        + aleatorio.normal(0, 10, cantidad), 0.01)
+    nombres = [f"Categoría {i}" for i in range(categorias)]
+    return primer_dia + x, codigos, montos, nombres
+
+
+def main() -> None:
+    argumentos = [int(a) for a in sys.argv[1:]]
+    categorias, dias, cantidad = (argumentos + [500, 5 * 365, 2_000_000][len(argumentos):])[:3]
+    fechas, codigos, montos, nombres = generar_gastos(categorias, dias, cantidad)
+    primer_dia, ultimo_dia = int(fechas.min()), int(fechas.max())
+
+    inicio = time.perf_counter()
+    pronostico = pronosticar_categorias(fechas, codigos, montos, nombres, 30)
+    t_vectorizado = time.perf_counter() - inicio
+
+    # Referencia: un modelo por categoría sobre la misma matriz densa
+    inicio = time.perf_counter()
+    matriz = matriz_categoria_dia(fechas, codigos, montos, categorias, primer_dia, ultimo_dia)
+    x = np.arange(matriz.shape[1]).reshape(-1, 1)
+    pendientes, interceptos = [], []
+    for fila in matriz:
+        modelo = LinearRegression().fit(x, fila)
+        pendientes.append(modelo.coef_[0])
+        interceptos.append(modelo.intercept_)
+    t_bucle = time.perf_counter() - inicio
+
+    assert np.allclose(pronostico.pendientes, pendientes, rtol=1e-7, atol=1e-9)
+    assert np.allclose(pronostico.interceptos, interceptos, rtol=1e-7, atol=1e-7)
+
+    print(f"categorías: {categorias:,}  días: {matriz.shape[1]:,}  gastos: {cantidad:,}")
+    print(f"vectorizado (matriz + ajuste + 30 días): {t_vectorizado * 1000:10.1f} ms")
+    print(f"sklearn por categoría (bucle):            {t_bucle * 1000:10.1f} ms")
+    print(f"total predicho 30 días: ${pronostico.total_predicho:,.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+# benchmarks/bench_recurrencias.py
+"""
+Detección de recurrencias y anomalías (servicio_prediccion/Recurrencias.py)
+sobre el libro sintético, con anomalías inyectadas.
+
+1. Tiempo del análisis sobre las columnas del libro, por descripción y
+   por categoría, y a través del gateway: con el repositorio columnar
+   (lee sus arreglos), con el de memoria (pasa las transacciones a
+   columnas) y ya en caché.
+2. Series detectadas: deben estar los cinco movimientos fijos del mes
+   con su próxima fecha y su último importe, y ninguna más.
+3. Anomalías: se multiplican por ANOMALIA_FACTOR los importes de
+   algunas filas variables al azar; se informa cuántas se encuentran y
+   cuántas filas sin tocar se marcan (el libro es log-normal: algunas
+   lo son de verdad).
+4. Las anomalías de un tramo se comparan con un recorrido en Python,
+   grupo por grupo con statistics.median; si no coinciden, el
+   benchmark falla.
+
+Uso:
+    python -m benchmarks.bench_recurrencias [filas] [anomalias]
+"""
+import datetime
+import math
+import statistics
+import sys
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Set, Tuple
+
+import numpy as np
+
+from benchmarks.libro_sintetico import _AUMENTO_ANUAL_FIJOS, _FIJOS_MENSUALES, generar_libro
+from common import config
+from common.models.prediccion import AnalisisRecurrencias
+from common.texto import normalizar
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+from servicio_prediccion.Recurrencias import ColumnasRecurrencias, analizar_columnas
+
+ANOMALIA_FACTOR = 50
+FILAS_RECORRIDO = 100_000
+SEMILLA = 1
+
+
+def medir(funcion: Callable[[], AnalisisRecurrencias], veces: int = 3
+          ) -> Tuple[float, AnalisisRecurrencias]:
+    """Mejor tiempo de `veces` llamadas y el último resultado."""
+    mejor = math.inf
+    for _ in range(veces):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor, resultado
+
+
+def recorrido_en_python(columnas: ColumnasRecurrencias) -> Set[Tuple[int, int, int]]:
+    """
+    Anomalías (día, código de descripción, centavos) con la misma regla,
+    fila por fila: una cola con las anteriores de cada grupo.
+    """
+    anteriores: Dict[Tuple[str, bool], deque] = defaultdict(
+        lambda: deque(maxlen=config.VENTANA_ANOMALIAS))
+    normalizadas = [normalizar(texto) for texto in columnas.textos_descripcion]
+    filas = sorted(zip(columnas.dias.tolist(), columnas.descripciones.tolist(),
+                       columnas.centavos.tolist(), range(len(columnas.dias))),
+                   key=lambda fila: (normalizadas[fila[1]], fila[2] > 0, fila[0], fila[3]))
+    encontradas = set()
+    for dia, descripcion, centavos, _ in filas:
+        valor = math.log(abs(centavos))
+        cola = anteriores[normalizadas[descripcion], centavos > 0]
+        if len(cola) >= config.MINIMO_HISTORIAL_ANOMALIA:
+            mediana = statistics.median(cola)
+            desvio = statistics.median(abs(x - mediana) for x in cola)
+            puntaje = 0.6745 * (valor - mediana) / max(desvio, config.VARIACION_MINIMA_ANOMALIA)
+            if abs(puntaje) > config.UMBRAL_ANOMALIA:
+                encontradas.add((dia, descripcion, centavos))
+        cola.append(valor)
+    return encontradas
+
+
+def main() -> None:
+    argumentos = sys.argv[1:]
+    filas = int(argumentos[0]) if argumentos else 1_000_000
+    inyectadas = int(argumentos[1]) if len(argumentos) > 1 else 200
+
+    libro = generar_libro(filas)
+    # --- Anomalías inyectadas: filas variables de la segunda mitad ---
+    aleatorio = np.random.default_rng(SEMILLA)
+    fijos = len(_FIJOS_MENSUALES)
+    candidatas = np.flatnonzero(libro.descripciones >= fijos)
+    candidatas = candidatas[candidatas >= len(libro) // 2]
+    elegidas = aleatorio.choice(candidatas, size=inyectadas, replace=False)
+    libro.centavos[elegidas] *= ANOMALIA_FACTOR
+    esperadas = set(zip(libro.fechas[elegidas].tolist(),
+                        [libro.nombres_descripcion[d] for d in libro.descripciones[elegidas].tolist()],
+                        libro.centavos[elegidas].tolist()))
+
+    columnas = ColumnasRecurrencias(libro.fechas, libro.centavos, libro.descripciones,
+                                    libro.nombres_descripcion, libro.categorias,
+                                    libro.nombres_categoria)
+
+    # --- 1. Tiempos ---
+    print(f"{len(libro):,} filas, {inyectadas} anomalías inyectadas (×{ANOMALIA_FACTOR})\n")
+    print(f"  {'análisis':<44} {'s':>7}")
+    segundos, analisis = medir(lambda: analizar_columnas(columnas, "descripcion"))
+    print(f"  {'columnas, por descripción':<44} {segundos:>7.3f}")
+    segundos, por_categoria = medir(lambda: analizar_columnas(columnas, "categoria"))
+    print(f"  {'columnas, por categoría':<44} {segundos:>7.3f}")
+
+    for backend in ("columnar", "memoria"):
+        gateway = FinanzasGateway(crear_repositorio(backend), datos_ejemplo=False)
+        for inicio, fin in libro.tramos(100_000):
+            gateway.agregar_columnas(*libro.columnas(inicio, fin))
+        inicio = time.perf_counter()
+        desde_gateway = gateway.detectar_recurrencias()
+        print(f"  {'gateway, repositorio ' + backend:<44} {time.perf_counter() - inicio:>7.3f}")
+        if desde_gateway != analisis:
+            raise AssertionError(f"el gateway ({backend}) no da el mismo análisis")
+    segundos, _ = medir(gateway.detectar_recurrencias)
+    print(f"  {'gateway, en caché':<44} {segundos:>7.3f}")
+    gateway.cerrar()
+
+    # --- 2. Series recurrentes ---
+    print("\nseries recurrentes (por descripción)")
+    print(f"  {'grupo':<24} {'ocurr.':>6} {'periodo':>7} {'próxima':>11} {'importe':>10} activa")
+    for serie in analisis.recurrentes:
+        print(f"  {serie.grupo:<24} {serie.ocurrencias:>6} {serie.periodo_dias:>7.1f} "
+              f"{serie.proxima_fecha.isoformat():>11} {serie.centavos_esperados:>10} "
+              f"{'sí' if serie.activa else 'no'}")
+    primero = datetime.date.fromordinal(int(libro.fechas.min()))
+    ultimo = datetime.date.fromordinal(int(libro.fechas.max()))
+    aumento = (1 + _AUMENTO_ANUAL_FIJOS) ** (ultimo.year - primero.year)
+    fijas = {descripcion: (datetime.date(ultimo.year + 1, 1, dia), round(importe * aumento))
+             for dia, descripcion, _, importe in _FIJOS_MENSUALES}
+    encontradas = {serie.grupo: (serie.proxima_fecha, serie.centavos_esperados)
+                   for serie in analisis.recurrentes}
+    if encontradas != fijas:
+        raise AssertionError(f"series esperadas {fijas}, encontradas {encontradas}")
+    print(f"  por categoría: {', '.join(serie.grupo for serie in por_categoria.recurrentes)}")
+
+    # --- 3. Anomalías ---
+    marcadas = {(anomalia.dia, anomalia.descripcion, anomalia.centavos)
+                for anomalia in analisis.anomalias}
+    aciertos = len(marcadas & esperadas)
+    print(f"\nanomalías: {len(marcadas):,} marcadas; {aciertos} de {inyectadas} inyectadas "
+          f"({aciertos / inyectadas:.0%}); {len(marcadas - esperadas):,} filas sin tocar "
+          f"({len(marcadas - esperadas) / len(libro):.2%} del libro)")
+
+    # --- 4. Comparación con el recorrido en Python ---
+    tramo = ColumnasRecurrencias(*(columna[:FILAS_RECORRIDO] if isinstance(columna, np.ndarray)
+                                   else columna for columna in columnas))
+    inicio = time.perf_counter()
+    esperado = recorrido_en_python(tramo)
+    en_python = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    vectorizado = analizar_columnas(tramo)
+    segundos = time.perf_counter() - inicio
+    textos = tramo.textos_descripcion
+    obtenido = {(anomalia.dia, textos.index(anomalia.descripcion), anomalia.centavos)
+                for anomalia in vectorizado.anomalias}
+    if obtenido != esperado:
+        raise AssertionError(f"{len(obtenido ^ esperado)} anomalías distintas del recorrido en Python")
+    print(f"\nprimeras {FILAS_RECORRIDO:,} filas: recorrido en Python {en_python:.2f} s, "
+          f"vectorizado {segundos:.3f} s ({en_python / segundos:.0f}×), "
+          f"{len(obtenido)} anomalías iguales")
+
+
+if __name__ == "__main__":
+    main()
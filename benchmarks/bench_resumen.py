@@ -0,0 +1,50 @@
+# benchmarks/bench_resumen.py
+"""
+Resumen incremental (AgregadorResumen) frente al recálculo completo.
+Que ambos caminos den los mismos totales lo comprueba
+tests/test_agregador_resumen.py.
+
+Uso:
+    python -m benchmarks.bench_resumen [filas]
+"""
+import sys
+import time
+
+from benchmarks.bench_insercion import generar_transacciones
+from common.utils import Subject
+from servicio_reporte.AgregadorResumen import AgregadorResumen
+from servicio_reporte.GeneradorReporte import GeneradorReporte
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+
+def main() -> None:
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    transacciones = generar_transacciones(cantidad)
+    repositorio = TransactionRepository()
+    sujeto = Subject()
+    agregador = AgregadorResumen()
+    sujeto.attach(agregador)
+
+    mitad = cantidad // 2
+    for transaccion in transacciones[:mitad]:
+        repositorio.agregar(transaccion)
+        sujeto.notify("TRANSACCION_AGREGADA", transaccion)
+    repositorio.agregar_lote(transacciones[mitad:])
+    sujeto.notify("TRANSACCION_LOTE_AGREGADO", transacciones[mitad:])
+
+    generador = GeneradorReporte()
+    inicio = time.perf_counter()
+    generador.generar_resumen(repositorio.obtener_todas())
+    t_completo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    generador.formatear_resumen(agregador.totales())
+    t_incremental = time.perf_counter() - inicio
+
+    print(f"filas: {cantidad:,}")
+    print(f"resumen recalculado: {t_completo * 1000:10.3f} ms")
+    print(f"resumen incremental: {t_incremental * 1000:10.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+# benchmarks/bench_servicios.py
+"""
+Prueba de carga local de los servicios HTTP (servicio_*/main.py).
+
+Arranca los tres servicios como procesos aparte en puertos libres,
+carga el servicio de transacciones con inserciones masivas y mide, por
+endpoint, peticiones por segundo y latencia p50 / p99 con varios hilos
+clientes compartiendo un ClienteHttp (pool de conexiones persistentes).
+Como referencia, mide también una petición por conexión nueva (urllib)
+y las páginas pedidas en tubería.
+
+Uso:
+    python -m benchmarks.bench_servicios [filas] [segundos por endpoint] [hilos]
+"""
+import datetime
+import itertools
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from common.servicio_http import ClienteHttp
+from servicio_transaccion.ClienteTransacciones import ClienteTransacciones
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+
+CATEGORIAS = ["Comida", "Transporte", "Vivienda", "Ocio", "Salud", "Servicios"]
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def puerto_libre() -> int:
+    with socket.socket() as prueba:
+        prueba.bind(("127.0.0.1", 0))
+        return prueba.getsockname()[1]
+
+
+def arrancar(modulo: str, puerto: int, *extra: str) -> subprocess.Popen:
+    proceso = subprocess.Popen([sys.executable, "-m", modulo, "--host", "127.0.0.1",
+                                "--puerto", str(puerto), *extra],
+                               cwd=RAIZ, stdout=subprocess.DEVNULL)
+    cliente = ClienteHttp(f"http://127.0.0.1:{puerto}", conexiones=1)
+    limite = time.monotonic() + 30
+    while True:
+        try:
+            cliente.pedir("GET", "/salud")
+            break
+        except OSError:
+            if time.monotonic() > limite or proceso.poll() is not None:
+                proceso.kill()
+                raise RuntimeError(f"{modulo} no arrancó")
+            time.sleep(0.05)
+    cliente.cerrar()
+    return proceso
+
+
+def generar_lote(cantidad: int, semilla: int):
+    aleatorio = np.random.default_rng(semilla)
+    hoy = datetime.date.today().toordinal()
+    dias = hoy - aleatorio.integers(0, 730, cantidad)
+    centavos = np.rint(aleatorio.normal(-4_000, 6_000, cantidad)).astype(np.int64)
+    categorias = aleatorio.integers(0, len(CATEGORIAS), cantidad)
+    return TransaccionFactory().crear_lote(
+        [datetime.date.fromordinal(int(d)) for d in dias],
+        [f"Movimiento {semilla}-{i}" for i in range(cantidad)],
+        centavos, [CATEGORIAS[c] for c in categorias])
+
+
+def medir(peticion: Callable[[], object], segundos: float, hilos: int,
+          por_llamada: int = 1) -> Tuple[float, float, float]:
+    """(peticiones/s, p50 ms, p99 ms); la latencia es la de cada llamada."""
+    latencias: List[List[float]] = [[] for _ in range(hilos)]
+    fin = time.perf_counter() + segundos
+
+    def cliente(i: int) -> None:
+        propias = latencias[i]
+        while True:
+            inicio = time.perf_counter()
+            if inicio > fin:
+                return
+            peticion()
+            propias.append(time.perf_counter() - inicio)
+
+    trabajadores = [threading.Thread(target=cliente, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for hilo in trabajadores:
+        hilo.start()
+    for hilo in trabajadores:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    todas = np.sort(np.concatenate([np.asarray(l) for l in latencias]))
+    return (len(todas) * por_llamada / transcurrido,
+            float(todas[int(0.50 * (len(todas) - 1))]) * 1000,
+            float(todas[int(0.99 * (len(todas) - 1))]) * 1000)
+
+
+def main() -> None:
+    argumentos = sys.argv[1:]
+    filas = int(argumentos[0]) if argumentos else 100_000
+    segundos = float(argumentos[1]) if len(argumentos) > 1 else 2.0
+    hilos = int(argumentos[2]) if len(argumentos) > 2 else 8
+
+    puertos = [puerto_libre() for _ in range(3)]
+    url_transacciones, url_reporte, url_prediccion = (
+        f"http://127.0.0.1:{puerto}" for puerto in puertos)
+    procesos = [arrancar("servicio_transaccion.main", puertos[0], "--backend", "memoria")]
+    try:
+        procesos += [arrancar("servicio_reporte.main", puertos[1],
+                              "--transacciones", url_transacciones),
+                     arrancar("servicio_prediccion.main", puertos[2],
+                              "--transacciones", url_transacciones)]
+        transacciones = ClienteTransacciones(url_transacciones, conexiones=hilos)
+        reporte = ClienteHttp(url_reporte, conexiones=hilos)
+        prediccion = ClienteHttp(url_prediccion, conexiones=hilos)
+
+        # Carga inicial con inserciones masivas
+        lote = 20_000
+        inicio = time.perf_counter()
+        for desde in range(0, filas, lote):
+            transacciones.agregar_lote(generar_lote(min(lote, filas - desde), desde))
+        carga = time.perf_counter() - inicio
+        print(f"carga inicial: {filas:,} filas en lotes de {lote:,}: "
+              f"{filas / carga:,.0f} filas/s")
+        # Primera sincronización de las réplicas (fuera de la medición)
+        inicio = time.perf_counter()
+        reporte.pedir("GET", "/resumen/categorias")
+        prediccion.pedir("GET", "/prediccion")
+        print(f"réplicas al día en {time.perf_counter() - inicio:.2f} s")
+
+        hasta = datetime.date.today()
+        desde = hasta - datetime.timedelta(days=89)
+        pagina = ("GET", "/transacciones", {"offset": 0, "limit": 50}, None)
+        filas_nuevas = itertools.cycle(generar_lote(20_000, 999))
+        cerrojo_filas = threading.Lock()
+
+        def una_fila():
+            with cerrojo_filas:
+                transaccion = next(filas_nuevas)
+            transacciones.agregar(transaccion.fecha, transaccion.descripcion,
+                                  transaccion.centavos, transaccion.categoria)
+
+        casos = [
+            ("GET /version (urllib, sin pool)",
+             lambda: urllib.request.urlopen(url_transacciones + "/version").read(), 1),
+            ("GET /version", lambda: transacciones.estado(), 1),
+            ("GET /transacciones (50)", lambda: transacciones.http.pedir(*pagina), 1),
+            ("GET /transacciones x16 tubería",
+             lambda: transacciones.http.pedir_varias([pagina] * 16), 16),
+            ("GET /transacciones/consulta 90d",
+             lambda: transacciones.consultar(desde, hasta, ["Ocio"], "gasto", limit=50), 1),
+            ("GET /resumen/categorias", lambda: reporte.pedir("GET", "/resumen/categorias"), 1),
+            ("GET /resumen/dias", lambda: reporte.pedir("GET", "/resumen/dias"), 1),
+            ("GET /prediccion", lambda: prediccion.pedir("GET", "/prediccion"), 1),
+            ("POST /prediccion/horizontes x3",
+             lambda: prediccion.pedir("POST", "/prediccion/horizontes",
+                                      cuerpo={"horizontes": [7, 30, 90]}), 1),
+            # Las escrituras al final: cambian los datos de las demás
+            ("POST /transacciones", una_fila, 1),
+            ("POST /transacciones/lote (100)",
+             lambda: transacciones.agregar_lote(generar_lote(100, 7)), 1),
+        ]
+        print(f"\n{hilos} hilos clientes, {segundos:g} s por endpoint")
+        print(f"{'endpoint':<34} {'pet/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        for nombre, peticion, por_llamada in casos:
+            por_segundo, p50, p99 = medir(peticion, segundos, hilos, por_llamada)
+            print(f"{nombre:<34} {por_segundo:>10,.0f} {p50:>9.2f} {p99:>9.2f}")
+
+        print(f"\ntransacciones en el servicio: {transacciones.estado()[1]:,}")
+        for cliente in (transacciones, reporte, prediccion):
+            cliente.cerrar()
+    finally:
+        for proceso in procesos:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_tabla.py
+"""
+Latencia de la tabla de la UI al agregar una transacción: recarga
+completa (comportamiento anterior) frente a inserción incremental
+(modo completo) y ventana virtual. Necesita un display para Tk.
+
+Uso:
+    python -m benchmarks.bench_tabla [filas ...]
+"""
+import datetime
+import sys
+import time
+import tkinter as tk
+
+from benchmarks.bench_insercion import generar_transacciones
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from ui.AppGraficaFinanzas.components.tabla_transacciones import TablaTransacciones
+
+TAMANOS = (1_000, 10_000, 100_000)
+INSERCIONES = 20
+
+
+def medir(raiz: tk.Tk, repositorio: TransactionRepository, umbral: int,
+          incremental: bool) -> float:
+    tabla = TablaTransacciones(raiz, lambda: len(repositorio),
+                               repositorio.obtener_rango, umbral_virtual=umbral)
+    tabla.pack(fill=tk.BOTH, expand=True)
+    tabla.recargar()
+    raiz.update()
+
+    nuevas = generar_transacciones(INSERCIONES, semilla=7)
+    inicio = time.perf_counter()
+    for transaccion in nuevas:
+        repositorio.agregar(transaccion)
+        if incremental:
+            tabla.insertar(transaccion)
+        else:
+            tabla.recargar()
+        raiz.update_idletasks()
+    segundos = (time.perf_counter() - inicio) / INSERCIONES
+    tabla.destroy()
+    return segundos
+
+
+def main() -> None:
+    tamanos = [int(a) for a in sys.argv[1:]] or TAMANOS
+    raiz = tk.Tk()
+    raiz.geometry("800x600")
+    for cantidad in tamanos:
+        repositorio = TransactionRepository()
+        repositorio.agregar_lote(generar_transacciones(cantidad))
+        completo = float("inf")
+        print(f"filas: {cantidad:,}")
+        if cantidad <= 10_000:
+            t = medir(raiz, repositorio, completo, incremental=False)
+            print(f"  recarga completa:        {t * 1000:9.2f} ms/inserción")
+            t = medir(raiz, repositorio, completo, incremental=True)
+            print(f"  inserción incremental:   {t * 1000:9.2f} ms/inserción")
+        t = medir(raiz, repositorio, 0, incremental=True)
+        print(f"  tabla virtual:           {t * 1000:9.2f} ms/inserción")
+    raiz.destroy()
+
+
+if __name__ == "__main__":
+    main()
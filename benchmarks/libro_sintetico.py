@@ -0,0 +1,240 @@
+# benchmarks/libro_sintetico.py
+"""
+Generador de libros sintéticos reproducibles para las mediciones.
+
+Con la misma semilla y los mismos parámetros devuelve siempre los
+mismos datos. Todo se genera con NumPy de una vez (10M de filas en
+pocos segundos). El libro imita un historial real:
+
+- movimientos fijos cada mes: salario, alquiler, servicios y
+  suscripciones, con un aumento anual;
+- gastos variables por categoría, con importes log-normales (muchos
+  pequeños y pocos grandes), más gasto en ocio los fines de semana, más
+  en compras en diciembre e inflación a lo largo de los años;
+- algunos ingresos extra.
+
+Las columnas quedan en orden de fecha, como llega un extracto. Para
+pasarlas al gateway o al repositorio se convierten por tramos
+(`columnas`, `filas`), así nunca hay más objetos Python que los del
+tramo.
+
+Uso (resumen del libro generado):
+    python -m benchmarks.libro_sintetico [filas] [años] [semilla]
+"""
+import datetime
+import sys
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.dinero import formatear
+
+HASTA_POR_DEFECTO = datetime.date(2024, 12, 31)
+
+# (categoría, peso entre los gastos variables, mediana en centavos,
+#  comercios); el peso se reparte entre las filas variables
+_GASTOS_VARIABLES: Sequence[Tuple[str, float, int, Sequence[str]]] = (
+    ("Alimentación", 0.30, 3_500, ("Supermercado", "Panadería", "Mercado", "Frutería")),
+    ("Transporte", 0.17, 1_200, ("Taxi", "Metro", "Gasolina", "Peaje")),
+    ("Ocio", 0.14, 4_000, ("Restaurante", "Cine", "Bar", "Concierto")),
+    ("Compras", 0.13, 5_500, ("Tienda de ropa", "Electrónica", "Librería", "Ferretería")),
+    ("Salud", 0.06, 6_000, ("Farmacia", "Consulta médica", "Óptica")),
+    ("Hogar", 0.08, 4_500, ("Limpieza", "Muebles", "Reparaciones")),
+    ("Educación", 0.03, 12_000, ("Curso", "Matrícula", "Material escolar")),
+    ("Viajes", 0.02, 40_000, ("Hotel", "Vuelo", "Alquiler de auto")),
+)
+_PESO_INGRESOS_EXTRA = 0.07
+_MEDIANA_INGRESO_EXTRA = 15_000
+_COMERCIOS_INGRESO = ("Transferencia recibida", "Reembolso", "Venta")
+
+# Movimientos fijos del mes: (día, descripción, categoría, centavos)
+_FIJOS_MENSUALES: Sequence[Tuple[int, str, str, int]] = (
+    (1, "Salario Mensual", "Ingreso", 350_000),
+    (2, "Alquiler", "Vivienda", -120_000),
+    (5, "Electricidad", "Servicios", -6_500),
+    (8, "Internet y teléfono", "Servicios", -4_500),
+    (15, "Suscripción streaming", "Ocio", -1_500),
+)
+_AUMENTO_ANUAL_FIJOS = 0.04
+_INFLACION_ANUAL = 0.03
+_DISPERSION_IMPORTES = 0.8       # sigma del logaritmo de los importes
+_PESO_FIN_DE_SEMANA_OCIO = 2.5
+_PESO_DICIEMBRE_COMPRAS = 2.0
+
+
+@dataclass
+class LibroSintetico:
+    """
+    Libro generado, en columnas: fechas (ordinales), centavos y códigos
+    de categoría y de descripción (índices de los nombres).
+    """
+    fechas: np.ndarray
+    centavos: np.ndarray
+    categorias: np.ndarray
+    descripciones: np.ndarray
+    nombres_categoria: List[str]
+    nombres_descripcion: List[str]
+
+    def __len__(self) -> int:
+        return len(self.fechas)
+
+    def columnas(self, inicio: int = 0, fin: Optional[int] = None
+                 ) -> Tuple[List[datetime.date], List[str], np.ndarray, List[str]]:
+        """
+        Columnas de un tramo listas para agregar_columnas: fechas como
+        datetime.date, textos como str y centavos como arreglo int64.
+        """
+        fechas = self.fechas[inicio:fin]
+        if not len(fechas):
+            return [], [], self.centavos[inicio:fin], []
+        # Hay pocos días distintos: una tabla de fechas evita crearlas fila a fila
+        primero = int(fechas.min())
+        tabla = [datetime.date.fromordinal(dia)
+                 for dia in range(primero, int(fechas.max()) + 1)]
+        return ([tabla[i] for i in (fechas - primero).tolist()],
+                [self.nombres_descripcion[i] for i in self.descripciones[inicio:fin].tolist()],
+                self.centavos[inicio:fin],
+                [self.nombres_categoria[i] for i in self.categorias[inicio:fin].tolist()])
+
+    def filas(self, inicio: int = 0, fin: Optional[int] = None
+              ) -> List[Tuple[datetime.date, str, int, str]]:
+        """Tramo como filas (fecha, descripción, centavos, categoría)."""
+        fechas, descripciones, centavos, categorias = self.columnas(inicio, fin)
+        return list(zip(fechas, descripciones, centavos.tolist(), categorias))
+
+    def tramos(self, tamano: int):
+        """(inicio, fin) de tramos consecutivos de `tamano` filas."""
+        return [(inicio, min(inicio + tamano, len(self)))
+                for inicio in range(0, len(self), tamano)]
+
+
+def generar_libro(filas: int,
+                  anios: int = 5,
+                  semilla: int = 0,
+                  hasta: datetime.date = HASTA_POR_DEFECTO) -> LibroSintetico:
+    """
+    Libro de `filas` transacciones repartidas en los `anios` años que
+    terminan en `hasta`. La fecha final es fija por defecto (no "hoy")
+    para que el resultado no cambie de un día a otro.
+    """
+    aleatorio = np.random.default_rng(semilla)
+    desde = datetime.date(hasta.year - anios + 1, 1, 1)
+    primer_dia = desde.toordinal()
+    dias = hasta.toordinal() - primer_dia + 1
+
+    nombres_categoria = ["Ingreso", "Vivienda", "Servicios", "Ocio", "Ingresos extra"]
+    nombres_descripcion = [descripcion for _, descripcion, _, _ in _FIJOS_MENSUALES]
+    fijos = _fijos(desde, hasta, nombres_categoria, filas)
+
+    # --- Gastos e ingresos variables ---
+    variables = filas - len(fijos[0])
+    categorias_variables = [nombre for nombre, _, _, _ in _GASTOS_VARIABLES]
+    for nombre in categorias_variables:
+        if nombre not in nombres_categoria:
+            nombres_categoria.append(nombre)
+    codigo_categoria = {nombre: i for i, nombre in enumerate(nombres_categoria)}
+
+    pesos = np.array([peso for _, peso, _, _ in _GASTOS_VARIABLES] + [_PESO_INGRESOS_EXTRA])
+    tipo = aleatorio.choice(len(pesos), size=variables, p=pesos / pesos.sum())
+    extra = len(_GASTOS_VARIABLES)
+
+    # Día de cada fila: uniforme, salvo ocio (fines de semana) y
+    # compras (diciembre), que se eligen con otra distribución
+    dia = aleatorio.integers(0, dias, variables)
+    calendario = np.arange(primer_dia, primer_dia + dias)
+    dia_semana = (calendario + 6) % 7          # 0 = lunes ... 6 = domingo
+    meses = np.array([datetime.date.fromordinal(int(d)).month
+                      for d in calendario], dtype=np.int8)
+    for nombre, pesos_dia in (
+            ("Ocio", np.where(dia_semana >= 5, _PESO_FIN_DE_SEMANA_OCIO, 1.0)),
+            ("Compras", np.where(meses == 12, _PESO_DICIEMBRE_COMPRAS, 1.0))):
+        indice = categorias_variables.index(nombre)
+        mascara = tipo == indice
+        dia[mascara] = aleatorio.choice(dias, size=int(mascara.sum()),
+                                        p=pesos_dia / pesos_dia.sum())
+
+    medianas = np.array([mediana for _, _, mediana, _ in _GASTOS_VARIABLES]
+                        + [_MEDIANA_INGRESO_EXTRA], dtype=np.float64)
+    inflacion = (1 + _INFLACION_ANUAL) ** (dia / 365.25)
+    importes = np.rint(aleatorio.lognormal(np.log(medianas[tipo]), _DISPERSION_IMPORTES)
+                       * inflacion).astype(np.int64)
+    importes = np.maximum(importes, 1)
+    centavos = np.where(tipo == extra, importes, -importes)
+
+    codigos = np.array([codigo_categoria[nombre] for nombre in categorias_variables]
+                       + [codigo_categoria["Ingresos extra"]], dtype=np.int32)
+    categorias = codigos[tipo]
+
+    # Descripción: un comercio al azar de la categoría
+    comercios = [list(lista) for _, _, _, lista in _GASTOS_VARIABLES] + [list(_COMERCIOS_INGRESO)]
+    primeros = []
+    for lista in comercios:
+        primeros.append(len(nombres_descripcion))
+        nombres_descripcion.extend(lista)
+    cantidades = np.array([len(lista) for lista in comercios])
+    descripciones = (np.array(primeros)[tipo]
+                     + (aleatorio.random(variables) * cantidades[tipo]).astype(np.int64))
+
+    # --- Unión y orden por fecha (estable: los fijos primero en su día) ---
+    fechas = np.concatenate([fijos[0], (primer_dia + dia).astype(np.int32)])
+    orden = np.argsort(fechas, kind="stable")
+    return LibroSintetico(
+        fechas=fechas[orden],
+        centavos=np.concatenate([fijos[1], centavos])[orden],
+        categorias=np.concatenate([fijos[2], categorias]).astype(np.int32)[orden],
+        descripciones=np.concatenate([fijos[3], descripciones]).astype(np.int32)[orden],
+        nombres_categoria=nombres_categoria,
+        nombres_descripcion=nombres_descripcion,
+    )
+
+
+def _fijos(desde: datetime.date, hasta: datetime.date,
+           nombres_categoria: List[str], limite: int):
+    """Columnas de los movimientos fijos de cada mes (como mucho `limite`)."""
+    fechas, centavos, categorias, descripciones = [], [], [], []
+    anio, mes = desde.year, desde.month
+    while (anio, mes) <= (hasta.year, hasta.month):
+        aumento = (1 + _AUMENTO_ANUAL_FIJOS) ** (anio - desde.year)
+        for codigo, (dia, _, categoria, importe) in enumerate(_FIJOS_MENSUALES):
+            fecha = datetime.date(anio, mes, dia)
+            if fecha <= hasta:
+                fechas.append(fecha.toordinal())
+                centavos.append(round(importe * aumento))
+                categorias.append(nombres_categoria.index(categoria))
+                descripciones.append(codigo)
+        anio, mes = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+    fechas, centavos = fechas[:limite], centavos[:limite]
+    return (np.array(fechas, dtype=np.int32), np.array(centavos, dtype=np.int64),
+            np.array(categorias[:limite], dtype=np.int32),
+            np.array(descripciones[:limite], dtype=np.int32))
+
+
+def main() -> None:
+    argumentos = sys.argv[1:]
+    filas = int(argumentos[0]) if argumentos else 1_000_000
+    anios = int(argumentos[1]) if len(argumentos) > 1 else 5
+    semilla = int(argumentos[2]) if len(argumentos) > 2 else 0
+
+    inicio = time.perf_counter()
+    libro = generar_libro(filas, anios, semilla)
+    segundos = time.perf_counter() - inicio
+    megas = sum(columna.nbytes for columna in (libro.fechas, libro.centavos,
+                                                libro.categorias, libro.descripciones)) / 2**20
+    print(f"{len(libro):,} filas en {segundos:.2f} s "
+          f"({len(libro) / segundos:,.0f} filas/s), {megas:.0f} MB")
+    print(f"del {datetime.date.fromordinal(int(libro.fechas[0]))} "
+          f"al {datetime.date.fromordinal(int(libro.fechas[-1]))}")
+    es_gasto = libro.centavos < 0
+    print(f"ingresos: {formatear(int(libro.centavos[~es_gasto].sum()))}  "
+          f"gastos: {formatear(int(libro.centavos[es_gasto].sum()))}")
+    por_categoria = np.bincount(libro.categorias, weights=-libro.centavos * es_gasto,
+                                minlength=len(libro.nombres_categoria))
+    for codigo in np.argsort(-por_categoria):
+        if por_categoria[codigo] > 0:
+            print(f"  {libro.nombres_categoria[codigo]:<14} {formatear(-int(por_categoria[codigo]))}")
+
+
+if __name__ == "__main__":
+    main()
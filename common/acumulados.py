@@ -0,0 +1,152 @@
+# common/acumulados.py
+import datetime
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from common.models.transaccion import Transaccion
+from common.models.resumen import ResumenTotales
+from common.utils import Observer
+
+DIARIO = "diario"
+MENSUAL = "mensual"
+ANUAL = "anual"
+
+
+def clave_dia(fecha: datetime.date) -> int:
+    return fecha.toordinal()
+
+
+def clave_mes(fecha: datetime.date) -> int:
+    return fecha.year * 12 + fecha.month - 1
+
+
+def clave_anio(fecha: datetime.date) -> int:
+    return fecha.year
+
+
+def mes_desde_clave(clave: int) -> Tuple[int, int]:
+    """Devuelve (año, mes) a partir de una clave mensual."""
+    return clave // 12, clave % 12 + 1
+
+
+_CLAVES = {DIARIO: clave_dia, MENSUAL: clave_mes, ANUAL: clave_anio}
+
+
+class _TablaAcumulada:
+    """
+    Totales por cubeta de tiempo: cantidad, ingresos y gastos por categoría.
+    Actualizar una cubeta existente es O(1). Una clave nueva al final se
+    agrega en O(1); una anterior a la última deja las claves por ordenar
+    y se ordenan una sola vez en la siguiente lectura de `claves`.
+    """
+    def __init__(self) -> None:
+        self._claves: List[int] = []
+        self._desordenadas = False
+        self.cantidades: Dict[int, int] = {}
+        # Importes en centavos enteros
+        self.ingresos: Dict[int, int] = {}
+        self.gastos: Dict[int, Dict[str, int]] = {}
+
+    def acumular(self, clave: int, transaccion: Transaccion) -> None:
+        if clave not in self.cantidades:
+            if self._claves and clave < self._claves[-1]:
+                self._desordenadas = True
+            self._claves.append(clave)
+            self.cantidades[clave] = 0
+            self.ingresos[clave] = 0
+            self.gastos[clave] = defaultdict(int)
+
+        self.cantidades[clave] += 1
+        if transaccion.es_ingreso():
+            self.ingresos[clave] += transaccion.centavos
+        else:
+            self.gastos[clave][transaccion.categoria] += transaccion.centavos
+
+    @property
+    def claves(self) -> List[int]:
+        """Claves con datos, en orden ascendente."""
+        if self._desordenadas:
+            self._claves.sort()
+            self._desordenadas = False
+        return self._claves
+
+    def claves_en_rango(self, desde: int, hasta: int) -> List[int]:
+        claves = self.claves
+        return claves[bisect_left(claves, desde):bisect_right(claves, hasta)]
+
+    def resumen(self, claves: Iterable[int]) -> ResumenTotales:
+        por_categoria: Dict[str, int] = defaultdict(int)
+        cantidad = 0
+        ingreso_centavos = 0
+        for clave in claves:
+            cantidad += self.cantidades[clave]
+            ingreso_centavos += self.ingresos[clave]
+            for categoria, total in self.gastos[clave].items():
+                por_categoria[categoria] += total
+        return ResumenTotales(cantidad, ingreso_centavos,
+                              sum(por_categoria.values()), dict(por_categoria))
+
+
+class AcumuladosTemporales(Observer):
+    """
+    Tablas de totales diarios, mensuales y anuales por categoría,
+    compartidas por el servicio de reporte y el de predicción.
+    Se actualizan como Observer de LogicaFinanciera; una transacción
+    con fecha antigua solo toca sus tres cubetas.
+    """
+    def __init__(self) -> None:
+        self._tablas: Dict[str, _TablaAcumulada] = {}
+        self._vaciar()
+
+    # --- Métodos del Observer ---
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        if event == "TRANSACCION_AGREGADA":
+            self.acumular(data)
+        elif event == "TRANSACCION_LOTE_AGREGADO":
+            for transaccion in data:
+                self.acumular(transaccion)
+
+    # --- API ---
+    def acumular(self, transaccion: Transaccion) -> None:
+        for granularidad, clave in _CLAVES.items():
+            self._tablas[granularidad].acumular(clave(transaccion.fecha), transaccion)
+
+    def reconstruir(self, transacciones: Iterable[Transaccion]) -> None:
+        self._vaciar()
+        for transaccion in transacciones:
+            self.acumular(transaccion)
+
+    def cantidad(self) -> int:
+        return sum(self._tablas[ANUAL].cantidades.values())
+
+    def resumen(self, granularidad: str, desde: int, hasta: int) -> ResumenTotales:
+        """Resumen de las cubetas con clave en [desde, hasta]."""
+        tabla = self._tablas[granularidad]
+        return tabla.resumen(tabla.claves_en_rango(desde, hasta))
+
+    def resumen_por_periodo(self, granularidad: str,
+                            desde: int, hasta: int) -> List[Tuple[int, ResumenTotales]]:
+        """Un resumen por cada cubeta con datos en [desde, hasta]."""
+        tabla = self._tablas[granularidad]
+        return [(clave, tabla.resumen((clave,)))
+                for clave in tabla.claves_en_rango(desde, hasta)]
+
+    def gastos_diarios(self) -> Tuple[List[int], List[int]]:
+        """
+        Serie de gastos por día (valor absoluto, en centavos), lista
+        para el predictor.
+        """
+        tabla = self._tablas[DIARIO]
+        dias: List[int] = []
+        montos: List[int] = []
+        for dia in tabla.claves:
+            total = -sum(tabla.gastos[dia].values())
+            if total > 0:
+                dias.append(dia)
+                montos.append(total)
+        return dias, montos
+
+    # --- Auxiliares internos ---
+    def _vaciar(self) -> None:
+        self._tablas = {granularidad: _TablaAcumulada() for granularidad in _CLAVES}
@@ -0,0 +1,119 @@
+# common/cache.py
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Hashable, Optional, Tuple
+
+
+@dataclass
+class EstadisticasCache:
+    aciertos: int = 0
+    fallos: int = 0
+    desalojos: int = 0
+    invalidaciones: int = 0
+    entradas: int = 0
+    bytes: int = 0
+
+    @property
+    def tasa_aciertos(self) -> float:
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+
+def tamano_aproximado(valor: Any, _profundidad: int = 0) -> int:
+    """
+    Estimación del tamaño en memoria de un resultado: textos, números,
+    tuplas/listas/dicts, dataclasses y arreglos NumPy (por nbytes).
+    """
+    if _profundidad > 4:
+        return sys.getsizeof(valor)
+    nbytes = getattr(valor, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return sys.getsizeof(valor) + sum(tamano_aproximado(v, _profundidad + 1) for v in valor)
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(
+            tamano_aproximado(k, _profundidad + 1) + tamano_aproximado(v, _profundidad + 1)
+            for k, v in valor.items())
+    if is_dataclass(valor) and not isinstance(valor, type):
+        return sys.getsizeof(valor) + sum(
+            tamano_aproximado(getattr(valor, f.name), _profundidad + 1) for f in fields(valor))
+    return sys.getsizeof(valor)
+
+
+class CacheVersionada:
+    """
+    Caché LRU de resultados ligada a la versión de los datos.
+
+    Cada entrada guarda la versión con la que se calculó: solo se
+    sirve si coincide con la versión actual. Se desalojan las menos
+    usadas al pasar de `max_entradas` o de `max_bytes`.
+    """
+    def __init__(self, max_entradas: int = 64, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self._max_entradas = max_entradas
+        self._max_bytes = max_bytes
+        # clave -> (versión, valor, tamaño); el orden es el de uso (LRU al principio)
+        self._entradas: "OrderedDict[Hashable, Tuple[int, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._cerrojo = threading.Lock()
+        self._estadisticas = EstadisticasCache()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def obtener(self,
+                clave: Hashable,
+                version: int,
+                contar_fallo: bool = True) -> Tuple[bool, Optional[Any]]:
+        """
+        Devuelve (encontrado, valor). Con contar_fallo=False un fallo no
+        suma en las estadísticas (para consultas que se repiten después).
+        """
+        with self._cerrojo:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] != version:
+                if contar_fallo:
+                    self._estadisticas.fallos += 1
+                return False, None
+            self._entradas.move_to_end(clave)
+            self._estadisticas.aciertos += 1
+            return True, entrada[1]
+
+    def guardar(self, clave: Hashable, version: int, valor: Any) -> None:
+        tamano = tamano_aproximado(valor)
+        if tamano > self._max_bytes:
+            return
+        with self._cerrojo:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                # Un cálculo más lento no pisa a uno con datos más nuevos
+                if anterior[0] > version:
+                    self._entradas[clave] = anterior
+                    return
+                self._bytes -= anterior[2]
+            self._entradas[clave] = (version, valor, tamano)
+            self._bytes += tamano
+            while len(self._entradas) > self._max_entradas or self._bytes > self._max_bytes:
+                _, (_, _, liberado) = self._entradas.popitem(last=False)
+                self._bytes -= liberado
+                self._estadisticas.desalojos += 1
+
+    def invalidar(self, version_actual: Optional[int] = None) -> None:
+        """
+        Descarta las entradas calculadas con una versión anterior a
+        `version_actual` (o todas si no se indica).
+        """
+        with self._cerrojo:
+            for clave, (version, _, tamano) in list(self._entradas.items()):
+                if version_actual is None or version < version_actual:
+                    del self._entradas[clave]
+                    self._bytes -= tamano
+                    self._estadisticas.invalidaciones += 1
+
+    def estadisticas(self) -> EstadisticasCache:
+        with self._cerrojo:
+            e = self._estadisticas
+            return EstadisticasCache(e.aciertos, e.fallos, e.desalojos,
+                                     e.invalidaciones, len(self._entradas), self._bytes)
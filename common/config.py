@@ -2,3 +2,113 @@
 
 # Días por defecto para la predicción
 DIAS_POR_DEFECTO_PREDICCION = 30
+
+# Ventana (en días) del resumen "Últimos N Días"
+DIAS_VENTANA_RESUMEN = 90
+
+# Backend del repositorio de transacciones:
+#   "memoria"  -> TransactionRepository (listas en memoria)
+#   "columnar" -> ColumnarTransactionRepository (arreglos NumPy)
+#   "sqlite"   -> SqliteTransactionRepository (persistente en RUTA_BASE_DATOS)
+#   "diario"   -> DiarioTransactionRepository (columnar + diario e
+#                 instantánea en DIRECTORIO_DIARIO)
+BACKEND_REPOSITORIO = "memoria"
+
+# Archivo de base de datos para el backend "sqlite"
+RUTA_BASE_DATOS = "ahorrapro.db"
+
+# Backend "diario": directorio de datos, group commit (registros por
+# escritura y espera máxima en segundos) y cada cuántas filas nuevas se
+# reescribe la instantánea
+DIRECTORIO_DIARIO = "ahorrapro_datos"
+REGISTROS_POR_GRUPO = 256
+INTERVALO_GRUPO = 0.05
+FILAS_POR_INSTANTANEA = 1_000_000
+
+# Modo de predicción:
+#   "incremental" -> regresión mantenida al día con cada transacción
+#   "sklearn"     -> reentrena LinearRegression en cada análisis (referencia)
+MODO_PREDICCION = "incremental"
+
+# Precargar en segundo plano (una vez visible la ventana) los módulos
+# pesados de predicción y gráficos
+PRECARGAR_SERVICIOS = True
+
+# Hilos del pool que ejecuta resúmenes y predicciones fuera del hilo de Tk
+HILOS_GATEWAY = 2
+
+# A partir de cuántas filas la tabla de la UI pasa a modo virtual
+# (solo se dibujan las filas visibles)
+UMBRAL_TABLA_VIRTUAL = 5000
+
+# Búsqueda de la UI: milisegundos sin teclear antes de buscar y filas
+# que trae la primera página (las siguientes se piden al desplazarse)
+RETARDO_BUSQUEDA_MS = 150
+PAGINA_BUSQUEDA = 200
+
+# Importación de extractos (CSV / OFX): filas por lote escrito en el
+# repositorio y categoría para los movimientos que no traen una
+TAMANO_LOTE_IMPORTACION = 50_000
+CATEGORIA_POR_DEFECTO = "Sin categoría"
+
+# Caché de resúmenes y predicciones del gateway (LRU, por versión de datos)
+CACHE_MAX_ENTRADAS = 64
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Libro de varias cuentas: procesos del pool para resumir o pronosticar
+# todas las cuentas (None -> uno por núcleo) y cuántas cuentas viajan
+# juntas en cada tarea
+PROCESOS_ANALISIS = None
+CUENTAS_POR_TAREA = 64
+
+# Modo del gateway de la UI:
+#   "local"  -> los microservicios corren en el mismo proceso (por defecto)
+#   "remoto" -> el gateway les habla por HTTP; cada servicio se arranca
+#               aparte con python -m servicio_<nombre>.main
+MODO_GATEWAY = "local"
+URL_SERVICIO_TRANSACCION = "http://127.0.0.1:8101"
+URL_SERVICIO_REPORTE = "http://127.0.0.1:8102"
+URL_SERVICIO_PREDICCION = "http://127.0.0.1:8103"
+# Conexiones persistentes por servicio en el pool del cliente HTTP
+CONEXIONES_POR_SERVICIO = 8
+# Filas por respuesta al leer todas las transacciones o el registro de
+# cambios por HTTP (las páginas se piden en tubería)
+FILAS_POR_PAGINA_HTTP = 10_000
+
+# Métricas de rendimiento (common/metricas.py): desactivadas casi no
+# cuestan nada. Con UMBRAL_LLAMADA_LENTA (segundos) se muestrean cada
+# INTERVALO_MUESTREO segundos las pilas de las operaciones en curso y se
+# guardan las que superan el umbral
+METRICAS_ACTIVAS = False
+UMBRAL_LLAMADA_LENTA = None
+INTERVALO_MUESTREO = 0.005
+
+# Gráfico de la predicción: las series se reducen a PUNTOS_POR_PIXEL
+# puntos por píxel de ancho del eje con "lttb" (conserva la forma) o
+# "min_max" (mínimo y máximo de cada tramo); None dibuja todos. Con un
+# solo punto por píxel la nube de puntos se ve partida en dos franjas
+# (ambos métodos eligen extremos), con 3 ya se ve como la original
+METODO_SUBMUESTREO_GRAFICO = "lttb"
+PUNTOS_POR_PIXEL_GRAFICO = 3
+
+# Recurrencias y anomalías (servicio_prediccion/Recurrencias.py). Una
+# serie es recurrente con al menos MINIMO_OCURRENCIAS días distintos,
+# si FRACCION_INTERVALOS_REGULARES de sus intervalos se alejan del
+# periodo (su mediana) a lo sumo TOLERANCIA_PERIODO veces el periodo y
+# si la desviación (MAD) del logaritmo de sus importes no pasa de
+# TOLERANCIA_IMPORTE (sin esta, un comercio al que se compra todos los
+# días sería una serie "diaria")
+MINIMO_OCURRENCIAS_RECURRENTE = 3
+TOLERANCIA_PERIODO = 0.15
+FRACCION_INTERVALOS_REGULARES = 0.8
+TOLERANCIA_IMPORTE_RECURRENTE = 0.2
+# Una transacción es anómala si su importe (en escala logarítmica) se
+# aleja más de UMBRAL_ANOMALIA desviaciones robustas de la mediana de
+# las VENTANA_ANOMALIAS anteriores de su grupo; hacen falta al menos
+# MINIMO_HISTORIAL_ANOMALIA anteriores. VARIACION_MINIMA_ANOMALIA es la
+# desviación mínima (5 %): sin ella, un importe fijo con un aumento
+# anual (salario, alquiler) sería anómalo
+VENTANA_ANOMALIAS = 30
+MINIMO_HISTORIAL_ANOMALIA = 8
+UMBRAL_ANOMALIA = 3.5
+VARIACION_MINIMA_ANOMALIA = 0.05
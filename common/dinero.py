@@ -0,0 +1,94 @@
+# common/dinero.py
+"""
+Dinero en punto fijo: los importes se guardan y se suman como centavos
+enteros (int en Python, int64 en NumPy y SQLite), así que los totales
+son exactos sin importar cuántas transacciones haya.
+
+El texto se convierte a centavos solo en los bordes (formulario,
+importación) y los centavos a texto solo al mostrar (reportes, tabla).
+Hay una función para cada origen, sin adivinar por el tipo:
+centavos_desde_unidades (5 son 500 centavos) y centavos_desde_entero
+(5 son 5 centavos).
+"""
+import math
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from operator import index
+from typing import Union
+
+CENTAVOS_POR_UNIDAD = 100
+
+Importe = Union[int, float, str, Decimal]
+
+
+def centavos_desde_unidades(monto: Importe) -> int:
+    """
+    Convierte un importe en unidades (p. ej. 5, 12.34, "12.34" o
+    Decimal("12.34")) a centavos, redondeando al centavo más cercano
+    (las mitades, lejos del cero). Un int también son unidades: 5 es
+    500 centavos. Lanza ValueError si el texto no es un número.
+    """
+    if isinstance(monto, int):
+        return monto * CENTAVOS_POR_UNIDAD
+    if isinstance(monto, float):
+        if not math.isfinite(monto):
+            raise ValueError(f"Importe no válido: {monto}")
+        # copysign: redondeo simétrico para gastos e ingresos
+        return int(math.copysign(math.floor(abs(monto) * CENTAVOS_POR_UNIDAD + 0.5), monto))
+    try:
+        decimal = Decimal(str(monto).strip())
+    except InvalidOperation:
+        raise ValueError(f"Importe no válido: {monto!r}") from None
+    if not decimal.is_finite():
+        raise ValueError(f"Importe no válido: {monto!r}")
+    return int((decimal * CENTAVOS_POR_UNIDAD).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def centavos_desde_entero(centavos: int) -> int:
+    """
+    Valida un importe que ya está en centavos (int o entero de NumPy) y
+    lo devuelve como int. Un float o un texto se rechazan con TypeError:
+    no se adivina si vienen en unidades.
+    """
+    return index(centavos)
+
+
+def a_unidades(centavos: int) -> float:
+    """Centavos a unidades en coma flotante (gráficos, modelos)."""
+    return centavos / CENTAVOS_POR_UNIDAD
+
+
+def centavos_desde_unidades_arreglo(montos):
+    """
+    Versión vectorizada de centavos_desde_unidades para arreglos NumPy
+    (int64): también un arreglo de enteros son unidades.
+    """
+    import numpy as np
+
+    montos = np.asarray(montos, dtype=np.float64)
+    return (np.copysign(np.floor(np.abs(montos) * CENTAVOS_POR_UNIDAD + 0.5), montos)
+            .astype(np.int64))
+
+
+def centavos_desde_entero_arreglo(centavos):
+    """
+    Versión vectorizada de centavos_desde_entero: un arreglo de enteros
+    pasa a int64; uno de floats se rechaza con TypeError.
+    """
+    import numpy as np
+
+    centavos = np.asarray(centavos)
+    if centavos.dtype.kind not in "iu":
+        raise TypeError(f"Los importes deben ser centavos enteros, no {centavos.dtype}")
+    return centavos.astype(np.int64)
+
+
+def formatear_numero(centavos: int) -> str:
+    """1234567 -> "12,345.67"; sin pasar por float."""
+    signo = "-" if centavos < 0 else ""
+    unidades, resto = divmod(abs(centavos), CENTAVOS_POR_UNIDAD)
+    return f"{signo}{unidades:,}.{resto:02d}"
+
+
+def formatear(centavos: int, simbolo: str = "$") -> str:
+    """-1234567 -> "$-12,345.67" (mismo aspecto que f"${monto:,.2f}")."""
+    return f"{simbolo}{formatear_numero(centavos)}"
@@ -0,0 +1,521 @@
+# common/metricas.py
+"""
+Instrumentación ligera: contadores, histogramas y cronómetros.
+
+- contar(nombre): suma a un contador.
+- observar(nombre, valor): agrega un valor a un histograma (p. ej.
+  filas por lote).
+- cronometro(nombre) / @medido(nombre) / @instrumentar(prefijo): miden
+  la duración de un bloque, de una función o de todos los métodos
+  públicos de una clase.
+
+Desactivadas (METRICAS_ACTIVAS = False en common/config.py), cada punto
+medido cuesta una consulta a una variable global: las funciones
+decoradas llaman directo a la original y cronometro() devuelve un
+contexto vacío compartido. Se pueden activar en cualquier momento con
+activar().
+
+Las duraciones van a histogramas de límites fijos, así que registrar
+una no reserva memoria. instantanea() devuelve todo como diccionario y
+texto_prometheus() en el formato de texto de Prometheus.
+
+Llamadas lentas: con `umbral_lento`, un hilo toma cada `intervalo`
+segundos la pila de los hilos que están dentro de una operación medida
+(solo la más externa de cada hilo). Si la operación tarda más que el
+umbral, se guardan sus pilas más frecuentes como LlamadaLenta (formato
+"plegado" de los flame graphs) y se llama al gancho `al_detectar`.
+"""
+import inspect
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from common import config
+
+# Límites (segundos) de los histogramas de duración: de 100 µs a 30 s
+LIMITES_SEGUNDOS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Límites de los histogramas de cantidades (filas, bytes...)
+LIMITES_CANTIDAD: Tuple[float, ...] = (
+    1, 10, 100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+PREFIJO_PROMETHEUS = "ahorrapro"
+# Llamadas lentas que se conservan y pilas distintas guardadas de cada una
+MAX_LLAMADAS_LENTAS = 50
+MAX_PILAS_POR_LLAMADA = 20
+PROFUNDIDAD_PILA = 64
+
+_activas = False
+_reloj = time.perf_counter
+_muestreador: Optional["_Muestreador"] = None
+_NULO = nullcontext()
+_lentas: Deque["LlamadaLenta"] = deque(maxlen=MAX_LLAMADAS_LENTAS)
+
+
+# --- Histogramas y registro ---
+
+class Histograma:
+    """
+    Cuentas por intervalo (límite superior incluido), suma, máximo y
+    errores. Cada histograma tiene su cerrojo: registrar en uno no
+    espera a los demás.
+    """
+    __slots__ = ("limites", "cuentas", "suma", "cantidad", "maximo", "errores", "_cerrojo")
+
+    def __init__(self, limites: Sequence[float]) -> None:
+        self.limites = tuple(limites)
+        self._cerrojo = threading.Lock()
+        self.vaciar()
+
+    def vaciar(self) -> None:
+        # Una cuenta por límite y la última para lo que los supera (+Inf)
+        self.cuentas = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.cantidad = 0
+        self.maximo = 0.0
+        self.errores = 0
+
+    def observar(self, valor: float, error: bool = False) -> None:
+        i = bisect_left(self.limites, valor)
+        # acquire/release directos cuestan la mitad que un `with`; entre
+        # ambos solo hay aritmética que no puede fallar
+        cerrojo = self._cerrojo
+        cerrojo.acquire()
+        self.cuentas[i] += 1
+        self.suma += valor
+        self.cantidad += 1
+        if valor > self.maximo:
+            self.maximo = valor
+        if error:
+            self.errores += 1
+        cerrojo.release()
+
+    def copia(self) -> "Histograma":
+        """Copia consistente para exportar sin frenar a quien registra."""
+        copia = Histograma.__new__(Histograma)
+        copia.limites = self.limites
+        with self._cerrojo:
+            copia.cuentas = list(self.cuentas)
+            copia.suma, copia.cantidad = self.suma, self.cantidad
+            copia.maximo, copia.errores = self.maximo, self.errores
+        return copia
+
+    def percentil(self, proporcion: float) -> float:
+        """
+        Cota superior del percentil: el límite del intervalo donde cae
+        (el máximo observado si cae por encima del último límite).
+        """
+        if not self.cantidad:
+            return 0.0
+        objetivo = proporcion * self.cantidad
+        acumulado = 0
+        for i, cuenta in enumerate(self.cuentas):
+            acumulado += cuenta
+            if acumulado >= objetivo:
+                return min(self.limites[i], self.maximo) if i < len(self.limites) else self.maximo
+        return self.maximo
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            "cantidad": self.cantidad,
+            "suma": self.suma,
+            "media": self.suma / self.cantidad if self.cantidad else 0.0,
+            "p50": self.percentil(0.50),
+            "p90": self.percentil(0.90),
+            "p99": self.percentil(0.99),
+            "maximo": self.maximo,
+            "intervalos": dict(zip([*map(str, self.limites), "+Inf"], self.cuentas)),
+        }
+
+
+class RegistroMetricas:
+    """
+    Contadores, histogramas de valores y duraciones (con sus errores)
+    por operación. Es seguro entre hilos. Los histogramas no se
+    reemplazan nunca (reiniciar los vacía), así que quien registra
+    seguido puede guardar el suyo y no buscarlo cada vez.
+    """
+    def __init__(self) -> None:
+        self._cerrojo = threading.Lock()
+        self._contadores: Dict[str, int] = {}
+        self._histogramas: Dict[str, Histograma] = {}
+        self._duraciones: Dict[str, Histograma] = {}
+
+    def contar(self, nombre: str, cantidad: int = 1) -> None:
+        with self._cerrojo:
+            self._contadores[nombre] = self._contadores.get(nombre, 0) + cantidad
+
+    def histograma(self, nombre: str,
+                   limites: Sequence[float] = LIMITES_CANTIDAD) -> Histograma:
+        histograma = self._histogramas.get(nombre)
+        if histograma is None:
+            with self._cerrojo:
+                histograma = self._histogramas.setdefault(nombre, Histograma(limites))
+        return histograma
+
+    def duracion(self, operacion: str) -> Histograma:
+        histograma = self._duraciones.get(operacion)
+        if histograma is None:
+            with self._cerrojo:
+                histograma = self._duraciones.setdefault(operacion,
+                                                         Histograma(LIMITES_SEGUNDOS))
+        return histograma
+
+    def reiniciar(self) -> None:
+        with self._cerrojo:
+            self._contadores.clear()
+            for histograma in (*self._histogramas.values(), *self._duraciones.values()):
+                with histograma._cerrojo:
+                    histograma.vaciar()
+
+    def _copias(self) -> Tuple[Dict[str, int], Dict[str, Histograma], Dict[str, Histograma]]:
+        # Solo los histogramas con datos (tras reiniciar quedan vacíos)
+        with self._cerrojo:
+            contadores = dict(self._contadores)
+            histogramas = list(self._histogramas.items())
+            duraciones = list(self._duraciones.items())
+        return (contadores,
+                {nombre: copia for nombre, h in histogramas if (copia := h.copia()).cantidad},
+                {nombre: copia for nombre, h in duraciones if (copia := h.copia()).cantidad})
+
+    def instantanea(self) -> Dict[str, Any]:
+        contadores, histogramas, duraciones = self._copias()
+        return {
+            "contadores": contadores,
+            "histogramas": {nombre: h.resumen() for nombre, h in histogramas.items()},
+            "duraciones": {nombre: h.resumen() for nombre, h in duraciones.items()},
+            "errores": {nombre: h.errores for nombre, h in duraciones.items() if h.errores},
+        }
+
+    def texto_prometheus(self, prefijo: str = PREFIJO_PROMETHEUS) -> str:
+        contadores, histogramas, duraciones = self._copias()
+        lineas: List[str] = []
+        for nombre, valor in sorted(contadores.items()):
+            metrica = f"{prefijo}_{_nombre_prometheus(nombre)}_total"
+            lineas += [f"# TYPE {metrica} counter", f"{metrica} {valor}"]
+        for nombre, histograma in sorted(histogramas.items()):
+            metrica = f"{prefijo}_{_nombre_prometheus(nombre)}"
+            lineas.append(f"# TYPE {metrica} histogram")
+            lineas += _lineas_histograma(metrica, "", histograma)
+        if duraciones:
+            metrica = f"{prefijo}_duracion_segundos"
+            lineas.append(f"# TYPE {metrica} histogram")
+            for operacion, histograma in sorted(duraciones.items()):
+                lineas += _lineas_histograma(
+                    metrica, f'operacion="{_escapar(operacion)}"', histograma)
+            metrica = f"{prefijo}_errores_total"
+            lineas.append(f"# TYPE {metrica} counter")
+            for operacion, histograma in sorted(duraciones.items()):
+                lineas.append(f'{metrica}{{operacion="{_escapar(operacion)}"}} '
+                              f'{histograma.errores}')
+        return "\n".join(lineas) + "\n"
+
+
+def _nombre_prometheus(nombre: str) -> str:
+    return "".join(c if c.isascii() and (c.isalnum() or c == "_") else "_" for c in nombre)
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _lineas_histograma(metrica: str, etiquetas: str, histograma: Histograma) -> List[str]:
+    separador = "," if etiquetas else ""
+    lineas = []
+    acumulado = 0
+    for limite, cuenta in zip([*map(repr, histograma.limites), "+Inf"], histograma.cuentas):
+        acumulado += cuenta
+        lineas.append(f'{metrica}_bucket{{{etiquetas}{separador}le="{limite}"}} {acumulado}')
+    sufijo = f"{{{etiquetas}}}" if etiquetas else ""
+    lineas.append(f"{metrica}_sum{sufijo} {histograma.suma!r}")
+    lineas.append(f"{metrica}_count{sufijo} {histograma.cantidad}")
+    return lineas
+
+
+REGISTRO = RegistroMetricas()
+
+
+# --- Llamadas lentas ---
+
+@dataclass
+class LlamadaLenta:
+    """
+    Operación que superó el umbral. `funciones` cuenta en cuántas
+    muestras estaba ejecutándose cada función (archivo:función, la más
+    interna de la pila); `pilas` son las pilas completas más frecuentes,
+    de la más externa a la más interna separadas por ";"
+    (archivo:función:línea).
+    """
+    operacion: str
+    segundos: float
+    hilo: str
+    momento: float
+    muestras: int
+    funciones: List[Tuple[str, int]] = field(default_factory=list)
+    pilas: List[Tuple[str, int]] = field(default_factory=list)
+
+    def texto(self, maximo: int = 5) -> str:
+        lineas = [f"{self.operacion}: {self.segundos * 1000:.1f} ms en {self.hilo} "
+                  f"({self.muestras} muestras)"]
+        for funcion, cuenta in self.funciones[:maximo]:
+            lineas.append(f"  {cuenta / max(self.muestras, 1):>6.1%}  {funcion}")
+        if self.pilas:
+            lineas.append("  pila más frecuente: "
+                          + " <- ".join(reversed(self.pilas[0][0].split(";")[-8:])))
+        return "\n".join(lineas)
+
+
+class _Captura:
+    __slots__ = ("operacion", "hilo", "pilas")
+
+    def __init__(self, operacion: str, hilo: int) -> None:
+        self.operacion = operacion
+        self.hilo = hilo
+        self.pilas: Counter = Counter()
+
+
+class _Muestreador:
+    """Hilo que muestrea las pilas de las operaciones medidas en curso."""
+    def __init__(self, umbral: float, intervalo: float,
+                 al_detectar: Optional[Callable[[LlamadaLenta], None]]) -> None:
+        self.umbral = umbral
+        self._intervalo = intervalo
+        self._al_detectar = al_detectar
+        self._cerrojo = threading.Lock()
+        self._en_curso: Dict[int, _Captura] = {}
+        self._detener = threading.Event()
+        self._hilo = threading.Thread(target=self._muestrear, name="metricas-muestreo",
+                                      daemon=True)
+        self._hilo.start()
+
+    def entrar(self, operacion: str) -> Optional[_Captura]:
+        hilo = threading.get_ident()
+        # Solo este hilo agrega o quita su entrada: se puede mirar sin cerrojo
+        if hilo in self._en_curso:
+            # Operación anidada: sus muestras ya caen en la externa
+            return None
+        with self._cerrojo:
+            captura = self._en_curso[hilo] = _Captura(operacion, hilo)
+        return captura
+
+    def salir(self, captura: _Captura, segundos: float) -> None:
+        with self._cerrojo:
+            del self._en_curso[captura.hilo]
+        if segundos < self.umbral:
+            return
+        funciones: Counter = Counter()
+        for pila, cuenta in captura.pilas.items():
+            funciones[pila.rpartition(";")[2].rpartition(":")[0]] += cuenta
+        lenta = LlamadaLenta(captura.operacion, segundos, threading.current_thread().name,
+                             time.time(), sum(captura.pilas.values()),
+                             funciones.most_common(MAX_PILAS_POR_LLAMADA),
+                             captura.pilas.most_common(MAX_PILAS_POR_LLAMADA))
+        _lentas.append(lenta)
+        if self._al_detectar is not None:
+            self._al_detectar(lenta)
+
+    def detener(self) -> None:
+        self._detener.set()
+        self._hilo.join()
+
+    def _muestrear(self) -> None:
+        while not self._detener.wait(self._intervalo):
+            if not self._en_curso:
+                continue
+            marcos = sys._current_frames()
+            with self._cerrojo:
+                for hilo, captura in self._en_curso.items():
+                    marco = marcos.get(hilo)
+                    if marco is not None:
+                        captura.pilas[_pila(marco)] += 1
+            del marcos
+
+
+def _pila(marco) -> str:
+    partes = []
+    while marco is not None and len(partes) < PROFUNDIDAD_PILA:
+        codigo = marco.f_code
+        partes.append(f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}:{marco.f_lineno}")
+        marco = marco.f_back
+    return ";".join(reversed(partes))
+
+
+# --- Activación ---
+
+def activar(umbral_lento: Optional[float] = None,
+            al_detectar: Optional[Callable[[LlamadaLenta], None]] = None,
+            intervalo: float = config.INTERVALO_MUESTREO) -> None:
+    """
+    Empieza a registrar. Con `umbral_lento` (segundos) también muestrea
+    las pilas y guarda las operaciones que lo superan.
+    """
+    global _activas, _muestreador
+    if _muestreador is not None:
+        _muestreador.detener()
+        _muestreador = None
+    if umbral_lento is not None:
+        _muestreador = _Muestreador(umbral_lento, intervalo, al_detectar)
+    _activas = True
+
+
+def desactivar() -> None:
+    """Deja de registrar; lo ya registrado se conserva."""
+    global _activas, _muestreador
+    _activas = False
+    if _muestreador is not None:
+        _muestreador.detener()
+        _muestreador = None
+
+
+def activas() -> bool:
+    return _activas
+
+
+def reiniciar() -> None:
+    REGISTRO.reiniciar()
+    _lentas.clear()
+
+
+# --- Puntos de medición ---
+
+def contar(nombre: str, cantidad: int = 1) -> None:
+    if _activas:
+        REGISTRO.contar(nombre, cantidad)
+
+
+def observar(nombre: str, valor: float, limites: Sequence[float] = LIMITES_CANTIDAD) -> None:
+    if _activas:
+        REGISTRO.histograma(nombre, limites).observar(valor)
+
+
+def registrar_duracion(operacion: str, segundos: float, error: bool = False) -> None:
+    """Duración medida a mano (p. ej. en corrutinas, donde no sirve la pila del hilo)."""
+    if _activas:
+        REGISTRO.duracion(operacion).observar(segundos, error)
+
+
+class _Cronometro:
+    __slots__ = ("_operacion", "_histograma", "_inicio", "_captura")
+
+    def __init__(self, operacion: str, histograma: Histograma) -> None:
+        self._operacion = operacion
+        self._histograma = histograma
+
+    def __enter__(self) -> "_Cronometro":
+        muestreador = _muestreador
+        self._captura = muestreador.entrar(self._operacion) if muestreador is not None else None
+        self._inicio = _reloj()
+        return self
+
+    def __exit__(self, tipo, valor, traza) -> bool:
+        segundos = _reloj() - self._inicio
+        self._histograma.observar(segundos, tipo is not None)
+        captura = self._captura
+        if captura is not None:
+            muestreador = _muestreador
+            if muestreador is not None:
+                muestreador.salir(captura, segundos)
+        return False
+
+
+def cronometro(operacion: str):
+    """Contexto que mide la duración del bloque (vacío si están desactivadas)."""
+    if not _activas:
+        return _NULO
+    return _Cronometro(operacion, REGISTRO.duracion(operacion))
+
+
+def medido(operacion: str) -> Callable[[Callable], Callable]:
+    """Decorador: mide cada llamada a la función como `operacion`."""
+    def decorar(funcion: Callable) -> Callable:
+        histograma: Optional[Histograma] = None
+
+        @wraps(funcion)
+        def medida(*args, **kwargs):
+            nonlocal histograma
+            if not _activas:
+                return funcion(*args, **kwargs)
+            if histograma is None:
+                histograma = REGISTRO.duracion(operacion)
+            if _muestreador is not None:
+                with _Cronometro(operacion, histograma):
+                    return funcion(*args, **kwargs)
+            # Sin muestreo se evita el objeto del contexto
+            inicio = _reloj()
+            try:
+                resultado = funcion(*args, **kwargs)
+            except BaseException:
+                histograma.observar(_reloj() - inicio, True)
+                raise
+            histograma.observar(_reloj() - inicio)
+            return resultado
+        return medida
+    return decorar
+
+
+def instrumentar(prefijo: str) -> Callable[[type], type]:
+    """
+    Decorador de clase: mide los métodos públicos definidos en la clase
+    (no los heredados, ni propiedades ni métodos estáticos) como
+    "<prefijo>.<método>".
+    """
+    def decorar(clase: type) -> type:
+        for nombre, valor in list(vars(clase).items()):
+            if nombre.startswith("_") or not inspect.isfunction(valor):
+                continue
+            setattr(clase, nombre, medido(f"{prefijo}.{nombre}")(valor))
+        return clase
+    return decorar
+
+
+def agregar_opciones(parser) -> None:
+    """Opciones --metricas y --umbral-lento para los main de los servicios."""
+    parser.add_argument("--metricas", action="store_true", default=config.METRICAS_ACTIVAS,
+                        help="registrar métricas (GET /metricas)")
+    parser.add_argument("--umbral-lento", type=float, default=config.UMBRAL_LLAMADA_LENTA,
+                        help="segundos a partir de los cuales se muestrea y se "
+                             "informa una llamada lenta (activa las métricas)")
+
+
+def aplicar_opciones(opciones) -> None:
+    if opciones.metricas or opciones.umbral_lento is not None:
+        activar(opciones.umbral_lento,
+                lambda lenta: print(lenta.texto(), file=sys.stderr, flush=True))
+
+
+# --- Exportación ---
+
+def instantanea() -> Dict[str, Any]:
+    """
+    Todo lo registrado como diccionario: contadores, histogramas,
+    duraciones (segundos; percentiles aproximados por intervalo),
+    errores por operación y llamadas lentas.
+    """
+    datos = REGISTRO.instantanea()
+    datos["activas"] = _activas
+    datos["llamadas_lentas"] = [
+        {"operacion": lenta.operacion, "segundos": lenta.segundos, "hilo": lenta.hilo,
+         "momento": lenta.momento, "muestras": lenta.muestras,
+         "funciones": lenta.funciones, "pilas": lenta.pilas}
+        for lenta in llamadas_lentas()]
+    return datos
+
+
+def texto_prometheus() -> str:
+    return REGISTRO.texto_prometheus()
+
+
+def llamadas_lentas() -> List[LlamadaLenta]:
+    return list(_lentas)
+
+
+if config.METRICAS_ACTIVAS:
+    activar(config.UMBRAL_LLAMADA_LENTA)
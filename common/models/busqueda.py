@@ -0,0 +1,16 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from common.models.transaccion import Transaccion
+
+
+@dataclass
+class ResultadoBusqueda:
+    """
+    Una página de resultados de la búsqueda por texto: `total` es la
+    cantidad de coincidencias y `transacciones` las de la página, de la
+    más relevante a la menos (y a igual relevancia, la más reciente
+    primero).
+    """
+    total: int = 0
+    transacciones: List[Transaccion] = field(default_factory=list)
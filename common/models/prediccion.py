@@ -0,0 +1,183 @@
+import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Mínimo de transacciones para intentar una predicción
+MINIMO_TRANSACCIONES = 10
+
+
+def validar_serie(total_transacciones: int,
+                  dias_con_gasto: int,
+                  minimo_transacciones: int = MINIMO_TRANSACCIONES) -> Optional[str]:
+    """
+    Devuelve el mensaje de error si la serie no alcanza para predecir.
+    """
+    if total_transacciones < minimo_transacciones:
+        return "No hay suficientes datos para realizar un análisis predictivo."
+    if not dias_con_gasto:
+        return "No hay gastos registrados para el análisis predictivo."
+    if dias_con_gasto < 2:
+        return "No hay suficientes días con gastos para la predicción."
+    return None
+
+
+@dataclass
+class ResultadoPrediccion:
+    """
+    Resultado numérico del análisis predictivo, sin dependencias
+    de gráficos. Los días se expresan como ordinales de fecha
+    (datetime.date.toordinal) y los montos como gasto en valor absoluto.
+
+    La recta ajustada es `pendiente` e `intercepto`, con x = días desde
+    el primer día histórico; `tendencia` (la recta en cada día
+    histórico) se calcula solo si se pide.
+    """
+    dias_historicos: Sequence[int]
+    montos_historicos: Sequence[float]
+    dias_futuros: List[int]
+    montos_predichos: List[float]
+    dias_a_predecir: int
+    pendiente: float
+    intercepto: float
+
+    @property
+    def tendencia(self) -> List[float]:
+        if not self.dias_historicos:
+            return []
+        primero = self.dias_historicos[0]
+        return [self.pendiente * (dia - primero) + self.intercepto
+                for dia in self.dias_historicos]
+
+    @property
+    def total_predicho(self) -> float:
+        return sum(self.montos_predichos)
+
+    def fechas_historicas(self) -> List[datetime.date]:
+        return [datetime.date.fromordinal(dia) for dia in self.dias_historicos]
+
+    def fechas_futuras(self) -> List[datetime.date]:
+        return [datetime.date.fromordinal(dia) for dia in self.dias_futuros]
+
+
+@dataclass
+class PronosticoCategorias:
+    """
+    Pronóstico de gasto diario por categoría (una tendencia lineal por
+    categoría, ajustada sobre todos los días del periodo histórico,
+    incluidos los días sin gasto). Las filas de `montos_predichos`
+    siguen el orden de `categorias`.
+    """
+    categorias: List[str]
+    primer_dia: int
+    ultimo_dia: int
+    pendientes: List[float]
+    interceptos: List[float]
+    gasto_historico: List[float]
+    dias_futuros: List[int]
+    montos_predichos: List[List[float]]
+    totales_predichos: List[float]
+
+    @property
+    def dias_a_predecir(self) -> int:
+        return len(self.dias_futuros)
+
+    @property
+    def total_predicho(self) -> float:
+        return sum(self.totales_predichos)
+
+    def filas(self) -> List[Tuple[str, float, float]]:
+        """
+        (categoría, gasto histórico, total predicho), de mayor a menor
+        total predicho.
+        """
+        return sorted(zip(self.categorias, self.gasto_historico, self.totales_predichos),
+                      key=lambda fila: fila[2], reverse=True)
+
+
+@dataclass
+class PronosticoCuenta:
+    """
+    Pronóstico compacto de una cuenta, pensado para los análisis de
+    muchas cuentas a la vez: la recta ajustada sobre los días con gasto
+    (x = días desde `primer_dia`) y los montos predichos a partir del
+    día siguiente a `ultimo_dia`. No incluye la serie histórica.
+    """
+    primer_dia: int
+    ultimo_dia: int
+    pendiente: float
+    intercepto: float
+    gasto_historico: float
+    montos_predichos: List[float]
+
+    @property
+    def dias_a_predecir(self) -> int:
+        return len(self.montos_predichos)
+
+    @property
+    def total_predicho(self) -> float:
+        return sum(self.montos_predichos)
+
+    @property
+    def dias_futuros(self) -> List[int]:
+        return list(range(self.ultimo_dia + 1, self.ultimo_dia + 1 + self.dias_a_predecir))
+
+
+@dataclass
+class SerieRecurrente:
+    """
+    Movimiento que se repite con un periodo regular (salario, alquiler,
+    suscripciones...). `grupo` es la descripción o la categoría, según
+    cómo se agrupó. Días como ordinales de fecha; importes en centavos
+    con signo (negativo = gasto). `regularidad` es la desviación (MAD)
+    de los intervalos dividida por el periodo: 0 es exactamente regular.
+    """
+    grupo: str
+    categoria: str
+    ocurrencias: int
+    periodo_dias: float
+    regularidad: float
+    ultimo_dia: int
+    proximo_dia: int
+    centavos_esperados: int
+    activa: bool
+
+    @property
+    def proxima_fecha(self) -> datetime.date:
+        return datetime.date.fromordinal(self.proximo_dia)
+
+
+@dataclass
+class Anomalia:
+    """
+    Transacción con un importe inusual frente a las anteriores de su
+    grupo. `puntaje` es el puntaje robusto (positivo = más de lo
+    habitual); `centavos_esperados`, la mediana de las anteriores.
+    """
+    dia: int
+    descripcion: str
+    categoria: str
+    centavos: int
+    centavos_esperados: int
+    puntaje: float
+
+    @property
+    def fecha(self) -> datetime.date:
+        return datetime.date.fromordinal(self.dia)
+
+
+@dataclass
+class AnalisisRecurrencias:
+    """
+    Series recurrentes (por fecha de la próxima aparición) y anomalías
+    (de la más reciente a la más antigua) de un libro.
+    """
+    agrupar_por: str
+    recurrentes: List[SerieRecurrente]
+    anomalias: List[Anomalia]
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "AnalisisRecurrencias":
+        """Reconstruye el análisis desde su forma JSON (dataclasses.asdict)."""
+        return cls(datos["agrupar_por"],
+                   [SerieRecurrente(**serie) for serie in datos["recurrentes"]],
+                   [Anomalia(**anomalia) for anomalia in datos["anomalias"]])
@@ -0,0 +1,56 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+from common.models.transaccion import Transaccion
+
+
+@dataclass
+class ResumenTotales:
+    """
+    Totales agregados de un conjunto de transacciones, en centavos
+    enteros (exactos). Los gastos se guardan con signo negativo, igual
+    que en Transaccion.
+    """
+    cantidad: int = 0
+    ingreso_centavos: int = 0
+    gasto_centavos: int = 0
+    gastos_por_categoria: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def saldo_centavos(self) -> int:
+        return self.ingreso_centavos + self.gasto_centavos
+
+    @classmethod
+    def desde_transacciones(cls,
+                            transacciones: Iterable[Transaccion]) -> "ResumenTotales":
+        resumen: Dict[str, int] = defaultdict(int)
+        ingreso_centavos = 0
+        gasto_centavos = 0
+        cantidad = 0
+
+        for transaccion in transacciones:
+            cantidad += 1
+            centavos = transaccion.centavos
+            if centavos >= 0:
+                ingreso_centavos += centavos
+            else:
+                resumen[transaccion.categoria] += centavos
+                gasto_centavos += centavos
+
+        return cls(cantidad, ingreso_centavos, gasto_centavos, dict(resumen))
+
+
+def calcular_gastos_diarios(
+        transacciones: Iterable[Transaccion]) -> Tuple[List[int], List[int]]:
+    """
+    Suma los gastos (en valor absoluto, en centavos) por día.
+    Devuelve (ordinales de fecha ascendentes, totales del día).
+    """
+    totales: Dict[int, int] = defaultdict(int)
+    for transaccion in transacciones:
+        if transaccion.centavos < 0:
+            totales[transaccion.fecha.toordinal()] -= transaccion.centavos
+
+    dias = sorted(totales)
+    return dias, [totales[dia] for dia in dias]
@@ -1,18 +1,30 @@
 import datetime
-from dataclasses import dataclass
+from typing import Optional
+from dataclasses import dataclass, field
+
+from common.dinero import a_unidades
 
 @dataclass
 class Transaccion:
     """
     Entidad base de transacción.
+    El importe se guarda en centavos enteros (negativo = gasto) y se
+    pasa por nombre: Transaccion(fecha, descripcion, categoria,
+    centavos=-5000). Así la llamada posicional anterior, con `monto` en
+    unidades, falla en lugar de leerse como centavos. `monto` lo da en
+    unidades, solo para mostrarlo o graficarlo.
     """
     fecha: datetime.date
     descripcion: str
-    monto: float
+    centavos: int = field(kw_only=True)
     categoria: str
 
+    @property
+    def monto(self) -> float:
+        return a_unidades(self.centavos)
+
     def es_ingreso(self) -> bool:
-        return self.monto >= 0
+        return self.centavos >= 0
 
 
 class Ingreso(Transaccion):
@@ -27,3 +39,20 @@ class Gasto(Transaccion):
     Transacción de tipo gasto.
     """
     pass
+
+
+# Filtro por tipo en las consultas al repositorio
+TIPO_INGRESO = "ingreso"
+TIPO_GASTO = "gasto"
+
+
+def tipo_es_ingreso(tipo: Optional[str]) -> Optional[bool]:
+    """
+    Traduce el filtro de tipo: True para ingresos, False para gastos,
+    None si no se filtra por tipo.
+    """
+    if tipo is None:
+        return None
+    if tipo not in (TIPO_INGRESO, TIPO_GASTO):
+        raise ValueError(f"Tipo de transacción desconocido: {tipo}")
+    return tipo == TIPO_INGRESO
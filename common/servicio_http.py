@@ -0,0 +1,405 @@
+# common/servicio_http.py
+"""
+HTTP/1.1 mínimo para exponer los microservicios en localhost, solo con
+la biblioteca estándar.
+
+- ServidorHttp: servidor asyncio con rutas (método, camino) -> función.
+  Las conexiones son persistentes (keep-alive) y admiten peticiones en
+  tubería: se responden en orden, una tras otra.
+- ClienteHttp: cliente bloqueante con un pool de conexiones
+  persistentes; `pedir_varias` envía varias peticiones seguidas por la
+  misma conexión sin esperar cada respuesta (pipelining).
+
+Los cuerpos van en JSON. Las fechas viajan como texto ISO y los
+dataclasses como diccionarios. Una ruta que devuelve TextoPlano responde
+text/plain (así se publican las métricas para Prometheus en GET /metricas).
+"""
+import asyncio
+import dataclasses
+import datetime
+import json
+import logging
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from common import metricas
+
+# Funciones de las rutas: (parámetros de la URL, cuerpo JSON) -> respuesta JSON
+Manejador = Callable[[Dict[str, str], Any], Any]
+# (método, camino, parámetros de la URL, cuerpo) de una petición del cliente
+PeticionHttp = Tuple[str, str, Optional[Dict[str, Any]], Any]
+
+MAX_CABECERAS = 100
+# Línea de petición o de cabecera; el cuerpo se lee aparte con su largo
+MAX_LINEA = 64 * 1024
+MAX_CUERPO = 256 * 1024 * 1024
+# Peticiones en vuelo por conexión en pedir_varias: con una ventana
+# acotada, ni el cliente ni el servidor se bloquean escribiendo
+# mientras el otro también escribe
+PROFUNDIDAD_TUBERIA = 32
+
+TIPO_JSON = "application/json"
+TIPO_TEXTO = "text/plain; version=0.0.4; charset=utf-8"
+
+_MOTIVOS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            413: "Payload Too Large", 431: "Request Header Fields Too Large",
+            500: "Internal Server Error", 502: "Bad Gateway"}
+
+_registro = logging.getLogger(__name__)
+
+
+class ErrorServicio(Exception):
+    """Respuesta de error de un servicio (código HTTP y mensaje)."""
+    def __init__(self, estado: int, mensaje: str) -> None:
+        super().__init__(f"{estado}: {mensaje}")
+        self.estado = estado
+        self.mensaje = mensaje
+
+
+class TextoPlano(str):
+    """Respuesta de una ruta que se envía como texto en lugar de JSON."""
+
+
+# --- JSON ---
+
+def _a_json(valor: Any) -> Any:
+    if isinstance(valor, datetime.date):
+        return valor.isoformat()
+    if dataclasses.is_dataclass(valor) and not isinstance(valor, type):
+        return dataclasses.asdict(valor)
+    if hasattr(valor, "tolist"):
+        # Escalares y arreglos de NumPy
+        return valor.tolist()
+    raise TypeError(f"No se puede convertir a JSON: {type(valor).__name__}")
+
+
+def codificar(valor: Any) -> bytes:
+    return json.dumps(valor, default=_a_json, ensure_ascii=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def decodificar(datos: bytes) -> Any:
+    return json.loads(datos) if datos else None
+
+
+def fecha(texto: Optional[str]) -> Optional[datetime.date]:
+    """Fecha ISO de un parámetro o de un cuerpo (None si no viene)."""
+    return datetime.date.fromisoformat(texto) if texto else None
+
+
+def entero(texto: Optional[str], por_defecto: Optional[int] = None) -> Optional[int]:
+    return int(texto) if texto not in (None, "") else por_defecto
+
+
+# --- Servidor ---
+
+class ServidorHttp:
+    """
+    Servidor HTTP/1.1 sobre asyncio. Cada ruta es una función síncrona;
+    las marcadas `en_hilo` (cálculos o E/S lentas) se ejecutan en el
+    pool de hilos del bucle para no detener las demás conexiones.
+
+    Errores: ValueError, TypeError y KeyError -> 400 (petición mal
+    formada), línea o cabecera de más de MAX_LINEA -> 431, cuerpo de
+    más de MAX_CUERPO -> 413, ruta desconocida -> 404, ErrorServicio de otro servicio
+    -> 502, cualquier otra excepción -> 500.
+
+    Todos tienen GET /salud, GET /metricas (texto para Prometheus) y
+    GET /metricas/instantanea (JSON); con las métricas activas se mide
+    cada ruta como "http.<método> <camino>".
+    """
+    def __init__(self, nombre: str) -> None:
+        self.nombre = nombre
+        self._rutas: Dict[Tuple[str, str], Tuple[Manejador, bool]] = {}
+        self.ruta("GET", "/salud")(lambda consulta, cuerpo: {"servicio": nombre})
+        self.ruta("GET", "/metricas")(
+            lambda consulta, cuerpo: TextoPlano(metricas.texto_prometheus()))
+        self.ruta("GET", "/metricas/instantanea")(
+            lambda consulta, cuerpo: metricas.instantanea())
+
+    def ruta(self, metodo: str, camino: str,
+             en_hilo: bool = False) -> Callable[[Manejador], Manejador]:
+        def registrar(manejador: Manejador) -> Manejador:
+            self._rutas[(metodo, camino)] = (manejador, en_hilo)
+            return manejador
+        return registrar
+
+    async def iniciar(self, host: str, puerto: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self._atender, host, puerto,
+                                          limit=MAX_LINEA)
+
+    def servir(self, host: str, puerto: int) -> None:
+        """Atiende peticiones hasta que se interrumpa el proceso."""
+        async def principal() -> None:
+            servidor = await self.iniciar(host, puerto)
+            _registro.info("%s escuchando en http://%s:%s", self.nombre, host, puerto)
+            async with servidor:
+                await servidor.serve_forever()
+        try:
+            asyncio.run(principal())
+        except KeyboardInterrupt:
+            pass
+
+    async def _atender(self, lector: asyncio.StreamReader,
+                       escritor: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                peticion = await self._leer_peticion(lector)
+                if peticion is None:
+                    break
+                metodo, objetivo, cabeceras, cuerpo = peticion
+                estado, respuesta, tipo = await self._despachar(metodo, objetivo, cuerpo)
+                mantener = cabeceras.get("connection", "").lower() != "close"
+                escritor.write(_respuesta(estado, respuesta, mantener, tipo))
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _PeticionInvalida as error:
+            escritor.write(_respuesta(error.estado, codificar({"error": str(error)}), False))
+        finally:
+            escritor.close()
+
+    async def _leer_peticion(self, lector: asyncio.StreamReader):
+        linea = await _leer_linea(lector)
+        if not linea:
+            return None
+        try:
+            metodo, objetivo, _ = linea.decode("latin-1").split()
+        except ValueError:
+            raise _PeticionInvalida(400, "Línea de petición inválida")
+
+        cabeceras: Dict[str, str] = {}
+        for _ in range(MAX_CABECERAS):
+            linea = await _leer_linea(lector)
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        else:
+            raise _PeticionInvalida(400, "Demasiadas cabeceras")
+
+        try:
+            largo = int(cabeceras.get("content-length") or 0)
+        except ValueError:
+            raise _PeticionInvalida(400, "Content-Length inválido")
+        if largo > MAX_CUERPO:
+            raise _PeticionInvalida(413, "Cuerpo demasiado grande")
+        cuerpo = await lector.readexactly(largo) if largo else b""
+        return metodo, objetivo, cabeceras, cuerpo
+
+    async def _despachar(self, metodo: str, objetivo: str,
+                         cuerpo: bytes) -> Tuple[int, bytes, str]:
+        partes = urlsplit(objetivo)
+        ruta = self._rutas.get((metodo, partes.path))
+        if ruta is None:
+            return 404, codificar({"error": f"No existe {metodo} {partes.path}"}), TIPO_JSON
+        inicio = time.perf_counter()
+        respuesta = await self._ejecutar(*ruta, partes.query, cuerpo)
+        # Medida a mano: en el bucle se atienden varias peticiones a la
+        # vez, así que la pila del hilo no dice nada de esta ruta
+        metricas.registrar_duracion(f"http.{metodo} {partes.path}",
+                                    time.perf_counter() - inicio, respuesta[0] != 200)
+        return respuesta
+
+    async def _ejecutar(self, manejador: Manejador, en_hilo: bool, texto_consulta: str,
+                        cuerpo: bytes) -> Tuple[int, bytes, str]:
+        try:
+            consulta = dict(parse_qsl(texto_consulta))
+            datos = decodificar(cuerpo)
+            if en_hilo:
+                resultado = await asyncio.get_running_loop().run_in_executor(
+                    None, manejador, consulta, datos)
+            else:
+                resultado = manejador(consulta, datos)
+            if isinstance(resultado, TextoPlano):
+                return 200, resultado.encode("utf-8"), TIPO_TEXTO
+            return 200, codificar(resultado), TIPO_JSON
+        except (ValueError, TypeError, KeyError) as error:
+            return 400, codificar({"error": str(error)}), TIPO_JSON
+        except ErrorServicio as error:
+            return 502, codificar({"error": str(error)}), TIPO_JSON
+        except Exception as error:  # noqa: BLE001 - se informa al cliente
+            return 500, codificar({"error": f"{type(error).__name__}: {error}"}), TIPO_JSON
+
+
+class _PeticionInvalida(Exception):
+    def __init__(self, estado: int, mensaje: str) -> None:
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+async def _leer_linea(lector: asyncio.StreamReader) -> bytes:
+    try:
+        return await lector.readline()
+    except (ValueError, asyncio.LimitOverrunError):
+        # readline no admite líneas de más de MAX_LINEA (el límite del lector)
+        raise _PeticionInvalida(431, "Línea de petición o cabecera demasiado larga")
+
+
+def _respuesta(estado: int, cuerpo: bytes, mantener: bool, tipo: str = TIPO_JSON) -> bytes:
+    cabecera = (f"HTTP/1.1 {estado} {_MOTIVOS.get(estado, '')}\r\n"
+                f"Content-Type: {tipo}\r\n"
+                f"Content-Length: {len(cuerpo)}\r\n"
+                f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n")
+    return cabecera.encode("latin-1") + cuerpo
+
+
+# --- Cliente ---
+
+class _Conexion:
+    def __init__(self, host: str, puerto: int, timeout: float) -> None:
+        self._socket = socket.create_connection((host, puerto), timeout=timeout)
+        self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._lector = self._socket.makefile("rb")
+        self.reutilizada = False
+        self.abierta = True
+
+    def enviar(self, datos: bytes) -> None:
+        self._socket.sendall(datos)
+
+    def leer_respuesta(self) -> Tuple[int, bytes]:
+        linea = self._lector.readline()
+        if not linea:
+            raise ConnectionResetError("El servicio cerró la conexión")
+        estado = int(linea.split(None, 2)[1])
+        largo = 0
+        while True:
+            linea = self._lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            nombre = nombre.strip().lower()
+            if nombre == "content-length":
+                largo = int(valor)
+            elif nombre == "connection" and valor.strip().lower() == "close":
+                self.abierta = False
+        cuerpo = self._lector.read(largo) if largo else b""
+        if len(cuerpo) < largo:
+            raise ConnectionResetError("Respuesta incompleta")
+        return estado, cuerpo
+
+    def cerrar(self) -> None:
+        self.abierta = False
+        self._lector.close()
+        self._socket.close()
+
+
+class ClienteHttp:
+    """
+    Cliente de un servicio con un pool de hasta `conexiones` conexiones
+    persistentes; se puede usar desde varios hilos a la vez. Una
+    respuesta de error se lanza como ErrorServicio.
+    """
+    def __init__(self, url: str, conexiones: int = 4, timeout: float = 60.0) -> None:
+        partes = urlsplit(url)
+        self._host = partes.hostname or "127.0.0.1"
+        self._puerto = partes.port or 80
+        self._prefijo = partes.path.rstrip("/")
+        self._timeout = timeout
+        self._cupo = threading.BoundedSemaphore(conexiones)
+        self._libres: List[_Conexion] = []
+        self._cerrojo = threading.Lock()
+        self._cantidad = conexiones
+
+    def pedir(self, metodo: str, camino: str,
+              consulta: Optional[Dict[str, Any]] = None, cuerpo: Any = None) -> Any:
+        return self.pedir_varias([(metodo, camino, consulta, cuerpo)])[0]
+
+    def pedir_varias(self, peticiones: Sequence[PeticionHttp]) -> List[Any]:
+        """
+        Envía las peticiones en tubería por una sola conexión y devuelve
+        las respuestas en el mismo orden.
+        """
+        mensajes = [self._mensaje(*peticion) for peticion in peticiones]
+        # Reintentar es seguro solo si todas se pueden repetir (GET)
+        repetible = all(peticion[0] == "GET" for peticion in peticiones)
+        with self._cupo:
+            conexion = self._tomar()
+            try:
+                respuestas = self._intercambiar(conexion, mensajes)
+            except (ConnectionError, socket.timeout, ValueError):
+                conexion.cerrar()
+                # Una conexión inactiva puede haberla cerrado el servicio
+                if not (conexion.reutilizada and repetible):
+                    raise
+                conexion = self._abrir()
+                try:
+                    respuestas = self._intercambiar(conexion, mensajes)
+                except BaseException:
+                    conexion.cerrar()
+                    raise
+            self._devolver(conexion)
+
+        resultados = []
+        for estado, cuerpo in respuestas:
+            datos = decodificar(cuerpo)
+            if estado >= 400:
+                mensaje = datos.get("error", "") if isinstance(datos, dict) else str(datos)
+                raise ErrorServicio(estado, mensaje)
+            resultados.append(datos)
+        return resultados
+
+    def conectar(self) -> None:
+        """Abre de antemano todas las conexiones del pool."""
+        abiertas = []
+        for _ in range(self._cantidad):
+            if not self._cupo.acquire(blocking=False):
+                break
+            abiertas.append(self._tomar())
+        for conexion in abiertas:
+            self._devolver(conexion)
+            self._cupo.release()
+
+    def cerrar(self) -> None:
+        with self._cerrojo:
+            libres, self._libres = self._libres, []
+        for conexion in libres:
+            conexion.cerrar()
+
+    def _mensaje(self, metodo: str, camino: str,
+                 consulta: Optional[Dict[str, Any]], cuerpo: Any) -> bytes:
+        objetivo = self._prefijo + camino
+        if consulta:
+            objetivo += "?" + urlencode({clave: valor for clave, valor in consulta.items()
+                                         if valor is not None})
+        datos = codificar(cuerpo) if cuerpo is not None else b""
+        cabecera = (f"{metodo} {objetivo} HTTP/1.1\r\n"
+                    f"Host: {self._host}:{self._puerto}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(datos)}\r\n\r\n")
+        return cabecera.encode("latin-1") + datos
+
+    @staticmethod
+    def _intercambiar(conexion: _Conexion, mensajes: List[bytes]) -> List[Tuple[int, bytes]]:
+        respuestas = []
+        enviados = min(len(mensajes), PROFUNDIDAD_TUBERIA)
+        conexion.enviar(b"".join(mensajes[:enviados]))
+        while len(respuestas) < len(mensajes):
+            respuestas.append(conexion.leer_respuesta())
+            if enviados < len(mensajes):
+                conexion.enviar(mensajes[enviados])
+                enviados += 1
+        return respuestas
+
+    def _tomar(self) -> _Conexion:
+        with self._cerrojo:
+            if self._libres:
+                conexion = self._libres.pop()
+                conexion.reutilizada = True
+                return conexion
+        return self._abrir()
+
+    def _abrir(self) -> _Conexion:
+        return _Conexion(self._host, self._puerto, self._timeout)
+
+    def _devolver(self, conexion: _Conexion) -> None:
+        if not conexion.abierta:
+            conexion.cerrar()
+            return
+        with self._cerrojo:
+            self._libres.append(conexion)
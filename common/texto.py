@@ -0,0 +1,17 @@
+# common/texto.py
+"""
+Normalización de texto compartida por la búsqueda (IndiceBusqueda) y
+la detección de recurrencias: dos descripciones que solo difieren en
+mayúsculas, acentos o signos se tratan como la misma.
+"""
+import re
+import unicodedata
+
+_SEPARADORES = re.compile(r"[\W_]+")
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin acentos y con los signos convertidos en espacios."""
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(_SEPARADORES.sub(" ", sin_acentos).split())
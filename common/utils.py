@@ -1,5 +1,11 @@
 # common/utils.py
-from typing import Protocol, List, Optional, Any
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Protocol, List, Optional, Any, Dict, Iterator, Tuple
+
+Evento = Tuple[str, Any]
+
 
 class Observer(Protocol):
     """
@@ -9,22 +15,195 @@ class Observer(Protocol):
         ...
 
 
+def agrupar_eventos(eventos: List[Evento], eventos_lote: Dict[str, str]) -> List[Evento]:
+    """
+    Junta los eventos consecutivos que tienen evento de lote asociado.
+    Por ejemplo, varios TRANSACCION_AGREGADA seguidos se convierten en
+    un único TRANSACCION_LOTE_AGREGADO con la lista de transacciones.
+    Los demás eventos se dejan como están y en el mismo orden.
+    """
+    nombres_lote = set(eventos_lote.values())
+    agrupados: List[Evento] = []
+    for evento, data in eventos:
+        if evento in nombres_lote:
+            nombre, datos = evento, list(data)
+        elif evento in eventos_lote:
+            nombre, datos = eventos_lote[evento], [data]
+        else:
+            agrupados.append((evento, data))
+            continue
+
+        if agrupados and agrupados[-1][0] == nombre:
+            agrupados[-1][1].extend(datos)
+        else:
+            agrupados.append((nombre, datos))
+    return agrupados
+
+
+class _EntregaDiferida:
+    """
+    Cola de eventos de un observador con entrega diferida: los eventos se
+    acumulan y se entregan agrupados en un hilo aparte cuando pasan
+    `retardo` segundos sin eventos nuevos (debounce). Así un observador
+    lento no frena a quien escribe.
+    """
+    def __init__(self, observer: Observer, retardo: float,
+                 eventos_lote: Dict[str, str]) -> None:
+        self._observer = observer
+        self._retardo = retardo
+        self._eventos_lote = eventos_lote
+        self._pendientes: List[Evento] = []
+        self._cerrojo = threading.Lock()
+        # Dos temporizadores pueden vencer casi a la vez: las entregas
+        # al observador no se solapan
+        self._cerrojo_entrega = threading.Lock()
+        self._temporizador: Optional[threading.Timer] = None
+
+    def encolar(self, event: str, data: Optional[Any]) -> None:
+        with self._cerrojo:
+            self._pendientes.append((event, data))
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+            self._temporizador = threading.Timer(self._retardo, self.entregar)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def entregar(self) -> None:
+        with self._cerrojo_entrega:
+            with self._cerrojo:
+                pendientes, self._pendientes = self._pendientes, []
+                self._temporizador = None
+            for event, data in agrupar_eventos(pendientes, self._eventos_lote):
+                self._observer.update(event, data)
+
+    def cancelar(self) -> None:
+        with self._cerrojo:
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+
+
+@dataclass
+class _Suscripcion:
+    observer: Observer
+    agrupar: bool = False
+    diferida: Optional[_EntregaDiferida] = None
+
+
 class Subject:
     """
     Sujeto observable. Los servicios pueden heredar de aquí
     para notificar cambios a la UI u otros observadores.
+
+    Por defecto cada observador recibe cada evento en el momento.
+    Quien se suscribe con agrupar=True recibe, dentro de un bloque
+    `with subject.batch():`, un solo evento de lote al final (según
+    EVENTOS_LOTE). Con retardo=segundos la entrega es asíncrona y
+    agrupada (debounce) en un hilo aparte.
+
+    Se puede notificar desde cualquier hilo. Las entregas inmediatas se
+    hacen de a una (con un cerrojo reentrante), así que un observador
+    nunca recibe dos eventos a la vez y todos los ven en el mismo
+    orden. Cada hilo tiene su propio batch(): un lote agrupa solo los
+    eventos del hilo que lo abrió.
     """
+    # Evento individual -> evento de lote que agrupa varios de ellos
+    EVENTOS_LOTE: Dict[str, str] = {}
+
     def __init__(self) -> None:
         self._observers: List[Observer] = []
+        self._suscripciones: List[_Suscripcion] = []
+        self._cerrojo_observers = threading.RLock()
+        # Por hilo: profundidad de batch() y eventos acumulados en él
+        self._lotes = threading.local()
 
-    def attach(self, observer: Observer) -> None:
-        if observer not in self._observers:
-            self._observers.append(observer)
+    def attach(self,
+               observer: Observer,
+               agrupar: bool = False,
+               retardo: Optional[float] = None) -> None:
+        with self._cerrojo_observers:
+            if observer not in self._observers:
+                diferida = None
+                if retardo is not None:
+                    diferida = _EntregaDiferida(observer, retardo, self.EVENTOS_LOTE)
+                self._observers.append(observer)
+                self._suscripciones.append(_Suscripcion(observer, agrupar, diferida))
 
     def detach(self, observer: Observer) -> None:
-        if observer in self._observers:
-            self._observers.remove(observer)
+        with self._cerrojo_observers:
+            if observer in self._observers:
+                indice = self._observers.index(observer)
+                suscripcion = self._suscripciones.pop(indice)
+                self._observers.pop(indice)
+                if suscripcion.diferida is not None:
+                    suscripcion.diferida.cancelar()
 
     def notify(self, event: str, data: Optional[Any] = None) -> None:
-        for observer in list(self._observers):
-            observer.update(event, data)
+        lote = self._lote_actual()
+        en_lote = lote.profundidad > 0
+        if en_lote:
+            lote.eventos.append((event, data))
+
+        with self._cerrojo_observers:
+            for suscripcion in list(self._suscripciones):
+                if suscripcion.diferida is not None:
+                    suscripcion.diferida.encolar(event, data)
+                elif not (en_lote and suscripcion.agrupar):
+                    suscripcion.observer.update(event, data)
+
+    def notify_lote(self, event: str, datos: List[Any]) -> None:
+        """
+        Equivale a notificar `event` una vez por elemento dentro de un
+        batch(), pero los observadores que agrupan reciben el lote sin
+        recorrerlo elemento por elemento.
+        """
+        evento_lote = self.EVENTOS_LOTE.get(event)
+        if evento_lote is None:
+            with self.batch():
+                for data in datos:
+                    self.notify(event, data)
+            return
+
+        with self.batch():
+            self._lote_actual().eventos.append((evento_lote, datos))
+            with self._cerrojo_observers:
+                for suscripcion in list(self._suscripciones):
+                    if suscripcion.diferida is not None:
+                        suscripcion.diferida.encolar(evento_lote, datos)
+                    elif not suscripcion.agrupar:
+                        for data in datos:
+                            suscripcion.observer.update(event, data)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Agrupa las notificaciones del bloque. Los observadores suscritos
+        con agrupar=True las reciben al salir, ya agrupadas; el resto
+        las sigue recibiendo una a una.
+        """
+        lote = self._lote_actual()
+        lote.profundidad += 1
+        try:
+            yield
+        finally:
+            lote.profundidad -= 1
+            if lote.profundidad == 0:
+                self._entregar_lote(lote)
+
+    def _lote_actual(self) -> threading.local:
+        lote = self._lotes
+        if not hasattr(lote, "eventos"):
+            lote.profundidad = 0
+            lote.eventos = []
+        return lote
+
+    def _entregar_lote(self, lote: threading.local) -> None:
+        eventos, lote.eventos = lote.eventos, []
+        if not eventos:
+            return
+        agrupados = agrupar_eventos(eventos, self.EVENTOS_LOTE)
+        with self._cerrojo_observers:
+            for suscripcion in list(self._suscripciones):
+                if suscripcion.agrupar and suscripcion.diferida is None:
+                    for event, data in agrupados:
+                        suscripcion.observer.update(event, data)
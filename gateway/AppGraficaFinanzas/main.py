@@ -1,37 +1,279 @@
 # gateway/AppGraficaFinanzas/main.py
+import datetime
+import importlib
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common import config, metricas
+from common.utils import Observer
+from common.cache import CacheVersionada, EstadisticasCache
+from common.dinero import centavos_desde_unidades
+from common.acumulados import AcumuladosTemporales
+from common.models.busqueda import ResultadoBusqueda
+from servicio_transaccion.IndiceBusqueda import IndiceBusqueda
 from servicio_transaccion.TransactionFactory import TransaccionFactory
-from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionRepository import (
+    ITransactionRepository, TransactionRepository
+)
 from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+from servicio_transaccion.LibroCuentas import CUENTA_PRINCIPAL, LibroCuentas
 
 from servicio_reporte.GeneradorReporte import GeneradorReporte
 from servicio_reporte.ControladorResumen import ControladorResumen
+from servicio_reporte.AgregadorResumen import AgregadorResumen
+
+# Módulos que arrastran numpy, scikit-learn o Matplotlib: se importan
+# la primera vez que se usan (o al precalentar en segundo plano).
+_MODULOS_PESADOS = (
+    "servicio_prediccion.ServicioPrediccion",
+    "servicio_prediccion.GraficoPrediccion",
+    "servicio_prediccion.ServicioRecurrencias",
+    "matplotlib.figure",
+    "matplotlib.backends.backend_tkagg",
+)
+
+
+def crear_repositorio(backend: str = config.BACKEND_REPOSITORIO,
+                      ruta: Optional[str] = None) -> ITransactionRepository:
+    """
+    Construye el repositorio según el backend configurado.
+    Los backends alternativos se importan solo si se usan.
+    `ruta` reemplaza a RUTA_BASE_DATOS (backend "sqlite") o a
+    DIRECTORIO_DIARIO (backend "diario").
+    """
+    if backend == "memoria":
+        return TransactionRepository()
+    if backend == "columnar":
+        from servicio_transaccion.ColumnarTransactionRepository import (
+            ColumnarTransactionRepository
+        )
+        return ColumnarTransactionRepository()
+    if backend == "sqlite":
+        from servicio_transaccion.SqliteTransactionRepository import (
+            SqliteTransactionRepository
+        )
+        return SqliteTransactionRepository(ruta or config.RUTA_BASE_DATOS)
+    if backend == "diario":
+        from servicio_transaccion.DiarioTransactionRepository import (
+            DiarioTransactionRepository
+        )
+        return DiarioTransactionRepository(ruta or config.DIRECTORIO_DIARIO,
+                                           config.REGISTROS_POR_GRUPO,
+                                           config.INTERVALO_GRUPO,
+                                           config.FILAS_POR_INSTANTANEA)
+    raise ValueError(f"Backend de repositorio desconocido: {backend}")
+
+
+def crear_particion(cuenta: str,
+                    backend: str = config.BACKEND_REPOSITORIO) -> ITransactionRepository:
+    """
+    Repositorio de una cuenta del libro. Con "sqlite", cada cuenta va
+    en su propio archivo junto a RUTA_BASE_DATOS (ahorrapro.<cuenta>.db);
+    con "diario", en DIRECTORIO_DIARIO/cuentas/<cuenta>.
+    """
+    ruta = None
+    if backend == "sqlite":
+        base, extension = os.path.splitext(config.RUTA_BASE_DATOS)
+        ruta = f"{base}.{cuenta}{extension}"
+    elif backend == "diario":
+        ruta = os.path.join(config.DIRECTORIO_DIARIO, "cuentas", cuenta)
+    return crear_repositorio(backend, ruta)
+
 
-from servicio_prediccion.SklearnAdapter import SklearnPredictorAdapter
-from servicio_prediccion.ServicioPrediccion import ServicioPrediccion
+def cuentas_guardadas(backend: str = config.BACKEND_REPOSITORIO) -> List[str]:
+    """Cuentas con una partición persistente de una ejecución anterior."""
+    if backend == "sqlite":
+        base, extension = os.path.splitext(config.RUTA_BASE_DATOS)
+        directorio, prefijo = os.path.split(base)
+        prefijo += "."
+        nombres = os.listdir(directorio or ".")
+        # La base de la cuenta principal (sin ".<cuenta>") no cuenta
+        return sorted(nombre[len(prefijo):len(nombre) - len(extension)]
+                      for nombre in nombres
+                      if nombre.startswith(prefijo) and nombre.endswith(extension)
+                      and len(nombre) > len(prefijo) + len(extension))
+    if backend == "diario":
+        directorio = os.path.join(config.DIRECTORIO_DIARIO, "cuentas")
+        if os.path.isdir(directorio):
+            return sorted(nombre for nombre in os.listdir(directorio)
+                          if os.path.isdir(os.path.join(directorio, nombre)))
+    return []
 
 
-class FinanzasGateway:
+@metricas.instrumentar("gateway")
+class FinanzasGateway(Observer):
     """
     Gateway / fachada que expone una interfaz sencilla para la UI.
     Aquí se "conectan" los microservicios.
+
+    Los métodos *_futuro ejecutan el trabajo en un pool de hilos y
+    devuelven un Future. Las peticiones idénticas en curso se comparten
+    y las pendientes se cancelan cuando llegan datos nuevos.
+
+    Los resúmenes y predicciones se guardan en una caché por versión de
+    los datos y parámetros: si nada cambió, se responden sin recalcular.
+
+    El repositorio del gateway es la cuenta principal de un LibroCuentas;
+    las demás cuentas tienen su propia partición y los análisis de todas
+    las cuentas se reparten en un pool de procesos.
+
+    Cada método público se mide con common/metricas.py (como
+    "gateway.<método>"); obtener_metricas y metricas_prometheus exportan
+    lo registrado.
+
+    Con `datos_ejemplo=False` un repositorio vacío no se llena con los
+    datos de ejemplo (así arrancan las réplicas de los servicios HTTP).
+    Ver gateway/AppGraficaFinanzas/remoto.py para el modo remoto.
     """
-    def __init__(self) -> None:
-        # Infra básica
-        self._repository = TransactionRepository()
+    def __init__(self,
+                 repository: Optional[ITransactionRepository] = None,
+                 datos_ejemplo: bool = True) -> None:
+        # Infra básica (si no se inyecta, se usa el backend de common/config.py)
+        self._repository = repository if repository is not None else crear_repositorio()
         self._factory = TransaccionFactory()
 
         # Microservicio de transacciones (Subject del Observer)
-        self._logica_financiera = LogicaFinanciera(self._factory, self._repository)
+        self._logica_financiera = LogicaFinanciera(self._factory, self._repository,
+                                                   datos_ejemplo)
+        self._libro = LibroCuentas(crear_particion, self._repository)
+        if repository is None:
+            for cuenta in cuentas_guardadas():
+                self._libro.particion(cuenta)
+
+        # Los servicios de reporte y predicción (y el índice de búsqueda)
+        # se crean en el primer uso
+        self._acumulados: Optional[AcumuladosTemporales] = None
+        self._indice_busqueda: Optional[IndiceBusqueda] = None
+        self._agregador_resumen: Optional[AgregadorResumen] = None
+        self._pronostico_incremental = None
+        self._controlador_resumen: Optional[ControladorResumen] = None
+        self._servicio_prediccion = None
+        self._servicio_recurrencias = None
+
+        # Ejecución en segundo plano: las escrituras toman _cerrojo_datos
+        # (también mientras notifican a los Observers). Los cálculos solo
+        # lo toman para copiar lo que mantienen esos Observers y el resto
+        # lo hacen sin él, así una escritura no espera a una predicción.
+        # Las lecturas directas del repositorio no lo toman: los
+        # repositorios son seguros entre hilos y leen sobre instantáneas.
+        self._cerrojo_datos = threading.RLock()
+        self._cerrojo_futuros = threading.RLock()
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        self._procesos: Optional[ProcessPoolExecutor] = None
+        self._en_curso: Dict[Tuple[Any, ...], Future] = {}
+        self._cache = CacheVersionada(config.CACHE_MAX_ENTRADAS, config.CACHE_MAX_BYTES)
+        self._logica_financiera.attach(self, agrupar=True)
+
+    # --- Métodos del Observer ---
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        """
+        Llegaron datos nuevos: se cancelan los cálculos que aún no
+        empezaron y se libera la caché, porque ya estarían desactualizados.
+        """
+        version = self.version
+        self._cache.invalidar(version)
+        with self._cerrojo_futuros:
+            for clave, futuro in list(self._en_curso.items()):
+                if clave[-1] < version:
+                    futuro.cancel()
+
+    # --- Creación perezosa de servicios ---
 
-        # Microservicio de reporte
-        self._generador_reporte = GeneradorReporte()
-        self._controlador_resumen = ControladorResumen(self._repository,
-                                                    self._generador_reporte)
+    def _observador(self, atributo: str, construir: Callable[[Any], Any]) -> Any:
+        """
+        Crea un Observer de LogicaFinanciera (tablas, índice, totales,
+        regresión) sin retener _cerrojo_datos mientras se construye: con
+        el cerrojo solo se toma una instantánea del repositorio y se
+        suscribe un registro de los eventos que lleguen mientras tanto.
+        `construir(instantanea)` corre sin el cerrojo; al terminar, otra
+        vez con él, se aplican los eventos registrados y se publica en
+        `atributo` si ningún otro hilo se adelantó (si no, se descarta).
+        """
+        observador = getattr(self, atributo)
+        if observador is not None:
+            return observador
+        pendientes = _EventosPendientes()
+        with self._cerrojo_datos:
+            instantanea = self._repository.obtener_todas()
+            self._logica_financiera.attach(pendientes, agrupar=True)
+        try:
+            observador = construir(instantanea)
+        except BaseException:
+            with self._cerrojo_datos:
+                self._logica_financiera.detach(pendientes)
+            raise
+        # Quitar el registro y suscribir el Observer con el mismo cerrojo:
+        # entre una cosa y otra no puede colarse ninguna escritura
+        with self._cerrojo_datos:
+            self._logica_financiera.detach(pendientes)
+            if getattr(self, atributo) is None:
+                for event, data in pendientes.eventos:
+                    observador.update(event, data)
+                self._logica_financiera.attach(observador, agrupar=True)
+                setattr(self, atributo, observador)
+        return getattr(self, atributo)
 
-        # Microservicio de predicción
-        self._sklearn_adapter = SklearnPredictorAdapter()
-        self._servicio_prediccion = ServicioPrediccion(self._repository,
-                                                    self._sklearn_adapter)
+    def _tablas_temporales(self) -> AcumuladosTemporales:
+        # Totales diarios/mensuales/anuales compartidos por reporte y predicción
+        return self._observador("_acumulados", _construir(AcumuladosTemporales))
+
+    def _busqueda(self) -> IndiceBusqueda:
+        return self._observador("_indice_busqueda", _construir(IndiceBusqueda))
+
+    def _resumen(self) -> ControladorResumen:
+        if self._controlador_resumen is None:
+            # Los totales se mantienen al día como Observer
+            agregador = self._observador("_agregador_resumen", _construir(AgregadorResumen))
+            acumulados = self._tablas_temporales()
+            with self._cerrojo_datos:
+                if self._controlador_resumen is None:
+                    self._controlador_resumen = ControladorResumen(self._repository,
+                                                                  GeneradorReporte(),
+                                                                  agregador,
+                                                                  acumulados,
+                                                                  self._cerrojo_datos)
+        return self._controlador_resumen
+
+    def _prediccion(self):
+        if self._servicio_prediccion is None:
+            from servicio_prediccion.SklearnAdapter import SklearnPredictorAdapter
+            from servicio_prediccion.ServicioPrediccion import ServicioPrediccion
+            from servicio_prediccion.RegresionIncremental import PronosticoIncremental
+
+            pronostico = None
+            if config.MODO_PREDICCION == "incremental":
+                pronostico = self._observador("_pronostico_incremental",
+                                              _construir(PronosticoIncremental))
+            acumulados = self._tablas_temporales()
+            with self._cerrojo_datos:
+                if self._servicio_prediccion is None:
+                    self._servicio_prediccion = ServicioPrediccion(self._repository,
+                                                                  SklearnPredictorAdapter(),
+                                                                  acumulados,
+                                                                  pronostico,
+                                                                  self._cerrojo_datos)
+        return self._servicio_prediccion
+
+    def _recurrencias(self):
+        if self._servicio_recurrencias is None:
+            from servicio_prediccion.ServicioRecurrencias import ServicioRecurrencias
+            self._servicio_recurrencias = ServicioRecurrencias(self._repository)
+        return self._servicio_recurrencias
+
+    def precalentar(self) -> threading.Thread:
+        """
+        Importa en un hilo de fondo las dependencias pesadas para que el
+        primer análisis no tenga que esperarlas. Solo importa módulos:
+        los servicios se siguen creando en el hilo que los usa.
+        """
+        hilo = threading.Thread(target=_importar_modulos_pesados,
+                                name="precalentar-gateway",
+                                daemon=True)
+        hilo.start()
+        return hilo
 
     # --- Exposición de servicios a la UI ---
 
@@ -39,21 +281,377 @@ class FinanzasGateway:
     def logica_financiera(self) -> LogicaFinanciera:
         return self._logica_financiera
 
-    def agregar_transaccion(self, *args, **kwargs) -> bool:
-        return self._logica_financiera.agregar_transaccion(*args, **kwargs)
+    @property
+    def version(self) -> int:
+        # Cambia con cualquier escritura, en la cuenta principal o en las demás
+        return self._logica_financiera.version + self._libro.version
+
+    def agregar_transaccion(self, fecha, descripcion, monto, categoria) -> bool:
+        """Importe en unidades (50, 12.34 o "12.34"); ver agregar_transaccion_centavos."""
+        return self.agregar_transaccion_centavos(fecha, descripcion,
+                                                 centavos_desde_unidades(monto), categoria)
+
+    def agregar_transaccion_centavos(self, *args, **kwargs) -> bool:
+        with self._cerrojo_datos:
+            return self._logica_financiera.agregar_transaccion_centavos(*args, **kwargs)
+
+    def agregar_lote(self, filas) -> int:
+        with self._cerrojo_datos:
+            return self._logica_financiera.agregar_lote(filas)
+
+    def agregar_columnas(self, fechas, descripciones, centavos, categorias) -> int:
+        with self._cerrojo_datos:
+            return self._logica_financiera.agregar_columnas(fechas, descripciones,
+                                                            centavos, categorias)
+
+    def importar_extracto(self,
+                          ruta: str,
+                          formato: Optional[str] = None,
+                          progreso: Optional[Callable[[Any], None]] = None,
+                          desde_linea: int = 0):
+        """
+        Importa un extracto CSV u OFX. El cerrojo se toma lote a lote,
+        así que los resúmenes pueden calcularse mientras se importa.
+        Devuelve un ResultadoImportacion (filas, filas/s, líneas inválidas
+        y la última línea escrita, para reanudar con `desde_linea`).
+        """
+        from servicio_transaccion.ImportadorExtractos import ImportadorExtractos
+        return ImportadorExtractos(self).importar(ruta, formato, progreso,
+                                                  desde_linea=desde_linea)
 
     def obtener_transacciones(self):
         return self._logica_financiera.obtener_transacciones()
 
+    def contar_transacciones(self) -> int:
+        return self._logica_financiera.contar_transacciones()
+
+    def obtener_pagina(self, inicio: int, cantidad: int):
+        return self._logica_financiera.obtener_pagina(inicio, cantidad)
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias=None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None):
+        return self._logica_financiera.consultar(desde, hasta, categorias, tipo, offset, limit)
+
+    def buscar(self,
+               texto: str,
+               categoria: Optional[str] = None,
+               offset: int = 0,
+               limit: int = 50) -> ResultadoBusqueda:
+        """
+        Búsqueda por texto en las descripciones (y por categoría exacta),
+        ordenada por relevancia y paginada. El índice se construye en la
+        primera búsqueda y desde ahí se mantiene al día como Observer.
+        """
+        return self._busqueda().buscar(texto, categoria, offset, limit)
+
+    def buscar_futuro(self,
+                      texto: str,
+                      categoria: Optional[str] = None,
+                      offset: int = 0,
+                      limit: int = 50) -> Future:
+        """buscar en el pool de hilos (la UI busca mientras se escribe)."""
+        return self._enviar("buscar", self.buscar, texto, categoria, offset, limit)
+
+    def preparar_busqueda(self) -> Future:
+        """
+        Construye el índice de búsqueda en el pool de hilos (con un
+        historial grande tarda unos segundos), para que la primera
+        búsqueda no tenga que esperarlo.
+        """
+        return self._enviar("preparar_busqueda", self._busqueda)
+
+    def obtener_categorias(self) -> List[str]:
+        return self._busqueda().categorias()
+
     def obtener_resumen_por_categoria(self) -> str:
-        return self._controlador_resumen.obtener_resumen_por_categoria()
+        return self._cacheado("resumen", lambda: self._resumen().obtener_resumen_por_categoria())
+
+    def obtener_resumen_por_categoria_futuro(self) -> Future:
+        return self._futuro_cacheado("resumen", self._resumen,
+                                     self.obtener_resumen_por_categoria)
+
+    def obtener_resumen_mes_actual(self) -> str:
+        # El resultado depende del día de hoy, así que forma parte de la clave
+        hoy = datetime.date.today()
+        return self._cacheado("resumen_mes",
+                              lambda: self._resumen().obtener_resumen_mes_actual(hoy), hoy)
+
+    def obtener_resumen_ultimos_meses(self, meses: int = 12) -> str:
+        hoy = datetime.date.today()
+        return self._cacheado("resumen_meses",
+                              lambda: self._resumen().obtener_resumen_ultimos_meses(meses, hoy),
+                              meses, hoy)
+
+    def obtener_resumen_ultimos_dias(self, dias: int = config.DIAS_VENTANA_RESUMEN) -> str:
+        hoy = datetime.date.today()
+        return self._cacheado("resumen_dias",
+                              lambda: self._resumen().obtener_resumen_ultimos_dias(dias, hoy),
+                              dias, hoy)
+
+    def analisis_predictivo(self,
+                            dias_a_predecir: int = 30,
+                            ventana_dias: Optional[int] = None):
+        # Con ventana, el resultado depende de hoy; sin ella no
+        hoy = datetime.date.today() if ventana_dias is not None else None
+        return self._cacheado("prediccion",
+                              lambda: self._prediccion().analisis_predictivo(
+                                  dias_a_predecir, ventana_dias, hoy),
+                              dias_a_predecir, ventana_dias, hoy)
+
+    def analisis_predictivo_futuro(self,
+                                   dias_a_predecir: int = 30,
+                                   ventana_dias: Optional[int] = None) -> Future:
+        return self._futuro_cacheado("prediccion", self._prediccion,
+                                     self.analisis_predictivo, dias_a_predecir, ventana_dias)
+
+    def analisis_predictivo_horizontes(self,
+                                       horizontes: List[int],
+                                       ventana_dias: Optional[int] = None):
+        """
+        Predicción para varios horizontes de una vez: una lista de
+        (ResultadoPrediccion, mensaje) en el orden de `horizontes`.
+        """
+        return [self.analisis_predictivo(dias, ventana_dias) for dias in horizontes]
+
+    def pronostico_por_categoria(self,
+                                 dias_a_predecir: int = 30,
+                                 ventana_dias: Optional[int] = None):
+        hoy = datetime.date.today() if ventana_dias is not None else None
+        return self._cacheado("pronostico_categorias",
+                              lambda: self._prediccion().pronostico_por_categoria(
+                                  dias_a_predecir, ventana_dias, hoy),
+                              dias_a_predecir, ventana_dias, hoy)
+
+    def obtener_pronostico_por_categoria(self,
+                                         dias_a_predecir: int = 30,
+                                         ventana_dias: Optional[int] = None) -> str:
+        """Texto de la tabla por categoría (o el mensaje si no se pudo predecir)."""
+        pronostico, mensaje = self.pronostico_por_categoria(dias_a_predecir, ventana_dias)
+        if mensaje:
+            return mensaje
+        return GeneradorReporte().formatear_pronostico_por_categoria(pronostico)
+
+    def obtener_pronostico_por_categoria_futuro(self,
+                                                dias_a_predecir: int = 30,
+                                                ventana_dias: Optional[int] = None) -> Future:
+        self._prediccion()
+        return self._enviar("pronostico_categorias_texto",
+                            self.obtener_pronostico_por_categoria,
+                            dias_a_predecir, ventana_dias)
+
+    def detectar_recurrencias(self, agrupar_por: str = "descripcion"):
+        """
+        AnalisisRecurrencias del libro: movimientos recurrentes (con su
+        próxima fecha e importe esperado) e importes anómalos, agrupando
+        por "descripcion" o por "categoria".
+        """
+        return self._cacheado("recurrencias",
+                              lambda: self._recurrencias().analizar(agrupar_por),
+                              agrupar_por)
+
+    def detectar_recurrencias_futuro(self, agrupar_por: str = "descripcion") -> Future:
+        return self._futuro_cacheado("recurrencias", self._recurrencias,
+                                     self.detectar_recurrencias, agrupar_por)
+
+    # --- Varias cuentas ---
+
+    @property
+    def libro(self) -> LibroCuentas:
+        return self._libro
+
+    def cuentas(self) -> List[str]:
+        with self._cerrojo_datos:
+            return self._libro.cuentas()
+
+    def agregar_lote_cuenta(self, cuenta: str, filas) -> int:
+        """
+        Agrega filas (fecha, descripción, centavos, categoría) a una cuenta.
+        La cuenta principal sigue pasando por LogicaFinanciera (y sus
+        Observers); las demás se crean en el primer uso.
+        """
+        if cuenta == CUENTA_PRINCIPAL:
+            return self.agregar_lote(filas)
+        transacciones = self._factory.crear_lote(*zip(*filas)) if filas else []
+        with self._cerrojo_datos:
+            agregadas = self._libro.agregar_lote(cuenta, transacciones)
+        self.update("CUENTA_LOTE_AGREGADO", cuenta)
+        return agregadas
+
+    def resumir_cuentas(self):
+        """{cuenta: ResumenTotales} de todas las cuentas."""
+        from servicio_reporte.ResumenCuentas import resumir_cuentas
+        return self._cacheado("resumen_cuentas",
+                              lambda: resumir_cuentas(self._libro, self._pool_procesos()))
+
+    def resumir_cuentas_futuro(self) -> Future:
+        return self._futuro_cacheado("resumen_cuentas", self._pool_procesos,
+                                     self.resumir_cuentas)
+
+    def obtener_resumen_cuentas(self) -> str:
+        return GeneradorReporte().formatear_resumen_cuentas(self.resumir_cuentas())
+
+    def pronosticar_cuentas(self, dias_a_predecir: int = 30):
+        """{cuenta: (PronosticoCuenta, mensaje)} de todas las cuentas."""
+        from servicio_prediccion.PronosticoCuentas import pronosticar_cuentas
+        return self._cacheado("pronostico_cuentas",
+                              lambda: pronosticar_cuentas(self._libro, dias_a_predecir,
+                                                          self._pool_procesos()),
+                              dias_a_predecir)
+
+    def pronosticar_cuentas_futuro(self, dias_a_predecir: int = 30) -> Future:
+        return self._futuro_cacheado("pronostico_cuentas", self._pool_procesos,
+                                     self.pronosticar_cuentas, dias_a_predecir)
+
+    def estadisticas_cache(self) -> EstadisticasCache:
+        return self._cache.estadisticas()
+
+    # --- Métricas ---
+
+    def obtener_metricas(self) -> Dict[str, Any]:
+        """
+        Instantánea de common/metricas.py (contadores, duraciones por
+        operación, llamadas lentas) más las estadísticas de la caché.
+        """
+        datos = metricas.instantanea()
+        datos["cache"] = asdict(self._cache.estadisticas())
+        return datos
+
+    def metricas_prometheus(self) -> str:
+        return metricas.texto_prometheus()
+
+    def cerrar(self) -> None:
+        """
+        Detiene los pools de hilos y procesos (cancela lo que no haya
+        empezado) y cierra los repositorios persistentes.
+        """
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor = None
+        if self._procesos is not None:
+            self._procesos.shutdown(wait=False, cancel_futures=True)
+            self._procesos = None
+        with self._cerrojo_datos:
+            self._libro.cerrar()
+
+    def exportar_prediccion_png(self, ruta: str, dias_a_predecir: int = 30) -> Optional[str]:
+        """
+        Genera el gráfico de la predicción en un PNG sin abrir ventanas.
+        Devuelve el mensaje de error si no se pudo predecir.
+        """
+        resultado, mensaje = self.analisis_predictivo(dias_a_predecir)
+        if mensaje:
+            return mensaje
+        from servicio_prediccion.GraficoPrediccion import guardar_png
+        guardar_png(resultado, ruta)
+        return None
+
+    # --- Caché de resultados ---
+
+    def _cacheado(self, nombre: str, calcular: Callable[[], Any], *args: Any) -> Any:
+        clave = (nombre, args)
+        # Consulta sin el cerrojo: un acierto no espera a cálculos en curso
+        encontrado, valor = self._cache.obtener(clave, self.version)
+        if encontrado:
+            metricas.contar("gateway.cache.aciertos")
+            return valor
+        metricas.contar("gateway.cache.fallos")
+        # Sin _cerrojo_datos: los servicios lo toman solo para copiar el
+        # estado de sus Observers. Si hubo una escritura mientras tanto,
+        # el resultado se devuelve pero no se guarda con la versión vieja.
+        version = self.version
+        valor = calcular()
+        if self.version == version:
+            self._cache.guardar(clave, version, valor)
+        return valor
+
+    def _futuro_cacheado(self,
+                         nombre: str,
+                         crear_servicio: Callable[[], Any],
+                         funcion: Callable[..., Any],
+                         *args: Any) -> Future:
+        # El fallo se cuenta cuando el pool vuelva a consultar en _cacheado
+        encontrado, valor = self._cache.obtener((nombre, args), self.version,
+                                                contar_fallo=False)
+        if encontrado:
+            futuro: Future = Future()
+            futuro.set_result(valor)
+            return futuro
+        crear_servicio()  # se crea en el hilo que llama, no en el pool (ver _observador)
+        return self._enviar(nombre, funcion, *args)
+
+    # --- Ejecución en segundo plano ---
+
+    def _enviar(self, nombre: str, funcion: Callable[..., Any], *args: Any) -> Future:
+        clave = (nombre, args, self.version)
+        with self._cerrojo_futuros:
+            futuro = self._en_curso.get(clave)
+            if futuro is not None and not futuro.done():
+                return futuro
+
+            if self._ejecutor is None:
+                self._ejecutor = ThreadPoolExecutor(max_workers=config.HILOS_GATEWAY,
+                                                    thread_name_prefix="gateway")
+            futuro = self._ejecutor.submit(funcion, *args)
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda f: self._olvidar(clave, f))
+        return futuro
+
+    def _pool_procesos(self) -> ProcessPoolExecutor:
+        # Los análisis de todas las cuentas son CPU puro: van a procesos
+        with self._cerrojo_futuros:
+            if self._procesos is None:
+                self._procesos = ProcessPoolExecutor(max_workers=config.PROCESOS_ANALISIS)
+            return self._procesos
+
+    def _olvidar(self, clave: Tuple[Any, ...], futuro: Future) -> None:
+        with self._cerrojo_futuros:
+            if self._en_curso.get(clave) is futuro:
+                del self._en_curso[clave]
+
+
+class _EventosPendientes(Observer):
+    """Eventos que llegan mientras se construye un Observer (ver _observador)."""
+    def __init__(self) -> None:
+        self.eventos: List[Tuple[str, Any]] = []
+
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        self.eventos.append((event, data))
+
+
+def _construir(clase: Callable[[], Any]) -> Callable[[Any], Any]:
+    """Constructor para _observador: la instancia reconstruida desde la instantánea."""
+    def construir(instantanea):
+        observador = clase()
+        observador.reconstruir(instantanea)
+        return observador
+    return construir
+
 
-    def analisis_predictivo(self, dias_a_predecir: int = 30):
-        return self._servicio_prediccion.analisis_predictivo(dias_a_predecir)
+def _importar_modulos_pesados() -> None:
+    for modulo in _MODULOS_PESADOS:
+        try:
+            importlib.import_module(modulo)
+        except ImportError:
+            # Si falta una dependencia, el error se verá al usar el servicio
+            pass
 
 
-def crear_gateway() -> FinanzasGateway:
+def crear_gateway():
     """
-    Helper para crear el gateway desde la UI.
+    Helper para crear el gateway desde la UI. Con MODO_GATEWAY = "remoto"
+    devuelve un FinanzasGatewayRemoto que habla HTTP con los servicios.
     """
+    if config.MODO_GATEWAY == "remoto":
+        from gateway.AppGraficaFinanzas.remoto import FinanzasGatewayRemoto
+        return FinanzasGatewayRemoto(config.URL_SERVICIO_TRANSACCION,
+                                     config.URL_SERVICIO_REPORTE,
+                                     config.URL_SERVICIO_PREDICCION,
+                                     config.CONEXIONES_POR_SERVICIO)
+    if config.MODO_GATEWAY != "local":
+        raise ValueError(f"Modo de gateway desconocido: {config.MODO_GATEWAY}")
     return FinanzasGateway()
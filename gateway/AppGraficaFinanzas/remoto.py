@@ -0,0 +1,285 @@
+# gateway/AppGraficaFinanzas/remoto.py
+"""
+Modo remoto del gateway: la misma interfaz que usa la UI, pero cada
+microservicio corre en su propio proceso y se le habla por HTTP
+(python -m servicio_transaccion.main, servicio_reporte.main y
+servicio_prediccion.main).
+
+Los servicios de reporte y predicción mantienen una réplica local de
+las transacciones (crear_replica), al día con el registro de cambios
+del servicio de transacciones.
+"""
+import datetime
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from common import config, metricas
+from common.dinero import Importe, centavos_desde_unidades
+from common.models.prediccion import (
+    AnalisisRecurrencias, PronosticoCategorias, ResultadoPrediccion
+)
+from common.servicio_http import ClienteHttp, ErrorServicio
+from common.utils import Subject
+from servicio_reporte.GeneradorReporte import GeneradorReporte
+from servicio_transaccion.ClienteTransacciones import (
+    ClienteTransacciones, ReplicaTransacciones
+)
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+
+
+def crear_replica(url_transacciones: str):
+    """
+    Gateway local sobre un repositorio en memoria (sin datos de
+    ejemplo) y la réplica que lo alimenta desde el servicio de
+    transacciones. Lo usan los servicios de reporte y predicción.
+    """
+    from gateway.AppGraficaFinanzas.main import FinanzasGateway
+    from servicio_transaccion.TransactionRepository import TransactionRepository
+
+    gateway = FinanzasGateway(TransactionRepository(), datos_ejemplo=False)
+    replica = ReplicaTransacciones(ClienteTransacciones(url_transacciones),
+                                   gateway.agregar_lote)
+    return gateway, replica
+
+
+def _prediccion(respuesta: Dict[str, Any]) -> Tuple[Optional[ResultadoPrediccion], Optional[str]]:
+    resultado = respuesta["resultado"]
+    return (ResultadoPrediccion(**resultado) if resultado else None), respuesta["mensaje"]
+
+
+class _AvisosLocales(Subject):
+    """Avisa a la UI de las escrituras hechas a través de este gateway."""
+    EVENTOS_LOTE = LogicaFinanciera.EVENTOS_LOTE
+
+
+@metricas.instrumentar("gateway.remoto")
+class FinanzasGatewayRemoto:
+    """
+    Gateway que delega en los servicios HTTP. Cada servicio tiene su
+    pool de conexiones persistentes; las lecturas de muchas páginas y
+    las predicciones para varios horizontes viajan en tubería o en una
+    sola petición. Los métodos *_futuro usan un pool de hilos, como en
+    FinanzasGateway.
+
+    Los observadores suscritos a `logica_financiera` solo se enteran de
+    las escrituras hechas desde este gateway. Las operaciones de varias
+    cuentas (LibroCuentas) solo existen en el modo local.
+    """
+    def __init__(self,
+                 url_transacciones: str = config.URL_SERVICIO_TRANSACCION,
+                 url_reporte: str = config.URL_SERVICIO_REPORTE,
+                 url_prediccion: str = config.URL_SERVICIO_PREDICCION,
+                 conexiones: int = config.CONEXIONES_POR_SERVICIO) -> None:
+        self._transacciones = ClienteTransacciones(url_transacciones, conexiones)
+        self._reporte = ClienteHttp(url_reporte, conexiones)
+        self._prediccion = ClienteHttp(url_prediccion, conexiones)
+        self._factory = TransaccionFactory()
+        self._avisos = _AvisosLocales()
+        self._ejecutor: Optional[ThreadPoolExecutor] = None
+        self._cerrojo_ejecutor = threading.Lock()
+
+    # --- Exposición de servicios a la UI ---
+
+    @property
+    def logica_financiera(self) -> Subject:
+        return self._avisos
+
+    @property
+    def version(self) -> int:
+        return self._transacciones.estado()[0]
+
+    def precalentar(self) -> threading.Thread:
+        """Abre en segundo plano las conexiones de los tres pools."""
+        def conectar() -> None:
+            for cliente in (self._transacciones.http, self._reporte, self._prediccion):
+                try:
+                    cliente.conectar()
+                except OSError:
+                    # Si un servicio no está, el error se verá al usarlo
+                    pass
+        hilo = threading.Thread(target=conectar, name="precalentar-gateway", daemon=True)
+        hilo.start()
+        return hilo
+
+    def agregar_transaccion(self, fecha: datetime.date, descripcion: str,
+                            monto: Importe, categoria: str) -> bool:
+        return self.agregar_transaccion_centavos(fecha, descripcion,
+                                                 centavos_desde_unidades(monto), categoria)
+
+    def agregar_transaccion_centavos(self, fecha: datetime.date, descripcion: str,
+                                     centavos: int, categoria: str) -> bool:
+        transaccion = self._factory.crear(fecha, descripcion, centavos, categoria)
+        self._transacciones.agregar(fecha, descripcion, transaccion.centavos, categoria)
+        self._avisos.notify("TRANSACCION_AGREGADA", transaccion)
+        return True
+
+    def agregar_lote(self, filas) -> int:
+        columnas = tuple(zip(*filas)) or ((), (), (), ())
+        return self.agregar_columnas(*columnas)
+
+    def agregar_columnas(self, fechas, descripciones, centavos, categorias) -> int:
+        transacciones = self._factory.crear_lote(fechas, descripciones, centavos, categorias)
+        if not transacciones:
+            return 0
+        agregadas = self._transacciones.agregar_lote(transacciones)
+        self._avisos.notify_lote("TRANSACCION_AGREGADA", transacciones)
+        return agregadas
+
+    def importar_extracto(self,
+                          ruta: str,
+                          formato: Optional[str] = None,
+                          progreso: Optional[Callable[[Any], None]] = None,
+                          desde_linea: int = 0):
+        """Igual que en el modo local: cada lote viaja en una sola petición."""
+        from servicio_transaccion.ImportadorExtractos import ImportadorExtractos
+        return ImportadorExtractos(self).importar(ruta, formato, progreso,
+                                                  desde_linea=desde_linea)
+
+    def obtener_transacciones(self):
+        return self._transacciones.obtener_todas()
+
+    def contar_transacciones(self) -> int:
+        return self._transacciones.estado()[1]
+
+    def obtener_pagina(self, inicio: int, cantidad: int):
+        return self._transacciones.obtener_pagina(inicio, cantidad)
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias=None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None):
+        return self._transacciones.consultar(desde, hasta, categorias, tipo, offset, limit)
+
+    def buscar(self,
+               texto: str,
+               categoria: Optional[str] = None,
+               offset: int = 0,
+               limit: int = 50):
+        return self._transacciones.buscar(texto, categoria, offset, limit)
+
+    def buscar_futuro(self,
+                      texto: str,
+                      categoria: Optional[str] = None,
+                      offset: int = 0,
+                      limit: int = 50) -> Future:
+        return self._enviar(self.buscar, texto, categoria, offset, limit)
+
+    def obtener_categorias(self) -> List[str]:
+        return self._transacciones.categorias()
+
+    def obtener_resumen_por_categoria(self) -> str:
+        return self._texto_reporte("/resumen/categorias")
+
+    def obtener_resumen_por_categoria_futuro(self) -> Future:
+        return self._enviar(self.obtener_resumen_por_categoria)
+
+    def obtener_resumen_mes_actual(self) -> str:
+        return self._texto_reporte("/resumen/mes")
+
+    def obtener_resumen_ultimos_meses(self, meses: int = 12) -> str:
+        return self._texto_reporte("/resumen/meses", {"meses": meses})
+
+    def obtener_resumen_ultimos_dias(self, dias: int = config.DIAS_VENTANA_RESUMEN) -> str:
+        return self._texto_reporte("/resumen/dias", {"dias": dias})
+
+    def analisis_predictivo(self,
+                            dias_a_predecir: int = 30,
+                            ventana_dias: Optional[int] = None):
+        return _prediccion(self._prediccion.pedir(
+            "GET", "/prediccion", {"dias": dias_a_predecir, "ventana": ventana_dias}))
+
+    def analisis_predictivo_futuro(self,
+                                   dias_a_predecir: int = 30,
+                                   ventana_dias: Optional[int] = None) -> Future:
+        return self._enviar(self.analisis_predictivo, dias_a_predecir, ventana_dias)
+
+    def analisis_predictivo_horizontes(self,
+                                       horizontes: List[int],
+                                       ventana_dias: Optional[int] = None):
+        """Todos los horizontes en una sola petición."""
+        respuestas = self._prediccion.pedir(
+            "POST", "/prediccion/horizontes",
+            cuerpo={"horizontes": list(horizontes), "ventana_dias": ventana_dias})
+        return [_prediccion(respuesta) for respuesta in respuestas]
+
+    def pronostico_por_categoria(self,
+                                 dias_a_predecir: int = 30,
+                                 ventana_dias: Optional[int] = None):
+        respuesta = self._prediccion.pedir(
+            "GET", "/prediccion/categorias", {"dias": dias_a_predecir, "ventana": ventana_dias})
+        pronostico = respuesta["pronostico"]
+        return (PronosticoCategorias(**pronostico) if pronostico else None), respuesta["mensaje"]
+
+    def obtener_pronostico_por_categoria(self,
+                                         dias_a_predecir: int = 30,
+                                         ventana_dias: Optional[int] = None) -> str:
+        pronostico, mensaje = self.pronostico_por_categoria(dias_a_predecir, ventana_dias)
+        if mensaje:
+            return mensaje
+        return GeneradorReporte().formatear_pronostico_por_categoria(pronostico)
+
+    def obtener_pronostico_por_categoria_futuro(self,
+                                                dias_a_predecir: int = 30,
+                                                ventana_dias: Optional[int] = None) -> Future:
+        return self._enviar(self.obtener_pronostico_por_categoria,
+                            dias_a_predecir, ventana_dias)
+
+    def detectar_recurrencias(self, agrupar_por: str = "descripcion") -> AnalisisRecurrencias:
+        return AnalisisRecurrencias.desde_dict(
+            self._prediccion.pedir("GET", "/recurrencias", {"agrupar": agrupar_por}))
+
+    def detectar_recurrencias_futuro(self, agrupar_por: str = "descripcion") -> Future:
+        return self._enviar(self.detectar_recurrencias, agrupar_por)
+
+    def exportar_prediccion_png(self, ruta: str, dias_a_predecir: int = 30) -> Optional[str]:
+        resultado, mensaje = self.analisis_predictivo(dias_a_predecir)
+        if mensaje:
+            return mensaje
+        from servicio_prediccion.GraficoPrediccion import guardar_png
+        guardar_png(resultado, ruta)
+        return None
+
+    def obtener_metricas(self) -> Dict[str, Any]:
+        """
+        Métricas de este proceso y, en "servicios", las de cada servicio
+        (GET /metricas/instantanea); un servicio que no responde queda
+        con {"error": ...}.
+        """
+        datos = metricas.instantanea()
+        datos["servicios"] = {}
+        for nombre, cliente in (("transacciones", self._transacciones.http),
+                                ("reporte", self._reporte),
+                                ("prediccion", self._prediccion)):
+            try:
+                datos["servicios"][nombre] = cliente.pedir("GET", "/metricas/instantanea")
+            except (OSError, ErrorServicio) as error:
+                datos["servicios"][nombre] = {"error": str(error)}
+        return datos
+
+    def metricas_prometheus(self) -> str:
+        # Cada servicio publica las suyas en GET /metricas
+        return metricas.texto_prometheus()
+
+    def cerrar(self) -> None:
+        if self._ejecutor is not None:
+            self._ejecutor.shutdown(wait=False, cancel_futures=True)
+            self._ejecutor = None
+        for cliente in (self._transacciones.http, self._reporte, self._prediccion):
+            cliente.cerrar()
+
+    # --- Auxiliares internos ---
+
+    def _texto_reporte(self, camino: str, consulta: Optional[Dict[str, Any]] = None) -> str:
+        return self._reporte.pedir("GET", camino, consulta)["texto"]
+
+    def _enviar(self, funcion: Callable[..., Any], *args: Any) -> Future:
+        with self._cerrojo_ejecutor:
+            if self._ejecutor is None:
+                self._ejecutor = ThreadPoolExecutor(max_workers=config.HILOS_GATEWAY,
+                                                    thread_name_prefix="gateway-remoto")
+            return self._ejecutor.submit(funcion, *args)
@@ -0,0 +1,153 @@
+# servicio_prediccion/GraficoPrediccion.py
+"""
+Dibujo del resultado de la predicción. Matplotlib se importa solo
+al llamar a estas funciones, así que calcular una predicción no
+requiere cargar la librería de gráficos.
+
+GraficoPrediccion crea la figura una sola vez y en cada predicción
+nueva actualiza los datos de sus artistas. Las series se reducen a
+unos pocos puntos por píxel de ancho del eje (ver Submuestreo), así que
+el tiempo de dibujo no crece con los años de historial.
+"""
+import datetime
+import threading
+from typing import Optional
+
+import numpy as np
+
+from common import config, metricas
+from common.models.prediccion import ResultadoPrediccion
+from servicio_prediccion.Submuestreo import submuestrear
+
+# Margen de los ejes, en proporción del rango de los datos
+_MARGEN = 0.05
+
+
+class GraficoPrediccion:
+    """
+    Gráfico reutilizable: puntos históricos, tendencia y predicción.
+    La Figure se construye sin pasar por pyplot, de modo que sirve
+    tanto para incrustarla en Tk como para renderizarla con Agg, y no
+    queda registrada en ningún lado: cerrar() la vacía y la libera.
+    """
+    def __init__(self, metodo: Optional[str] = config.METODO_SUBMUESTREO_GRAFICO) -> None:
+        from matplotlib.dates import date2num
+        from matplotlib.figure import Figure
+
+        self._metodo = metodo
+        # El diseño "constrained" (que los rótulos no se corten) cuesta
+        # tanto como dibujar: se calcula en el primer dibujo y se fija
+        # hasta que cambie el ancho de los rótulos del eje y
+        self.figura = Figure(figsize=(10, 6), layout="constrained")
+        self._ancho_rotulos = 0
+        ax = self._ax = self.figura.add_subplot()
+        # Fecha ordinal -> número de Matplotlib (días desde su época)
+        self._desfase = date2num(datetime.date.fromordinal(1)) - 1
+
+        self._historicos = ax.scatter([], [], label="Gastos Históricos", alpha=0.6)
+        self._tendencia, = ax.plot([], [], linewidth=2, label="Tendencia")
+        self._prediccion, = ax.plot([], [], linestyle="--", linewidth=2, label="Predicción")
+        self._titulo = ax.set_title("", fontsize=14)
+        ax.xaxis_date()
+        ax.tick_params(axis="x", labelrotation=30)
+        ax.set_xlabel("Fecha")
+        ax.set_ylabel("Monto de Gasto ($)")
+        self._leyenda = ax.legend()
+        self.puntos_dibujados = 0
+
+    def puntos_visibles(self, dpi: Optional[float] = None) -> int:
+        """
+        Presupuesto de puntos: PUNTOS_POR_PIXEL_GRAFICO por píxel de ancho
+        del eje (al `dpi` indicado o al de la figura).
+        """
+        escala = dpi / self.figura.dpi if dpi else 1.0
+        return max(int(self._ax.bbox.width * escala * config.PUNTOS_POR_PIXEL_GRAFICO), 3)
+
+    def actualizar(self, resultado: ResultadoPrediccion, puntos: Optional[int] = None) -> None:
+        """
+        Cambia los datos de los artistas, el título y los límites; la
+        figura no se redibuja hasta dibujar() o savefig.
+        """
+        puntos = puntos or self.puntos_visibles()
+        dias = np.asarray(resultado.dias_historicos, dtype=np.float64)
+        montos = np.asarray(resultado.montos_historicos, dtype=np.float64)
+        futuros = np.asarray(resultado.dias_futuros, dtype=np.float64)
+        predichos = np.asarray(resultado.montos_predichos, dtype=np.float64)
+
+        with metricas.cronometro("prediccion.grafico.submuestrear"):
+            # La tendencia se evalúa solo en los días elegidos
+            elegidos = submuestrear(dias, montos, puntos, self._metodo)
+            elegidos_futuros = submuestrear(futuros, predichos, puntos, self._metodo)
+        x = dias[elegidos] + self._desfase
+        x_futuros = futuros[elegidos_futuros] + self._desfase
+        y = montos[elegidos]
+        y_tendencia = resultado.pendiente * (dias[elegidos] - dias[0]) + resultado.intercepto
+        y_futuros = predichos[elegidos_futuros]
+
+        self._historicos.set_offsets(np.column_stack([x, y]))
+        self._tendencia.set_data(x, y_tendencia)
+        self._prediccion.set_data(x_futuros, y_futuros)
+        self._leyenda.get_texts()[2].set_text(f"Predicción {resultado.dias_a_predecir} días")
+        self._titulo.set_text("Análisis Predictivo de Gastos\n"
+                              f"Predicción Total: ${resultado.total_predicho:,.2f}")
+        self.puntos_dibujados = len(elegidos) + len(elegidos_futuros)
+
+        # Límites a mano: autoscale no tiene en cuenta los puntos (scatter)
+        todos_x = np.concatenate([x, x_futuros])
+        todos_y = np.concatenate([y, y_tendencia, y_futuros, [0.0]])
+        self._ax.set_xlim(*_con_margen(todos_x.min(), todos_x.max()))
+        minimo_y, maximo_y = _con_margen(todos_y.min(), todos_y.max())
+        self._ax.set_ylim(minimo_y, maximo_y)
+        ancho = len(f"{max(abs(minimo_y), abs(maximo_y)):.0f}")
+        if ancho != self._ancho_rotulos:
+            self._ancho_rotulos = ancho
+            self.figura.set_layout_engine("constrained")
+
+    def dibujar(self) -> None:
+        """Redibuja en el lienzo (Tk o Agg) al que está conectada la figura."""
+        with metricas.cronometro("prediccion.grafico.dibujar"):
+            self.figura.canvas.draw()
+        self.fijar_diseno()
+
+    def fijar_diseno(self) -> None:
+        """Deja las posiciones calculadas en el último dibujo."""
+        self.figura.set_layout_engine("none")
+
+    def cerrar(self) -> None:
+        """Vacía la figura para que sus artistas y datos se liberen ya."""
+        self.figura.clear()
+
+
+def _con_margen(minimo: float, maximo: float):
+    margen = (maximo - minimo) * _MARGEN or 1.0
+    return minimo - margen, maximo + margen
+
+
+@metricas.medido("prediccion.grafico.crear_figura")
+def crear_figura(resultado: ResultadoPrediccion):
+    """Figure nueva con el resultado (para reutilizarla, GraficoPrediccion)."""
+    grafico = GraficoPrediccion()
+    grafico.actualizar(resultado)
+    return grafico.figura
+
+
+# Un gráfico por hilo para guardar_png: exportar muchos PNG no crea una
+# figura por archivo
+_para_png = threading.local()
+
+
+@metricas.medido("prediccion.grafico.guardar_png")
+def guardar_png(resultado: ResultadoPrediccion, ruta: str, dpi: int = 100) -> None:
+    """
+    Renderizado sin interfaz (backend Agg) para uso por lotes.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    grafico = getattr(_para_png, "grafico", None)
+    if grafico is None:
+        grafico = _para_png.grafico = GraficoPrediccion()
+        FigureCanvasAgg(grafico.figura)
+    grafico.actualizar(resultado, grafico.puntos_visibles(dpi))
+    with metricas.cronometro("prediccion.grafico.renderizar"):
+        grafico.figura.savefig(ruta, dpi=dpi, format="png")
+    grafico.fijar_diseno()
@@ -0,0 +1,102 @@
+# servicio_prediccion/PronosticoCategorias.py
+"""
+Pronóstico por categoría en un solo cálculo vectorizado: los gastos se
+acomodan en una matriz densa categoría × día y las tendencias lineales
+de todas las categorías se resuelven a la vez con NumPy (una
+multiplicación matriz-vector), en lugar de entrenar un modelo por
+categoría en un bucle de Python.
+"""
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common.dinero import a_unidades
+from common.models.prediccion import PronosticoCategorias
+from common.models.transaccion import Transaccion
+
+
+def columnas_gastos(transacciones: Iterable[Transaccion]
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+    """
+    Pasa los gastos a columnas: (días ordinales, código de categoría,
+    monto en unidades y en valor absoluto, nombres de categoría).
+    """
+    codigos = {}
+    dias: List[int] = []
+    categorias: List[int] = []
+    centavos: List[int] = []
+    for transaccion in transacciones:
+        if transaccion.centavos >= 0:
+            continue
+        dias.append(transaccion.fecha.toordinal())
+        categorias.append(codigos.setdefault(transaccion.categoria, len(codigos)))
+        centavos.append(-transaccion.centavos)
+    return (np.asarray(dias, dtype=np.int64),
+            np.asarray(categorias, dtype=np.int64),
+            a_unidades(np.asarray(centavos, dtype=np.int64)),
+            list(codigos))
+
+
+def matriz_categoria_dia(dias: np.ndarray,
+                         categorias: np.ndarray,
+                         montos: np.ndarray,
+                         cantidad_categorias: int,
+                         primer_dia: int,
+                         ultimo_dia: int) -> np.ndarray:
+    """
+    Matriz (categorías × días) con el gasto de cada categoría cada día,
+    desde primer_dia hasta ultimo_dia inclusive. Un solo bincount.
+    """
+    cantidad_dias = ultimo_dia - primer_dia + 1
+    celdas = categorias * cantidad_dias + (dias - primer_dia)
+    return np.bincount(celdas, weights=montos,
+                       minlength=cantidad_categorias * cantidad_dias
+                       ).reshape(cantidad_categorias, cantidad_dias)
+
+
+def ajustar_tendencias(matriz: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mínimos cuadrados de cada fila contra x = 0..D-1, todos a la vez.
+    Devuelve (pendientes, interceptos), uno por fila.
+    """
+    cantidad_dias = matriz.shape[1]
+    x = np.arange(cantidad_dias, dtype=np.float64)
+    x_centrada = x - x.mean()
+    sxx = float(x_centrada @ x_centrada)
+    pendientes = matriz @ x_centrada / sxx if sxx else np.zeros(matriz.shape[0])
+    interceptos = matriz.mean(axis=1) - pendientes * x.mean()
+    return pendientes, interceptos
+
+
+def pronosticar_categorias(dias: np.ndarray,
+                           categorias: np.ndarray,
+                           montos: np.ndarray,
+                           nombres: Sequence[str],
+                           dias_a_predecir: int,
+                           primer_dia: Optional[int] = None,
+                           ultimo_dia: Optional[int] = None) -> PronosticoCategorias:
+    """
+    Ajusta la tendencia de cada categoría sobre [primer_dia, ultimo_dia]
+    (por defecto, del primer al último gasto) y predice los
+    `dias_a_predecir` días siguientes, con los negativos llevados a 0.
+    """
+    primer_dia = int(dias.min()) if primer_dia is None else primer_dia
+    ultimo_dia = int(dias.max()) if ultimo_dia is None else ultimo_dia
+    matriz = matriz_categoria_dia(dias, categorias, montos, len(nombres),
+                                  primer_dia, ultimo_dia)
+    pendientes, interceptos = ajustar_tendencias(matriz)
+
+    x_futuros = np.arange(matriz.shape[1], matriz.shape[1] + dias_a_predecir)
+    predichos = np.maximum(interceptos[:, None] + pendientes[:, None] * x_futuros, 0.0)
+
+    return PronosticoCategorias(
+        categorias=list(nombres),
+        primer_dia=primer_dia,
+        ultimo_dia=ultimo_dia,
+        pendientes=pendientes.tolist(),
+        interceptos=interceptos.tolist(),
+        gasto_historico=matriz.sum(axis=1).tolist(),
+        dias_futuros=(primer_dia + x_futuros).tolist(),
+        montos_predichos=predichos.tolist(),
+        totales_predichos=predichos.sum(axis=1).tolist(),
+    )
@@ -0,0 +1,66 @@
+# servicio_prediccion/PronosticoCuentas.py
+"""
+Pronóstico de gasto de todas las cuentas de un LibroCuentas. Cada
+cuenta se ajusta con la misma recta que SklearnPredictorAdapter (sobre
+los días con gasto, x = días desde el primero), pero en forma cerrada
+con NumPy: los procesos del pool no necesitan importar scikit-learn y
+solo devuelven un PronosticoCuenta compacto.
+"""
+from concurrent.futures import Executor
+from functools import partial
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from common import config
+from common.dinero import a_unidades
+from common.models.prediccion import PronosticoCuenta, validar_serie
+from servicio_transaccion.ColumnarTransactionRepository import (
+    ColumnasTransacciones, gastos_diarios_columnas
+)
+from servicio_transaccion.LibroCuentas import LibroCuentas
+
+
+def ajustar_recta(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+    """Mínimos cuadrados de y contra x: (pendiente, intercepto)."""
+    x_media = float(x.mean())
+    x_centrada = x - x_media
+    sxx = float(x_centrada @ x_centrada)
+    pendiente = float(x_centrada @ y) / sxx if sxx else 0.0
+    return pendiente, float(y.mean()) - pendiente * x_media
+
+
+def pronosticar_columnas(columnas: ColumnasTransacciones,
+                         dias_a_predecir: int = 30
+                         ) -> Tuple[Optional[PronosticoCuenta], Optional[str]]:
+    """
+    Pronóstico de una cuenta a partir de sus columnas. Devuelve
+    (pronóstico, mensaje de error), como analisis_predictivo.
+    """
+    dias, centavos = gastos_diarios_columnas(columnas)
+    mensaje = validar_serie(len(columnas.centavos), len(dias))
+    if mensaje:
+        return None, mensaje
+
+    # El modelo trabaja en unidades, como SklearnPredictorAdapter
+    montos = a_unidades(centavos)
+    x = (dias - dias[0]).astype(np.float64)
+    pendiente, intercepto = ajustar_recta(x, montos)
+    x_futuros = np.arange(x[-1] + 1, x[-1] + 1 + dias_a_predecir)
+    predichos = np.maximum(intercepto + pendiente * x_futuros, 0.0)
+    return PronosticoCuenta(primer_dia=int(dias[0]),
+                            ultimo_dia=int(dias[-1]),
+                            pendiente=pendiente,
+                            intercepto=intercepto,
+                            gasto_historico=a_unidades(int(centavos.sum())),
+                            montos_predichos=predichos.tolist()), None
+
+
+def pronosticar_cuentas(libro: LibroCuentas,
+                        dias_a_predecir: int = 30,
+                        ejecutor: Optional[Executor] = None,
+                        cuentas_por_lote: int = config.CUENTAS_POR_TAREA
+                        ) -> Dict[str, Tuple[Optional[PronosticoCuenta], Optional[str]]]:
+    """{cuenta: (pronóstico, mensaje)} de todas las cuentas del libro."""
+    return libro.repartir(partial(pronosticar_columnas, dias_a_predecir=dias_a_predecir),
+                          ejecutor, cuentas_por_lote)
@@ -0,0 +1,350 @@
+# servicio_prediccion/Recurrencias.py
+"""
+Movimientos recurrentes e importes anómalos, en un solo pase vectorizado
+sobre el libro completo.
+
+Las transacciones se agrupan por descripción normalizada (o por
+categoría) y por signo, y se ordenan una vez por (grupo, fecha). Con
+ese orden todo lo demás son operaciones sobre arreglos:
+
+- los intervalos entre días consecutivos de un grupo salen de un diff;
+  las medianas por grupo, de ordenar por valor y por grupo y tomar los
+  elementos del medio de cada tramo. Un grupo es recurrente si casi
+  todos sus intervalos están cerca de la mediana (el periodo) y sus
+  importes varían poco;
+- cada transacción se compara con la mediana y la MAD (en escala
+  logarítmica) de las VENTANA_ANOMALIAS anteriores de su grupo: las
+  ventanas son vistas (sliding_window_view) sobre el arreglo ordenado,
+  procesadas por bloques.
+
+El costo es O(N log N) por el orden más O(N · ventana) por las
+ventanas, lineal para una ventana fija. Solo se crean objetos Python
+para las series y las anomalías encontradas.
+"""
+import calendar
+import datetime
+from typing import Iterable, List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from common import config
+from common.models.prediccion import AnalisisRecurrencias, Anomalia, SerieRecurrente
+from common.models.transaccion import Transaccion
+from common.texto import normalizar
+
+AGRUPAR_POR = ("descripcion", "categoria")
+
+# MAD -> desviación estándar de una normal
+_ESCALA_MAD = 0.6745
+# Un periodo es de "n meses" si se aleja como mucho 2 días por mes de
+# n meses medios; la próxima fecha cae entonces en el mismo día del mes
+_DIAS_POR_MES = 365.2425 / 12
+_HOLGURA_MENSUAL = 2.0
+# Importes recientes con los que se estima el próximo
+_ULTIMOS_IMPORTES = 3
+# Una serie sigue activa si su último movimiento no tiene más de 1,5
+# periodos respecto del final del libro
+_PERIODOS_ACTIVA = 1.5
+# Filas por bloque de ventanas (bloque × ventana valores de 8 bytes)
+_BLOQUE = 65_536
+
+
+class ColumnasRecurrencias(NamedTuple):
+    """
+    Libro en columnas: días ordinales, centavos con signo y códigos de
+    descripción y de categoría (índices de los textos).
+    """
+    dias: np.ndarray
+    centavos: np.ndarray
+    descripciones: np.ndarray
+    textos_descripcion: Sequence[str]
+    categorias: np.ndarray
+    nombres_categoria: Sequence[str]
+
+
+def columnas_transacciones(transacciones: Iterable[Transaccion]) -> ColumnasRecurrencias:
+    """Pasa transacciones a columnas, codificando descripciones y categorías."""
+    descripciones = {}
+    categorias = {}
+    dias: List[int] = []
+    centavos: List[int] = []
+    codigos_descripcion: List[int] = []
+    codigos_categoria: List[int] = []
+    for transaccion in transacciones:
+        dias.append(transaccion.fecha.toordinal())
+        centavos.append(transaccion.centavos)
+        codigos_descripcion.append(
+            descripciones.setdefault(transaccion.descripcion, len(descripciones)))
+        codigos_categoria.append(categorias.setdefault(transaccion.categoria, len(categorias)))
+    return ColumnasRecurrencias(np.asarray(dias, dtype=np.int64),
+                                np.asarray(centavos, dtype=np.int64),
+                                np.asarray(codigos_descripcion, dtype=np.int64),
+                                list(descripciones),
+                                np.asarray(codigos_categoria, dtype=np.int64),
+                                list(categorias))
+
+
+def analizar_columnas(columnas: ColumnasRecurrencias,
+                      agrupar_por: str = "descripcion",
+                      minimo_ocurrencias: int = config.MINIMO_OCURRENCIAS_RECURRENTE,
+                      tolerancia_periodo: float = config.TOLERANCIA_PERIODO,
+                      fraccion_regular: float = config.FRACCION_INTERVALOS_REGULARES,
+                      tolerancia_importe: float = config.TOLERANCIA_IMPORTE_RECURRENTE,
+                      ventana: int = config.VENTANA_ANOMALIAS,
+                      minimo_historial: int = config.MINIMO_HISTORIAL_ANOMALIA,
+                      umbral: float = config.UMBRAL_ANOMALIA,
+                      variacion_minima: float = config.VARIACION_MINIMA_ANOMALIA
+                      ) -> AnalisisRecurrencias:
+    """
+    Series recurrentes y anomalías del libro. `agrupar_por` es
+    "descripcion" (normalizada: sin mayúsculas, acentos ni signos) o
+    "categoria"; ingresos y gastos de un mismo nombre son grupos aparte.
+    """
+    if agrupar_por not in AGRUPAR_POR:
+        raise ValueError(f"agrupar_por debe ser uno de {AGRUPAR_POR}, no {agrupar_por!r}")
+
+    # Los importes en cero no tienen signo ni escala logarítmica
+    con_importe = columnas.centavos != 0
+    dias = np.asarray(columnas.dias, dtype=np.int64)[con_importe]
+    if not len(dias):
+        return AnalisisRecurrencias(agrupar_por, [], [])
+    centavos = np.asarray(columnas.centavos, dtype=np.int64)[con_importe]
+    descripciones = np.asarray(columnas.descripciones)[con_importe]
+    categorias = np.asarray(columnas.categorias)[con_importe]
+
+    if agrupar_por == "descripcion":
+        mapa, nombres = _codigos_normalizados(columnas.textos_descripcion)
+        codigos = mapa[descripciones]
+    else:
+        mapa, nombres = _codigos_normalizados(columnas.nombres_categoria)
+        codigos = mapa[categorias]
+
+    # --- Orden por (grupo, fecha) ---
+    # Estable: en un mismo día se respeta el orden de llegada
+    clave = codigos * 2 + (centavos > 0)
+    orden = np.argsort((clave << 32) | dias, kind="stable")
+    clave, dias, centavos = clave[orden], dias[orden], centavos[orden]
+    descripciones, categorias = descripciones[orden], categorias[orden]
+
+    nuevo = np.empty(len(clave), dtype=bool)
+    nuevo[0] = True
+    np.not_equal(clave[1:], clave[:-1], out=nuevo[1:])
+    grupos = np.cumsum(nuevo) - 1
+    inicios = np.flatnonzero(nuevo)
+    finales = np.append(inicios[1:], len(clave)) - 1
+
+    # Nombre y categoría de cada grupo: los de su último movimiento
+    nombres_grupo = [nombres[codigo] for codigo in (clave[inicios] // 2).tolist()]
+    if agrupar_por == "descripcion":
+        categorias_grupo = [columnas.nombres_categoria[c]
+                            for c in categorias[finales].tolist()]
+    else:
+        categorias_grupo = nombres_grupo
+
+    recurrentes = _series_recurrentes(grupos, dias, centavos, len(inicios),
+                                      nombres_grupo, categorias_grupo,
+                                      minimo_ocurrencias, tolerancia_periodo,
+                                      fraccion_regular, tolerancia_importe)
+
+    puntajes, esperados = _puntajes_robustos(grupos, inicios, np.log(np.abs(centavos)),
+                                             ventana, minimo_historial, variacion_minima)
+    with np.errstate(invalid="ignore"):
+        anomalas = np.flatnonzero(np.abs(puntajes) > umbral)
+    anomalas = anomalas[np.lexsort((-np.abs(puntajes[anomalas]), -dias[anomalas]))]
+    signos = np.sign(centavos[anomalas])
+    anomalias = [
+        Anomalia(dia=dia,
+                 descripcion=columnas.textos_descripcion[descripcion],
+                 categoria=columnas.nombres_categoria[categoria],
+                 centavos=importe,
+                 centavos_esperados=signo * esperado,
+                 puntaje=round(puntaje, 2))
+        for dia, descripcion, categoria, importe, signo, esperado, puntaje in zip(
+            dias[anomalas].tolist(), descripciones[anomalas].tolist(),
+            categorias[anomalas].tolist(), centavos[anomalas].tolist(), signos.tolist(),
+            np.rint(np.exp(esperados[anomalas])).astype(np.int64).tolist(),
+            puntajes[anomalas].tolist())
+    ]
+    return AnalisisRecurrencias(agrupar_por, recurrentes, anomalias)
+
+
+# --- Series recurrentes ---
+
+def _series_recurrentes(grupos: np.ndarray,
+                        dias: np.ndarray,
+                        centavos: np.ndarray,
+                        cantidad: int,
+                        nombres: List[str],
+                        categorias: List[str],
+                        minimo_ocurrencias: int,
+                        tolerancia_periodo: float,
+                        fraccion_regular: float,
+                        tolerancia_importe: float) -> List[SerieRecurrente]:
+    """
+    Grupos con intervalos e importes regulares. Las ocurrencias y los
+    intervalos cuentan días distintos; los importes, cada movimiento.
+    """
+    ocurrencias_filas = np.bincount(grupos, minlength=cantidad)
+    logaritmos = np.log(np.abs(centavos).astype(np.float64))
+    medianas_log = _medianas(logaritmos, grupos, cantidad)
+    desvios_log = _medianas(np.abs(logaritmos - medianas_log[grupos]), grupos, cantidad)
+
+    # Intervalos entre días distintos de un mismo grupo
+    nuevo_dia = np.empty(len(dias), dtype=bool)
+    nuevo_dia[0] = True
+    nuevo_dia[1:] = (grupos[1:] != grupos[:-1]) | (dias[1:] != dias[:-1])
+    posiciones = np.flatnonzero(nuevo_dia)
+    grupos_dia = grupos[posiciones]
+    dias = dias[posiciones]
+    ocurrencias = np.bincount(grupos_dia, minlength=cantidad)
+    mismo_grupo = grupos_dia[1:] == grupos_dia[:-1]
+    grupos_intervalo = grupos_dia[1:][mismo_grupo]
+    intervalos = np.diff(dias)[mismo_grupo].astype(np.float64)
+    periodos = _medianas(intervalos, grupos_intervalo, cantidad)
+    desvios = np.abs(intervalos - periodos[grupos_intervalo])
+    # Regular: casi todos los intervalos cerca del periodo (la MAD sola
+    # no alcanza: con intervalos de 3 y 28 días alternados vale 0)
+    cerca = np.bincount(grupos_intervalo,
+                        weights=desvios <= tolerancia_periodo * periodos[grupos_intervalo],
+                        minlength=cantidad)
+    regularidades = _medianas(desvios, grupos_intervalo, cantidad) / periodos
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        elegidos = np.flatnonzero((ocurrencias >= max(minimo_ocurrencias, 2))
+                                  & (periodos >= 1)
+                                  & (cerca >= fraccion_regular * (ocurrencias - 1))
+                                  & (desvios_log <= tolerancia_importe))
+    if not len(elegidos):
+        return []
+
+    # Importe esperado: mediana de los últimos movimientos del grupo
+    finales = np.cumsum(ocurrencias_filas)[elegidos] - 1
+    primeros = finales - ocurrencias_filas[elegidos] + 1
+    ultimos = np.stack([centavos[np.maximum(finales - k, primeros)]
+                        for k in range(_ULTIMOS_IMPORTES)])
+    esperados = np.rint(np.median(ultimos, axis=0)).astype(np.int64)
+    ultimos_dias = dias[np.cumsum(ocurrencias)[elegidos] - 1]
+
+    fin_del_libro = int(dias.max())
+    series = []
+    for grupo, periodo, regularidad, cantidad_grupo, ultimo, esperado in zip(
+            elegidos.tolist(), periodos[elegidos].tolist(), regularidades[elegidos].tolist(),
+            ocurrencias[elegidos].tolist(), ultimos_dias.tolist(), esperados.tolist()):
+        series.append(SerieRecurrente(
+            grupo=nombres[grupo],
+            categoria=categorias[grupo],
+            ocurrencias=cantidad_grupo,
+            periodo_dias=periodo,
+            regularidad=round(regularidad, 4),
+            ultimo_dia=ultimo,
+            proximo_dia=proximo_dia(ultimo, periodo),
+            centavos_esperados=esperado,
+            activa=ultimo + _PERIODOS_ACTIVA * periodo >= fin_del_libro))
+    series.sort(key=lambda serie: (serie.proximo_dia, serie.grupo))
+    return series
+
+
+def proximo_dia(ultimo: int, periodo: float) -> int:
+    """
+    Día ordinal del próximo movimiento. Los periodos de meses enteros
+    (mensual, trimestral, anual...) caen en el mismo día del mes,
+    ajustado al último día si el mes es más corto.
+    """
+    meses = round(periodo / _DIAS_POR_MES)
+    if meses >= 1 and abs(periodo - meses * _DIAS_POR_MES) <= _HOLGURA_MENSUAL * meses:
+        fecha = datetime.date.fromordinal(ultimo)
+        indice = fecha.month - 1 + meses
+        anio, mes = fecha.year + indice // 12, indice % 12 + 1
+        dia = min(fecha.day, calendar.monthrange(anio, mes)[1])
+        return datetime.date(anio, mes, dia).toordinal()
+    return ultimo + max(int(round(periodo)), 1)
+
+
+# --- Anomalías ---
+
+def _puntajes_robustos(grupos: np.ndarray,
+                       inicios: np.ndarray,
+                       valores: np.ndarray,
+                       ventana: int,
+                       minimo_historial: int,
+                       variacion_minima: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Puntaje robusto 0,6745 · (x − mediana) / MAD de cada fila frente a
+    las `ventana` anteriores de su grupo, y esa mediana. NaN en las filas
+    con menos de `minimo_historial` anteriores.
+    """
+    cantidad = len(valores)
+    previas = np.arange(cantidad) - inicios[grupos]
+    medianas = np.full(cantidad, np.nan)
+    desvios = np.full(cantidad, np.nan)
+
+    # ventanas[i] = valores[i - ventana:i] (NaN antes del comienzo)
+    relleno = np.concatenate([np.full(ventana, np.nan), valores[:-1]])
+    ventanas = sliding_window_view(relleno, ventana)
+    posiciones = np.arange(ventana)
+
+    evaluables = np.flatnonzero(previas >= max(minimo_historial, 1))
+    for desde in range(0, len(evaluables), _BLOQUE):
+        filas = evaluables[desde:desde + _BLOQUE]
+        bloque = ventanas[filas]
+        validas = np.minimum(previas[filas], ventana)
+        # Lo que queda antes del comienzo del grupo es de otro grupo
+        bloque[posiciones < (ventana - validas)[:, None]] = np.nan
+        centro = _mediana_filas(bloque, validas)
+        medianas[filas] = centro
+        desvios[filas] = _mediana_filas(np.abs(bloque - centro[:, None]), validas)
+
+    puntajes = _ESCALA_MAD * (valores - medianas) / np.maximum(desvios, variacion_minima)
+    return puntajes, medianas
+
+
+# --- Auxiliares ---
+
+def _codigos_normalizados(textos: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Código de cada texto tras normalizarlo (textos que solo difieren en
+    mayúsculas, acentos o signos comparten código) y el primer texto
+    original de cada código.
+    """
+    codigos = {}
+    originales: List[str] = []
+    mapa = np.empty(len(textos), dtype=np.int64)
+    for i, texto in enumerate(textos):
+        normalizado = normalizar(texto)
+        codigo = codigos.get(normalizado)
+        if codigo is None:
+            codigo = codigos[normalizado] = len(originales)
+            originales.append(texto)
+        mapa[i] = codigo
+    return mapa, originales
+
+
+def _mediana_filas(bloque: np.ndarray, validas: np.ndarray) -> np.ndarray:
+    """
+    Mediana de cada fila contando sus `validas` valores que no son NaN.
+    Ordenar filas cortas es varias veces más rápido que np.median (que
+    hace dos particiones por fila) y los NaN quedan al final.
+    """
+    ordenado = np.sort(bloque, axis=1)
+    filas = np.arange(len(bloque))
+    return (ordenado[filas, (validas - 1) // 2] + ordenado[filas, validas // 2]) / 2
+
+
+def _medianas(valores: np.ndarray, grupos: np.ndarray, cantidad: int) -> np.ndarray:
+    """
+    Mediana de `valores` en cada grupo 0..cantidad-1 (NaN si el grupo no
+    tiene valores): se ordena por valor y luego, estable, por grupo (la
+    mitad de lo que tarda un lexsort) y se toman los elementos del medio
+    de cada tramo.
+    """
+    orden = np.argsort(valores)
+    ordenados = valores[orden[np.argsort(grupos[orden], kind="stable")]]
+    conteos = np.bincount(grupos, minlength=cantidad)
+    inicios = np.cumsum(conteos) - conteos
+    medianas = np.full(cantidad, np.nan)
+    hay = conteos > 0
+    bajo = inicios[hay] + (conteos[hay] - 1) // 2
+    alto = inicios[hay] + conteos[hay] // 2
+    medianas[hay] = (ordenados[bajo] + ordenados[alto]) / 2
+    return medianas
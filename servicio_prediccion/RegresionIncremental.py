@@ -0,0 +1,217 @@
+# servicio_prediccion/RegresionIncremental.py
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from common.dinero import CENTAVOS_POR_UNIDAD, a_unidades
+from common.models.transaccion import Transaccion
+from common.utils import Observer
+from servicio_transaccion.IndiceOrdenado import IndiceOrdenado, InstantaneaIndice
+
+# (día, total gastado en centavos)
+DiaConGasto = Tuple[int, int]
+
+
+def _dia(punto: DiaConGasto) -> int:
+    return punto[0]
+
+
+class RegresionLinealIncremental:
+    """
+    Mínimos cuadrados simples (y = pendiente * x + intercepto) a partir
+    de sus estadísticos suficientes: n, Σx, Σy, Σxy y Σx².
+    Agregar o quitar un punto es O(1).
+
+    x e y son enteros (días y centavos) y las sumas, enteros de Python:
+    agregar y quitar puntos no acumula error de redondeo por muchos
+    que se quiten. Las x se guardan relativas a una referencia fija (el
+    primer punto) para que las sumas no crezcan de más; coeficientes()
+    redondea una sola vez, al dividir.
+    """
+    def __init__(self) -> None:
+        self._referencia: Optional[int] = None
+        self.n = 0
+        self._sx = 0
+        self._sy = 0
+        self._sxy = 0
+        self._sxx = 0
+
+    def agregar_punto(self, x: int, y: int, peso: int = 1) -> None:
+        if self._referencia is None:
+            self._referencia = x
+        dx = x - self._referencia
+        self.n += peso
+        self._sx += peso * dx
+        self._sy += peso * y
+        self._sxy += peso * dx * y
+        self._sxx += peso * dx * dx
+
+    def quitar_punto(self, x: int, y: int) -> None:
+        self.agregar_punto(x, y, peso=-1)
+
+    def coeficientes(self,
+                     origen: int,
+                     escala: int = 1) -> Optional[Tuple[float, float]]:
+        """
+        Devuelve (pendiente, intercepto) divididos por `escala` (100 para
+        pasar de centavos a unidades) y con el intercepto medido en
+        x = origen, o None si todavía no hay una recta definida.
+        """
+        if self.n < 2:
+            return None
+        # pendiente = numerador / denominador; con x = origen - referencia,
+        # intercepto = (Σy·den - num·Σx + num·n·x) / (n·den), todo entero
+        denominador = self.n * self._sxx - self._sx * self._sx
+        numerador = self.n * self._sxy - self._sx * self._sy
+        if denominador == 0:
+            denominador, numerador = 1, 0
+        desplazamiento = origen - self._referencia
+        intercepto = (self._sy * denominador - numerador * self._sx
+                      + numerador * self.n * desplazamiento)
+        return (numerador / (denominador * escala),
+                intercepto / (self.n * denominador * escala))
+
+
+class ColumnaSerie(Sequence):
+    """
+    Columna de una instantánea de la serie diaria (los días, o los
+    montos en unidades), sin copiarla: se lee al recorrerla. tolist()
+    la convierte en lista (así se envía como JSON).
+    """
+    def __init__(self, instantanea: InstantaneaIndice[DiaConGasto], montos: bool) -> None:
+        self._instantanea = instantanea
+        self._montos = montos
+
+    def __len__(self) -> int:
+        return len(self._instantanea)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return self.tolist()[indice]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de la serie")
+        return self._valor(self._instantanea.vista(indice, indice + 1)[0])
+
+    def __iter__(self) -> Iterator:
+        return map(self._valor, self._instantanea)
+
+    def __array__(self, dtype=None, copy=None):
+        import numpy as np
+        return np.asarray(self.tolist(), dtype=dtype)
+
+    def tolist(self) -> list:
+        return list(self)
+
+    def _valor(self, punto: DiaConGasto):
+        return a_unidades(punto[1]) if self._montos else punto[0]
+
+
+class PronosticoIncremental(Observer):
+    """
+    Mantiene la regresión de los gastos diarios al día como Observer
+    de LogicaFinanciera. Cuando cambia el total de un día se quita el
+    punto anterior y se agrega el nuevo, así que predecir cuesta
+    O(días a predecir) y no hace falta reentrenar con todo el historial.
+
+    Los totales diarios y la regresión van en centavos (exactos); los
+    coeficientes se entregan en unidades. La serie diaria se mantiene
+    además ordenada por día en un IndiceOrdenado: serie_diaria() toma
+    una instantánea (copia la lista de bloques, no los días).
+    """
+    def __init__(self) -> None:
+        self._regresion = RegresionLinealIncremental()
+        self._totales_diarios: Dict[int, int] = {}
+        self._serie: IndiceOrdenado[DiaConGasto] = IndiceOrdenado(_dia)
+        self._cantidad_transacciones = 0
+        self._primer_dia: Optional[int] = None
+        self._ultimo_dia: Optional[int] = None
+        self._vaciar()
+
+    # --- Métodos del Observer ---
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        if event == "TRANSACCION_AGREGADA":
+            self.acumular(data)
+        elif event == "TRANSACCION_LOTE_AGREGADO":
+            for transaccion in data:
+                self.acumular(transaccion)
+
+    # --- API ---
+    def acumular(self, transaccion: Transaccion) -> None:
+        self._cantidad_transacciones += 1
+        if transaccion.centavos >= 0:
+            return
+
+        dia = transaccion.fecha.toordinal()
+        anterior = self._totales_diarios.get(dia, 0)
+        nuevo = anterior - transaccion.centavos
+        self._totales_diarios[dia] = nuevo
+
+        if anterior > 0:
+            self._regresion.quitar_punto(dia, anterior)
+            self._serie.reemplazar((dia, nuevo))
+        else:
+            self._serie.insertar((dia, nuevo))
+        self._regresion.agregar_punto(dia, nuevo)
+
+        if self._primer_dia is None or dia < self._primer_dia:
+            self._primer_dia = dia
+        if self._ultimo_dia is None or dia > self._ultimo_dia:
+            self._ultimo_dia = dia
+
+    def reconstruir(self, transacciones: Iterable[Transaccion]) -> None:
+        self._vaciar()
+        for transaccion in transacciones:
+            self.acumular(transaccion)
+
+    @property
+    def cantidad_transacciones(self) -> int:
+        return self._cantidad_transacciones
+
+    @property
+    def primer_dia(self) -> Optional[int]:
+        return self._primer_dia
+
+    @property
+    def dias_con_gasto(self) -> int:
+        return len(self._totales_diarios)
+
+    def coeficientes(self) -> Optional[Tuple[float, float]]:
+        """
+        (pendiente, intercepto) con x = días desde el primer día con gasto,
+        igual que el modelo de sklearn.
+        """
+        if self._primer_dia is None:
+            return None
+        return self._regresion.coeficientes(self._primer_dia, CENTAVOS_POR_UNIDAD)
+
+    def predecir(self, dias_a_predecir: int) -> Optional[Tuple[List[int], List[float]]]:
+        """
+        Devuelve (x de los días futuros, gastos predichos), con los
+        negativos llevados a 0. Cuesta O(dias_a_predecir).
+        """
+        coeficientes = self.coeficientes()
+        if coeficientes is None:
+            return None
+        pendiente, intercepto = coeficientes
+        ultimo = self._ultimo_dia - self._primer_dia
+        dias_futuros = list(range(ultimo + 1, ultimo + 1 + dias_a_predecir))
+        return dias_futuros, [max(pendiente * x + intercepto, 0.0) for x in dias_futuros]
+
+    def serie_diaria(self) -> Tuple[ColumnaSerie, ColumnaSerie]:
+        """
+        Días con gasto (ascendentes) y su total en unidades, sobre una
+        instantánea: O(días / bloque), sin copiar la serie, y no cambia
+        con las escrituras siguientes.
+        """
+        instantanea = self._serie.instantanea()
+        return ColumnaSerie(instantanea, montos=False), ColumnaSerie(instantanea, montos=True)
+
+    # --- Auxiliares internos ---
+    def _vaciar(self) -> None:
+        self._regresion = RegresionLinealIncremental()
+        self._totales_diarios = {}
+        self._serie = IndiceOrdenado(_dia)
+        self._cantidad_transacciones = 0
+        self._primer_dia = None
+        self._ultimo_dia = None
@@ -1,24 +1,161 @@
 # servicio_prediccion/ServicioPrediccion.py
-from typing import Optional, Tuple
+import datetime
+from contextlib import nullcontext
+from typing import ContextManager, Optional, Tuple
 
-import matplotlib.pyplot as plt
+import numpy as np
 
-from servicio_transaccion.TransactionRepository import TransactionRepository
+from common import metricas
+from common.acumulados import AcumuladosTemporales
+from common.dinero import a_unidades
+from common.models.prediccion import PronosticoCategorias, ResultadoPrediccion
+from common.models.resumen import calcular_gastos_diarios
+from common.models.transaccion import TIPO_GASTO
+from servicio_transaccion.TransactionRepository import ITransactionRepository
 from servicio_prediccion.SklearnAdapter import SklearnPredictorAdapter
+from servicio_prediccion.RegresionIncremental import PronosticoIncremental
+from servicio_prediccion.PronosticoCategorias import columnas_gastos, pronosticar_categorias
 
 
+def _unidades(centavos) -> np.ndarray:
+    # Las series diarias llegan en centavos; los modelos trabajan en unidades
+    return a_unidades(np.asarray(centavos, dtype=np.int64))
+
+
+@metricas.instrumentar("prediccion")
 class ServicioPrediccion:
     """
     Microservicio que orquesta la predicción usando el Adapter de sklearn.
+    Si recibe AcumuladosTemporales, usa su tabla diaria en lugar
+    de agregar las transacciones en cada predicción. Si recibe un
+    PronosticoIncremental, no reentrena: usa la regresión mantenida
+    al día (el ajuste con sklearn queda como implementación de referencia).
+    Con `ventana_dias` el ajuste usa solo los últimos días, leídos con
+    una consulta por fecha al repositorio.
+
+    `cerrojo` es el que toman las escrituras mientras notifican a los
+    Observers: con él se copia la serie diaria (o, con el
+    PronosticoIncremental, se leen la recta y una instantánea de la
+    serie) y el ajuste se hace después, sin frenar a las escrituras.
     """
     def __init__(self,
-                repository: TransactionRepository,
-                adapter: SklearnPredictorAdapter) -> None:
+                repository: ITransactionRepository,
+                adapter: SklearnPredictorAdapter,
+                acumulados: Optional[AcumuladosTemporales] = None,
+                pronostico: Optional[PronosticoIncremental] = None,
+                cerrojo: Optional[ContextManager] = None) -> None:
         self._repository = repository
         self._adapter = adapter
+        self._acumulados = acumulados
+        self._pronostico = pronostico
+        self._cerrojo = cerrojo if cerrojo is not None else nullcontext()
 
     def analisis_predictivo(self,
-                            dias_a_predecir: int = 30
-                            ) -> Tuple[Optional[plt.Figure], Optional[str]]:
-        transacciones = self._repository.obtener_todas()
-        return self._adapter.analizar_gastos(transacciones, dias_a_predecir)
+                            dias_a_predecir: int = 30,
+                            ventana_dias: Optional[int] = None,
+                            hoy: Optional[datetime.date] = None
+                            ) -> Tuple[Optional[ResultadoPrediccion], Optional[str]]:
+        if ventana_dias is not None:
+            return self._analisis_ventana(dias_a_predecir, ventana_dias,
+                                          hoy or datetime.date.today())
+
+        if self._pronostico is not None:
+            return self._analisis_incremental(dias_a_predecir)
+
+        if self._acumulados is not None:
+            with self._cerrojo:
+                dias, centavos = self._acumulados.gastos_diarios()
+        else:
+            # El repositorio entrega la serie diaria ya agregada (sin copiar filas)
+            dias, centavos = self._repository.gastos_diarios()
+        return self._adapter.analizar_gastos_diarios(dias, _unidades(centavos),
+                                                     len(self._repository),
+                                                     dias_a_predecir)
+
+    def pronostico_por_categoria(self,
+                                 dias_a_predecir: int = 30,
+                                 ventana_dias: Optional[int] = None,
+                                 hoy: Optional[datetime.date] = None
+                                 ) -> Tuple[Optional[PronosticoCategorias], Optional[str]]:
+        """
+        Tabla de gasto predicho por categoría. Todas las categorías se
+        ajustan juntas sobre una matriz categoría × día (ver
+        PronosticoCategorias); con `ventana_dias` solo se usan los
+        últimos días.
+        """
+        desde = hasta = None
+        if ventana_dias is not None:
+            hasta = hoy or datetime.date.today()
+            desde = hasta - datetime.timedelta(days=ventana_dias - 1)
+
+        dias, categorias, montos, nombres = self._columnas_gastos(desde, hasta)
+        if ventana_dias is None:
+            cantidad = len(self._repository)
+        else:
+            cantidad = len(self._repository.consultar(desde=desde, hasta=hasta))
+        mensaje = self._adapter.validar_serie(cantidad, len(np.unique(dias)))
+        if mensaje:
+            return None, mensaje
+
+        return pronosticar_categorias(
+            dias, categorias, montos, nombres, dias_a_predecir,
+            primer_dia=None if desde is None else desde.toordinal(),
+            ultimo_dia=None if hasta is None else hasta.toordinal()), None
+
+    def _columnas_gastos(self,
+                         desde: Optional[datetime.date],
+                         hasta: Optional[datetime.date]):
+        columnas = getattr(self._repository, "columnas", None)
+        if columnas is None:
+            return columnas_gastos(
+                self._repository.consultar(desde=desde, hasta=hasta, tipo=TIPO_GASTO))
+
+        # Repositorio columnar: se filtra sobre sus arreglos, sin crear objetos
+        datos = columnas()
+        elegidos = datos.centavos < 0
+        if desde is not None:
+            elegidos &= (datos.fechas >= desde.toordinal()) & (datos.fechas <= hasta.toordinal())
+        codigos, categorias = np.unique(datos.categorias[elegidos], return_inverse=True)
+        return (datos.fechas[elegidos].astype(np.int64),
+                categorias,
+                a_unidades(-datos.centavos[elegidos]),
+                [datos.nombres_categoria[c] for c in codigos])
+
+    def _analisis_ventana(self,
+                          dias_a_predecir: int,
+                          ventana_dias: int,
+                          hoy: datetime.date
+                          ) -> Tuple[Optional[ResultadoPrediccion], Optional[str]]:
+        desde = hoy - datetime.timedelta(days=ventana_dias - 1)
+        gastos = self._repository.consultar(desde=desde, hasta=hoy, tipo=TIPO_GASTO)
+        dias, centavos = calcular_gastos_diarios(gastos)
+        cantidad = len(self._repository.consultar(desde=desde, hasta=hoy))
+        return self._adapter.analizar_gastos_diarios(dias, _unidades(centavos),
+                                                     cantidad, dias_a_predecir)
+
+    def _analisis_incremental(self,
+                              dias_a_predecir: int
+                              ) -> Tuple[Optional[ResultadoPrediccion], Optional[str]]:
+        # La recta sale de los estadísticos suficientes y la serie es una
+        # instantánea: solo se calculan los días a predecir
+        pronostico = self._pronostico
+        with self._cerrojo:
+            cantidad = pronostico.cantidad_transacciones
+            mensaje = self._adapter.validar_serie(cantidad, pronostico.dias_con_gasto)
+            if mensaje:
+                return None, mensaje
+            dias, montos = pronostico.serie_diaria()
+            pendiente, intercepto = pronostico.coeficientes()
+            x_futuros, predichos = pronostico.predecir(dias_a_predecir)
+            primer_dia = pronostico.primer_dia
+
+        resultado = ResultadoPrediccion(
+            dias_historicos=dias,
+            montos_historicos=montos,
+            dias_futuros=[primer_dia + x for x in x_futuros],
+            montos_predichos=predichos,
+            dias_a_predecir=dias_a_predecir,
+            pendiente=pendiente,
+            intercepto=intercepto
+        )
+        return resultado, None
@@ -0,0 +1,33 @@
+# servicio_prediccion/ServicioRecurrencias.py
+from common import metricas
+from common.models.prediccion import AnalisisRecurrencias
+from servicio_transaccion.TransactionRepository import ITransactionRepository
+from servicio_prediccion.Recurrencias import (
+    ColumnasRecurrencias, analizar_columnas, columnas_transacciones
+)
+
+
+@metricas.instrumentar("prediccion.recurrencias")
+class ServicioRecurrencias:
+    """
+    Detecta movimientos recurrentes (con su próxima fecha e importe) e
+    importes anómalos sobre todo el libro (ver Recurrencias). Con un
+    repositorio columnar se leen sus arreglos sin crear objetos.
+    """
+    def __init__(self, repository: ITransactionRepository) -> None:
+        self._repository = repository
+
+    def analizar(self, agrupar_por: str = "descripcion") -> AnalisisRecurrencias:
+        return analizar_columnas(self._columnas(), agrupar_por)
+
+    def _columnas(self) -> ColumnasRecurrencias:
+        columnas = getattr(self._repository, "columnas", None)
+        descripciones = getattr(self._repository, "descripciones", None)
+        if columnas is None or descripciones is None:
+            return columnas_transacciones(self._repository.obtener_todas())
+
+        datos = columnas()
+        # Las mismas filas que columnas(), aunque lleguen otras mientras tanto
+        codigos, textos = descripciones(len(datos.fechas))
+        return ColumnasRecurrencias(datos.fechas, datos.centavos, codigos, textos,
+                                    datos.categorias, datos.nombres_categoria)
@@ -1,24 +1,31 @@
 # servicio_prediccion/SklearnAdapter.py
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Sequence
 
-import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-plt.switch_backend("TkAgg")
 from sklearn.linear_model import LinearRegression
 
+from common import metricas
+from common.dinero import a_unidades
 from common.models.transaccion import Transaccion
+from common.models.resumen import calcular_gastos_diarios
+from common.models.prediccion import (
+    MINIMO_TRANSACCIONES, ResultadoPrediccion, validar_serie
+)
 
 
+@metricas.instrumentar("prediccion.sklearn")
 class SklearnPredictorAdapter:
     """
-    Adapter que encapsula la lógica de pandas + sklearn
+    Adapter que encapsula la lógica de numpy + sklearn
     para que el servicio de predicción no dependa directamente
     de la librería externa.
 
     Expone un método analizar_gastos que recibe transacciones
-    y devuelve (Figura, mensaje_error).
+    y devuelve (ResultadoPrediccion, mensaje_error). analizar_gastos_diarios
+    recibe directamente la serie de gastos por día. El dibujo del
+    resultado está en GraficoPrediccion.
     """
+    MINIMO_TRANSACCIONES = MINIMO_TRANSACCIONES
 
     def __init__(self) -> None:
         self._model = LinearRegression()
@@ -26,94 +33,71 @@ class SklearnPredictorAdapter:
     def analizar_gastos(self,
                         transacciones: List[Transaccion],
                         dias_a_predecir: int = 30
-                        ) -> Tuple[Optional[plt.Figure], Optional[str]]:
-
-        if len(transacciones) < 10:
-            return None, "No hay suficientes datos para realizar un análisis predictivo."
-
-        # Convertir a DataFrame
-        dataframe = pd.DataFrame([{
-            "fecha": t.fecha,
-            "descripcion": t.descripcion,
-            "monto": t.monto,
-            "categoria": t.categoria
-        } for t in transacciones])
-        dataframe["fecha"] = pd.to_datetime(dataframe["fecha"])
-
-        # Filtrar solo gastos (< 0)
-        gastos = dataframe[dataframe["monto"] < 0].copy()
-        if gastos.empty:
-            return None, "No hay gastos registrados para el análisis predictivo."
-
-        gastos["monto"] = gastos["monto"].abs()
-
-        # Agrupar por día
-        gastos_diarios = (
-            gastos
-            .set_index("fecha")
-            .resample("D")["monto"]
-            .sum()
-            .reset_index()
-        )
-
-        gastos_diarios = gastos_diarios[gastos_diarios["monto"] > 0]
-        if len(gastos_diarios) < 2:
-            return None, "No hay suficientes días con gastos para la predicción."
-
-        gastos_diarios["dias_desde_inicio"] = (
-            gastos_diarios["fecha"] - gastos_diarios["fecha"].min()
-        ).dt.days
-
-        X = gastos_diarios[["dias_desde_inicio"]]
-        y = gastos_diarios["monto"]
+                        ) -> Tuple[Optional[ResultadoPrediccion], Optional[str]]:
+        with metricas.cronometro("prediccion.sklearn.serie_diaria"):
+            dias, centavos = calcular_gastos_diarios(transacciones)
+            montos = a_unidades(np.asarray(centavos, dtype=np.int64))
+        return self.analizar_gastos_diarios(dias, montos, len(transacciones),
+                                            dias_a_predecir)
+
+    def validar_serie(self,
+                      total_transacciones: int,
+                      dias_con_gasto: int) -> Optional[str]:
+        """
+        Devuelve el mensaje de error si la serie no alcanza para predecir.
+        """
+        return validar_serie(total_transacciones, dias_con_gasto, self.MINIMO_TRANSACCIONES)
+
+    def ajustar(self,
+                fechas_ordinales: Sequence[int],
+                montos_diarios: Sequence[float]) -> Tuple[float, float]:
+        """
+        Entrena la regresión con x = días desde el primer día y
+        devuelve (pendiente, intercepto).
+        """
+        dias = np.asarray(fechas_ordinales, dtype=np.int64)
+        X = (dias - dias[0]).reshape(-1, 1)
+        self._model.fit(X, np.asarray(montos_diarios, dtype=np.float64))
+        return float(self._model.coef_[0]), float(self._model.intercept_)
+
+    def analizar_gastos_diarios(self,
+                                fechas_ordinales: Sequence[int],
+                                montos_diarios: Sequence[float],
+                                total_transacciones: int,
+                                dias_a_predecir: int = 30
+                                ) -> Tuple[Optional[ResultadoPrediccion], Optional[str]]:
+        """
+        fechas_ordinales: días con gasto (date.toordinal), ascendentes.
+        montos_diarios: total gastado cada día, en valor absoluto.
+        """
+        dias = np.asarray(fechas_ordinales, dtype=np.int64)
+        y = np.asarray(montos_diarios, dtype=np.float64)
+        hay_gasto = y > 0
+        dias, y = dias[hay_gasto], y[hay_gasto]
+
+        mensaje = self.validar_serie(total_transacciones, len(dias))
+        if mensaje:
+            return None, mensaje
 
         # Entrenamos el modelo
-        self._model.fit(X, y)
-
-        ultimo_dia = int(X["dias_desde_inicio"].max())
-        dias_futuros = np.arange(ultimo_dia + 1,
-                                ultimo_dia + 1 + dias_a_predecir).reshape(-1, 1)
-
-        gastos_predichos = self._model.predict(dias_futuros)
-        gastos_predichos[gastos_predichos < 0] = 0
-
-        # Creamos la figura de Matplotlib
-        figura, ax = plt.subplots(figsize=(10, 6))
-
-        # Históricos
-        ax.scatter(gastos_diarios["fecha"], y,
-                label="Gastos Históricos", alpha=0.6)
-
-        # Tendencia ajustada a las fechas históricas
-        ax.plot(
-            gastos_diarios["fecha"],
-            self._model.predict(X),
-            linewidth=2,
-            label="Tendencia"
-        )
-
-        # Predicciones
-        fechas_futuras = (
-            pd.to_datetime(gastos_diarios["fecha"].min())
-            + pd.to_timedelta(dias_futuros.flatten(), unit="D")
+        self.ajustar(dias, y)
+        X = (dias - dias[0]).reshape(-1, 1)
+
+        with metricas.cronometro("prediccion.sklearn.predecir"):
+            ultimo_dia = int(X[-1, 0])
+            dias_futuros = np.arange(ultimo_dia + 1,
+                                    ultimo_dia + 1 + dias_a_predecir).reshape(-1, 1)
+
+            gastos_predichos = self._model.predict(dias_futuros)
+            gastos_predichos[gastos_predichos < 0] = 0
+
+        resultado = ResultadoPrediccion(
+            dias_historicos=dias.tolist(),
+            montos_historicos=y.tolist(),
+            dias_futuros=(dias[0] + dias_futuros.flatten()).tolist(),
+            montos_predichos=gastos_predichos.tolist(),
+            dias_a_predecir=dias_a_predecir,
+            pendiente=float(self._model.coef_[0]),
+            intercepto=float(self._model.intercept_)
         )
-
-        ax.plot(
-            fechas_futuras,
-            gastos_predichos,
-            linestyle="--",
-            linewidth=2,
-            label=f"Predicción {dias_a_predecir} días"
-        )
-
-        ax.set_title(
-            f"Análisis Predictivo de Gastos\nPredicción Total: ${gastos_predichos.sum():,.2f}",
-            fontsize=14
-        )
-        ax.set_xlabel("Fecha")
-        ax.set_ylabel("Monto de Gasto ($)")
-        ax.legend()
-        figura.autofmt_xdate()
-        plt.tight_layout()
-
-        return figura, None
+        return resultado, None
@@ -0,0 +1,81 @@
+# servicio_prediccion/Submuestreo.py
+"""
+Reducción de series para dibujarlas. Con más puntos que píxeles de
+ancho, los que sobran no se ven pero igual cuestan al dibujar. Los
+métodos devuelven los índices elegidos (ascendentes, con el primero y
+el último), así que sirven para cualquier columna paralela (fechas,
+montos, tendencia):
+
+- lttb (Largest-Triangle-Three-Buckets): reparte la serie en tramos y
+  de cada uno toma el punto que forma el triángulo más grande con el
+  elegido en el tramo anterior y el promedio del siguiente. Conserva la
+  forma (picos y valles) con un punto por tramo.
+- min_max: el mínimo y el máximo de cada tramo. Conserva exactamente
+  el rango de cada columna de píxeles, con dos puntos por tramo.
+"""
+from typing import Optional
+
+import numpy as np
+
+METODOS = ("lttb", "min_max")
+
+
+def lttb(x, y, puntos: int) -> np.ndarray:
+    """Índices de `puntos` puntos de (x, y) elegidos con LTTB."""
+    n = len(x)
+    if puntos >= n or puntos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # El primero y el último quedan fijos; los del medio (1 .. n-2) se
+    # reparten en puntos - 2 tramos [bordes[i], bordes[i + 1])
+    bordes = np.linspace(1, n - 1, puntos - 1).astype(np.int64)
+    largos = np.diff(bordes)
+    # Promedio de cada tramo; el "siguiente" del último es el último punto
+    promedio_x = np.append(np.add.reduceat(x[:n - 1], bordes[:-1]) / largos, x[-1])
+    promedio_y = np.append(np.add.reduceat(y[:n - 1], bordes[:-1]) / largos, y[-1])
+
+    elegidos = np.empty(puntos, dtype=np.int64)
+    elegidos[0], elegidos[-1] = 0, n - 1
+    anterior = 0
+    for i in range(puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        ax, ay = x[anterior], y[anterior]
+        cx, cy = promedio_x[i + 1], promedio_y[i + 1]
+        # Doble del área del triángulo (a, punto, c); el signo no importa
+        areas = np.abs((ax - cx) * (y[inicio:fin] - ay) - (ax - x[inicio:fin]) * (cy - ay))
+        anterior = inicio + int(areas.argmax())
+        elegidos[i + 1] = anterior
+    return elegidos
+
+
+def min_max(y, tramos: int) -> np.ndarray:
+    """Índices del mínimo y el máximo de cada uno de `tramos` tramos."""
+    n = len(y)
+    if 2 * tramos >= n or tramos < 1:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    # Tramos de igual ancho como filas de una matriz; el último se
+    # completa repitiendo el último valor (que ya se elige siempre)
+    ancho = -(-n // tramos)
+    filas = -(-n // ancho)
+    matriz = np.concatenate([y, np.full(filas * ancho - n, y[-1])]).reshape(filas, ancho)
+    inicios = np.arange(filas) * ancho
+    minimos = np.minimum(inicios + matriz.argmin(axis=1), n - 1)
+    maximos = np.minimum(inicios + matriz.argmax(axis=1), n - 1)
+    return np.union1d(np.union1d(minimos, maximos), [0, n - 1])
+
+
+def submuestrear(x, y, puntos: int, metodo: Optional[str] = "lttb") -> np.ndarray:
+    """
+    Índices para dibujar la serie con unos `puntos` puntos (el ancho en
+    píxeles). Con `metodo` None se devuelven todos.
+    """
+    if metodo is None:
+        return np.arange(len(x))
+    if metodo == "lttb":
+        return lttb(x, y, puntos)
+    if metodo == "min_max":
+        return min_max(y, puntos // 2)
+    raise ValueError(f"Método de submuestreo desconocido: {metodo}")
@@ -0,0 +1,85 @@
+# servicio_prediccion/main.py
+"""
+Servicio de predicción como servidor HTTP (asyncio) en localhost. Como
+el de reportes, trabaja sobre una réplica de las transacciones que se
+sincroniza antes de cada petición.
+
+Rutas (cada predicción es {"resultado": ResultadoPrediccion o null,
+"mensaje": texto o null}):
+
+    GET  /prediccion             ?dias=30&ventana
+    POST /prediccion/horizontes  {"horizontes": [7, 30, 90], "ventana_dias": null}
+                                 -> una predicción por horizonte
+    GET  /prediccion/categorias  ?dias=30&ventana -> {"pronostico", "mensaje"}
+    GET  /recurrencias           ?agrupar=descripcion|categoria
+                                 -> AnalisisRecurrencias
+
+Uso:
+    python -m servicio_prediccion.main [--puerto 8103] [--transacciones URL]
+"""
+import argparse
+import logging
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from common import config, metricas
+from common.servicio_http import ServidorHttp, entero
+from gateway.AppGraficaFinanzas.remoto import crear_replica
+
+
+def _respuesta(resultado: Any, mensaje: Optional[str], clave: str = "resultado") -> Dict[str, Any]:
+    return {clave: resultado, "mensaje": mensaje}
+
+
+def crear_servidor(url_transacciones: str) -> ServidorHttp:
+    servidor = ServidorHttp("servicio_prediccion")
+    gateway, replica = crear_replica(url_transacciones)
+
+    def parametros(consulta: Dict[str, str]):
+        return (entero(consulta.get("dias"), config.DIAS_POR_DEFECTO_PREDICCION),
+                entero(consulta.get("ventana")))
+
+    @servidor.ruta("GET", "/prediccion", en_hilo=True)
+    def prediccion(consulta, cuerpo):
+        replica.sincronizar()
+        return _respuesta(*gateway.analisis_predictivo(*parametros(consulta)))
+
+    @servidor.ruta("POST", "/prediccion/horizontes", en_hilo=True)
+    def horizontes(consulta, cuerpo):
+        replica.sincronizar()
+        dias = [int(horizonte) for horizonte in cuerpo["horizontes"]]
+        ventana = cuerpo.get("ventana_dias")
+        return [_respuesta(*resultado) for resultado
+                in gateway.analisis_predictivo_horizontes(
+                    dias, int(ventana) if ventana is not None else None)]
+
+    @servidor.ruta("GET", "/prediccion/categorias", en_hilo=True)
+    def categorias(consulta, cuerpo):
+        replica.sincronizar()
+        return _respuesta(*gateway.pronostico_por_categoria(*parametros(consulta)),
+                          clave="pronostico")
+
+    @servidor.ruta("GET", "/recurrencias", en_hilo=True)
+    def recurrencias(consulta, cuerpo):
+        replica.sincronizar()
+        return gateway.detectar_recurrencias(consulta.get("agrupar", "descripcion"))
+
+    return servidor
+
+
+def main(argumentos: Optional[List[str]] = None) -> None:
+    url = urlsplit(config.URL_SERVICIO_PREDICCION)
+    parser = argparse.ArgumentParser(description="Servicio de predicción (HTTP)")
+    parser.add_argument("--host", default=url.hostname)
+    parser.add_argument("--puerto", type=int, default=url.port)
+    parser.add_argument("--transacciones", default=config.URL_SERVICIO_TRANSACCION,
+                        help="URL del servicio de transacciones")
+    metricas.agregar_opciones(parser)
+    opciones = parser.parse_args(argumentos)
+    metricas.aplicar_opciones(opciones)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+    crear_servidor(opciones.transacciones).servir(opciones.host, opciones.puerto)
+
+
+if __name__ == "__main__":
+    main()
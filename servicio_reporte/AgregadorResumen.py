@@ -0,0 +1,68 @@
+# servicio_reporte/AgregadorResumen.py
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional
+
+from common.models.transaccion import Transaccion
+from common.models.resumen import ResumenTotales
+from common.utils import Observer
+
+
+class AgregadorResumen(Observer):
+    """
+    Mantiene los totales del resumen actualizados de forma incremental.
+    Se suscribe a LogicaFinanciera, así que obtener el resumen cuesta
+    O(número de categorías) sin importar cuántas transacciones haya.
+    """
+    def __init__(self, inicial: Optional[ResumenTotales] = None) -> None:
+        self._cantidad = 0
+        # Centavos enteros: la suma incremental es exacta
+        self._ingreso_centavos = 0
+        self._gasto_centavos = 0
+        self._gastos_por_categoria: Dict[str, int] = defaultdict(int)
+        if inicial is not None:
+            self._cargar(inicial)
+
+    # --- Métodos del Observer ---
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        if event == "TRANSACCION_AGREGADA":
+            self._acumular(data)
+        elif event == "TRANSACCION_LOTE_AGREGADO":
+            for transaccion in data:
+                self._acumular(transaccion)
+
+    # --- API ---
+    def totales(self) -> ResumenTotales:
+        return ResumenTotales(self._cantidad,
+                              self._ingreso_centavos,
+                              self._gasto_centavos,
+                              dict(self._gastos_por_categoria))
+
+    def reconstruir(self, transacciones: Iterable[Transaccion]) -> None:
+        """
+        Recalcula todo desde cero (por ejemplo, tras cargar un repositorio
+        persistente o para comprobar la consistencia).
+        """
+        self._cargar(ResumenTotales.desde_transacciones(transacciones))
+
+    def es_consistente(self, transacciones: Iterable[Transaccion]) -> bool:
+        """
+        Compara los totales incrementales con un recálculo completo.
+        Con centavos enteros el orden de la suma no importa: deben
+        coincidir exactamente.
+        """
+        return self.totales() == ResumenTotales.desde_transacciones(transacciones)
+
+    # --- Auxiliares internos ---
+    def _acumular(self, transaccion: Transaccion) -> None:
+        self._cantidad += 1
+        if transaccion.es_ingreso():
+            self._ingreso_centavos += transaccion.centavos
+        else:
+            self._gastos_por_categoria[transaccion.categoria] += transaccion.centavos
+            self._gasto_centavos += transaccion.centavos
+
+    def _cargar(self, totales: ResumenTotales) -> None:
+        self._cantidad = totales.cantidad
+        self._ingreso_centavos = totales.ingreso_centavos
+        self._gasto_centavos = totales.gasto_centavos
+        self._gastos_por_categoria = defaultdict(int, totales.gastos_por_categoria)
@@ -1,19 +1,91 @@
 # servicio_reporte/ControladorResumen.py
-from servicio_transaccion.TransactionRepository import TransactionRepository
+import datetime
+from contextlib import nullcontext
+from typing import ContextManager, Optional
+
+from common import metricas
+from common.acumulados import (
+    AcumuladosTemporales, DIARIO, MENSUAL, clave_dia, clave_mes, mes_desde_clave
+)
+from common.models.resumen import ResumenTotales
+from servicio_transaccion.TransactionRepository import ITransactionRepository
 from servicio_reporte.GeneradorReporte import GeneradorReporte
+from servicio_reporte.AgregadorResumen import AgregadorResumen
 
 
+@metricas.instrumentar("reporte.controlador")
 class ControladorResumen:
     """
     Servicio de alto nivel para obtener el resumen.
     Usa el repositorio de transacciones y el GeneradorReporte.
+    Si recibe un AgregadorResumen, toma de él los totales ya acumulados;
+    los resúmenes por periodo salen de los AcumuladosTemporales.
+
+    `cerrojo` es el que toman las escrituras mientras notifican a esos
+    Observers: se toma solo para leer sus totales, y el texto se arma
+    después, sin él.
     """
     def __init__(self,
-                repository: TransactionRepository,
-                generador: GeneradorReporte) -> None:
+                repository: ITransactionRepository,
+                generador: GeneradorReporte,
+                agregador: Optional[AgregadorResumen] = None,
+                acumulados: Optional[AcumuladosTemporales] = None,
+                cerrojo: Optional[ContextManager] = None) -> None:
         self._repository = repository
         self._generador = generador
+        self._agregador = agregador
+        self._acumulados = acumulados
+        self._cerrojo = cerrojo if cerrojo is not None else nullcontext()
 
     def obtener_resumen_por_categoria(self) -> str:
-        transacciones = self._repository.obtener_todas()
-        return self._generador.generar_resumen(transacciones)
+        if self._agregador is not None:
+            with self._cerrojo:
+                totales = self._agregador.totales()
+        else:
+            # La agregación la hace el repositorio, sin copiar las transacciones
+            totales = self._repository.resumen_totales()
+        return self._generador.formatear_resumen(totales)
+
+    def obtener_resumen_mes_actual(self, hoy: Optional[datetime.date] = None) -> str:
+        mes = clave_mes(hoy or datetime.date.today())
+        acumulados = self._tablas_temporales()
+        with self._cerrojo:
+            totales = acumulados.resumen(MENSUAL, mes, mes)
+        return self._generador.formatear_resumen(totales, _nombre_mes(mes))
+
+    def obtener_resumen_ultimos_meses(self,
+                                      meses: int = 12,
+                                      hoy: Optional[datetime.date] = None) -> str:
+        hasta = clave_mes(hoy or datetime.date.today())
+        acumulados = self._tablas_temporales()
+        with self._cerrojo:
+            periodos = acumulados.resumen_por_periodo(MENSUAL, hasta - meses + 1, hasta)
+        return self._generador.formatear_resumen_por_periodo(
+            [(_nombre_mes(mes), totales) for mes, totales in periodos])
+
+    def obtener_resumen_ultimos_dias(self,
+                                     dias: int = 90,
+                                     hoy: Optional[datetime.date] = None) -> str:
+        hoy = hoy or datetime.date.today()
+        desde = hoy - datetime.timedelta(days=dias - 1)
+        if self._acumulados is not None:
+            with self._cerrojo:
+                totales = self._acumulados.resumen(DIARIO, clave_dia(desde), clave_dia(hoy))
+        else:
+            # Solo se leen las transacciones de la ventana, no todo el historial
+            totales = ResumenTotales.desde_transacciones(
+                self._repository.consultar(desde=desde, hasta=hoy))
+        return self._generador.formatear_resumen(totales, f"últimos {dias} días")
+
+    def _tablas_temporales(self) -> AcumuladosTemporales:
+        if self._acumulados is not None:
+            return self._acumulados
+        # Sin tablas compartidas (suscritas a los eventos) se recalculan
+        acumulados = AcumuladosTemporales()
+        acumulados.reconstruir(self._repository.obtener_todas())
+        return acumulados
+
+
+def _nombre_mes(clave: int) -> str:
+    anio, mes = mes_desde_clave(clave)
+    return f"{anio:04d}-{mes:02d}"
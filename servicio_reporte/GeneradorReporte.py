@@ -1,43 +1,115 @@
 # servicio_reporte/GeneradorReporte.py
-from typing import List, Dict
-from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
 
+from common import metricas
+from common.dinero import formatear, formatear_numero
 from common.models.transaccion import Transaccion
+from common.models.resumen import ResumenTotales
+from common.models.prediccion import PronosticoCategorias
 
 
+@metricas.instrumentar("reporte")
 class GeneradorReporte:
     """
     Microservicio que genera el texto de resumen
     a partir de una lista de transacciones.
     """
-    def generar_resumen(self, transacciones: List[Transaccion]) -> str:
-        if not transacciones:
-            return "No hay transacciones para resumir."
-
-        resumen: Dict[str, float] = defaultdict(float)
-        ingreso_total: float = 0.0
-        gasto_total: float = 0.0
+    def generar_resumen(self, transacciones: Iterable[Transaccion]) -> str:
+        with metricas.cronometro("reporte.generar_resumen.totales"):
+            totales = ResumenTotales.desde_transacciones(transacciones)
+        return self.formatear_resumen(totales)
 
-        for transaccion in transacciones:
-            if transaccion.es_ingreso():
-                ingreso_total += transaccion.monto
-            else:
-                resumen[transaccion.categoria] += transaccion.monto
-                gasto_total += transaccion.monto
+    def formatear_resumen(self, totales: ResumenTotales, periodo: str = "") -> str:
+        """
+        Genera el texto a partir de totales ya agregados
+        (por ejemplo, calculados directamente por el repositorio).
+        """
+        if not totales.cantidad:
+            if periodo:
+                return f"No hay transacciones en {periodo}."
+            return "No hay transacciones para resumir."
 
-        saldo = ingreso_total + gasto_total
+        resumen = totales.gastos_por_categoria
         texto_resumen = " Resumen de Gastos por Categoría \n"
+        if periodo:
+            texto_resumen += f" Periodo: {periodo}\n"
 
         if not resumen:
             texto_resumen += "No hay gastos registrados.\n"
         else:
             for categoria, total in sorted(resumen.items(), key=lambda item: item[1]):
-                texto_resumen += f"{categoria:<20}: ${total:,.2f}\n"
+                texto_resumen += f"{categoria:<20}: {formatear(total)}\n"
 
         texto_resumen += (
             "\n--- Resumen General ---\n"
-            f"Ingresos Totales: ${ingreso_total:,.2f}\n"
-            f"Gastos Totales:   ${gasto_total:,.2f}\n"
-            f"Saldo General:    ${saldo:,.2f}\n"
+            f"Ingresos Totales: {formatear(totales.ingreso_centavos)}\n"
+            f"Gastos Totales:   {formatear(totales.gasto_centavos)}\n"
+            f"Saldo General:    {formatear(totales.saldo_centavos)}\n"
         )
         return texto_resumen
+
+    def formatear_resumen_por_periodo(self,
+                                      periodos: List[Tuple[str, ResumenTotales]]) -> str:
+        """
+        Tabla con ingresos, gastos y saldo de cada periodo (p. ej. cada mes).
+        """
+        if not periodos:
+            return "No hay transacciones en el periodo seleccionado."
+
+        texto_resumen = (
+            " Resumen por Periodo \n"
+            f"{'Periodo':<9}{'Ingresos':>13}{'Gastos':>13}{'Saldo':>13}\n"
+        )
+        for nombre, totales in periodos:
+            texto_resumen += f"{nombre:<9}{_columnas_importes(totales)}\n"
+        return texto_resumen
+
+    def formatear_resumen_cuentas(self,
+                                  resumenes: Dict[str, ResumenTotales],
+                                  maximo_filas: int = 20) -> str:
+        """
+        Tabla con ingresos, gastos y saldo de cada cuenta, de menor a
+        mayor saldo, más una fila con el consolidado de todas las cuentas.
+        """
+        from servicio_reporte.ResumenCuentas import consolidar
+
+        if not resumenes:
+            return "No hay cuentas para resumir."
+
+        filas = sorted(resumenes.items(), key=lambda item: item[1].saldo_centavos)
+        texto_resumen = (
+            f" Resumen por Cuenta ({len(resumenes)} cuentas) \n"
+            f"{'Cuenta':<16}{'Ingresos':>13}{'Gastos':>13}{'Saldo':>13}\n"
+        )
+        for cuenta, totales in filas[:maximo_filas]:
+            texto_resumen += f"{cuenta[:15]:<16}{_columnas_importes(totales)}\n"
+        if len(filas) > maximo_filas:
+            texto_resumen += f"... y {len(filas) - maximo_filas} cuentas más\n"
+        texto_resumen += f"{'Total':<16}{_columnas_importes(consolidar(resumenes))}\n"
+        return texto_resumen
+
+    def formatear_pronostico_por_categoria(self,
+                                           pronostico: PronosticoCategorias,
+                                           maximo_filas: int = 20) -> str:
+        """
+        Tabla con el gasto histórico y el predicho de cada categoría,
+        de mayor a menor gasto predicho.
+        """
+        filas = pronostico.filas()
+        texto_resumen = (
+            f" Pronóstico por Categoría ({pronostico.dias_a_predecir} días) \n"
+            f"{'Categoría':<16}{'Histórico':>13}{'Predicho':>13}\n"
+        )
+        for categoria, historico, predicho in filas[:maximo_filas]:
+            texto_resumen += f"{categoria[:15]:<16}{historico:>13,.2f}{predicho:>13,.2f}\n"
+        if len(filas) > maximo_filas:
+            texto_resumen += f"... y {len(filas) - maximo_filas} categorías más\n"
+        texto_resumen += f"\nTotal predicho: ${pronostico.total_predicho:,.2f}\n"
+        return texto_resumen
+
+
+def _columnas_importes(totales: ResumenTotales) -> str:
+    # Ingresos, gastos y saldo en columnas de 13 caracteres
+    return "".join(f"{formatear_numero(centavos):>13}"
+                   for centavos in (totales.ingreso_centavos, totales.gasto_centavos,
+                                    totales.saldo_centavos))
@@ -0,0 +1,34 @@
+# servicio_reporte/ResumenCuentas.py
+"""
+Resumen de todas las cuentas de un LibroCuentas. Cada cuenta se resume
+sobre sus columnas NumPy; con un ProcessPoolExecutor los lotes de
+cuentas se reparten entre procesos.
+"""
+from concurrent.futures import Executor
+from typing import Dict, Optional
+
+from common import config
+from common.models.resumen import ResumenTotales
+from servicio_transaccion.ColumnarTransactionRepository import resumen_columnas
+from servicio_transaccion.LibroCuentas import LibroCuentas
+
+
+def resumir_cuentas(libro: LibroCuentas,
+                    ejecutor: Optional[Executor] = None,
+                    cuentas_por_lote: int = config.CUENTAS_POR_TAREA
+                    ) -> Dict[str, ResumenTotales]:
+    """{cuenta: totales} de todas las cuentas del libro."""
+    return libro.repartir(resumen_columnas, ejecutor, cuentas_por_lote)
+
+
+def consolidar(resumenes: Dict[str, ResumenTotales]) -> ResumenTotales:
+    """Suma los totales de varias cuentas en uno solo."""
+    total = ResumenTotales()
+    for resumen in resumenes.values():
+        total.cantidad += resumen.cantidad
+        total.ingreso_centavos += resumen.ingreso_centavos
+        total.gasto_centavos += resumen.gasto_centavos
+        for categoria, centavos in resumen.gastos_por_categoria.items():
+            total.gastos_por_categoria[categoria] = (
+                total.gastos_por_categoria.get(categoria, 0) + centavos)
+    return total
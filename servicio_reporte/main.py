@@ -0,0 +1,64 @@
+# servicio_reporte/main.py
+"""
+Servicio de reportes como servidor HTTP (asyncio) en localhost. Trabaja
+sobre una réplica de las transacciones que se sincroniza con el
+servicio de transacciones antes de cada petición.
+
+Rutas (respuestas {"texto": ...}):
+
+    GET /resumen/categorias
+    GET /resumen/mes
+    GET /resumen/meses    ?meses=12
+    GET /resumen/dias     ?dias=90
+
+Uso:
+    python -m servicio_reporte.main [--puerto 8102] [--transacciones URL]
+"""
+import argparse
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from common import config, metricas
+from common.servicio_http import ServidorHttp, entero
+from gateway.AppGraficaFinanzas.remoto import crear_replica
+
+
+def crear_servidor(url_transacciones: str) -> ServidorHttp:
+    servidor = ServidorHttp("servicio_reporte")
+    gateway, replica = crear_replica(url_transacciones)
+
+    def texto(obtener: Callable[[Dict[str, str]], str]):
+        def manejador(consulta, cuerpo):
+            replica.sincronizar()
+            return {"texto": obtener(consulta)}
+        return manejador
+
+    rutas = {
+        "/resumen/categorias": lambda consulta: gateway.obtener_resumen_por_categoria(),
+        "/resumen/mes": lambda consulta: gateway.obtener_resumen_mes_actual(),
+        "/resumen/meses": lambda consulta: gateway.obtener_resumen_ultimos_meses(
+            entero(consulta.get("meses"), 12)),
+        "/resumen/dias": lambda consulta: gateway.obtener_resumen_ultimos_dias(
+            entero(consulta.get("dias"), config.DIAS_VENTANA_RESUMEN)),
+    }
+    for camino, obtener in rutas.items():
+        # Sincronizar espera al servicio de transacciones: va fuera del bucle
+        servidor.ruta("GET", camino, en_hilo=True)(texto(obtener))
+    return servidor
+
+
+def main(argumentos: Optional[List[str]] = None) -> None:
+    url = urlsplit(config.URL_SERVICIO_REPORTE)
+    parser = argparse.ArgumentParser(description="Servicio de reportes (HTTP)")
+    parser.add_argument("--host", default=url.hostname)
+    parser.add_argument("--puerto", type=int, default=url.port)
+    parser.add_argument("--transacciones", default=config.URL_SERVICIO_TRANSACCION,
+                        help="URL del servicio de transacciones")
+    metricas.agregar_opciones(parser)
+    opciones = parser.parse_args(argumentos)
+    metricas.aplicar_opciones(opciones)
+    crear_servidor(opciones.transacciones).servir(opciones.host, opciones.puerto)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# servicio_transaccion/ClienteTransacciones.py
+"""
+Cliente HTTP del servicio de transacciones (servicio_transaccion/main.py)
+y réplica local alimentada por su registro de cambios.
+
+Cada transacción viaja como una fila [fecha ISO, descripción, centavos,
+categoría].
+"""
+import datetime
+import threading
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from common import config
+from common.dinero import centavos_desde_entero
+from common.models.busqueda import ResultadoBusqueda
+from common.models.transaccion import Transaccion
+from common.servicio_http import ClienteHttp
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+
+Fila = Tuple[datetime.date, str, int, str]
+
+
+def filas_json(transacciones: Iterable[Transaccion]) -> List[list]:
+    return [[t.fecha.isoformat(), t.descripcion, t.centavos, t.categoria]
+            for t in transacciones]
+
+
+def filas_desde_json(filas: Iterable[Sequence]) -> List[Fila]:
+    """Filas (fecha, descripción, centavos, categoría); los importes deben ser enteros."""
+    return [(datetime.date.fromisoformat(fecha), str(descripcion),
+             centavos_desde_entero(centavos), str(categoria))
+            for fecha, descripcion, centavos, categoria in filas]
+
+
+def transacciones_desde_json(filas: Iterable[Sequence]) -> List[Transaccion]:
+    filas = filas_desde_json(filas)
+    if not filas:
+        return []
+    return TransaccionFactory().crear_lote(*zip(*filas))
+
+
+class ClienteTransacciones:
+    """
+    API del servicio de transacciones sobre un pool de conexiones
+    persistentes. Las lecturas de muchas páginas se piden en tubería.
+    """
+    def __init__(self,
+                 url: str,
+                 conexiones: int = config.CONEXIONES_POR_SERVICIO,
+                 filas_por_pagina: int = config.FILAS_POR_PAGINA_HTTP) -> None:
+        self.http = ClienteHttp(url, conexiones)
+        self._filas_por_pagina = filas_por_pagina
+
+    def estado(self) -> Tuple[int, int]:
+        """(versión, cantidad de transacciones)."""
+        respuesta = self.http.pedir("GET", "/version")
+        return respuesta["version"], respuesta["cantidad"]
+
+    def agregar(self, fecha: datetime.date, descripcion: str,
+                centavos: int, categoria: str) -> int:
+        """Agrega una transacción; devuelve la versión nueva."""
+        fila = [fecha.isoformat(), descripcion, centavos_desde_entero(centavos), categoria]
+        return self.http.pedir("POST", "/transacciones", cuerpo=fila)["version"]
+
+    def agregar_lote(self, transacciones: Iterable[Transaccion]) -> int:
+        """Inserción masiva: una sola petición para todo el lote."""
+        respuesta = self.http.pedir("POST", "/transacciones/lote",
+                                    cuerpo={"filas": filas_json(transacciones)})
+        return respuesta["agregadas"]
+
+    def obtener_pagina(self, inicio: int, cantidad: int) -> List[Transaccion]:
+        return transacciones_desde_json(self.http.pedir(
+            "GET", "/transacciones", {"offset": inicio, "limit": cantidad}))
+
+    def obtener_todas(self) -> List[Transaccion]:
+        """
+        Todas las transacciones, en fecha descendente. Las páginas se
+        piden juntas en tubería; si otro cliente escribe a la vez, el
+        resultado puede mezclar filas de antes y de después.
+        """
+        _, cantidad = self.estado()
+        paginas = [("GET", "/transacciones",
+                    {"offset": inicio, "limit": self._filas_por_pagina}, None)
+                   for inicio in range(0, cantidad, self._filas_por_pagina)]
+        filas = [fila for pagina in self.http.pedir_varias(paginas) for fila in pagina]
+        return transacciones_desde_json(filas)
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias: Optional[Iterable[str]] = None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> List[Transaccion]:
+        consulta = {"desde": desde.isoformat() if desde else None,
+                    "hasta": hasta.isoformat() if hasta else None,
+                    "categorias": ",".join(categorias) if categorias is not None else None,
+                    "tipo": tipo, "offset": offset, "limit": limit}
+        return transacciones_desde_json(
+            self.http.pedir("GET", "/transacciones/consulta", consulta))
+
+    def buscar(self,
+               texto: str,
+               categoria: Optional[str] = None,
+               offset: int = 0,
+               limit: int = 50) -> ResultadoBusqueda:
+        respuesta = self.http.pedir("GET", "/transacciones/busqueda",
+                                    {"texto": texto, "categoria": categoria,
+                                     "offset": offset, "limit": limit})
+        return ResultadoBusqueda(respuesta["total"],
+                                 transacciones_desde_json(respuesta["filas"]))
+
+    def categorias(self) -> List[str]:
+        return self.http.pedir("GET", "/categorias")
+
+    def cambios(self, desde: int) -> Tuple[List[Fila], int]:
+        """
+        Filas escritas desde la posición `desde` del registro de cambios
+        (todas las que falten, en páginas pedidas en tubería) y la
+        posición final.
+        """
+        pagina = self._filas_por_pagina
+        primera = self.http.pedir("GET", "/cambios", {"desde": desde, "limit": pagina})
+        filas, total = primera["filas"], primera["total"]
+        restantes = [("GET", "/cambios", {"desde": inicio, "limit": pagina}, None)
+                     for inicio in range(desde + len(filas), total, pagina)]
+        for respuesta in self.http.pedir_varias(restantes) if restantes else ():
+            filas.extend(respuesta["filas"])
+        return filas_desde_json(filas), desde + len(filas)
+
+    def cerrar(self) -> None:
+        self.http.cerrar()
+
+
+class ReplicaTransacciones:
+    """
+    Mantiene una copia local de las transacciones del servicio: cada
+    sincronizar() trae lo escrito desde la última vez y lo entrega a
+    `destino` (p. ej. FinanzasGateway.agregar_lote).
+
+    Es segura entre hilos y agrupa las llamadas simultáneas: al volver,
+    se aplicó una sincronización que empezó después de la llamada (así
+    se ve todo lo escrito antes), pero los hilos que esperan a la vez
+    comparten la misma en lugar de pedir los cambios uno por uno.
+    """
+    def __init__(self, cliente: ClienteTransacciones,
+                 destino: Callable[[List[Fila]], int]) -> None:
+        self._cliente = cliente
+        self._destino = destino
+        self._posicion = 0
+        self._condicion = threading.Condition()
+        # Sincronizaciones numeradas: iniciadas, terminadas y si hay una en curso
+        self._iniciadas = 0
+        self._terminadas = 0
+        self._en_curso = False
+
+    @property
+    def posicion(self) -> int:
+        return self._posicion
+
+    def sincronizar(self) -> None:
+        """Aplica los cambios escritos hasta ahora en el servicio."""
+        with self._condicion:
+            # Sirve una sincronización que empiece después de este punto
+            necesaria = self._iniciadas + 1
+            while self._terminadas < necesaria:
+                if self._en_curso:
+                    self._condicion.wait()
+                    continue
+                self._en_curso = True
+                self._iniciadas += 1
+                numero = self._iniciadas
+                try:
+                    self._condicion.release()
+                    try:
+                        self._aplicar_cambios()
+                    finally:
+                        self._condicion.acquire()
+                    self._terminadas = numero
+                finally:
+                    self._en_curso = False
+                    self._condicion.notify_all()
+
+    def _aplicar_cambios(self) -> None:
+        filas, posicion = self._cliente.cambios(self._posicion)
+        if filas:
+            self._destino(filas)
+        self._posicion = posicion
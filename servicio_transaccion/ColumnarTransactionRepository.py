@@ -0,0 +1,350 @@
+# servicio_transaccion/ColumnarTransactionRepository.py
+import datetime
+import threading
+from collections.abc import Sequence
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from common import metricas
+from common.models.transaccion import Transaccion, Ingreso, Gasto, tipo_es_ingreso
+from common.models.resumen import ResumenTotales
+
+
+class ColumnasTransacciones(NamedTuple):
+    """
+    Vistas (sin copia) de las columnas del repositorio columnar,
+    en orden de inserción.
+    """
+    fechas: np.ndarray        # int32, ordinal de la fecha (date.toordinal)
+    centavos: np.ndarray      # int64, importe en centavos (negativo = gasto)
+    categorias: np.ndarray    # int32, índice en `nombres_categoria`
+    nombres_categoria: List[str]
+
+    @classmethod
+    def desde_transacciones(cls,
+                            transacciones: Iterable[Transaccion]) -> "ColumnasTransacciones":
+        """
+        Pasa cualquier secuencia de transacciones a columnas (copia
+        compacta, p. ej. para enviarla a otro proceso).
+        """
+        lote = list(transacciones)
+        m = len(lote)
+        diccionario = _Diccionario()
+        return cls(np.fromiter((t.fecha.toordinal() for t in lote), dtype=np.int32, count=m),
+                   np.fromiter((t.centavos for t in lote), dtype=np.int64, count=m),
+                   np.fromiter((diccionario.codificar(t.categoria) for t in lote),
+                               dtype=np.int32, count=m),
+                   diccionario.valores)
+
+
+# Por debajo de 2**53 toda suma parcial de enteros es exacta en float64
+_LIMITE_EXACTO_FLOAT = 2 ** 53
+
+
+def sumar_por_grupo(grupos: np.ndarray, centavos: np.ndarray, cantidad: int) -> np.ndarray:
+    """
+    Suma int64 de `centavos` por grupo (0..cantidad-1), exacta. Usa
+    bincount (que acumula en float64) cuando el total absoluto garantiza
+    que no hay redondeo; si no, np.add.at sobre int64.
+    """
+    if int(np.abs(centavos).sum()) < _LIMITE_EXACTO_FLOAT:
+        return np.bincount(grupos, weights=centavos, minlength=cantidad).astype(np.int64)
+    totales = np.zeros(cantidad, dtype=np.int64)
+    np.add.at(totales, grupos, centavos)
+    return totales
+
+
+def resumen_columnas(columnas: ColumnasTransacciones) -> ResumenTotales:
+    """Totales de un conjunto de columnas, con reducciones int64 exactas."""
+    centavos = columnas.centavos
+    es_gasto = centavos < 0
+    categorias = columnas.categorias[es_gasto]
+    cantidad_categorias = len(columnas.nombres_categoria)
+
+    por_categoria = sumar_por_grupo(categorias, centavos[es_gasto], cantidad_categorias)
+    presentes = np.bincount(categorias, minlength=cantidad_categorias) > 0
+    gastos_por_categoria = {
+        columnas.nombres_categoria[codigo]: int(por_categoria[codigo])
+        for codigo in np.flatnonzero(presentes)
+    }
+    return ResumenTotales(len(centavos),
+                          int(centavos[~es_gasto].sum()),
+                          int(centavos[es_gasto].sum()),
+                          gastos_por_categoria)
+
+
+def gastos_diarios_columnas(columnas: ColumnasTransacciones) -> Tuple[np.ndarray, np.ndarray]:
+    """(días con gasto ascendentes, gasto del día en centavos, valor absoluto)."""
+    es_gasto = columnas.centavos < 0
+    dias, inverso = np.unique(columnas.fechas[es_gasto], return_inverse=True)
+    totales = sumar_por_grupo(inverso, -columnas.centavos[es_gasto], len(dias))
+    return dias, totales
+
+
+class _Diccionario:
+    """
+    Codificación por diccionario: cada texto distinto se guarda una vez
+    y las filas solo almacenan su código entero.
+    """
+    def __init__(self) -> None:
+        self.valores: List[str] = []
+        self._codigos: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def codificar(self, valor: str) -> int:
+        codigo = self._codigos.get(valor)
+        if codigo is None:
+            codigo = len(self.valores)
+            self._codigos[valor] = codigo
+            self.valores.append(valor)
+        return codigo
+
+    def codigo(self, valor: str) -> Optional[int]:
+        return self._codigos.get(valor)
+
+    @classmethod
+    def desde_valores(cls, valores: List[str]) -> "_Diccionario":
+        diccionario = cls()
+        diccionario.valores = valores
+        diccionario._codigos = {valor: codigo for codigo, valor in enumerate(valores)}
+        return diccionario
+
+
+class FilasColumnares(Sequence):
+    """
+    Vista de solo lectura sobre las filas del repositorio columnar.
+    Los objetos Ingreso/Gasto solo se crean cuando se accede a ellos.
+    """
+    def __init__(self,
+                 fechas: np.ndarray,
+                 centavos: np.ndarray,
+                 categorias: np.ndarray,
+                 descripciones: np.ndarray,
+                 nombres_categoria: List[str],
+                 textos_descripcion: List[str],
+                 orden: np.ndarray) -> None:
+        self._fechas = fechas
+        self._centavos = centavos
+        self._categorias = categorias
+        self._descripciones = descripciones
+        self._nombres_categoria = nombres_categoria
+        self._textos_descripcion = textos_descripcion
+        self._orden = orden
+
+    def __len__(self) -> int:
+        return len(self._orden)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self._fila(int(i)) for i in self._orden[indice]]
+        return self._fila(int(self._orden[indice]))
+
+    def __iter__(self) -> Iterator[Transaccion]:
+        for i in self._orden:
+            yield self._fila(int(i))
+
+    def _fila(self, i: int) -> Transaccion:
+        centavos = int(self._centavos[i])
+        clase = Ingreso if centavos >= 0 else Gasto
+        return clase(datetime.date.fromordinal(int(self._fechas[i])),
+                     self._textos_descripcion[self._descripciones[i]],
+                     self._nombres_categoria[self._categorias[i]],
+                     centavos=centavos)
+
+
+@metricas.instrumentar("repositorio.columnar")
+class ColumnarTransactionRepository:
+    """
+    Repositorio en memoria con almacenamiento columnar (arreglos NumPy).
+
+    Cada transacción ocupa 20 bytes (fecha int32, centavos int64,
+    categoría y descripción codificadas como int32) en lugar de un
+    objeto Python completo. Es intercambiable con TransactionRepository.
+
+    Concurrencia: las escrituras se serializan con un cerrojo y solo
+    anexan filas (o copian los arreglos al crecer); `_n` se actualiza al
+    final. Los lectores leen `_n` antes que los arreglos, así que sin
+    cerrojo siempre ven filas completas de una versión consistente.
+    """
+    CAPACIDAD_INICIAL = 1024
+
+    def __init__(self) -> None:
+        self._n = 0
+        self._fechas = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int32)
+        self._centavos = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int64)
+        self._categorias = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int32)
+        self._descripciones = np.empty(self.CAPACIDAD_INICIAL, dtype=np.int32)
+        self._dic_categorias = _Diccionario()
+        self._dic_descripciones = _Diccionario()
+        # (filas, permutación que deja las filas en fecha descendente,
+        # fechas negadas en ese orden); se calcula bajo demanda y vale
+        # mientras no cambie la cantidad de filas
+        self._ordenado: Optional[Tuple[int, np.ndarray, np.ndarray]] = None
+        # Reentrante: las subclases lo toman alrededor de super().agregar
+        self._cerrojo = threading.RLock()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def agregar(self, transaccion: Transaccion) -> None:
+        with self._cerrojo:
+            self._asegurar_capacidad(1)
+            i = self._n
+            self._fechas[i] = transaccion.fecha.toordinal()
+            self._centavos[i] = transaccion.centavos
+            self._categorias[i] = self._dic_categorias.codificar(transaccion.categoria)
+            self._descripciones[i] = self._dic_descripciones.codificar(transaccion.descripcion)
+            self._n += 1
+
+    def agregar_lote(self, transacciones: Iterable[Transaccion]) -> int:
+        lote = list(transacciones)
+        m = len(lote)
+        return self.agregar_columnas(
+            np.fromiter((t.fecha.toordinal() for t in lote), dtype=np.int32, count=m),
+            [t.descripcion for t in lote],
+            np.fromiter((t.centavos for t in lote), dtype=np.int64, count=m),
+            [t.categoria for t in lote])
+
+    def agregar_columnas(self,
+                         fechas: Sequence[int],
+                         descripciones: Sequence[str],
+                         centavos: Sequence[int],
+                         categorias: Sequence[str]) -> int:
+        """
+        Agrega filas dadas como columnas paralelas, sin crear objetos
+        Transaccion. Las fechas van como ordinales (date.toordinal) y
+        los importes en centavos enteros.
+        """
+        m = len(fechas)
+        if not m:
+            return 0
+        metricas.observar("repositorio.filas_por_lote", m)
+
+        with self._cerrojo:
+            self._asegurar_capacidad(m)
+            inicio, fin = self._n, self._n + m
+            codificar_cat = self._dic_categorias.codificar
+            codificar_desc = self._dic_descripciones.codificar
+            self._fechas[inicio:fin] = fechas
+            self._centavos[inicio:fin] = centavos
+            self._categorias[inicio:fin] = np.fromiter(
+                (codificar_cat(c) for c in categorias), dtype=np.int32, count=m)
+            self._descripciones[inicio:fin] = np.fromiter(
+                (codificar_desc(d) for d in descripciones), dtype=np.int32, count=m)
+            self._n = fin
+        return m
+
+    def obtener_todas(self) -> FilasColumnares:
+        # No se copian datos: la vista guarda referencias a los arreglos actuales.
+        # Al crecer se crean arreglos nuevos, así que la vista sigue siendo consistente.
+        return self._filas(self._orden()[1])
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias: Optional[Iterable[str]] = None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> FilasColumnares:
+        """
+        La ventana de fechas se ubica con searchsorted sobre las fechas
+        ya ordenadas; categoría y tipo se filtran con máscaras solo
+        dentro de la ventana. Devuelve una vista perezosa.
+        """
+        es_ingreso = tipo_es_ingreso(tipo)
+        _, orden, claves = self._orden()
+        inicio, fin = 0, len(orden)
+        if hasta is not None:
+            inicio = int(np.searchsorted(claves, -hasta.toordinal(), "left"))
+        if desde is not None:
+            fin = int(np.searchsorted(claves, -desde.toordinal(), "right"))
+        seleccion = orden[inicio:fin]
+
+        if categorias is not None:
+            codigos = [c for c in map(self._dic_categorias.codigo, categorias) if c is not None]
+            seleccion = seleccion[np.isin(self._categorias[seleccion], codigos)]
+        if es_ingreso is not None:
+            centavos = self._centavos[seleccion]
+            seleccion = seleccion[centavos >= 0 if es_ingreso else centavos < 0]
+
+        offset = max(offset, 0)
+        fin_pagina = None if limit is None else offset + max(limit, 0)
+        return self._filas(seleccion[offset:fin_pagina])
+
+    def obtener_rango(self, inicio: int, cantidad: int) -> List[Transaccion]:
+        inicio = max(inicio, 0)
+        return self.obtener_todas()[inicio:inicio + cantidad]
+
+    def columnas(self) -> ColumnasTransacciones:
+        n = self._n
+        return ColumnasTransacciones(self._fechas[:n], self._centavos[:n],
+                                     self._categorias[:n],
+                                     self._dic_categorias.valores)
+
+    def descripciones(self, n: Optional[int] = None) -> Tuple[np.ndarray, List[str]]:
+        """
+        Códigos de descripción de las primeras `n` filas (todas por
+        defecto), en el orden de columnas(), y el texto de cada código.
+        """
+        n = self._n if n is None else min(n, self._n)
+        return self._descripciones[:n], self._dic_descripciones.valores
+
+    # --- Agregaciones vectorizadas ---
+    def resumen_totales(self) -> ResumenTotales:
+        return resumen_columnas(self.columnas())
+
+    def gastos_diarios(self) -> Tuple[np.ndarray, np.ndarray]:
+        return gastos_diarios_columnas(self.columnas())
+
+    # --- Auxiliares internos ---
+    def _filas(self, orden: np.ndarray) -> FilasColumnares:
+        n = self._n
+        return FilasColumnares(self._fechas[:n], self._centavos[:n],
+                               self._categorias[:n], self._descripciones[:n],
+                               self._dic_categorias.valores,
+                               self._dic_descripciones.valores,
+                               orden)
+
+    def _orden(self) -> Tuple[int, np.ndarray, np.ndarray]:
+        n = self._n
+        ordenado = self._ordenado
+        if ordenado is not None and ordenado[0] == n:
+            return ordenado
+        # argsort estable sobre la fecha negada: descendente y, a igual
+        # fecha, en orden de inserción. Dos lectores pueden calcularlo a
+        # la vez: el resultado es el mismo.
+        if ordenado is not None and n - ordenado[0] <= ordenado[0]:
+            # Pocas filas nuevas: se ordenan solo ellas y se intercalan
+            # en el orden anterior (copia O(N) en lugar de argsort O(N log N)).
+            # Con side="right" quedan detrás de las de igual fecha.
+            with metricas.cronometro("repositorio.columnar.intercalar_orden"):
+                previas, orden, claves = ordenado
+                nuevas = -self._fechas[previas:n]
+                orden_nuevas = np.argsort(nuevas, kind="stable")
+                nuevas = nuevas[orden_nuevas]
+                posiciones = np.searchsorted(claves, nuevas, "right")
+                orden = np.insert(orden, posiciones, orden_nuevas + previas)
+                claves = np.insert(claves, posiciones, nuevas)
+        else:
+            with metricas.cronometro("repositorio.columnar.ordenar"):
+                claves = -self._fechas[:n]
+                orden = np.argsort(claves, kind="stable")
+                claves = claves[orden]
+        ordenado = self._ordenado = (n, orden, claves)
+        return ordenado
+
+    def _asegurar_capacidad(self, extra: int) -> None:
+        necesaria = self._n + extra
+        capacidad = len(self._fechas)
+        if necesaria <= capacidad:
+            return
+        while capacidad < necesaria:
+            capacidad *= 2
+        for nombre in ("_fechas", "_centavos", "_categorias", "_descripciones"):
+            anterior = getattr(self, nombre)
+            nuevo = np.empty(capacidad, dtype=anterior.dtype)
+            nuevo[:self._n] = anterior[:self._n]
+            setattr(self, nombre, nuevo)
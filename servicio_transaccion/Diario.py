@@ -0,0 +1,328 @@
+# servicio_transaccion/Diario.py
+"""
+Formatos en disco del backend "diario":
+
+- Diario: archivo binario de solo anexado. Tras una cabecera (magia y
+  generación) vienen registros <longitud u32><crc32 u32><carga>; cada
+  carga es un lote de filas en columnas. Las escrituras se agrupan
+  (group commit): varios registros comparten un solo write + fsync.
+  Al recuperar, el primer registro incompleto o con CRC inválido marca
+  el final del diario (escritura cortada por una caída) y se trunca.
+
+- Instantánea: columnas de ancho fijo (centavos int64; fechas, categorías
+  y descripciones int32) tras una cabecera de 64 bytes, y al final los
+  diccionarios de textos. Se escribe en un archivo temporal y se
+  reemplaza de forma atómica; al arrancar se mapea con mmap y las
+  columnas se usan tal cual, sin parsear.
+
+Todos los enteros se guardan en little-endian. La versión 2 de ambos
+formatos (magias terminadas en 2) guarda los importes en centavos.
+"""
+import mmap
+import os
+import struct
+import threading
+import zlib
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# --- Diario ---
+_MAGIA_DIARIO = b"AHPDIAR2"
+_CABECERA_DIARIO = struct.Struct("<8sQ")          # magia, generación
+_CABECERA_REGISTRO = struct.Struct("<II")         # longitud de la carga, crc32
+_CANTIDAD = struct.Struct("<I")
+
+# --- Instantánea ---
+_MAGIA_INSTANTANEA = b"AHPINST2"
+_CABECERA_INSTANTANEA = struct.Struct("<8sQQ")    # magia, generación, filas
+_TAMANO_CABECERA_INSTANTANEA = 64
+_TABLA_TEXTOS = struct.Struct("<IQ")              # cantidad, bytes del texto
+
+
+def _sincronizar_directorio(ruta: str) -> None:
+    # Tras un os.replace, el fsync del directorio fija el nuevo nombre
+    # (POSIX). En Windows no se pueden abrir directorios: se omite.
+    try:
+        descriptor = os.open(os.path.dirname(os.path.abspath(ruta)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+# --- Codificación de los lotes del diario ---
+
+def codificar_lote(fechas: Sequence[int],
+                   descripciones: Sequence[str],
+                   centavos: Sequence[int],
+                   categorias: Sequence[str]) -> bytes:
+    """
+    Carga de un registro: cantidad, fechas (ordinales int32), centavos
+    (int64), longitudes de los textos (uint32) y los textos en UTF-8
+    (primero las descripciones, luego las categorías).
+    """
+    textos = [texto.encode("utf-8") for texto in descripciones]
+    textos += [texto.encode("utf-8") for texto in categorias]
+    return b"".join((
+        _CANTIDAD.pack(len(fechas)),
+        np.asarray(fechas, dtype="<i4").tobytes(),
+        np.asarray(centavos, dtype="<i8").tobytes(),
+        np.fromiter(map(len, textos), dtype="<u4", count=len(textos)).tobytes(),
+        b"".join(textos),
+    ))
+
+
+def decodificar_lote(carga: bytes) -> Tuple[np.ndarray, List[str], np.ndarray, List[str]]:
+    """(fechas, descripciones, centavos, categorias) de una carga."""
+    (cantidad,) = _CANTIDAD.unpack_from(carga)
+    posicion = _CANTIDAD.size
+    fechas = np.frombuffer(carga, dtype="<i4", count=cantidad, offset=posicion)
+    posicion += 4 * cantidad
+    centavos = np.frombuffer(carga, dtype="<i8", count=cantidad, offset=posicion)
+    posicion += 8 * cantidad
+    longitudes = np.frombuffer(carga, dtype="<u4", count=2 * cantidad, offset=posicion)
+    posicion += 8 * cantidad
+
+    finales = (np.cumsum(longitudes, dtype=np.int64) + posicion).tolist()
+    inicios = [posicion] + finales[:-1]
+    textos = [bytes(carga[inicio:fin]).decode("utf-8")
+              for inicio, fin in zip(inicios, finales)]
+    return fechas, textos[:cantidad], centavos, textos[cantidad:]
+
+
+def recuperar_diario(ruta: str) -> Tuple[Optional[int], List[memoryview]]:
+    """
+    Lee el diario y devuelve (generación, cargas válidas). Si la cola
+    quedó cortada o corrupta, la trunca en el último registro válido.
+    Devuelve (None, []) si el archivo no existe o no llegó a tener
+    cabecera completa.
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            datos = archivo.read()
+    except FileNotFoundError:
+        return None, []
+    if len(datos) < _CABECERA_DIARIO.size:
+        return None, []
+    magia, generacion = _CABECERA_DIARIO.unpack_from(datos)
+    if magia != _MAGIA_DIARIO:
+        raise ValueError(f"{ruta} no es un diario de transacciones de esta versión")
+
+    vista = memoryview(datos)
+    cargas: List[memoryview] = []
+    posicion = _CABECERA_DIARIO.size
+    while posicion + _CABECERA_REGISTRO.size <= len(datos):
+        longitud, crc = _CABECERA_REGISTRO.unpack_from(datos, posicion)
+        fin = posicion + _CABECERA_REGISTRO.size + longitud
+        if fin > len(datos):
+            break
+        carga = vista[posicion + _CABECERA_REGISTRO.size:fin]
+        if zlib.crc32(carga) != crc:
+            break
+        cargas.append(carga)
+        posicion = fin
+
+    if posicion < len(datos):
+        with open(ruta, "r+b") as archivo:
+            archivo.truncate(posicion)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+    return generacion, cargas
+
+
+class Diario:
+    """
+    Escritor del diario con group commit: los registros se acumulan y se
+    escriben juntos (un solo write + fsync) cuando hay
+    `registros_por_grupo` pendientes o pasan `intervalo_grupo` segundos
+    desde el primero. Lo pendiente se pierde si el proceso cae antes
+    del fsync; sincronizar() fuerza la escritura.
+    """
+    def __init__(self,
+                 ruta: str,
+                 generacion: int,
+                 registros_por_grupo: int = 256,
+                 intervalo_grupo: float = 0.05) -> None:
+        self.ruta = ruta
+        self.generacion = generacion
+        self._registros_por_grupo = registros_por_grupo
+        self._intervalo_grupo = intervalo_grupo
+        self._pendientes: List[bytes] = []
+        self._cerrojo = threading.Lock()
+        self._temporizador: Optional[threading.Timer] = None
+        # Error de una escritura hecha por el temporizador: se relanza al
+        # siguiente uso, en el hilo que escribe
+        self._error: Optional[BaseException] = None
+        self._archivo = open(ruta, "ab")
+        if self._archivo.tell() == 0:
+            self._escribir_cabecera()
+
+    def anexar(self, carga: bytes, inmediato: bool = False) -> None:
+        """
+        Agrega un registro. Con `inmediato`, el grupo (con este registro
+        y los pendientes) se escribe antes de volver.
+        """
+        registro = _CABECERA_REGISTRO.pack(len(carga), zlib.crc32(carga)) + carga
+        with self._cerrojo:
+            self._relanzar_error()
+            self._pendientes.append(registro)
+            if inmediato or len(self._pendientes) >= self._registros_por_grupo:
+                self._escribir_pendientes()
+            elif self._temporizador is None:
+                self._temporizador = threading.Timer(self._intervalo_grupo,
+                                                     self._sincronizar_en_fondo)
+                self._temporizador.daemon = True
+                self._temporizador.start()
+
+    def sincronizar(self) -> None:
+        with self._cerrojo:
+            self._relanzar_error()
+            self._escribir_pendientes()
+
+    def reiniciar(self, generacion: int) -> None:
+        """
+        Vacía el diario y lo marca con una nueva generación. Se llama
+        después de escribir una instantánea que ya contiene todas sus
+        filas, así que lo pendiente se descarta.
+        """
+        with self._cerrojo:
+            self._cancelar_temporizador()
+            self._pendientes = []
+            self._archivo.close()
+            self._archivo = open(self.ruta, "wb")
+            self.generacion = generacion
+            self._escribir_cabecera()
+            self._archivo.close()
+            self._archivo = open(self.ruta, "ab")
+
+    def cerrar(self) -> None:
+        with self._cerrojo:
+            self._escribir_pendientes()
+            self._archivo.close()
+
+    # --- Auxiliares internos (con el cerrojo tomado) ---
+    def _escribir_cabecera(self) -> None:
+        self._archivo.write(_CABECERA_DIARIO.pack(_MAGIA_DIARIO, self.generacion))
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+
+    def _escribir_pendientes(self) -> None:
+        self._cancelar_temporizador()
+        if not self._pendientes:
+            return
+        pendientes, self._pendientes = self._pendientes, []
+        self._archivo.write(b"".join(pendientes))
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+
+    def _sincronizar_en_fondo(self) -> None:
+        with self._cerrojo:
+            self._temporizador = None
+            try:
+                self._escribir_pendientes()
+            except OSError as error:
+                self._error = error
+
+    def _cancelar_temporizador(self) -> None:
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+
+    def _relanzar_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+
+# --- Instantáneas ---
+
+class Instantanea(NamedTuple):
+    """Columnas de una instantánea; los arreglos apuntan al archivo mapeado."""
+    generacion: int
+    fechas: np.ndarray
+    centavos: np.ndarray
+    categorias: np.ndarray
+    descripciones: np.ndarray
+    nombres_categoria: List[str]
+    textos_descripcion: List[str]
+
+
+def _tabla_textos(textos: Sequence[str]) -> bytes:
+    # Longitudes en caracteres: el texto se decodifica una sola vez y se corta
+    texto = "".join(textos).encode("utf-8")
+    return b"".join((_TABLA_TEXTOS.pack(len(textos), len(texto)),
+                     np.fromiter(map(len, textos), dtype="<u4", count=len(textos)).tobytes(),
+                     texto))
+
+
+def _leer_tabla_textos(datos, posicion: int) -> Tuple[List[str], int]:
+    cantidad, tamano = _TABLA_TEXTOS.unpack_from(datos, posicion)
+    posicion += _TABLA_TEXTOS.size
+    longitudes = np.frombuffer(datos, dtype="<u4", count=cantidad, offset=posicion)
+    posicion += 4 * cantidad
+    texto = bytes(datos[posicion:posicion + tamano]).decode("utf-8")
+    finales = np.cumsum(longitudes, dtype=np.int64).tolist()
+    inicios = [0] + finales[:-1]
+    return [texto[inicio:fin] for inicio, fin in zip(inicios, finales)], posicion + tamano
+
+
+def escribir_instantanea(ruta: str,
+                         generacion: int,
+                         fechas: np.ndarray,
+                         centavos: np.ndarray,
+                         categorias: np.ndarray,
+                         descripciones: np.ndarray,
+                         nombres_categoria: Sequence[str],
+                         textos_descripcion: Sequence[str]) -> None:
+    """
+    Escribe la instantánea en `ruta`.tmp y la reemplaza de forma
+    atómica: una caída a mitad deja la instantánea anterior intacta.
+    """
+    temporal = ruta + ".tmp"
+    with open(temporal, "wb") as archivo:
+        cabecera = _CABECERA_INSTANTANEA.pack(_MAGIA_INSTANTANEA, generacion, len(fechas))
+        archivo.write(cabecera.ljust(_TAMANO_CABECERA_INSTANTANEA, b"\0"))
+        # Los centavos van primero para quedar alineados a 8 bytes
+        for columna, tipo in ((centavos, "<i8"), (fechas, "<i4"),
+                              (categorias, "<i4"), (descripciones, "<i4")):
+            archivo.write(np.ascontiguousarray(columna, dtype=tipo).data)
+        archivo.write(_tabla_textos(nombres_categoria))
+        archivo.write(_tabla_textos(textos_descripcion))
+        archivo.flush()
+        os.fsync(archivo.fileno())
+    os.replace(temporal, ruta)
+    _sincronizar_directorio(ruta)
+
+
+def leer_instantanea(ruta: str) -> Optional[Instantanea]:
+    """
+    Mapea la instantánea con mmap. Las columnas son vistas de solo
+    lectura sobre el archivo; solo se decodifican los diccionarios.
+    Devuelve None si no existe.
+    """
+    try:
+        with open(ruta, "rb") as archivo:
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    except FileNotFoundError:
+        return None
+
+    magia, generacion, filas = _CABECERA_INSTANTANEA.unpack_from(mapa)
+    if magia != _MAGIA_INSTANTANEA:
+        raise ValueError(f"{ruta} no es una instantánea de transacciones de esta versión")
+    posicion = _TAMANO_CABECERA_INSTANTANEA
+    columnas = []
+    for tipo, ancho in (("<i8", 8), ("<i4", 4), ("<i4", 4), ("<i4", 4)):
+        columnas.append(np.frombuffer(mapa, dtype=tipo, count=filas, offset=posicion))
+        posicion += ancho * filas
+    centavos, fechas, categorias, descripciones = columnas
+    nombres_categoria, posicion = _leer_tabla_textos(mapa, posicion)
+    textos_descripcion, posicion = _leer_tabla_textos(mapa, posicion)
+    if posicion != len(mapa):
+        raise ValueError(f"{ruta}: tamaño de instantánea inesperado")
+    return Instantanea(generacion, fechas, centavos, categorias, descripciones,
+                       nombres_categoria, textos_descripcion)
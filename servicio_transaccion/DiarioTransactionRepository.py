@@ -0,0 +1,129 @@
+# servicio_transaccion/DiarioTransactionRepository.py
+import os
+from typing import Sequence
+
+from common import metricas
+from common.models.transaccion import Transaccion
+from servicio_transaccion.ColumnarTransactionRepository import (
+    ColumnarTransactionRepository, _Diccionario
+)
+from servicio_transaccion.Diario import (
+    Diario, codificar_lote, decodificar_lote, escribir_instantanea,
+    leer_instantanea, recuperar_diario
+)
+
+
+@metricas.instrumentar("repositorio.diario")
+class DiarioTransactionRepository(ColumnarTransactionRepository):
+    """
+    Repositorio columnar persistente en un directorio:
+
+    - diario.bin: cada escritura se anexa antes de aplicarse en memoria
+      (con group commit, ver Diario).
+    - instantanea.bin: todas las columnas, reescrita cada
+      `filas_por_instantanea` filas nuevas; después el diario se vacía.
+
+    Al abrir se mapea la instantánea (sus columnas se usan sin copiar
+    hasta la primera escritura) y solo se reproduce la cola del diario.
+    Cada escritura se anexa al diario y se aplica en memoria sin soltar
+    el cerrojo del repositorio: el orden del diario es el de las filas.
+    """
+    def __init__(self,
+                 directorio: str,
+                 registros_por_grupo: int = 256,
+                 intervalo_grupo: float = 0.05,
+                 filas_por_instantanea: int = 1_000_000) -> None:
+        super().__init__()
+        os.makedirs(directorio, exist_ok=True)
+        self._ruta_instantanea = os.path.join(directorio, "instantanea.bin")
+        self._filas_por_instantanea = filas_por_instantanea
+
+        generacion = self._cargar_instantanea()
+        ruta_diario = os.path.join(directorio, "diario.bin")
+        generacion_diario, cargas = recuperar_diario(ruta_diario)
+        if generacion_diario is not None and generacion_diario > generacion:
+            raise ValueError(f"El diario de {directorio} es de la generación "
+                             f"{generacion_diario}, pero falta su instantánea")
+
+        # Un diario de una generación anterior ya está dentro de la instantánea
+        self._filas_en_diario = 0
+        if generacion_diario == generacion:
+            for carga in cargas:
+                self._filas_en_diario += super().agregar_columnas(*decodificar_lote(carga))
+        self._diario = Diario(ruta_diario, generacion, registros_por_grupo, intervalo_grupo)
+        if generacion_diario is not None and generacion_diario != generacion:
+            self._diario.reiniciar(generacion)
+
+    def agregar(self, transaccion: Transaccion) -> None:
+        carga = codificar_lote([transaccion.fecha.toordinal()],
+                               [transaccion.descripcion],
+                               [transaccion.centavos],
+                               [transaccion.categoria])
+        with self._cerrojo:
+            self._diario.anexar(carga)
+            super().agregar(transaccion)
+            self._contar_filas(1)
+
+    def agregar_columnas(self,
+                         fechas: Sequence[int],
+                         descripciones: Sequence[str],
+                         centavos: Sequence[int],
+                         categorias: Sequence[str]) -> int:
+        # Un lote es su propio grupo: se escribe (y fsync) antes de aplicarlo
+        if not len(fechas):
+            return 0
+        carga = codificar_lote(fechas, descripciones, centavos, categorias)
+        with self._cerrojo:
+            self._diario.anexar(carga, inmediato=True)
+            agregadas = super().agregar_columnas(fechas, descripciones, centavos, categorias)
+            self._contar_filas(agregadas)
+        return agregadas
+
+    # --- Persistencia ---
+    def instantanea(self) -> None:
+        """
+        Escribe todas las filas en una instantánea nueva y vacía el
+        diario. Sin filas nuevas desde la última, no hace nada.
+        """
+        with self._cerrojo:
+            if not self._filas_en_diario:
+                return
+            n = self._n
+            generacion = self._diario.generacion + 1
+            escribir_instantanea(self._ruta_instantanea, generacion,
+                                 self._fechas[:n], self._centavos[:n],
+                                 self._categorias[:n], self._descripciones[:n],
+                                 self._dic_categorias.valores,
+                                 self._dic_descripciones.valores)
+            self._diario.reiniciar(generacion)
+            self._filas_en_diario = 0
+
+    def sincronizar(self) -> None:
+        """Escribe en disco las escrituras que esperan su grupo."""
+        self._diario.sincronizar()
+
+    def cerrar(self) -> None:
+        with self._cerrojo:
+            self._diario.cerrar()
+
+    # --- Auxiliares internos ---
+    def _contar_filas(self, cantidad: int) -> None:
+        self._filas_en_diario += cantidad
+        if self._filas_en_diario >= self._filas_por_instantanea:
+            self.instantanea()
+
+    def _cargar_instantanea(self) -> int:
+        instantanea = leer_instantanea(self._ruta_instantanea)
+        if instantanea is None:
+            return 0
+        if len(instantanea.fechas):
+            # Vistas de solo lectura sobre el mmap: la primera escritura
+            # las copia a memoria al hacer crecer los arreglos
+            self._fechas = instantanea.fechas
+            self._centavos = instantanea.centavos
+            self._categorias = instantanea.categorias
+            self._descripciones = instantanea.descripciones
+            self._n = len(instantanea.fechas)
+        self._dic_categorias = _Diccionario.desde_valores(instantanea.nombres_categoria)
+        self._dic_descripciones = _Diccionario.desde_valores(instantanea.textos_descripcion)
+        return instantanea.generacion
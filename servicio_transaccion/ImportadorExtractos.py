@@ -0,0 +1,358 @@
+# servicio_transaccion/ImportadorExtractos.py
+"""
+Importación masiva de extractos bancarios (CSV u OFX).
+
+Los archivos se leen línea a línea con generadores y se escriben en
+lotes de `tamano_lote` filas, así que la memoria usada no depende del
+tamaño del archivo. Una línea mal formada se registra y se salta: la
+importación sigue con la siguiente. Si la importación se corta (por
+ejemplo, falla el destino), ResultadoImportacion.ultima_linea dice hasta
+dónde quedó escrito y importar(..., desde_linea=ultima_linea) sigue
+desde ahí sin repetir filas.
+
+Uso desde la línea de comandos (desde la raíz del proyecto):
+    python -m servicio_transaccion.ImportadorExtractos extracto.csv
+"""
+import csv
+import datetime
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import dropwhile, islice
+from typing import (
+    Callable, IO, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
+)
+
+from common import config
+from common.dinero import centavos_desde_unidades
+
+# (fecha, descripción, centavos, categoría)
+Fila = Tuple[datetime.date, str, int, str]
+
+_FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+
+# Nombres de columna aceptados en la cabecera del CSV (en minúsculas y sin tildes)
+_COLUMNAS_CSV = {
+    "fecha": ("fecha", "date", "fecha operacion", "fecha valor"),
+    "descripcion": ("descripcion", "description", "concepto", "detalle", "memo"),
+    "monto": ("monto", "amount", "importe", "valor"),
+    "categoria": ("categoria", "category"),
+}
+
+_MAXIMO_ERRORES_GUARDADOS = 1000
+
+
+class ErrorLinea(ValueError):
+    """Una línea del extracto no se pudo interpretar."""
+
+
+@dataclass
+class LineaInvalida:
+    numero: int
+    motivo: str
+
+
+@dataclass
+class ResultadoImportacion:
+    """
+    Avance de una importación. Se va actualizando lote a lote y es
+    lo que recibe la función de progreso.
+    """
+    filas_leidas: int = 0
+    filas_importadas: int = 0
+    lineas_invalidas: int = 0
+    segundos: float = 0.0
+    # Última línea del archivo ya escrita en el destino (o descartada
+    # por inválida): desde_linea para reanudar
+    ultima_linea: int = 0
+    # Solo se guardan las primeras _MAXIMO_ERRORES_GUARDADOS
+    errores: List[LineaInvalida] = field(default_factory=list)
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas_importadas / self.segundos if self.segundos else 0.0
+
+    def registrar_error(self, numero: int, motivo: str) -> None:
+        self.lineas_invalidas += 1
+        if len(self.errores) < _MAXIMO_ERRORES_GUARDADOS:
+            self.errores.append(LineaInvalida(numero, motivo))
+
+
+class IDestinoImportacion(Protocol):
+    """
+    Quien recibe los lotes importados (LogicaFinanciera o el gateway).
+    """
+    def agregar_columnas(self,
+                         fechas: Sequence[datetime.date],
+                         descripciones: Sequence[str],
+                         centavos: Sequence[int],
+                         categorias: Sequence[str]) -> int:
+        ...
+
+
+# --- Normalización de campos ---
+
+@lru_cache(maxsize=8192)
+def normalizar_fecha(texto: str) -> datetime.date:
+    """
+    Acepta los formatos habituales de los bancos (ISO, día/mes/año,
+    AAAAMMDD y las fechas OFX con hora y zona: 20240131120000[-5:EST]).
+    Las fechas se repiten mucho en un extracto, por eso la caché.
+    """
+    texto = texto.strip()
+    if len(texto) > 8 and texto[:8].isdigit():
+        texto = texto[:8]
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ErrorLinea(f"fecha no válida: {texto!r}")
+
+
+def normalizar_monto(texto: str) -> int:
+    """
+    Convierte importes como "-1234.5", "$1,234.50", "1.234,50" o
+    "(75.00)" (negativo contable) a centavos enteros, sin pasar por
+    float (ver common/dinero.py).
+    """
+    try:
+        return centavos_desde_unidades(texto)
+    except ValueError:
+        pass
+
+    limpio = texto.strip().replace("$", "").replace(" ", "").replace("\xa0", "")
+    negativo = limpio.startswith("(") and limpio.endswith(")")
+    if negativo:
+        limpio = limpio[1:-1]
+
+    # El último separador es el decimal; el otro es de miles
+    if "," in limpio and "." in limpio:
+        if limpio.rfind(",") > limpio.rfind("."):
+            limpio = limpio.replace(".", "").replace(",", ".")
+        else:
+            limpio = limpio.replace(",", "")
+    elif "," in limpio:
+        entero, _, decimales = limpio.rpartition(",")
+        limpio = f"{entero.replace(',', '')}.{decimales}" if len(decimales) != 3 \
+            else limpio.replace(",", "")
+
+    try:
+        centavos = centavos_desde_unidades(limpio)
+    except ValueError:
+        raise ErrorLinea(f"monto no válido: {texto!r}") from None
+    return -centavos if negativo else centavos
+
+
+def _sin_tildes(texto: str) -> str:
+    return texto.strip().lower().translate(str.maketrans("áéíóú", "aeiou"))
+
+
+# --- Lectores (generadores de filas o errores) ---
+
+Lectura = Iterator[Tuple[int, Union[Fila, ErrorLinea]]]
+
+
+def leer_csv(archivo: IO[str],
+             categoria_por_defecto: str = config.CATEGORIA_POR_DEFECTO) -> Lectura:
+    """
+    Recorre un CSV con cabecera. El separador (, ; tab |) es el que
+    más aparece en la cabecera. Devuelve (número de línea, fila o error).
+    """
+    cabecera = archivo.readline()
+    archivo.seek(0)
+    separador = max(",;\t|", key=cabecera.count)
+
+    lector = csv.reader(archivo, delimiter=separador)
+    try:
+        cabecera = [_sin_tildes(c) for c in next(lector)]
+    except StopIteration:
+        return
+
+    indices = {}
+    for campo, nombres in _COLUMNAS_CSV.items():
+        indices[campo] = next((i for i, c in enumerate(cabecera) if c in nombres), None)
+    faltantes = [c for c in ("fecha", "monto") if indices[c] is None]
+    if faltantes:
+        raise ValueError(f"El CSV no tiene las columnas: {', '.join(faltantes)}")
+
+    i_fecha, i_monto = indices["fecha"], indices["monto"]
+    i_desc, i_cat = indices["descripcion"], indices["categoria"]
+    minimo = max(i for i in indices.values() if i is not None) + 1
+
+    while True:
+        try:
+            columnas = next(lector)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield lector.line_num, ErrorLinea(str(error))
+            continue
+
+        if not columnas:
+            continue
+        if len(columnas) < minimo:
+            yield lector.line_num, ErrorLinea(f"faltan columnas ({len(columnas)})")
+            continue
+        try:
+            fila = (normalizar_fecha(columnas[i_fecha]),
+                    columnas[i_desc].strip() if i_desc is not None else "",
+                    normalizar_monto(columnas[i_monto]),
+                    (columnas[i_cat].strip() if i_cat is not None else "")
+                    or categoria_por_defecto)
+        except ErrorLinea as error:
+            yield lector.line_num, error
+            continue
+        yield lector.line_num, fila
+
+
+_ETIQUETA_OFX = re.compile(r"<(/?)([A-Z0-9.]+)>([^<]*)", re.IGNORECASE)
+
+
+def leer_ofx(archivo: IO[str],
+             categoria_por_defecto: str = config.CATEGORIA_POR_DEFECTO) -> Lectura:
+    """
+    Recorre los <STMTTRN> de un OFX, tanto en SGML (etiquetas sin
+    cerrar) como en XML. Se lee por líneas, sin cargar el archivo.
+    """
+    movimiento: Optional[dict] = None
+    linea_inicio = 0
+    for numero, linea in enumerate(archivo, start=1):
+        for cierre, etiqueta, valor in _ETIQUETA_OFX.findall(linea):
+            etiqueta = etiqueta.upper()
+            if etiqueta == "STMTTRN":
+                if cierre and movimiento is not None:
+                    yield linea_inicio, _fila_ofx(movimiento, categoria_por_defecto)
+                    movimiento = None
+                elif not cierre:
+                    movimiento, linea_inicio = {}, numero
+            elif movimiento is not None and not cierre and valor.strip():
+                movimiento[etiqueta] = valor.strip()
+    if movimiento is not None:
+        yield linea_inicio, ErrorLinea("movimiento sin cerrar al final del archivo")
+
+
+def _fila_ofx(movimiento: dict, categoria_por_defecto: str) -> Union[Fila, ErrorLinea]:
+    if "DTPOSTED" not in movimiento or "TRNAMT" not in movimiento:
+        return ErrorLinea("movimiento sin DTPOSTED o TRNAMT")
+    try:
+        return (normalizar_fecha(movimiento["DTPOSTED"]),
+                movimiento.get("NAME") or movimiento.get("MEMO", ""),
+                normalizar_monto(movimiento["TRNAMT"]),
+                categoria_por_defecto)
+    except ErrorLinea as error:
+        return error
+
+
+_LECTORES = {"csv": leer_csv, "ofx": leer_ofx, "qfx": leer_ofx}
+
+
+def _formato_de(ruta: str) -> str:
+    return os.path.splitext(ruta)[1].lstrip(".").lower()
+
+
+# --- Importador ---
+
+class ImportadorExtractos:
+    """
+    Lee un extracto y lo escribe en el destino por lotes: cada lote es
+    una sola inserción en el repositorio y una sola notificación
+    TRANSACCION_LOTE_AGREGADO para los observadores que agrupan.
+    """
+    def __init__(self,
+                 destino: IDestinoImportacion,
+                 tamano_lote: int = config.TAMANO_LOTE_IMPORTACION,
+                 categoria_por_defecto: str = config.CATEGORIA_POR_DEFECTO) -> None:
+        self._destino = destino
+        self._tamano_lote = tamano_lote
+        self._categoria_por_defecto = categoria_por_defecto
+
+    def importar(self,
+                 ruta: str,
+                 formato: Optional[str] = None,
+                 progreso: Optional[Callable[[ResultadoImportacion], None]] = None,
+                 codificacion: str = "utf-8-sig",
+                 desde_linea: int = 0) -> ResultadoImportacion:
+        """
+        Importa el extracto de `ruta`. Con `desde_linea` se saltan las
+        líneas hasta esa (inclusive), para reanudar una importación
+        cortada con la ultima_linea de su resultado.
+        """
+        formato = (formato or _formato_de(ruta)).lower()
+        if formato not in _LECTORES:
+            raise ValueError(f"Formato de extracto desconocido: {formato}")
+
+        # errors="replace": un byte inválido no detiene la importación
+        with open(ruta, newline="", encoding=codificacion, errors="replace") as archivo:
+            lectura = _LECTORES[formato](archivo, self._categoria_por_defecto)
+            return self.importar_lectura(lectura, progreso, desde_linea)
+
+    def importar_lectura(self,
+                         lectura: Iterable[Tuple[int, Union[Fila, ErrorLinea]]],
+                         progreso: Optional[Callable[[ResultadoImportacion], None]] = None,
+                         desde_linea: int = 0) -> ResultadoImportacion:
+        resultado = ResultadoImportacion(ultima_linea=desde_linea)
+        inicio = time.perf_counter()
+        # Los números de línea llegan en orden creciente
+        lectura = dropwhile(lambda leida: leida[0] <= desde_linea, lectura)
+
+        while True:
+            trozo = list(islice(lectura, self._tamano_lote))
+            if not trozo:
+                break
+
+            fechas: List[datetime.date] = []
+            descripciones: List[str] = []
+            centavos: List[int] = []
+            categorias: List[str] = []
+            for numero, fila in trozo:
+                if isinstance(fila, ErrorLinea):
+                    resultado.registrar_error(numero, str(fila))
+                    continue
+                fechas.append(fila[0])
+                descripciones.append(fila[1])
+                centavos.append(fila[2])
+                categorias.append(fila[3])
+
+            resultado.filas_leidas += len(trozo)
+            if fechas:
+                resultado.filas_importadas += self._destino.agregar_columnas(
+                    fechas, descripciones, centavos, categorias)
+            resultado.ultima_linea = trozo[-1][0]
+            resultado.segundos = time.perf_counter() - inicio
+            if progreso is not None:
+                progreso(resultado)
+
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+
+def _imprimir_progreso(resultado: ResultadoImportacion) -> None:
+    print(f"\r{resultado.filas_importadas:>12,} filas  "
+          f"{resultado.filas_por_segundo:>10,.0f} filas/s  "
+          f"{resultado.lineas_invalidas:,} inválidas", end="", flush=True)
+
+
+def main(argumentos: List[str]) -> None:
+    from servicio_transaccion.TransactionFactory import TransaccionFactory
+    from servicio_transaccion.TransactionRepository import TransactionRepository
+    from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+
+    if not argumentos:
+        print(__doc__)
+        return
+    logica = LogicaFinanciera(TransaccionFactory(), TransactionRepository())
+    importador = ImportadorExtractos(logica)
+    for ruta in argumentos:
+        print(ruta)
+        resultado = importador.importar(ruta, progreso=_imprimir_progreso)
+        print()
+        for error in resultado.errores[:10]:
+            print(f"  línea {error.numero}: {error.motivo}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
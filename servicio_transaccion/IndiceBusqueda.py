@@ -0,0 +1,300 @@
+# servicio_transaccion/IndiceBusqueda.py
+"""
+Índice para buscar transacciones por texto mientras se escribe.
+
+Las descripciones se repiten mucho ("Supermercado", "Alquiler"...), así
+que el texto se indexa sobre el vocabulario de descripciones distintas,
+no fila por fila:
+
+- cada descripción normalizada (minúsculas, sin acentos ni signos) tiene
+  un id. Los trigramas de sus palabras apuntan a esos ids y sirven para
+  los términos de 3 letras o más (subcadenas); una lista ordenada de
+  palabras sirve para los de 1 o 2 letras (prefijos de palabra).
+- las transacciones se guardan por grupo (descripción, categoría), cada
+  grupo en un IndiceOrdenado por fecha descendente, como las listas por
+  categoría de TransactionRepository. La categoría tiene su propio
+  índice exacto: categoría normalizada -> grupos.
+
+Una búsqueda recorre el vocabulario, ordena los grupos que coinciden
+por relevancia y solo lee de ellos las filas de la página pedida.
+"""
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from common import metricas
+from common.models.busqueda import ResultadoBusqueda
+from common.models.transaccion import Transaccion
+from common.texto import normalizar
+from common.utils import Observer
+from servicio_transaccion.IndiceOrdenado import (
+    IndiceOrdenado, InstantaneaIndice, VistaFusionada
+)
+
+# (orden de llegada, transacción): a igual fecha, el orden de llegada
+Entrada = Tuple[int, Transaccion]
+
+# Relevancia de un término según dónde aparece en la descripción; la de
+# una descripción es la suma de la de sus términos
+_AL_INICIO = 3
+_INICIO_DE_PALABRA = 2
+_DENTRO_DE_PALABRA = 1
+
+
+def _trigramas(palabras: Iterable[str]) -> Set[str]:
+    return {palabra[i:i + 3] for palabra in palabras for i in range(len(palabra) - 2)}
+
+
+def _relevancia(descripcion: str, termino: str) -> int:
+    if descripcion.startswith(termino):
+        return _AL_INICIO
+    if f" {termino}" in descripcion:
+        return _INICIO_DE_PALABRA
+    return _DENTRO_DE_PALABRA
+
+
+def _clave_entrada(entrada: Entrada) -> int:
+    return -entrada[1].fecha.toordinal()
+
+
+def _clave_fecha_descendente(transaccion: Transaccion) -> int:
+    return -transaccion.fecha.toordinal()
+
+
+@metricas.instrumentar("busqueda")
+class IndiceBusqueda(Observer):
+    """
+    Índice de texto sobre descripción y categoría, al día como Observer
+    de LogicaFinanciera (TRANSACCION_AGREGADA y su evento de lote).
+
+    Un término de la búsqueda coincide con una descripción si aparece
+    dentro de ella (3 letras o más) o si alguna de sus palabras empieza
+    por él (1 o 2 letras); una descripción tiene que coincidir con todos
+    los términos. Los resultados van de la más relevante a la menos (el
+    término al inicio de la descripción, al inicio de una palabra o
+    dentro de una palabra) y, a igual relevancia, en el orden de los
+    repositorios: fecha descendente y luego orden de llegada.
+
+    Concurrencia: las escrituras y la parte de la búsqueda que lee el
+    vocabulario se serializan con un cerrojo (esa parte no depende de
+    la cantidad de transacciones); las filas de la página se leen fuera
+    de él, sobre instantáneas de los grupos.
+    """
+    def __init__(self) -> None:
+        self._cerrojo = threading.Lock()
+        self._vaciar()
+
+    # --- Métodos del Observer ---
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        if event == "TRANSACCION_AGREGADA":
+            self.agregar_lote((data,))
+        elif event == "TRANSACCION_LOTE_AGREGADO":
+            self.agregar_lote(data)
+
+    # --- API ---
+    def agregar_lote(self, transacciones: Iterable[Transaccion]) -> None:
+        with self._cerrojo:
+            # Primero se reparte por (descripción, categoría) tal como llegan;
+            # enumerate ya da los pares (llegada, transacción)
+            por_clave: Dict[Tuple[str, str], List[Entrada]] = {}
+            llegada = self._llegadas
+            for entrada in enumerate(transacciones, llegada):
+                transaccion = entrada[1]
+                clave = (transaccion.descripcion, transaccion.categoria)
+                entradas = por_clave.get(clave)
+                if entradas is None:
+                    entradas = por_clave[clave] = []
+                entradas.append(entrada)
+                llegada += 1
+            self._llegadas = llegada
+            for clave, entradas in por_clave.items():
+                grupo = self._grupo_de.get(clave)
+                if grupo is None:
+                    grupo = self._crear_grupo(*clave)
+                if len(entradas) == 1:
+                    # insertar_lote reconstruye el bloque: para una sola
+                    # fila (lo habitual desde la UI) basta con insertarla
+                    self._grupos[grupo].insertar(entradas[0])
+                else:
+                    self._grupos[grupo].insertar_lote(entradas)
+
+    def reconstruir(self, transacciones: Iterable[Transaccion]) -> None:
+        """Vuelve a indexar desde cero (en el orden de obtener_todas)."""
+        with self._cerrojo:
+            self._vaciar()
+        self.agregar_lote(transacciones)
+
+    def buscar(self,
+               texto: str,
+               categoria: Optional[str] = None,
+               offset: int = 0,
+               limit: int = 50) -> ResultadoBusqueda:
+        """
+        Página [offset, offset + limit) de las transacciones cuya
+        descripción coincide con `texto` y, si se indica, de la
+        categoría `categoria` (sin distinguir mayúsculas ni acentos).
+        Con solo la categoría se devuelven todas las de esa categoría;
+        sin texto ni categoría no hay resultados.
+        """
+        terminos = normalizar(texto).split()
+        with self._cerrojo:
+            niveles = self._niveles(terminos, categoria)
+        total = sum(len(instantanea) for nivel in niveles for instantanea in nivel)
+        return ResultadoBusqueda(total, _pagina(niveles, max(offset, 0), max(limit, 0)))
+
+    def categorias(self) -> List[str]:
+        """Categorías indexadas (tal como se escribieron la primera vez)."""
+        with self._cerrojo:
+            return sorted(self._nombres_categoria.values(), key=normalizar)
+
+    # --- Auxiliares internos ---
+    def _vaciar(self) -> None:
+        # Vocabulario: descripciones normalizadas distintas
+        self._textos: List[str] = []
+        self._id_texto: Dict[str, int] = {}
+        # Descripción tal como llega -> id de su texto normalizado
+        self._texto_de: Dict[str, int] = {}
+        self._trigramas: Dict[str, Set[int]] = defaultdict(set)
+        self._palabras: List[str] = []
+        self._por_palabra: Dict[str, Set[int]] = {}
+        # Grupos (descripción, categoría) y sus transacciones
+        self._grupos: List[IndiceOrdenado[Entrada]] = []
+        self._grupo_de: Dict[Tuple[str, str], int] = {}
+        self._grupos_de_texto: List[List[int]] = []
+        self._por_categoria: Dict[str, Set[int]] = {}
+        self._nombres_categoria: Dict[str, str] = {}
+        self._llegadas = 0
+
+    def _crear_grupo(self, descripcion: str, categoria: str) -> int:
+        texto = self._texto_de.get(descripcion)
+        if texto is None:
+            texto = self._texto_de[descripcion] = self._indexar_texto(normalizar(descripcion))
+        grupo = len(self._grupos)
+        self._grupos.append(IndiceOrdenado(_clave_entrada))
+        self._grupo_de[(descripcion, categoria)] = grupo
+        self._grupos_de_texto[texto].append(grupo)
+
+        nombre = normalizar(categoria)
+        self._por_categoria.setdefault(nombre, set()).add(grupo)
+        self._nombres_categoria.setdefault(nombre, categoria)
+        return grupo
+
+    def _indexar_texto(self, normalizada: str) -> int:
+        texto = self._id_texto.get(normalizada)
+        if texto is not None:
+            return texto
+        texto = self._id_texto[normalizada] = len(self._textos)
+        self._textos.append(normalizada)
+        self._grupos_de_texto.append([])
+        palabras = set(normalizada.split())
+        for trigrama in _trigramas(palabras):
+            self._trigramas[trigrama].add(texto)
+        for palabra in palabras:
+            ids = self._por_palabra.get(palabra)
+            if ids is None:
+                ids = self._por_palabra[palabra] = set()
+                insort(self._palabras, palabra)
+            ids.add(texto)
+        return texto
+
+    def _candidatos(self, termino: str) -> Set[int]:
+        """Ids de las descripciones que coinciden con un término."""
+        if len(termino) >= 3:
+            listas = sorted((self._trigramas.get(t, set()) for t in _trigramas((termino,))),
+                            key=len)
+            ids = listas[0].intersection(*listas[1:])
+            # Los trigramas pueden estar en otro orden: se confirma la subcadena
+            return {i for i in ids if termino in self._textos[i]}
+        # Palabras que empiezan por el término: un tramo de la lista ordenada
+        siguiente = termino[:-1] + chr(ord(termino[-1]) + 1)
+        inicio = bisect_left(self._palabras, termino)
+        fin = bisect_left(self._palabras, siguiente, inicio)
+        ids: Set[int] = set()
+        for palabra in self._palabras[inicio:fin]:
+            ids |= self._por_palabra[palabra]
+        return ids
+
+    def _niveles(self,
+                 terminos: List[str],
+                 categoria: Optional[str]) -> List[List[InstantaneaIndice[Entrada]]]:
+        """
+        Instantáneas de los grupos que coinciden, agrupadas por
+        relevancia (de mayor a menor). Se llama con el cerrojo tomado.
+        """
+        en_categoria = None
+        if categoria is not None:
+            en_categoria = self._por_categoria.get(normalizar(categoria), set())
+        if not terminos:
+            if en_categoria is None:
+                return []
+            return [[self._grupos[g].instantanea() for g in sorted(en_categoria)]]
+
+        candidatos: Optional[Set[int]] = None
+        # Los términos largos suelen ser los más selectivos
+        for termino in sorted(set(terminos), key=len, reverse=True):
+            ids = self._candidatos(termino)
+            candidatos = ids if candidatos is None else candidatos & ids
+            if not candidatos:
+                return []
+
+        por_relevancia: Dict[int, List[int]] = defaultdict(list)
+        for texto in candidatos:
+            descripcion = self._textos[texto]
+            relevancia = sum(_relevancia(descripcion, termino) for termino in terminos)
+            for grupo in self._grupos_de_texto[texto]:
+                if en_categoria is None or grupo in en_categoria:
+                    por_relevancia[relevancia].append(grupo)
+        return [[self._grupos[g].instantanea() for g in grupos]
+                for _, grupos in sorted(por_relevancia.items(), reverse=True)]
+
+
+def _pagina(niveles: List[List[InstantaneaIndice[Entrada]]],
+            offset: int,
+            limit: int) -> List[Transaccion]:
+    """Filas [offset, offset + limit) de los niveles puestos uno tras otro."""
+    pagina: List[Transaccion] = []
+    for instantaneas in niveles:
+        if len(pagina) >= limit:
+            break
+        total = sum(len(instantanea) for instantanea in instantaneas)
+        if offset >= total:
+            offset -= total
+            continue
+        pagina.extend(_pagina_fusionada(instantaneas, offset, limit - len(pagina)))
+        offset = 0
+    return pagina
+
+
+def _pagina_fusionada(instantaneas: List[InstantaneaIndice[Entrada]],
+                      offset: int,
+                      cantidad: int) -> List[Transaccion]:
+    """
+    Filas [offset, offset + cantidad) de la fusión de varios grupos en
+    orden de fecha. Para no fusionar todo lo anterior a `offset`, se
+    busca primero (bisect sobre las fechas) la fecha de la fila
+    `offset` y la fusión empieza en esa fecha: O(G log N) para ubicarla,
+    con G grupos, más lo que se lee.
+    """
+    if len(instantaneas) == 1:
+        return [transaccion for _, transaccion
+                in instantaneas[0].rango(offset, offset + cantidad)]
+
+    desde = [0] * len(instantaneas)
+    if offset:
+        # Menor clave k con más de `offset` filas de clave <= k
+        bajo = min(_clave_entrada(instantanea.vista()[0]) for instantanea in instantaneas)
+        alto = max(_clave_entrada(instantanea.vista()[-1]) for instantanea in instantaneas)
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if sum(i.posicion(medio, derecha=True) for i in instantaneas) > offset:
+                alto = medio
+            else:
+                bajo = medio + 1
+        desde = [instantanea.posicion(bajo) for instantanea in instantaneas]
+        offset -= sum(desde)
+
+    vistas = [instantanea.vista(inicio)
+              for instantanea, inicio in zip(instantaneas, desde)
+              if inicio < len(instantanea)]
+    return VistaFusionada(vistas, _clave_fecha_descendente)[offset:offset + cantidad]
@@ -0,0 +1,344 @@
+# servicio_transaccion/IndiceOrdenado.py
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from heapq import merge
+from itertools import accumulate, islice
+from typing import Callable, Generic, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class VistaOrdenada(Sequence, Generic[T]):
+    """
+    Vista de solo lectura de las posiciones [inicio, fin) de un
+    IndiceOrdenado. No copia elementos: guarda la lista de bloques del
+    momento en que se creó (el índice no modifica en su lugar un bloque
+    compartido con una vista, así que la vista no cambia aunque el
+    índice reciba escrituras).
+    """
+    def __init__(self,
+                 bloques: List[List[T]],
+                 inicios: List[int],
+                 inicio: int,
+                 fin: int) -> None:
+        self._bloques = bloques
+        # Posición global del primer elemento de cada bloque
+        self._inicios = inicios
+        self._inicio = inicio
+        self._fin = max(fin, inicio)
+
+    def __len__(self) -> int:
+        return self._fin - self._inicio
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if paso != 1:
+                return [self[i] for i in range(inicio, fin, paso)]
+            return VistaOrdenada(self._bloques, self._inicios,
+                                 self._inicio + inicio, self._inicio + fin)
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de la vista")
+        posicion = self._inicio + indice
+        b = bisect_right(self._inicios, posicion) - 1
+        return self._bloques[b][posicion - self._inicios[b]]
+
+    def __iter__(self) -> Iterator[T]:
+        if not len(self):
+            return
+        b = bisect_right(self._inicios, self._inicio) - 1
+        restantes = len(self)
+        desde = self._inicio - self._inicios[b]
+        while restantes > 0:
+            parte = self._bloques[b][desde:desde + restantes]
+            yield from parte
+            restantes -= len(parte)
+            b, desde = b + 1, 0
+
+    def __repr__(self) -> str:
+        return f"VistaOrdenada({len(self)} elementos)"
+
+
+class VistaFusionada(Sequence, Generic[T]):
+    """
+    Une varias vistas ordenadas de pares (orden de llegada, elemento)
+    en una sola secuencia ordenada por (clave, orden de llegada). La
+    fusión es perezosa: solo se recorre hasta la posición pedida.
+    """
+    def __init__(self,
+                 vistas: List[Sequence],
+                 clave: Callable[[T], int]) -> None:
+        self._vistas = vistas
+        self._total = sum(len(v) for v in vistas)
+        self._fusion = iter(merge(*vistas, key=lambda par: (clave(par[1]), par[0])))
+        self._recorridos: List[T] = []
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            self._recorrer_hasta(fin if paso > 0 else len(self))
+            return self._recorridos[indice]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de la vista")
+        self._recorrer_hasta(indice + 1)
+        return self._recorridos[indice]
+
+    def __iter__(self) -> Iterator[T]:
+        i = 0
+        while i < self._total:
+            self._recorrer_hasta(i + 1)
+            yield self._recorridos[i]
+            i += 1
+
+    def _recorrer_hasta(self, cantidad: int) -> None:
+        faltan = cantidad - len(self._recorridos)
+        if faltan > 0:
+            self._recorridos.extend(par[1] for par in islice(self._fusion, faltan))
+
+
+class InstantaneaIndice(Generic[T]):
+    """
+    Estado de un IndiceOrdenado en un momento dado: sus bloques, las
+    claves de cada bloque y dónde empieza cada uno. El índice no
+    modifica en su lugar ningún bloque que pertenezca a una instantánea,
+    así que se puede leer desde cualquier hilo, sin cerrojos, mientras
+    el índice sigue recibiendo escrituras.
+    """
+    __slots__ = ("_bloques", "_claves", "_maximos", "_inicios", "_total")
+
+    def __init__(self,
+                 bloques: List[List[T]],
+                 claves: List[List[int]],
+                 maximos: List[int]) -> None:
+        self._bloques = bloques
+        self._claves = claves
+        self._maximos = maximos
+        # Posición global del primer elemento de cada bloque
+        self._inicios = [0, *accumulate(len(b) for b in bloques)]
+        self._total = self._inicios.pop()
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[T]:
+        for bloque in self._bloques:
+            yield from bloque
+
+    def vista(self, inicio: int = 0, fin: Optional[int] = None) -> VistaOrdenada[T]:
+        """Vista de solo lectura de las posiciones [inicio, fin), sin copiar."""
+        fin = self._total if fin is None else min(fin, self._total)
+        return VistaOrdenada(self._bloques, self._inicios, max(inicio, 0), fin)
+
+    def rango(self, inicio: int, fin: int) -> List[T]:
+        """
+        Elementos en las posiciones [inicio, fin). Ubica el primer bloque
+        con bisect y copia solo los elementos pedidos.
+        """
+        inicio, fin = max(inicio, 0), min(fin, self._total)
+        if inicio >= fin:
+            return []
+        return list(self.vista(inicio, fin))
+
+    def posicion(self, k: int, derecha: bool = False) -> int:
+        """
+        Cantidad de elementos con clave < k (o <= k si derecha=True),
+        es decir, dónde empieza (o termina) la clave k. O(log N).
+        """
+        buscar = bisect_right if derecha else bisect_left
+        i = buscar(self._maximos, k)
+        if i >= len(self._bloques):
+            return self._total
+        return self._inicios[i] + buscar(self._claves[i], k)
+
+    def entre(self, minimo: Optional[int], maximo: Optional[int]) -> VistaOrdenada[T]:
+        """Vista de los elementos con minimo <= clave <= maximo (None = sin límite)."""
+        inicio = 0 if minimo is None else self.posicion(minimo)
+        fin = self._total if maximo is None else self.posicion(maximo, derecha=True)
+        return self.vista(inicio, fin)
+
+
+class IndiceOrdenado(Generic[T]):
+    """
+    Lista ordenada por clave, dividida en bloques pequeños.
+
+    Insertar cuesta O(log N + B), donde B es el tamaño del bloque,
+    en lugar de reordenar toda la lista. Los elementos con la misma
+    clave conservan el orden de inserción (orden estable).
+
+    Las lecturas se hacen sobre instantáneas (copy-on-write por bloque).
+    El índice en sí no es seguro entre hilos: quien lo usa debe
+    serializar las escrituras y la creación de instantáneas; las
+    instantáneas ya creadas se leen desde cualquier hilo.
+    """
+    TAMANO_BLOQUE = 512
+
+    def __init__(self, clave: Callable[[T], int]) -> None:
+        self._clave = clave
+        self._bloques: List[List[T]] = []
+        self._claves: List[List[int]] = []
+        # Última (mayor) clave de cada bloque, para ubicar el bloque con bisect
+        self._maximos: List[int] = []
+        self._total = 0
+        # Instantánea vigente (hasta la próxima escritura). Un bloque que
+        # pertenece a una instantánea no se modifica en su lugar: se copia
+        # (junto con sus claves) antes de escribir. `_propios` guarda los
+        # id de los bloques creados después de la última instantánea, que
+        # sí se pueden modificar directamente.
+        self._instantanea: Optional[InstantaneaIndice[T]] = None
+        self._propios: Set[int] = set()
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[T]:
+        for bloque in self._bloques:
+            yield from bloque
+
+    def instantanea(self) -> InstantaneaIndice[T]:
+        """
+        Estado actual como InstantaneaIndice. Cuesta O(N / B) (copia la
+        lista de bloques, no los elementos) y se reutiliza hasta la
+        próxima escritura.
+        """
+        if self._instantanea is None:
+            self._instantanea = InstantaneaIndice(list(self._bloques), list(self._claves),
+                                                  list(self._maximos))
+            self._propios.clear()
+        return self._instantanea
+
+    def rango(self, inicio: int, fin: int) -> List[T]:
+        return self.instantanea().rango(inicio, fin)
+
+    def vista(self, inicio: int = 0, fin: Optional[int] = None) -> VistaOrdenada[T]:
+        """Vista de solo lectura de las posiciones [inicio, fin), sin copiar."""
+        return self.instantanea().vista(inicio, fin)
+
+    def posicion(self, k: int, derecha: bool = False) -> int:
+        return self.instantanea().posicion(k, derecha)
+
+    def entre(self, minimo: Optional[int], maximo: Optional[int]) -> VistaOrdenada[T]:
+        return self.instantanea().entre(minimo, maximo)
+
+    def insertar(self, item: T) -> None:
+        k = self._clave(item)
+        self._instantanea = None
+        if not self._bloques:
+            self._bloques.append([item])
+            self._propios.add(id(self._bloques[0]))
+            self._claves.append([k])
+            self._maximos.append(k)
+            self._total = 1
+            return
+
+        i = min(bisect_right(self._maximos, k), len(self._bloques) - 1)
+        claves = self._claves[i]
+        posicion = bisect_right(claves, k)
+        bloque = self._bloques[i]
+        if id(bloque) in self._propios:
+            claves.insert(posicion, k)
+            bloque.insert(posicion, item)
+        else:
+            claves = self._claves[i] = claves[:posicion] + [k] + claves[posicion:]
+            bloque = self._bloques[i] = bloque[:posicion] + [item] + bloque[posicion:]
+            self._propios.add(id(bloque))
+        self._maximos[i] = claves[-1]
+        self._total += 1
+
+        if len(claves) > 2 * self.TAMANO_BLOQUE:
+            self._dividir(i)
+
+    def reemplazar(self, item: T) -> None:
+        """
+        Cambia el primer elemento con la clave de `item` por `item`, en
+        su misma posición. O(log N), más copiar el bloque si pertenece
+        a una instantánea. KeyError si no hay ninguno con esa clave.
+        """
+        k = self._clave(item)
+        i = bisect_left(self._maximos, k)
+        if i < len(self._bloques):
+            posicion = bisect_left(self._claves[i], k)
+            if self._claves[i][posicion] == k:
+                self._instantanea = None
+                bloque = self._bloques[i]
+                if id(bloque) not in self._propios:
+                    bloque = self._bloques[i] = list(bloque)
+                    self._claves[i] = list(self._claves[i])
+                    self._propios.add(id(bloque))
+                bloque[posicion] = item
+                return
+        raise KeyError(k)
+
+    def insertar_lote(self, items: Iterable[T]) -> int:
+        """
+        Inserta un lote en una sola pasada: se ordena el lote (Timsort es
+        O(M) si ya viene ordenado) y se fusiona solo con los bloques que
+        le corresponden. La clave de cada elemento se calcula una sola vez.
+        """
+        items = list(items)
+        if not items:
+            return 0
+        self._instantanea = None
+        claves_items = list(map(self._clave, items))
+        orden = sorted(range(len(items)), key=claves_items.__getitem__)
+        lote = [items[j] for j in orden]
+        claves_lote = [claves_items[j] for j in orden]
+
+        if not self._bloques:
+            self._reconstruir_desde(0, 0, lote, claves_lote)
+            self._total = len(lote)
+            return len(lote)
+
+        # Cortar el lote por bloque destino (bisect sobre los máximos,
+        # porque tanto el lote como los bloques están ordenados).
+        ultimo = len(self._bloques) - 1
+        cortes = []
+        j = 0
+        while j < len(lote):
+            i = min(bisect_right(self._maximos, claves_lote[j]), ultimo)
+            fin = len(lote) if i == ultimo else bisect_left(claves_lote, self._maximos[i], j)
+            cortes.append((i, j, fin))
+            j = fin
+
+        # Se recorre de atrás hacia adelante para que los índices sigan válidos
+        for i, desde, hasta in reversed(cortes):
+            # sorted es estable: a igual clave quedan primero los existentes
+            claves = self._claves[i] + claves_lote[desde:hasta]
+            elementos = self._bloques[i] + lote[desde:hasta]
+            orden = sorted(range(len(claves)), key=claves.__getitem__)
+            self._reconstruir_desde(i, i + 1,
+                                    [elementos[k] for k in orden],
+                                    [claves[k] for k in orden])
+
+        self._total += len(lote)
+        return len(lote)
+
+    # --- Auxiliares internos ---
+    def _dividir(self, i: int) -> None:
+        self._reconstruir_desde(i, i + 1, self._bloques[i], self._claves[i])
+
+    def _reconstruir_desde(self,
+                           inicio: int,
+                           fin: int,
+                           items: List[T],
+                           claves_items: Optional[List[int]] = None) -> None:
+        """
+        Reemplaza los bloques [inicio, fin) por `items` (ya ordenados),
+        cortados en bloques de TAMANO_BLOQUE.
+        """
+        if claves_items is None:
+            claves_items = [self._clave(item) for item in items]
+        paso = self.TAMANO_BLOQUE
+        bloques = [items[j:j + paso] for j in range(0, len(items), paso)]
+        claves = [claves_items[j:j + paso] for j in range(0, len(items), paso)]
+        self._propios.difference_update(id(b) for b in self._bloques[inicio:fin])
+        self._bloques[inicio:fin] = bloques
+        self._propios.update(id(b) for b in bloques)
+        self._claves[inicio:fin] = claves
+        self._maximos[inicio:fin] = [c[-1] for c in claves]
@@ -0,0 +1,146 @@
+# servicio_transaccion/LibroCuentas.py
+"""
+Libro de varias cuentas particionado por cuenta: cada cuenta es dueña
+de su propio repositorio (su partición), con cualquiera de los backends.
+
+Para los análisis en bloque (resumir o pronosticar todas las cuentas)
+las particiones se entregan como columnas NumPy compactas y agrupadas
+en lotes de varias cuentas, listas para enviarse a un pool de procesos
+sin serializar objetos Transaccion.
+"""
+import re
+from concurrent.futures import Executor
+from functools import partial
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+)
+
+from common.models.transaccion import Transaccion
+from servicio_transaccion.TransactionRepository import ITransactionRepository
+
+# Cuenta que corresponde al repositorio propio del gateway
+CUENTA_PRINCIPAL = "principal"
+
+# Los identificadores se usan también en nombres de archivo (backend sqlite)
+_IDENTIFICADOR_VALIDO = re.compile(r"^[\w.-]+$")
+
+
+def validar_cuenta(cuenta: str) -> str:
+    if not isinstance(cuenta, str) or not _IDENTIFICADOR_VALIDO.match(cuenta):
+        raise ValueError(f"Identificador de cuenta inválido: {cuenta!r}")
+    return cuenta
+
+
+def aplicar_por_cuenta(funcion: Callable[[Any], Any],
+                       lote: Sequence[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    """
+    Aplica `funcion` a las columnas de cada cuenta del lote. Se ejecuta
+    en los procesos del pool: `funcion` debe ser de nivel de módulo.
+    """
+    return [(cuenta, funcion(columnas)) for cuenta, columnas in lote]
+
+
+class LibroCuentas:
+    """
+    Conjunto de particiones, una por cuenta. Las particiones se crean
+    con `crear_particion(cuenta)` la primera vez que se escribe en ellas.
+
+    `version` aumenta con cada escritura hecha a través del libro; las
+    escrituras de la cuenta principal que pasan por LogicaFinanciera no
+    la cambian (esas ya cambian la versión de LogicaFinanciera).
+    """
+    def __init__(self,
+                 crear_particion: Callable[[str], ITransactionRepository],
+                 principal: Optional[ITransactionRepository] = None) -> None:
+        self._crear_particion = crear_particion
+        self._particiones: Dict[str, ITransactionRepository] = {}
+        if principal is not None:
+            self._particiones[CUENTA_PRINCIPAL] = principal
+        self.version = 0
+
+    def __len__(self) -> int:
+        # Total de transacciones de todas las cuentas
+        return sum(len(particion) for particion in self._particiones.values())
+
+    def __contains__(self, cuenta: str) -> bool:
+        return cuenta in self._particiones
+
+    def cuentas(self) -> List[str]:
+        return list(self._particiones)
+
+    def particion(self, cuenta: str, crear: bool = True) -> ITransactionRepository:
+        """
+        Repositorio de la cuenta. Si no existe y `crear` es False,
+        lanza KeyError.
+        """
+        particion = self._particiones.get(cuenta)
+        if particion is None:
+            if not crear:
+                raise KeyError(cuenta)
+            particion = self._particiones[validar_cuenta(cuenta)] = (
+                self._crear_particion(cuenta))
+        return particion
+
+    def agregar(self, cuenta: str, transaccion: Transaccion) -> None:
+        self.particion(cuenta).agregar(transaccion)
+        self.version += 1
+
+    def agregar_lote(self, cuenta: str, transacciones: Iterable[Transaccion]) -> int:
+        agregadas = self.particion(cuenta).agregar_lote(transacciones)
+        self.version += 1
+        return agregadas
+
+    def cerrar(self) -> None:
+        """Cierra las particiones que lo necesitan (p. ej. SQLite o diario)."""
+        for particion in self._particiones.values():
+            cerrar = getattr(particion, "cerrar", None)
+            if cerrar is not None:
+                cerrar()
+
+    # --- Columnas para los análisis en bloque ---
+    def columnas(self, cuenta: str):
+        """
+        ColumnasTransacciones de la cuenta. En el backend columnar son
+        vistas de sus arreglos; en los demás, una copia compacta.
+        """
+        from servicio_transaccion.ColumnarTransactionRepository import ColumnasTransacciones
+
+        particion = self.particion(cuenta, crear=False)
+        columnas = getattr(particion, "columnas", None)
+        if columnas is not None:
+            return columnas()
+        return ColumnasTransacciones.desde_transacciones(particion.obtener_todas())
+
+    def lotes_columnas(self,
+                       cuentas_por_lote: int,
+                       cuentas: Optional[Iterable[str]] = None
+                       ) -> Iterator[List[Tuple[str, Any]]]:
+        """
+        Lotes de (cuenta, columnas) de hasta `cuentas_por_lote` cuentas:
+        cada lote es una sola tarea del pool, así el costo de enviarla
+        se reparte entre varias cuentas.
+        """
+        lote: List[Tuple[str, Any]] = []
+        for cuenta in (self.cuentas() if cuentas is None else cuentas):
+            lote.append((cuenta, self.columnas(cuenta)))
+            if len(lote) >= cuentas_por_lote:
+                yield lote
+                lote = []
+        if lote:
+            yield lote
+
+    def repartir(self,
+                 funcion: Callable[[Any], Any],
+                 ejecutor: Optional[Executor] = None,
+                 cuentas_por_lote: int = 64,
+                 cuentas: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Aplica `funcion(columnas)` a cada cuenta y devuelve
+        {cuenta: resultado}. Con un ejecutor (p. ej. ProcessPoolExecutor)
+        los lotes se reparten entre sus trabajadores; sin él, se
+        calculan en el proceso actual.
+        """
+        tarea = partial(aplicar_por_cuenta, funcion)
+        lotes = self.lotes_columnas(cuentas_por_lote, cuentas)
+        resultados = map(tarea, lotes) if ejecutor is None else ejecutor.map(tarea, lotes)
+        return {cuenta: resultado for lote in resultados for cuenta, resultado in lote}
@@ -0,0 +1,271 @@
+# servicio_transaccion/SqliteTransactionRepository.py
+import datetime
+import sqlite3
+import threading
+from collections.abc import Sequence
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from common import metricas
+from common.models.transaccion import Transaccion, Ingreso, Gasto, tipo_es_ingreso
+from common.models.resumen import ResumenTotales
+
+
+# Los importes se guardan en centavos (INTEGER): SUM es exacto.
+# Los índices incluyen el importe para que las agregaciones por fecha y
+# por categoría se resuelvan leyendo solo el índice (índices de cobertura).
+_ESQUEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS transacciones (
+        id          INTEGER PRIMARY KEY,
+        fecha       INTEGER NOT NULL,
+        descripcion TEXT    NOT NULL,
+        centavos    INTEGER NOT NULL,
+        categoria   TEXT    NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_transacciones_fecha ON transacciones (fecha, centavos)",
+    "CREATE INDEX IF NOT EXISTS idx_transacciones_categoria ON transacciones (categoria, centavos)",
+)
+
+# Bases anteriores guardaban `monto REAL` en unidades: se pasan a centavos
+_MIGRACION_CENTAVOS = (
+    "BEGIN",
+    "DROP INDEX IF EXISTS idx_transacciones_fecha",
+    "DROP INDEX IF EXISTS idx_transacciones_categoria",
+    "ALTER TABLE transacciones RENAME TO transacciones_anterior",
+) + _ESQUEMA + (
+    "INSERT INTO transacciones (id, fecha, descripcion, centavos, categoria) "
+    "SELECT id, fecha, descripcion, CAST(ROUND(monto * 100) AS INTEGER), categoria "
+    "FROM transacciones_anterior",
+    "DROP TABLE transacciones_anterior",
+)
+
+# Sentencias fijas: sqlite3 las prepara una vez y las reutiliza de su caché
+_SQL_INSERTAR = (
+    "INSERT INTO transacciones (fecha, descripcion, centavos, categoria) "
+    "VALUES (?, ?, ?, ?)"
+)
+_SQL_TODAS = (
+    "SELECT fecha, descripcion, centavos, categoria FROM transacciones "
+    "ORDER BY fecha DESC, id ASC"
+)
+_SQL_RANGO = _SQL_TODAS + " LIMIT ? OFFSET ?"
+# Vistas (VistaConsulta): el mayor id y la cantidad de filas que cumplen
+# los filtros, y sus páginas, por posición o a continuación de (fecha, id)
+_SQL_TOPE = "SELECT MAX(id), COUNT(*) FROM transacciones WHERE {filtros}"
+_SQL_PAGINA = (
+    "SELECT fecha, descripcion, centavos, categoria, id FROM transacciones "
+    "WHERE {filtros} AND id <= ? ORDER BY fecha DESC, id ASC LIMIT ? OFFSET ?"
+)
+_SQL_SIGUIENTE = (
+    "SELECT fecha, descripcion, centavos, categoria, id FROM transacciones "
+    "WHERE {filtros} AND id <= ? AND (fecha < ? OR (fecha = ? AND id > ?)) "
+    "ORDER BY fecha DESC, id ASC LIMIT ?"
+)
+_SQL_TOTALES = (
+    "SELECT COUNT(*), "
+    "       COALESCE(SUM(CASE WHEN centavos >= 0 THEN centavos END), 0), "
+    "       COALESCE(SUM(CASE WHEN centavos < 0 THEN centavos END), 0) "
+    "FROM transacciones"
+)
+_SQL_GASTOS_POR_CATEGORIA = (
+    "SELECT categoria, SUM(centavos) FROM transacciones "
+    "WHERE centavos < 0 GROUP BY categoria"
+)
+_SQL_GASTOS_DIARIOS = (
+    "SELECT fecha, -SUM(centavos) FROM transacciones "
+    "WHERE centavos < 0 GROUP BY fecha ORDER BY fecha"
+)
+
+
+def _fila(transaccion: Transaccion) -> Tuple[int, str, int, str]:
+    return (transaccion.fecha.toordinal(), transaccion.descripcion,
+            transaccion.centavos, transaccion.categoria)
+
+
+def _transaccion(fecha: int, descripcion: str, centavos: int, categoria: str) -> Transaccion:
+    clase = Ingreso if centavos >= 0 else Gasto
+    return clase(datetime.date.fromordinal(fecha), descripcion, categoria, centavos=centavos)
+
+
+class VistaConsulta(Sequence):
+    """
+    Resultado perezoso de una consulta al repositorio SQLite, en fecha
+    descendente y orden de llegada. No materializa las filas: al
+    recorrerla se leen por páginas de FILAS_POR_PAGINA, cada una a
+    continuación de la (fecha, id) de la anterior (sin un OFFSET que
+    crece); al indexarla o cortarla se lee solo lo pedido con
+    LIMIT/OFFSET.
+
+    Solo ve las filas con id <= `tope` (el mayor id al crearla): como
+    el repositorio solo agrega filas, es una instantánea consistente
+    aunque lleguen escrituras mientras se recorre.
+    """
+    FILAS_POR_PAGINA = 1000
+
+    def __init__(self,
+                 leer: Callable[[str, List[Any]], List[tuple]],
+                 filtros: str,
+                 parametros: List[Any],
+                 tope: int,
+                 offset: int,
+                 cantidad: int) -> None:
+        self._leer = leer
+        self._filtros = filtros
+        self._parametros = parametros
+        self._tope = tope
+        self._offset = offset
+        self._cantidad = cantidad
+
+    def __len__(self) -> int:
+        return self._cantidad
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fin, paso = indice.indices(len(self))
+            if paso != 1:
+                return [self[i] for i in range(inicio, fin, paso)]
+            return [_transaccion(*fila[:4]) for fila in self._pagina(inicio, fin - inicio)]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice fuera de la vista")
+        return _transaccion(*self._pagina(indice, 1)[0][:4])
+
+    def __iter__(self) -> Iterator[Transaccion]:
+        restantes = self._cantidad
+        filas = self._pagina(0, min(restantes, self.FILAS_POR_PAGINA))
+        while filas:
+            for fila in filas:
+                yield _transaccion(*fila[:4])
+            restantes -= len(filas)
+            if restantes <= 0:
+                return
+            fecha, identificador = filas[-1][0], filas[-1][4]
+            filas = self._leer(_SQL_SIGUIENTE.format(filtros=self._filtros),
+                               [*self._parametros, self._tope, fecha, fecha, identificador,
+                                min(restantes, self.FILAS_POR_PAGINA)])
+
+    def __repr__(self) -> str:
+        return f"VistaConsulta({len(self)} filas)"
+
+    def _pagina(self, inicio: int, cantidad: int) -> List[tuple]:
+        if cantidad <= 0:
+            return []
+        return self._leer(_SQL_PAGINA.format(filtros=self._filtros),
+                          [*self._parametros, self._tope, cantidad, self._offset + inicio])
+
+
+@metricas.instrumentar("repositorio.sqlite")
+class SqliteTransactionRepository:
+    """
+    Repositorio persistente sobre SQLite (modo WAL).
+    Misma interfaz que TransactionRepository; los totales y la serie
+    diaria se calculan en SQL sin materializar las filas.
+
+    La conexión se comparte entre hilos: cada operación la usa en
+    exclusiva (con un cerrojo), así que una lectura nunca ve un lote a
+    medio insertar. obtener_todas y consultar devuelven una VistaConsulta
+    que lee las filas por páginas, también con el cerrojo.
+    """
+    def __init__(self, ruta: str = ":memory:") -> None:
+        self._cerrojo = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("PRAGMA synchronous=NORMAL")
+        columnas = {fila[1] for fila in
+                    self._conexion.execute("PRAGMA table_info(transacciones)")}
+        sentencias = _MIGRACION_CENTAVOS if "monto" in columnas else _ESQUEMA
+        with self._conexion:
+            for sentencia in sentencias:
+                self._conexion.execute(sentencia)
+
+    def __len__(self) -> int:
+        with self._cerrojo:
+            return self._conexion.execute("SELECT COUNT(*) FROM transacciones").fetchone()[0]
+
+    def agregar(self, transaccion: Transaccion) -> None:
+        with self._cerrojo, self._conexion:
+            self._conexion.execute(_SQL_INSERTAR, _fila(transaccion))
+
+    def agregar_lote(self, transacciones: Iterable[Transaccion]) -> int:
+        # Una sola transacción SQL para todo el lote
+        filas = [_fila(t) for t in transacciones]
+        metricas.observar("repositorio.filas_por_lote", len(filas))
+        with self._cerrojo, self._conexion:
+            cursor = self._conexion.executemany(_SQL_INSERTAR, filas)
+        return max(cursor.rowcount, 0)
+
+    def obtener_todas(self) -> VistaConsulta:
+        return self._vista("1", [])
+
+    def obtener_rango(self, inicio: int, cantidad: int) -> List[Transaccion]:
+        with self._cerrojo:
+            filas = self._conexion.execute(_SQL_RANGO, (cantidad, max(inicio, 0))).fetchall()
+        return [_transaccion(*fila) for fila in filas]
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias: Optional[Iterable[str]] = None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> VistaConsulta:
+        """
+        Los filtros y la paginación los resuelve SQLite con los índices
+        por fecha y por categoría; las filas se leen al recorrer la vista.
+        """
+        filtros: List[str] = []
+        parametros: List[Any] = []
+        if desde is not None:
+            filtros.append("fecha >= ?")
+            parametros.append(desde.toordinal())
+        if hasta is not None:
+            filtros.append("fecha <= ?")
+            parametros.append(hasta.toordinal())
+        if categorias is not None:
+            nombres = list(categorias)
+            filtros.append(f"categoria IN ({', '.join('?' * len(nombres))})" if nombres else "0")
+            parametros.extend(nombres)
+        es_ingreso = tipo_es_ingreso(tipo)
+        if es_ingreso is not None:
+            filtros.append("centavos >= 0" if es_ingreso else "centavos < 0")
+
+        return self._vista(" AND ".join(filtros) or "1", parametros, offset, limit)
+
+    # --- Agregaciones resueltas por SQLite ---
+    def resumen_totales(self) -> ResumenTotales:
+        # Las dos consultas bajo el mismo cerrojo: ven los mismos datos
+        with self._cerrojo:
+            cantidad, ingreso_total, gasto_total = (
+                self._conexion.execute(_SQL_TOTALES).fetchone())
+            gastos_por_categoria = dict(self._conexion.execute(_SQL_GASTOS_POR_CATEGORIA))
+        return ResumenTotales(cantidad, ingreso_total, gasto_total, gastos_por_categoria)
+
+    def gastos_diarios(self) -> Tuple[List[int], List[int]]:
+        with self._cerrojo:
+            filas = self._conexion.execute(_SQL_GASTOS_DIARIOS).fetchall()
+        return [dia for dia, _ in filas], [total for _, total in filas]
+
+    # --- Auxiliares internos ---
+    def _vista(self,
+               filtros: str,
+               parametros: List[Any],
+               offset: int = 0,
+               limit: Optional[int] = None) -> VistaConsulta:
+        with self._cerrojo:
+            tope, total = self._conexion.execute(_SQL_TOPE.format(filtros=filtros),
+                                                 parametros).fetchone()
+        offset = max(offset, 0)
+        cantidad = max(total - offset, 0)
+        if limit is not None:
+            cantidad = min(cantidad, max(limit, 0))
+        return VistaConsulta(self._leer, filtros, parametros, tope or 0, offset, cantidad)
+
+    def _leer(self, sql: str, parametros: List[Any]) -> List[tuple]:
+        with self._cerrojo:
+            return self._conexion.execute(sql, parametros).fetchall()
+
+    def cerrar(self) -> None:
+        with self._cerrojo:
+            self._conexion.close()
@@ -1,31 +1,60 @@
 # servicio_transaccion/TransactionFactory.py
-from typing import Protocol
+from typing import List, Protocol, Sequence
 import datetime
+from common.dinero import centavos_desde_entero, centavos_desde_entero_arreglo
 from common.models.transaccion import Transaccion, Ingreso, Gasto
 
 
 class ITransaccionFactory(Protocol):
     """
     Interfaz de la fábrica de transacciones (Factory Method).
+    Los importes llegan en centavos enteros (ver common/dinero.py).
     """
     def crear(self,
             fecha: datetime.date,
             descripcion: str,
-            monto: float,
+            centavos: int,
             categoria: str) -> Transaccion:
         ...
 
+    def crear_lote(self,
+                   fechas: Sequence[datetime.date],
+                   descripciones: Sequence[str],
+                   centavos: Sequence[int],
+                   categorias: Sequence[str]) -> List[Transaccion]:
+        ...
+
 
 class TransaccionFactory(ITransaccionFactory):
     """
     Implementación concreta del Factory Method.
-    Crea Ingreso o Gasto según el monto.
+    Crea Ingreso o Gasto según el signo del importe. Un importe que no
+    sea entero (p. ej. un float en unidades) se rechaza con TypeError.
     """
     def crear(self,
             fecha: datetime.date,
             descripcion: str,
-            monto: float,
+            centavos: int,
             categoria: str) -> Transaccion:
-        if monto >= 0:
-            return Ingreso(fecha, descripcion, monto, categoria)
-        return Gasto(fecha, descripcion, monto, categoria)
+        centavos = centavos_desde_entero(centavos)
+        if centavos >= 0:
+            return Ingreso(fecha, descripcion, categoria, centavos=centavos)
+        return Gasto(fecha, descripcion, categoria, centavos=centavos)
+
+    def crear_lote(self,
+                   fechas: Sequence[datetime.date],
+                   descripciones: Sequence[str],
+                   centavos: Sequence[int],
+                   categorias: Sequence[str]) -> List[Transaccion]:
+        """
+        Crea un lote a partir de columnas paralelas. Acepta listas o
+        arreglos NumPy de enteros (se pasan a int de Python con tolist).
+        """
+        if hasattr(centavos, "tolist"):
+            centavos = centavos_desde_entero_arreglo(centavos).tolist()
+        else:
+            centavos = list(map(centavos_desde_entero, centavos))
+        return [(Ingreso if importe >= 0 else Gasto)(fecha, descripcion, categoria,
+                                                     centavos=importe)
+                for fecha, descripcion, importe, categoria
+                in zip(fechas, descripciones, centavos, categorias)]
@@ -1,21 +1,233 @@
 # servicio_transaccion/TransactionRepository.py
-from typing import List
-from common.models.transaccion import Transaccion
+import datetime
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Protocol, Sequence, Tuple
+from common import metricas
+from common.models.transaccion import Transaccion, tipo_es_ingreso
+from common.models.resumen import ResumenTotales, calcular_gastos_diarios
+from servicio_transaccion.IndiceOrdenado import (
+    IndiceOrdenado, InstantaneaIndice, VistaFusionada
+)
 
 
+class ITransactionRepository(Protocol):
+    """
+    Interfaz común de los repositorios de transacciones.
+    Todas las implementaciones devuelven las filas en orden de fecha
+    descendente (más reciente primero) y se pueden usar desde varios
+    hilos a la vez.
+    """
+    def __len__(self) -> int:
+        ...
+
+    def agregar(self, transaccion: Transaccion) -> None:
+        ...
+
+    def agregar_lote(self, transacciones: Iterable[Transaccion]) -> int:
+        ...
+
+    def obtener_todas(self) -> Sequence[Transaccion]:
+        ...
+
+    def obtener_rango(self, inicio: int, cantidad: int) -> List[Transaccion]:
+        ...
+
+    def resumen_totales(self) -> ResumenTotales:
+        ...
+
+    def gastos_diarios(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """(días con gasto ascendentes, gasto del día en centavos)."""
+        ...
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias: Optional[Iterable[str]] = None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> Sequence[Transaccion]:
+        """
+        Transacciones con fecha en [desde, hasta], de las categorías y
+        el tipo ("ingreso"/"gasto") pedidos, en el orden de obtener_todas
+        y paginadas con offset/limit. None significa sin filtro.
+        """
+        ...
+
+
+def _clave_fecha_descendente(transaccion: Transaccion) -> int:
+    # Clave negativa: el índice ordena ascendente y queremos la más reciente primero
+    return -transaccion.fecha.toordinal()
+
+
+def _clave_entrada(entrada: Tuple[int, Transaccion]) -> int:
+    return -entrada[1].fecha.toordinal()
+
+
+def _claves_ventana(desde: Optional[datetime.date],
+                    hasta: Optional[datetime.date]) -> Tuple[Optional[int], Optional[int]]:
+    # Con la clave negada, "hasta" (la fecha más reciente) es la clave menor
+    return (None if hasta is None else -hasta.toordinal(),
+            None if desde is None else -desde.toordinal())
+
+
+def _paginar(filas: Sequence[Transaccion],
+             offset: int,
+             limit: Optional[int]) -> Sequence[Transaccion]:
+    offset = max(offset, 0)
+    return filas[offset:] if limit is None else filas[offset:offset + max(limit, 0)]
+
+
+class _Lectura(NamedTuple):
+    """
+    Estado publicado para los lectores: instantáneas del índice principal
+    y, si ya se pidieron, de las listas por categoría, todas de la misma
+    versión de los datos.
+    """
+    transacciones: InstantaneaIndice[Transaccion]
+    por_categoria: Optional[Dict[Tuple[str, bool], InstantaneaIndice[Tuple[int, Transaccion]]]]
+
+
+@metricas.instrumentar("repositorio.memoria")
 class TransactionRepository:
     """
     Repositorio en memoria para almacenar transacciones.
     Si más adelante quieres persistencia en BD, se cambia aquí.
+
+    Las transacciones se guardan en un índice ordenado por fecha
+    descendente (más reciente primero); a igual fecha se respeta
+    el orden de inserción. Para las consultas filtradas hay además una
+    lista por (categoría, tipo) con el mismo orden; se crea con la
+    primera consulta que la necesita y desde ahí se mantiene al día.
+
+    Concurrencia: las escrituras se serializan con un cerrojo. Las
+    lecturas usan el último estado publicado (instantáneas inmutables
+    de los índices) sin tomar el cerrojo; solo la primera lectura
+    después de una escritura lo toma para publicar uno nuevo, lo que
+    cuesta O(N / B) (se copian listas de bloques, no transacciones).
+    Un lector nunca ve una escritura a medias y nunca frena al
+    escritor mientras recorre los datos.
     """
     def __init__(self) -> None:
-        self._transacciones: List[Transaccion] = []
+        self._transacciones: IndiceOrdenado[Transaccion] = IndiceOrdenado(
+            _clave_fecha_descendente
+        )
+        # (categoría, es_ingreso) -> pares (orden de llegada, transacción)
+        self._por_categoria: Optional[
+            Dict[Tuple[str, bool], IndiceOrdenado[Tuple[int, Transaccion]]]] = None
+        self._llegadas = 0
+        self._cerrojo = threading.Lock()
+        # None tras cada escritura: el próximo lector publica uno nuevo
+        self._publicado: Optional[_Lectura] = None
+
+    def __len__(self) -> int:
+        return len(self._transacciones)
 
     def agregar(self, transaccion: Transaccion) -> None:
-        self._transacciones.append(transaccion)
-        # Ordenar por fecha descendente (más reciente primero)
-        self._transacciones.sort(key=lambda t: t.fecha, reverse=True)
+        with self._cerrojo:
+            self._transacciones.insertar(transaccion)
+            if self._por_categoria is not None:
+                clave = (transaccion.categoria, transaccion.es_ingreso())
+                self._lista_categoria(clave).insertar((self._llegadas, transaccion))
+            self._llegadas += 1
+            self._publicado = None
+
+    def agregar_lote(self, transacciones: Iterable[Transaccion]) -> int:
+        """
+        Agrega varias transacciones de una vez. Si el lote ya viene
+        ordenado por fecha, la fusión se hace en una sola pasada.
+        Devuelve la cantidad de transacciones agregadas.
+        """
+        lote = list(transacciones)
+        metricas.observar("repositorio.filas_por_lote", len(lote))
+        with self._cerrojo:
+            if self._por_categoria is not None:
+                self._indexar_categorias(enumerate(lote, start=self._llegadas))
+            self._llegadas += len(lote)
+            agregadas = self._transacciones.insertar_lote(lote)
+            self._publicado = None
+        return agregadas
+
+    def obtener_todas(self) -> Sequence[Transaccion]:
+        # Vista de solo lectura: no copia la lista interna
+        return self._lectura().transacciones.vista()
+
+    def obtener_rango(self, inicio: int, cantidad: int) -> List[Transaccion]:
+        """
+        Página de transacciones (en el mismo orden que obtener_todas)
+        sin copiar el resto del repositorio.
+        """
+        inicio = max(inicio, 0)
+        return self._lectura().transacciones.rango(inicio, inicio + cantidad)
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias: Optional[Iterable[str]] = None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> Sequence[Transaccion]:
+        """
+        La ventana de fechas se ubica con bisect (O(log N)); los filtros
+        de categoría y tipo eligen las listas por categoría que aplican y
+        se fusionan de forma perezosa. No se recorre el resto del historial.
+        """
+        minimo, maximo = _claves_ventana(desde, hasta)
+        es_ingreso = tipo_es_ingreso(tipo)
+        if categorias is None and es_ingreso is None:
+            return _paginar(self._lectura().transacciones.entre(minimo, maximo), offset, limit)
+
+        nombres = None if categorias is None else set(categorias)
+        vistas = [indice.entre(minimo, maximo)
+                  for (categoria, ingreso), indice
+                  in self._lectura(con_categorias=True).por_categoria.items()
+                  if (nombres is None or categoria in nombres)
+                  and (es_ingreso is None or ingreso == es_ingreso)]
+        return _paginar(VistaFusionada([v for v in vistas if len(v)], _clave_fecha_descendente),
+                       offset, limit)
+
+    # --- Agregaciones (recorren la instantánea sin copiarla) ---
+    def resumen_totales(self) -> ResumenTotales:
+        return ResumenTotales.desde_transacciones(self._lectura().transacciones)
+
+    def gastos_diarios(self) -> Tuple[List[int], List[int]]:
+        return calcular_gastos_diarios(self._lectura().transacciones)
+
+    # --- Auxiliares internos ---
+    def _lectura(self, con_categorias: bool = False) -> _Lectura:
+        lectura = self._publicado
+        if lectura is None or (con_categorias and lectura.por_categoria is None):
+            with self._cerrojo, metricas.cronometro("repositorio.memoria.publicar"):
+                lectura = self._publicar(con_categorias)
+        return lectura
+
+    def _publicar(self, con_categorias: bool) -> _Lectura:
+        # Se llama con el cerrojo tomado: nadie escribe mientras tanto
+        lectura = self._publicado
+        if lectura is None:
+            lectura = _Lectura(self._transacciones.instantanea(), None)
+        if con_categorias and lectura.por_categoria is None:
+            if self._por_categoria is None:
+                # A igual fecha, la posición en el índice respeta el orden de llegada
+                self._por_categoria = {}
+                with metricas.cronometro("repositorio.memoria.indexar_categorias"):
+                    self._indexar_categorias(enumerate(self._transacciones))
+            lectura = lectura._replace(por_categoria={
+                clave: indice.instantanea() for clave, indice in self._por_categoria.items()})
+        self._publicado = lectura
+        return lectura
+
+    def _indexar_categorias(self, entradas: Iterable[Tuple[int, Transaccion]]) -> None:
+        grupos: Dict[Tuple[str, bool], List[Tuple[int, Transaccion]]] = defaultdict(list)
+        for llegada, transaccion in entradas:
+            grupos[(transaccion.categoria, transaccion.es_ingreso())].append(
+                (llegada, transaccion))
+        for clave, grupo in grupos.items():
+            self._lista_categoria(clave).insertar_lote(grupo)
 
-    def obtener_todas(self) -> List[Transaccion]:
-        # Se devuelve una copia para evitar modificar la lista interna.
-        return list(self._transacciones)
+    def _lista_categoria(self,
+                         clave: Tuple[str, bool]) -> IndiceOrdenado[Tuple[int, Transaccion]]:
+        indice = self._por_categoria.get(clave)
+        if indice is None:
+            indice = self._por_categoria[clave] = IndiceOrdenado(_clave_entrada)
+        return indice
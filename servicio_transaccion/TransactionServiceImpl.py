@@ -1,12 +1,16 @@
 # servicio_transaccion/TransactionServiceImpl.py
-from typing import List
+from typing import Iterable, List, Optional, Sequence, Tuple
 import datetime
-import numpy as np
+import random
 
+from common.dinero import Importe, centavos_desde_unidades
 from common.models.transaccion import Transaccion
 from common.utils import Subject
 from servicio_transaccion.TransactionFactory import ITransaccionFactory
-from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionRepository import ITransactionRepository
+
+# Semilla de los datos de ejemplo: los mismos importes en cada arranque
+SEMILLA_DATOS_EJEMPLO = 2024
 
 
 class LogicaFinanciera(Subject):
@@ -14,67 +18,124 @@ class LogicaFinanciera(Subject):
     Servicio de transacciones (microservicio de dominio).
     Hereda de Subject para notificar cambios (Observer).
     """
+    EVENTOS_LOTE = {"TRANSACCION_AGREGADA": "TRANSACCION_LOTE_AGREGADO"}
+
     def __init__(self,
                  factory: ITransaccionFactory,
-                 repository: TransactionRepository) -> None:
+                 repository: ITransactionRepository,
+                 datos_ejemplo: bool = True) -> None:
         super().__init__()
         self._factory = factory
         self._repository = repository
-        self._cargar_datos_ejemplo()
+        # Aumenta con cada escritura; permite detectar resultados desactualizados
+        self._version = 0
+        # Un repositorio persistente ya trae sus datos: no se repiten los de
+        # ejemplo. Una réplica de otro servicio (datos_ejemplo=False) arranca vacía.
+        if datos_ejemplo and not len(self._repository):
+            self._cargar_datos_ejemplo()
 
     # --- Datos de ejemplo (igual que en el monolito) ---
     def _cargar_datos_ejemplo(self) -> None:
         fecha_base = datetime.date.today() - datetime.timedelta(days=90)
+        aleatorio = random.Random(SEMILLA_DATOS_EJEMPLO)
+        filas = []
         for i in range(3):
             desplazamiento_mes = i * 30
-            self.agregar_transaccion(
-                fecha_base + datetime.timedelta(days=desplazamiento_mes + 1),
-                "Salario Mensual",
-                2500,
-                "Ingreso"
-            )
-            self.agregar_transaccion(
-                fecha_base + datetime.timedelta(days=desplazamiento_mes + 2),
-                "Alquiler",
-                -1200,
-                "Vivienda"
-            )
-            self.agregar_transaccion(
-                fecha_base + datetime.timedelta(days=desplazamiento_mes + 5),
-                "Supermercado",
-                float(-150 - np.random.rand() * 20),
-                "Alimentación"
-            )
-            self.agregar_transaccion(
-                fecha_base + datetime.timedelta(days=desplazamiento_mes + 10),
-                "Transporte",
-                float(-50 - np.random.rand() * 10),
-                "Transporte"
-            )
-            self.agregar_transaccion(
-                fecha_base + datetime.timedelta(days=desplazamiento_mes + 15),
-                "Restaurante",
-                float(-75 - np.random.rand() * 30),
-                "Ocio"
-            )
+            filas.extend([
+                (fecha_base + datetime.timedelta(days=desplazamiento_mes + 1),
+                 "Salario Mensual", 250_000, "Ingreso"),
+                (fecha_base + datetime.timedelta(days=desplazamiento_mes + 2),
+                 "Alquiler", -120_000, "Vivienda"),
+                (fecha_base + datetime.timedelta(days=desplazamiento_mes + 5),
+                 "Supermercado", centavos_desde_unidades(-150 - aleatorio.random() * 20), "Alimentación"),
+                (fecha_base + datetime.timedelta(days=desplazamiento_mes + 10),
+                 "Transporte", centavos_desde_unidades(-50 - aleatorio.random() * 10), "Transporte"),
+                (fecha_base + datetime.timedelta(days=desplazamiento_mes + 15),
+                 "Restaurante", centavos_desde_unidades(-75 - aleatorio.random() * 30), "Ocio"),
+            ])
+        self.agregar_lote(filas)
 
     # --- API del microservicio ---
     def agregar_transaccion(self,
                             fecha: datetime.date,
                             descripcion: str,
-                            monto: float,
+                            monto: Importe,
                             categoria: str) -> bool:
-        transaccion = self._factory.crear(fecha, descripcion, monto, categoria)
+        """
+        Agrega una transacción con el importe en unidades (50, 12.34 o
+        "12.34"); se convierte a centavos una sola vez, aquí.
+        """
+        return self.agregar_transaccion_centavos(fecha, descripcion,
+                                                 centavos_desde_unidades(monto), categoria)
+
+    def agregar_transaccion_centavos(self,
+                                     fecha: datetime.date,
+                                     descripcion: str,
+                                     centavos: int,
+                                     categoria: str) -> bool:
+        """
+        Agrega una transacción con el importe ya en centavos enteros
+        (-5000 es un gasto de 50.00). Un float se rechaza con TypeError;
+        para importes en unidades está agregar_transaccion.
+        """
+        transaccion = self._factory.crear(fecha, descripcion, centavos, categoria)
         self._repository.agregar(transaccion)
+        self._version += 1
 
         # Notificamos a los observadores (UI) que hubo un cambio
         self.notify("TRANSACCION_AGREGADA", transaccion)
         return True
 
+    def agregar_lote(self,
+                     filas: Iterable[Tuple[datetime.date, str, int, str]]) -> int:
+        """
+        Agrega un lote de filas (fecha, descripcion, centavos, categoria)
+        con una sola inserción en el repositorio. Los observadores que
+        agrupan reciben un único TRANSACCION_LOTE_AGREGADO.
+        """
+        columnas = tuple(zip(*filas)) or ((), (), (), ())
+        return self.agregar_columnas(*columnas)
+
+    def agregar_columnas(self,
+                         fechas: Sequence[datetime.date],
+                         descripciones: Sequence[str],
+                         centavos: Sequence[int],
+                         categorias: Sequence[str]) -> int:
+        """
+        Igual que agregar_lote, pero con los datos ya separados por
+        columnas (así llegan del importador de extractos).
+        """
+        transacciones = self._factory.crear_lote(fechas, descripciones, centavos, categorias)
+        cantidad = self._repository.agregar_lote(transacciones)
+        self._version += 1
+
+        self.notify_lote("TRANSACCION_AGREGADA", transacciones)
+        return cantidad
+
+    @property
+    def version(self) -> int:
+        return self._version
+
     def obtener_transacciones(self) -> List[Transaccion]:
         return self._repository.obtener_todas()
 
+    def contar_transacciones(self) -> int:
+        return len(self._repository)
+
+    def obtener_pagina(self, inicio: int, cantidad: int) -> List[Transaccion]:
+        return self._repository.obtener_rango(inicio, cantidad)
+
+    def consultar(self,
+                  desde: Optional[datetime.date] = None,
+                  hasta: Optional[datetime.date] = None,
+                  categorias: Optional[Iterable[str]] = None,
+                  tipo: Optional[str] = None,
+                  offset: int = 0,
+                  limit: Optional[int] = None) -> Sequence[Transaccion]:
+        """Consulta filtrada y paginada (vista de solo lectura, sin copiar)."""
+        return self._repository.consultar(desde, hasta, categorias, tipo, offset, limit)
+
     # Acceso al repositorio (para otros microservicios, como reporte/predicción)
     @property
-    def repository(self) -> TransactionRepository:
+    def repository(self) -> ITransactionRepository:
         return self._repository
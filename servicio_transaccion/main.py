@@ -0,0 +1,139 @@
+# servicio_transaccion/main.py
+"""
+Servicio de transacciones como servidor HTTP (asyncio) en localhost.
+
+Rutas (cuerpos y respuestas en JSON; filas [fecha ISO, descripción,
+centavos, categoría]):
+
+    GET  /version                  {"version", "cantidad"}
+    POST /transacciones            una fila -> {"version"}
+    POST /transacciones/lote       {"filas": [...]} -> {"agregadas", "version"}
+    GET  /transacciones            ?offset&limit: página en fecha descendente
+    GET  /transacciones/consulta   ?desde&hasta&categorias (separadas por
+                                   comas)&tipo&offset&limit
+    GET  /transacciones/busqueda   ?texto&categoria&offset&limit -> {"total", "filas"}
+    GET  /categorias               categorías de las transacciones
+    GET  /cambios                  ?desde&limit: registro de cambios para las
+                                   réplicas -> {"filas", "total"}
+
+Uso:
+    python -m servicio_transaccion.main [--puerto 8101] [--backend memoria] [--ruta ...]
+"""
+import argparse
+import logging
+import threading
+from typing import Any, List, Optional
+from urllib.parse import urlsplit
+
+from common import config, metricas
+from common.models.transaccion import Transaccion
+from common.servicio_http import ServidorHttp, entero, fecha
+from common.utils import Observer
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+from servicio_transaccion.ClienteTransacciones import filas_desde_json, filas_json
+
+
+class RegistroCambios(Observer):
+    """
+    Lista de las transacciones en el orden en que se escribieron (las
+    que ya había al arrancar van primero). Las réplicas de los demás
+    servicios la leen desde la última posición que conocen.
+    """
+    def __init__(self, existentes: List[Transaccion]) -> None:
+        self._transacciones = list(existentes)
+        self._cerrojo = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._transacciones)
+
+    def update(self, event: str, data: Optional[Any] = None) -> None:
+        with self._cerrojo:
+            if event == "TRANSACCION_LOTE_AGREGADO":
+                self._transacciones.extend(data)
+            elif event == "TRANSACCION_AGREGADA":
+                self._transacciones.append(data)
+
+    def leer(self, desde: int, limite: int) -> List[Transaccion]:
+        with self._cerrojo:
+            return self._transacciones[desde:desde + limite]
+
+
+def crear_servidor(gateway: FinanzasGateway) -> ServidorHttp:
+    servidor = ServidorHttp("servicio_transaccion")
+    registro = RegistroCambios(gateway.obtener_transacciones())
+    gateway.logica_financiera.attach(registro, agrupar=True)
+
+    @servidor.ruta("GET", "/version")
+    def version(consulta, cuerpo):
+        return {"version": gateway.version, "cantidad": gateway.contar_transacciones()}
+
+    @servidor.ruta("POST", "/transacciones", en_hilo=True)
+    def agregar(consulta, cuerpo):
+        gateway.agregar_transaccion_centavos(*filas_desde_json([cuerpo])[0])
+        return {"version": gateway.version}
+
+    @servidor.ruta("POST", "/transacciones/lote", en_hilo=True)
+    def agregar_lote(consulta, cuerpo):
+        agregadas = gateway.agregar_lote(filas_desde_json(cuerpo["filas"]))
+        return {"agregadas": agregadas, "version": gateway.version}
+
+    @servidor.ruta("GET", "/transacciones")
+    def pagina(consulta, cuerpo):
+        return filas_json(gateway.obtener_pagina(entero(consulta.get("offset"), 0),
+                                                 entero(consulta.get("limit"), 50)))
+
+    @servidor.ruta("GET", "/transacciones/consulta")
+    def consultar(consulta, cuerpo):
+        categorias = consulta.get("categorias")
+        return filas_json(gateway.consultar(
+            fecha(consulta.get("desde")), fecha(consulta.get("hasta")),
+            categorias.split(",") if categorias is not None else None,
+            consulta.get("tipo"), entero(consulta.get("offset"), 0),
+            entero(consulta.get("limit"))))
+
+    @servidor.ruta("GET", "/transacciones/busqueda")
+    def buscar(consulta, cuerpo):
+        resultado = gateway.buscar(consulta.get("texto", ""), consulta.get("categoria"),
+                                   entero(consulta.get("offset"), 0),
+                                   entero(consulta.get("limit"), 50))
+        return {"total": resultado.total, "filas": filas_json(resultado.transacciones)}
+
+    @servidor.ruta("GET", "/categorias")
+    def categorias(consulta, cuerpo):
+        return gateway.obtener_categorias()
+
+    @servidor.ruta("GET", "/cambios")
+    def cambios(consulta, cuerpo):
+        desde = max(entero(consulta.get("desde"), 0), 0)
+        limite = entero(consulta.get("limit"), config.FILAS_POR_PAGINA_HTTP)
+        filas = filas_json(registro.leer(desde, limite))
+        # El total se toma después de leer: nunca queda por detrás de las filas
+        return {"filas": filas, "total": len(registro)}
+
+    return servidor
+
+
+def main(argumentos: Optional[List[str]] = None) -> None:
+    url = urlsplit(config.URL_SERVICIO_TRANSACCION)
+    parser = argparse.ArgumentParser(description="Servicio de transacciones (HTTP)")
+    parser.add_argument("--host", default=url.hostname)
+    parser.add_argument("--puerto", type=int, default=url.port)
+    parser.add_argument("--backend", default=config.BACKEND_REPOSITORIO)
+    parser.add_argument("--ruta", default=None,
+                        help="base SQLite o directorio del diario")
+    metricas.agregar_opciones(parser)
+    opciones = parser.parse_args(argumentos)
+    metricas.aplicar_opciones(opciones)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+
+    gateway = FinanzasGateway(crear_repositorio(opciones.backend, opciones.ruta))
+    # El índice de búsqueda se construye mientras el servidor arranca
+    gateway.preparar_busqueda()
+    try:
+        crear_servidor(gateway).servir(opciones.host, opciones.puerto)
+    finally:
+        gateway.cerrar()
+
+
+if __name__ == "__main__":
+    main()
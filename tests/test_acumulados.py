@@ -0,0 +1,61 @@
+# tests/test_acumulados.py
+"""
+Tablas de totales por día, mes y año: las claves quedan ordenadas
+aunque las transacciones lleguen sin orden, y los resúmenes por rango
+coinciden con sumar las transacciones a mano.
+"""
+import datetime
+import random
+
+from common.acumulados import (
+    ANUAL, DIARIO, MENSUAL, AcumuladosTemporales, clave_dia, clave_mes
+)
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+
+CATEGORIAS = ("Alimentación", "Transporte", "Ocio")
+PRIMER_DIA = datetime.date(2022, 1, 1).toordinal()
+
+
+def _generar(cantidad: int, semilla: int):
+    aleatorio = random.Random(semilla)
+    fabrica = TransaccionFactory()
+    return [fabrica.crear(datetime.date.fromordinal(PRIMER_DIA + aleatorio.randrange(730)),
+                          f"t-{i}", aleatorio.randint(-20_000, 20_000),
+                          aleatorio.choice(CATEGORIAS))
+            for i in range(cantidad)]
+
+
+def test_claves_ordenadas_en_cualquier_orden_de_llegada():
+    transacciones = _generar(2_000, 1)
+    en_orden = AcumuladosTemporales()
+    en_orden.reconstruir(sorted(transacciones, key=lambda t: t.fecha))
+    sin_orden = AcumuladosTemporales()
+    sin_orden.reconstruir(transacciones)
+
+    dias = sorted({clave_dia(t.fecha) for t in transacciones})
+    assert sin_orden._tablas[DIARIO].claves == en_orden._tablas[DIARIO].claves == dias
+    assert sin_orden._tablas[ANUAL].claves == [2022, 2023]
+    assert sin_orden.gastos_diarios() == en_orden.gastos_diarios()
+
+    # Una clave anterior a la última después de una lectura también se ordena
+    antigua = TransaccionFactory().crear(datetime.date(2021, 6, 1), "antigua", -100, "Ocio")
+    sin_orden.update("TRANSACCION_AGREGADA", antigua)
+    assert sin_orden._tablas[MENSUAL].claves[0] == clave_mes(antigua.fecha)
+    assert sin_orden.cantidad() == len(transacciones) + 1
+
+
+def test_resumen_por_rango_coincide_con_sumar_a_mano():
+    transacciones = _generar(1_000, 2)
+    acumulados = AcumuladosTemporales()
+    acumulados.update("TRANSACCION_LOTE_AGREGADO", transacciones)
+
+    desde, hasta = datetime.date(2022, 3, 1), datetime.date(2022, 8, 31)
+    en_rango = [t for t in transacciones if desde <= t.fecha <= hasta]
+    resumen = acumulados.resumen(DIARIO, clave_dia(desde), clave_dia(hasta))
+    assert resumen.cantidad == len(en_rango)
+    assert resumen.ingreso_centavos == sum(t.centavos for t in en_rango if t.es_ingreso())
+    assert resumen.gasto_centavos == sum(t.centavos for t in en_rango if not t.es_ingreso())
+
+    periodos = acumulados.resumen_por_periodo(MENSUAL, clave_mes(desde), clave_mes(hasta))
+    assert [clave for clave, _ in periodos] == list(range(clave_mes(desde), clave_mes(hasta) + 1))
+    assert sum(totales.cantidad for _, totales in periodos) == len(en_rango)
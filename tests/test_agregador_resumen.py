@@ -0,0 +1,60 @@
+# tests/test_agregador_resumen.py
+"""
+Los totales incrementales de AgregadorResumen deben ser exactamente los
+de un recálculo completo, con inserciones sueltas, lotes y columnas.
+"""
+import datetime
+import random
+
+import pytest
+
+from servicio_reporte.AgregadorResumen import AgregadorResumen
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+
+CATEGORIAS = ("Alimentación", "Transporte", "Ocio", "Ingreso", "Vivienda")
+
+
+def _fila(aleatorio: random.Random):
+    return (datetime.date(2020, 1, 1) + datetime.timedelta(days=aleatorio.randrange(1500)),
+            f"Movimiento {aleatorio.randrange(50)}",
+            aleatorio.randint(-500_000, 500_000),
+            aleatorio.choice(CATEGORIAS))
+
+
+@pytest.mark.parametrize("agrupar", [False, True])
+@pytest.mark.parametrize("semilla", range(5))
+def test_totales_incrementales_igual_a_recalculo(semilla, agrupar):
+    aleatorio = random.Random(semilla)
+    repositorio = TransactionRepository()
+    logica = LogicaFinanciera(TransaccionFactory(), repositorio, datos_ejemplo=False)
+    agregador = AgregadorResumen()
+    logica.attach(agregador, agrupar=agrupar)
+
+    for _ in range(200):
+        operacion = aleatorio.random()
+        if operacion < 0.5:
+            logica.agregar_transaccion_centavos(*_fila(aleatorio))
+        elif operacion < 0.8:
+            logica.agregar_lote([_fila(aleatorio) for _ in range(aleatorio.randrange(30))])
+        else:
+            filas = [_fila(aleatorio) for _ in range(aleatorio.randrange(1, 30))]
+            logica.agregar_columnas(*zip(*filas))
+
+    assert agregador.totales() == repositorio.resumen_totales()
+    assert agregador.es_consistente(repositorio.obtener_todas())
+
+
+def test_arranca_desde_totales_existentes():
+    aleatorio = random.Random(7)
+    repositorio = TransactionRepository()
+    logica = LogicaFinanciera(TransaccionFactory(), repositorio, datos_ejemplo=False)
+    logica.agregar_lote([_fila(aleatorio) for _ in range(100)])
+
+    agregador = AgregadorResumen(repositorio.resumen_totales())
+    logica.attach(agregador, agrupar=True)
+    logica.agregar_lote([_fila(aleatorio) for _ in range(100)])
+    logica.agregar_transaccion_centavos(*_fila(aleatorio))
+
+    assert agregador.totales() == repositorio.resumen_totales()
@@ -0,0 +1,288 @@
+# tests/test_concurrencia.py
+"""
+Repositorios y Subject con varios hilos a la vez:
+
+- cada lectura ve una versión consistente: la vista completa está en
+  fecha descendente, su largo coincide con lo que se recorre, nunca
+  retrocede respecto a la lectura anterior del mismo hilo y los totales
+  del resumen cuadran entre sí;
+- consultar con filtros devuelve solo filas que los cumplen;
+- al final están todas las filas escritas, sin pérdidas ni duplicados;
+- Subject.notify desde varios hilos: cada evento llega una sola vez,
+  un observador nunca recibe dos a la vez y cada batch() agrupa solo
+  los eventos de su hilo;
+- en el gateway, una escritura no espera a un cálculo en curso ni a
+  que se construya un índice, y lo escrito mientras tanto no se pierde.
+"""
+import datetime
+import random
+import threading
+import time
+from typing import Callable, Iterator, List
+
+import pytest
+
+from common.models.transaccion import Transaccion
+from common.utils import Subject
+from gateway.AppGraficaFinanzas.main import FinanzasGateway, crear_repositorio
+from servicio_transaccion.ColumnarTransactionRepository import ColumnarTransactionRepository
+from servicio_transaccion.DiarioTransactionRepository import DiarioTransactionRepository
+from servicio_transaccion.IndiceBusqueda import IndiceBusqueda
+from servicio_transaccion.SqliteTransactionRepository import SqliteTransactionRepository
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+CATEGORIAS = ("Alimentación", "Transporte", "Ocio", "Vivienda", "Salud")
+PRIMER_DIA = datetime.date(2015, 1, 1).toordinal()
+HASTA = datetime.date(2024, 12, 31)
+DESDE = HASTA - datetime.timedelta(days=89)
+FILAS_INICIALES = 2_000
+ESCRITORES = 2
+LECTORES = 4
+ESCRITURAS = 1_000
+
+
+def _generar(cantidad: int, prefijo: str, semilla: int) -> Iterator[Transaccion]:
+    """Transacciones al azar con descripción única."""
+    aleatorio = random.Random(semilla)
+    fabrica = TransaccionFactory()
+    for i in range(cantidad):
+        yield fabrica.crear(datetime.date.fromordinal(PRIMER_DIA + aleatorio.randrange(3650)),
+                            f"{prefijo}-{i}", aleatorio.randint(-50_000, 50_000),
+                            aleatorio.choice(CATEGORIAS))
+
+
+def _en_hilos(objetivos: List[Callable[[], None]]) -> None:
+    hilos = [threading.Thread(target=objetivo) for objetivo in objetivos]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+
+# --- Repositorios ---
+
+@pytest.fixture(params=["memoria", "columnar", "sqlite", "diario"])
+def repositorio(request, tmp_path):
+    if request.param == "memoria":
+        creado = TransactionRepository()
+    elif request.param == "columnar":
+        creado = ColumnarTransactionRepository()
+    elif request.param == "sqlite":
+        creado = SqliteTransactionRepository()
+    else:
+        creado = DiarioTransactionRepository(str(tmp_path / "diario"))
+    yield creado
+    cerrar = getattr(creado, "cerrar", None)
+    if cerrar is not None:
+        cerrar()
+
+
+def test_lectores_y_escritores_concurrentes(repositorio):
+    repositorio.agregar_lote(list(_generar(FILAS_INICIALES, "inicial", 1)))
+    errores: List[str] = []
+    terminados = threading.Event()
+
+    def escribir(hilo: int) -> None:
+        lote = list(_generar(ESCRITURAS, f"h{hilo}", 100 + hilo))
+        i = 0
+        while i < len(lote):
+            # Se alternan escrituras sueltas y lotes pequeños
+            if i % 100 < 50:
+                repositorio.agregar(lote[i])
+                i += 1
+            else:
+                repositorio.agregar_lote(lote[i:i + 50])
+                i += 50
+
+    def leer() -> None:
+        anterior = 0
+        try:
+            while not terminados.is_set():
+                vista = repositorio.obtener_todas()
+                ordinales = [t.fecha.toordinal() for t in vista]
+                if len(ordinales) != len(vista):
+                    errores.append(f"largo {len(vista)} pero se recorrieron {len(ordinales)}")
+                if any(a < b for a, b in zip(ordinales, ordinales[1:])):
+                    errores.append("vista fuera de orden")
+                if len(vista) < anterior:
+                    errores.append(f"la vista retrocedió de {anterior} a {len(vista)}")
+                anterior = len(vista)
+
+                filtradas = repositorio.consultar(DESDE, HASTA, ["Ocio"], "gasto", limit=200)
+                if any(t.categoria != "Ocio" or t.centavos >= 0
+                       or not DESDE <= t.fecha <= HASTA for t in filtradas):
+                    errores.append("consultar devolvió filas fuera del filtro")
+
+                resumen = repositorio.resumen_totales()
+                if sum(resumen.gastos_por_categoria.values()) != resumen.gasto_centavos:
+                    errores.append("resumen inconsistente")
+        except Exception as error:  # noqa: BLE001 - se informa en el assert
+            errores.append(repr(error))
+
+    lectura = [threading.Thread(target=leer) for _ in range(LECTORES)]
+    for hilo in lectura:
+        hilo.start()
+    _en_hilos([lambda h=h: escribir(h) for h in range(ESCRITORES)])
+    terminados.set()
+    for hilo in lectura:
+        hilo.join()
+
+    assert not errores, errores[:5]
+    assert len(repositorio) == FILAS_INICIALES + ESCRITORES * ESCRITURAS
+    escritas = [t.descripcion for t in repositorio.obtener_todas()
+                if not t.descripcion.startswith("inicial")]
+    assert len(set(escritas)) == len(escritas) == ESCRITORES * ESCRITURAS
+
+
+# --- Subject ---
+
+class _Sujeto(Subject):
+    EVENTOS_LOTE = {"EVENTO": "EVENTO_LOTE"}
+
+
+class _Contador:
+    def __init__(self) -> None:
+        self.recibidos: List[object] = []
+        self.lotes: List[list] = []
+        self.solapados = 0
+        self._dentro = False
+
+    def update(self, event, data=None) -> None:
+        if self._dentro:
+            self.solapados += 1
+        self._dentro = True
+        time.sleep(0)  # cede el GIL para provocar solapamientos
+        if event == "EVENTO_LOTE":
+            self.lotes.append(list(data))
+            self.recibidos.extend(data)
+        else:
+            self.recibidos.append(data)
+        self._dentro = False
+
+
+def test_subject_con_varios_hilos():
+    hilos, eventos = 8, 1_000
+    sujeto = _Sujeto()
+    inmediato, agrupado = _Contador(), _Contador()
+    sujeto.attach(inmediato)
+    sujeto.attach(agrupado, agrupar=True)
+    listo = threading.Event()
+
+    def notificar(hilo: int) -> None:
+        for i in range(0, eventos, 10):
+            with sujeto.batch():
+                for j in range(i, i + 10):
+                    sujeto.notify("EVENTO", (hilo, j))
+
+    def suscribir_y_quitar() -> None:
+        while not listo.is_set():
+            efimero = _Contador()
+            sujeto.attach(efimero)
+            sujeto.detach(efimero)
+
+    molesto = threading.Thread(target=suscribir_y_quitar)
+    molesto.start()
+    _en_hilos([lambda h=h: notificar(h) for h in range(hilos)])
+    listo.set()
+    molesto.join()
+
+    esperados = {(h, j) for h in range(hilos) for j in range(eventos)}
+    for observador in (inmediato, agrupado):
+        assert observador.solapados == 0
+        assert len(observador.recibidos) == len(esperados)
+        assert set(observador.recibidos) == esperados
+    assert all(len({hilo for hilo, _ in lote}) == 1 for lote in agrupado.lotes)
+
+
+# --- Gateway ---
+
+def test_escritura_no_espera_a_un_calculo_en_curso(monkeypatch):
+    gateway = FinanzasGateway(crear_repositorio("memoria"))
+    servicio = gateway._recurrencias()
+    analizar = servicio.analizar
+    empezo, seguir = threading.Event(), threading.Event()
+
+    def analizar_lento(agrupar_por="descripcion"):
+        empezo.set()
+        seguir.wait(5)
+        return analizar(agrupar_por)
+
+    monkeypatch.setattr(servicio, "analizar", analizar_lento)
+    futuro = gateway.detectar_recurrencias_futuro()
+    assert empezo.wait(5)
+    version = gateway.version
+
+    # La escritura termina aunque el cálculo siga en curso
+    escritor = threading.Thread(target=gateway.agregar_transaccion,
+                                args=(HASTA, "Café", -3, "Ocio"))
+    escritor.start()
+    escritor.join(2)
+    escrita = not escritor.is_alive()
+    seguir.set()
+    escritor.join()
+    assert escrita
+    futuro.result(5)
+
+    # El resultado del cálculo viejo no queda en caché con la versión nueva
+    assert gateway.version == version + 1
+    encontrado, _ = gateway._cache.obtener(("recurrencias", ("descripcion",)), gateway.version)
+    assert not encontrado
+    gateway.cerrar()
+
+
+def test_escritura_no_espera_a_que_se_construya_un_indice(monkeypatch):
+    gateway = FinanzasGateway(crear_repositorio("memoria"))
+    reconstruir = IndiceBusqueda.reconstruir
+    empezo, seguir = threading.Event(), threading.Event()
+
+    def reconstruir_lento(indice, transacciones):
+        empezo.set()
+        seguir.wait(5)
+        reconstruir(indice, transacciones)
+
+    monkeypatch.setattr(IndiceBusqueda, "reconstruir", reconstruir_lento)
+    futuro = gateway.preparar_busqueda()
+    assert empezo.wait(5)
+
+    escritor = threading.Thread(target=gateway.agregar_lote,
+                                args=([(HASTA, "Café con leche", -300, "Ocio")] * 3,))
+    escritor.start()
+    escritor.join(2)
+    escrito = not escritor.is_alive()
+    seguir.set()
+    escritor.join()
+    assert escrito
+    futuro.result(5)
+
+    # Lo escrito durante la construcción se aplica al publicar el índice
+    assert gateway.buscar("café con").total == 3
+    gateway.cerrar()
+
+
+def test_observadores_creados_con_escrituras_en_curso():
+    gateway = FinanzasGateway(crear_repositorio("memoria"), datos_ejemplo=False)
+    gateway.agregar_lote([(t.fecha, t.descripcion, t.centavos, t.categoria)
+                          for t in _generar(FILAS_INICIALES, "inicial", 1)])
+
+    def escribir(hilo: int) -> None:
+        for i, t in enumerate(_generar(ESCRITURAS, f"h{hilo}", 100 + hilo)):
+            fila = (t.fecha, t.descripcion, t.centavos, t.categoria)
+            if i % 2:
+                gateway.agregar_transaccion_centavos(*fila)
+            else:
+                gateway.agregar_lote([fila])
+
+    escritores = [threading.Thread(target=escribir, args=(h,)) for h in range(ESCRITORES)]
+    for hilo in escritores:
+        hilo.start()
+    # Varios hilos compiten por crear los mismos servicios
+    _en_hilos([gateway._resumen, gateway._resumen, gateway._tablas_temporales])
+    for hilo in escritores:
+        hilo.join()
+
+    # Ni pérdidas ni duplicados entre la instantánea y los eventos pendientes
+    repositorio = gateway.logica_financiera.repository
+    assert gateway._agregador_resumen.totales() == repositorio.resumen_totales()
+    assert gateway._acumulados.cantidad() == len(repositorio)
+    gateway.cerrar()
@@ -0,0 +1,106 @@
+# tests/test_diario_recuperacion.py
+"""
+Recuperación del backend "diario" ante caídas:
+
+- registro final cortado a la mitad o con CRC inválido: se descarta
+  solo ese registro y el diario se trunca;
+- caída entre escribir la instantánea y vaciar el diario: las filas
+  no se duplican.
+"""
+import datetime
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from servicio_transaccion.DiarioTransactionRepository import DiarioTransactionRepository
+
+SIN_INSTANTANEA = 10 ** 12
+FILAS = 1_000
+POR_LOTE = 100
+
+
+def _columnas(cantidad: int = FILAS, semilla: int = 7):
+    aleatorio = np.random.default_rng(semilla)
+    primer_dia = datetime.date(2015, 1, 1).toordinal()
+    return (primer_dia + aleatorio.integers(0, 3650, cantidad, dtype=np.int32),
+            [f"Comercio {i}" for i in aleatorio.integers(0, 50, cantidad)],
+            aleatorio.integers(-50_000, 50_000, cantidad),
+            [f"Categoría {i}" for i in aleatorio.integers(0, 5, cantidad)])
+
+
+def _llenar(repositorio: DiarioTransactionRepository, columnas) -> None:
+    fechas, descripciones, centavos, categorias = columnas
+    for inicio in range(0, len(fechas), POR_LOTE):
+        fin = inicio + POR_LOTE
+        repositorio.agregar_columnas(fechas[inicio:fin], descripciones[inicio:fin],
+                                     centavos[inicio:fin], categorias[inicio:fin])
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    return str(tmp_path / "datos")
+
+
+@pytest.fixture
+def columnas():
+    return _columnas()
+
+
+def _diario_lleno(directorio: str, columnas) -> str:
+    repositorio = DiarioTransactionRepository(directorio, filas_por_instantanea=SIN_INSTANTANEA)
+    _llenar(repositorio, columnas)
+    repositorio.cerrar()
+    return os.path.join(directorio, "diario.bin")
+
+
+def test_registro_final_cortado(directorio, columnas):
+    ruta_diario = _diario_lleno(directorio, columnas)
+    tamano = os.path.getsize(ruta_diario)
+    with open(ruta_diario, "r+b") as archivo:
+        archivo.truncate(tamano - 37)
+
+    # Se pierde solo el último lote y la cola rota se trunca
+    repositorio = DiarioTransactionRepository(directorio)
+    assert len(repositorio) == FILAS - POR_LOTE
+    assert os.path.getsize(ruta_diario) < tamano - 37
+
+    # Se puede seguir escribiendo y todo sobrevive al reabrir
+    _llenar(repositorio, [c[FILAS - POR_LOTE:] for c in columnas])
+    repositorio.cerrar()
+    reabierto = DiarioTransactionRepository(directorio)
+    assert len(reabierto) == FILAS
+    assert reabierto.resumen_totales() == repositorio.resumen_totales()
+    reabierto.cerrar()
+
+
+def test_crc_invalido_en_el_ultimo_registro(directorio, columnas):
+    ruta_diario = _diario_lleno(directorio, columnas)
+    with open(ruta_diario, "r+b") as archivo:
+        archivo.seek(-5, os.SEEK_END)
+        byte = archivo.read(1)
+        archivo.seek(-5, os.SEEK_END)
+        archivo.write(bytes([byte[0] ^ 0xFF]))
+
+    repositorio = DiarioTransactionRepository(directorio)
+    assert len(repositorio) == FILAS - POR_LOTE
+    repositorio.cerrar()
+
+
+def test_caida_entre_instantanea_y_vaciado(directorio, columnas):
+    repositorio = DiarioTransactionRepository(directorio, filas_por_instantanea=SIN_INSTANTANEA)
+    _llenar(repositorio, columnas)
+    repositorio.sincronizar()
+    esperado = list(repositorio.obtener_todas())
+
+    # La instantánea quedó escrita pero el diario sigue con todas las filas
+    ruta_diario = os.path.join(directorio, "diario.bin")
+    shutil.copy(ruta_diario, ruta_diario + ".copia")
+    repositorio.instantanea()
+    repositorio.cerrar()
+    os.replace(ruta_diario + ".copia", ruta_diario)
+
+    repositorio = DiarioTransactionRepository(directorio)
+    assert list(repositorio.obtener_todas()) == esperado
+    repositorio.cerrar()
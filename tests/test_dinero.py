@@ -0,0 +1,76 @@
+# tests/test_dinero.py
+"""
+Contrato de los importes: unidades y centavos tienen cada uno su
+función y su método, sin adivinar por el tipo.
+"""
+import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from common.dinero import (
+    centavos_desde_entero, centavos_desde_entero_arreglo,
+    centavos_desde_unidades, centavos_desde_unidades_arreglo
+)
+from common.models.transaccion import Transaccion
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+
+HOY = datetime.date(2024, 5, 1)
+
+
+@pytest.mark.parametrize("monto", [5, 5.0, "5", "5.00", Decimal("5")])
+def test_unidades_sin_importar_el_tipo(monto):
+    assert centavos_desde_unidades(monto) == 500
+
+
+@pytest.mark.parametrize("monto, centavos", [
+    (12.345, 1235), (-12.345, -1235), ("0.005", 1), ("-0.005", -1), (-7, -700),
+])
+def test_unidades_redondeo_simetrico(monto, centavos):
+    assert centavos_desde_unidades(monto) == centavos
+
+
+@pytest.mark.parametrize("monto", ["abc", "", float("nan"), float("inf"), "Infinity"])
+def test_unidades_no_validas(monto):
+    with pytest.raises(ValueError):
+        centavos_desde_unidades(monto)
+
+
+def test_entero_son_centavos_y_rechaza_float():
+    assert centavos_desde_entero(5) == 5
+    assert centavos_desde_entero(np.int64(-250)) == -250
+    for monto in (5.0, "5"):
+        with pytest.raises(TypeError):
+            centavos_desde_entero(monto)
+
+
+def test_arreglos():
+    assert centavos_desde_unidades_arreglo(np.array([5, -1])).tolist() == [500, -100]
+    assert centavos_desde_unidades_arreglo([1.256, -2.5]).tolist() == [126, -250]
+    assert centavos_desde_entero_arreglo(np.array([5, -1], dtype=np.int32)).dtype == np.int64
+    with pytest.raises(TypeError):
+        centavos_desde_entero_arreglo(np.array([5.0]))
+
+
+def test_centavos_por_nombre_en_el_modelo():
+    transaccion = Transaccion(HOY, "Café", "Ocio", centavos=-250)
+    assert transaccion.monto == -2.5
+    # La llamada posicional anterior (monto en unidades) ya no se acepta
+    with pytest.raises(TypeError):
+        Transaccion(HOY, "Café", 5, "Ocio")
+
+
+def test_agregar_transaccion_en_unidades_y_en_centavos():
+    repositorio = TransactionRepository()
+    logica = LogicaFinanciera(TransaccionFactory(), repositorio, datos_ejemplo=False)
+    logica.agregar_transaccion(HOY, "En unidades", -5, "General")
+    logica.agregar_transaccion(HOY, "Texto", "12.34", "General")
+    logica.agregar_transaccion_centavos(HOY, "En centavos", -5, "General")
+    with pytest.raises(TypeError):
+        logica.agregar_transaccion_centavos(HOY, "Float", -5.0, "General")
+
+    importes = {t.descripcion: t.centavos for t in repositorio.obtener_todas()}
+    assert importes == {"En unidades": -500, "Texto": 1234, "En centavos": -5}
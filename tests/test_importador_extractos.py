@@ -0,0 +1,120 @@
+# tests/test_importador_extractos.py
+"""
+ImportadorExtractos sobre extractos pequeños escritos en tmp_path:
+
+- una línea mal formada se salta, se informa con su número y la
+  importación sigue;
+- importes con signo, separador de miles y decimales con coma o punto
+  llegan a los centavos exactos;
+- una importación cortada se reanuda desde ultima_linea sin repetir
+  filas.
+"""
+import datetime
+
+import pytest
+
+from servicio_transaccion.ImportadorExtractos import (
+    ErrorLinea, ImportadorExtractos, normalizar_monto
+)
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+
+
+def _logica() -> LogicaFinanciera:
+    return LogicaFinanciera(TransaccionFactory(), TransactionRepository(), datos_ejemplo=False)
+
+
+def _escribir(tmp_path, lineas, nombre="extracto.csv"):
+    ruta = tmp_path / nombre
+    ruta.write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    return str(ruta)
+
+
+def _filas(logica: LogicaFinanciera):
+    return sorted((t.fecha, t.descripcion, t.centavos, t.categoria)
+                  for t in logica.obtener_transacciones())
+
+
+@pytest.mark.parametrize("texto, centavos", [
+    ("-1.234,50", -123_450),
+    ("$1,234.50", 123_450),
+    ("-$1,234.50", -123_450),
+    ("1 234,56", 123_456),
+    ("(75.00)", -7_500),
+    ("1,234", 123_400),
+    ("-0,5", -50),
+    ("12", 1_200),
+])
+def test_montos(texto, centavos):
+    assert normalizar_monto(texto) == centavos
+
+
+def test_monto_no_valido():
+    with pytest.raises(ErrorLinea):
+        normalizar_monto("doce")
+
+
+def test_linea_mal_formada_se_salta(tmp_path):
+    ruta = _escribir(tmp_path, [
+        "Fecha;Concepto;Importe;Categoría",
+        "31/01/2024;Supermercado;-1.234,50;Alimentación",
+        "no es una fecha;Cine;-12,00;Ocio",
+        "01/02/2024;Nómina;2.500,00;",
+        "02/02/2024;Sin importe",
+        "03/02/2024;Taxi;-$15.75;Transporte",
+    ])
+    logica = _logica()
+    resultado = ImportadorExtractos(logica, tamano_lote=2).importar(ruta)
+
+    assert resultado.filas_leidas == 5
+    assert resultado.filas_importadas == 3
+    assert resultado.lineas_invalidas == 2
+    assert [error.numero for error in resultado.errores] == [3, 5]
+    assert "fecha" in resultado.errores[0].motivo
+    assert resultado.ultima_linea == 6
+    assert _filas(logica) == [
+        (datetime.date(2024, 1, 31), "Supermercado", -123_450, "Alimentación"),
+        (datetime.date(2024, 2, 1), "Nómina", 250_000, "Sin categoría"),
+        (datetime.date(2024, 2, 3), "Taxi", -1_575, "Transporte"),
+    ]
+
+
+class _DestinoQueFalla:
+    """Escribe en la lógica y falla en el lote número `falla_en`."""
+    def __init__(self, logica: LogicaFinanciera, falla_en: int) -> None:
+        self._logica = logica
+        self._falla_en = falla_en
+        self._lotes = 0
+
+    def agregar_columnas(self, fechas, descripciones, centavos, categorias) -> int:
+        self._lotes += 1
+        if self._lotes == self._falla_en:
+            raise OSError("disco lleno")
+        return self._logica.agregar_columnas(fechas, descripciones, centavos, categorias)
+
+
+def test_reanudar_sin_duplicar(tmp_path):
+    lineas = ["fecha,descripcion,monto,categoria"]
+    lineas += [f"2024-03-{dia:02d},Gasto {dia},-{dia}.25,General" for dia in range(1, 29)]
+    lineas.insert(10, "2024-03-xx,Rota,-1.00,General")
+    ruta = _escribir(tmp_path, lineas)
+
+    completa = _logica()
+    ImportadorExtractos(completa, tamano_lote=5).importar(ruta)
+
+    logica = _logica()
+    avances = []
+    with pytest.raises(OSError):
+        ImportadorExtractos(_DestinoQueFalla(logica, falla_en=3), tamano_lote=5).importar(
+            ruta, progreso=lambda resultado: avances.append(resultado.ultima_linea))
+    # Quedaron escritos los dos primeros lotes (líneas 2 a 11)
+    assert avances == [6, 11]
+    assert len(logica.obtener_transacciones()) == 9
+
+    resultado = ImportadorExtractos(logica, tamano_lote=5).importar(ruta, desde_linea=avances[-1])
+    assert resultado.filas_importadas == 19
+    assert resultado.lineas_invalidas == 0
+    assert resultado.ultima_linea == len(lineas)
+    assert _filas(logica) == _filas(completa)
+    assert len(_filas(logica)) == 28
@@ -0,0 +1,98 @@
+# tests/test_indice_busqueda.py
+"""
+IndiceBusqueda frente a una búsqueda por fuerza bruta:
+
+- los términos de 1 o 2 letras coinciden con el inicio de una palabra y
+  los de 3 o más con cualquier parte de la descripción, sin distinguir
+  mayúsculas ni acentos;
+- los eventos del Observer agregan filas y reconstruir quita las que ya
+  no están;
+- las páginas puestas una tras otra dan el resultado completo, en orden
+  de relevancia y luego de fecha descendente.
+"""
+import datetime
+
+from common.models.transaccion import Transaccion
+from servicio_transaccion.IndiceBusqueda import IndiceBusqueda
+
+HOY = datetime.date(2024, 5, 31)
+
+
+def _transaccion(dias: int, descripcion: str, categoria: str = "Ocio") -> Transaccion:
+    return Transaccion(HOY - datetime.timedelta(days=dias), descripcion, categoria,
+                       centavos=-100 * (dias + 1))
+
+
+def _descripciones(resultado):
+    return [t.descripcion for t in resultado.transacciones]
+
+
+def test_prefijos_y_subcadenas():
+    indice = IndiceBusqueda()
+    indice.reconstruir([_transaccion(0, "Café Central"),
+                        _transaccion(1, "Cafetería del barrio"),
+                        _transaccion(2, "Supermercado"),
+                        _transaccion(3, "Recarga celular")])
+
+    # 1 o 2 letras: solo al inicio de una palabra ("Recarga celular" no)
+    assert set(_descripciones(indice.buscar("ca"))) == {"Café Central", "Cafetería del barrio"}
+    assert _descripciones(indice.buscar("ce")) == ["Café Central", "Recarga celular"]
+    # 3 o más letras: también dentro de una palabra
+    assert _descripciones(indice.buscar("arg")) == ["Recarga celular"]
+    # Sin acentos ni mayúsculas, y todos los términos tienen que coincidir
+    assert _descripciones(indice.buscar("CAFE cen")) == ["Café Central"]
+    assert indice.buscar("cafe super").total == 0
+    assert indice.buscar("").total == 0
+
+
+def test_relevancia_y_categoria():
+    indice = IndiceBusqueda()
+    indice.reconstruir([_transaccion(0, "Pago luz"),
+                        _transaccion(1, "Luz del mes", "Vivienda"),
+                        _transaccion(2, "Tragaluz")])
+
+    # Al inicio, luego al inicio de una palabra y luego dentro de una palabra
+    assert _descripciones(indice.buscar("luz")) == ["Luz del mes", "Pago luz", "Tragaluz"]
+    assert _descripciones(indice.buscar("luz", "vivienda")) == ["Luz del mes"]
+    assert indice.buscar("", "Ocio").total == 2
+    assert indice.categorias() == ["Ocio", "Vivienda"]
+
+
+def test_eventos_y_reconstruir():
+    indice = IndiceBusqueda()
+    indice.update("TRANSACCION_AGREGADA", _transaccion(5, "Gimnasio"))
+    indice.update("TRANSACCION_LOTE_AGREGADO", [_transaccion(1, "Gimnasio"),
+                                                _transaccion(2, "Cine")])
+    assert [t.fecha for t in indice.buscar("gim").transacciones] == [
+        HOY - datetime.timedelta(days=1), HOY - datetime.timedelta(days=5)]
+
+    # Lo que ya no está en el repositorio deja de aparecer
+    indice.reconstruir([_transaccion(3, "Cine")])
+    assert indice.buscar("gim").total == 0
+    assert indice.buscar("", "Ocio").total == 1
+    assert _descripciones(indice.buscar("cin")) == ["Cine"]
+
+
+def test_paginas():
+    transacciones = []
+    for dia in range(60):
+        transacciones.append(_transaccion(dia, "Taxi aeropuerto", "Transporte"))
+        transacciones.append(_transaccion(dia, "Taxi", "Ocio"))
+        transacciones.append(_transaccion(dia, "Autobús taxi"))
+    indice = IndiceBusqueda()
+    indice.reconstruir(transacciones)
+
+    completo = indice.buscar("taxi", limit=len(transacciones))
+    assert completo.total == len(completo.transacciones) == len(transacciones)
+    # "Taxi" y "Taxi aeropuerto" (al inicio) antes que "Autobús taxi"
+    assert all(t.descripcion != "Autobús taxi" for t in completo.transacciones[:120])
+    fechas = [t.fecha for t in completo.transacciones[:120]]
+    assert fechas == sorted(fechas, reverse=True)
+
+    paginas = []
+    for offset in range(0, completo.total, 7):
+        pagina = indice.buscar("taxi", offset=offset, limit=7)
+        assert pagina.total == completo.total
+        paginas.extend(pagina.transacciones)
+    assert paginas == completo.transacciones
+    assert indice.buscar("taxi", offset=completo.total, limit=7).transacciones == []
@@ -0,0 +1,106 @@
+# tests/test_indice_ordenado.py
+"""
+IndiceOrdenado frente a una lista ordenada con sorted (estable):
+
+- insertar de a uno y por lotes deja los elementos en orden de clave
+  y, a igual clave, en orden de inserción, también al partir bloques;
+- una instantánea no cambia con las escrituras siguientes;
+- posicion y entre ubican las claves como bisect sobre la lista;
+- TransactionRepository entrega la vista en fecha descendente y en
+  orden de llegada, y una vista tomada antes de escribir no cambia.
+"""
+import datetime
+import random
+
+import pytest
+
+from common.models.transaccion import Transaccion
+from servicio_transaccion.IndiceOrdenado import IndiceOrdenado
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+
+def _clave(par):
+    return par[0]
+
+
+@pytest.fixture
+def bloques_pequenos(monkeypatch):
+    # Bloques de 4 elementos para que las pruebas partan bloques
+    monkeypatch.setattr(IndiceOrdenado, "TAMANO_BLOQUE", 4)
+
+
+def test_insertar_igual_que_sorted(bloques_pequenos):
+    aleatorio = random.Random(1)
+    indice = IndiceOrdenado(_clave)
+    esperados = []
+    for llegada in range(500):
+        par = (aleatorio.randrange(40), llegada)
+        esperados.append(par)
+        if aleatorio.random() < 0.7:
+            indice.insertar(par)
+        else:
+            lote = [par] + [(aleatorio.randrange(40), f"{llegada}-{i}") for i in range(5)]
+            esperados.extend(lote[1:])
+            indice.insertar_lote(lote)
+
+    ordenados = sorted(esperados, key=_clave)
+    assert list(indice) == ordenados
+    assert len(indice) == len(ordenados)
+    assert indice.rango(100, 120) == ordenados[100:120]
+    assert list(indice.vista(490, 510)) == ordenados[490:510]
+
+
+def test_posicion_y_entre(bloques_pequenos):
+    indice = IndiceOrdenado(_clave)
+    indice.insertar_lote((clave, i) for i, clave in enumerate([5, 1, 3, 3, 9, 3, 7, 1]))
+    claves = [par[0] for par in indice]
+    assert claves == [1, 1, 3, 3, 3, 5, 7, 9]
+    assert indice.posicion(3) == 2
+    assert indice.posicion(3, derecha=True) == 5
+    assert indice.posicion(10) == 8
+    assert [par[0] for par in indice.entre(2, 7)] == [3, 3, 3, 5, 7]
+    assert [par[0] for par in indice.entre(None, 1)] == [1, 1]
+    # A igual clave, en el orden del lote
+    assert [par[1] for par in indice.entre(3, 3)] == [2, 3, 5]
+
+
+def test_instantanea_no_cambia(bloques_pequenos):
+    indice = IndiceOrdenado(_clave)
+    indice.insertar_lote((k, "inicial") for k in range(0, 40, 2))
+    antes = indice.instantanea()
+    copia = list(antes)
+    assert indice.instantanea() is antes  # se reutiliza hasta la próxima escritura
+
+    for k in range(1, 40, 2):
+        indice.insertar((k, "nuevo"))
+    indice.insertar_lote([(0, "lote"), (39, "lote")])
+    indice.reemplazar((10, "reemplazado"))
+
+    assert list(antes) == copia
+    assert len(antes) == 20
+    despues = indice.instantanea()
+    assert len(despues) == 42
+    assert (10, "reemplazado") in list(despues)
+    assert (10, "inicial") not in list(despues)
+    with pytest.raises(KeyError):
+        indice.reemplazar((100, "no está"))
+
+
+def _transaccion(dia: int, descripcion: str) -> Transaccion:
+    return Transaccion(datetime.date(2024, 1, 1) + datetime.timedelta(days=dia),
+                       descripcion, "General", centavos=-100)
+
+
+def test_repositorio_fecha_descendente_y_orden_de_llegada():
+    repositorio = TransactionRepository()
+    repositorio.agregar(_transaccion(1, "a"))
+    repositorio.agregar_lote([_transaccion(3, "b"), _transaccion(1, "c"), _transaccion(2, "d")])
+    vista = repositorio.obtener_todas()
+    repositorio.agregar(_transaccion(1, "e"))
+    repositorio.agregar_lote([_transaccion(5, "f"), _transaccion(3, "g")])
+
+    assert [t.descripcion for t in vista] == ["b", "d", "a", "c"]
+    assert [t.descripcion for t in repositorio.obtener_todas()] == \
+        ["f", "b", "g", "d", "a", "c", "e"]
+    assert [t.descripcion for t in repositorio.obtener_rango(2, 3)] == ["g", "d", "a"]
+    assert len(repositorio) == 7
@@ -0,0 +1,107 @@
+# tests/test_recurrencias.py
+"""
+Detección de recurrencias y anomalías sobre un libro sintético de dos
+años: alquiler y nómina mensuales, una suscripción cancelada, una
+factura de luz mensual con un mes disparado y compras de supermercado
+en días e importes al azar.
+"""
+import datetime
+import random
+
+import pytest
+
+from common.models.transaccion import Transaccion
+from servicio_prediccion.Recurrencias import (
+    analizar_columnas, columnas_transacciones, proximo_dia
+)
+from servicio_prediccion.ServicioRecurrencias import ServicioRecurrencias
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+MESES = 24
+FIN_DEL_LIBRO = datetime.date(2023, 12, 31)
+LUZ_DISPARADA = datetime.date(2023, 6, 12)
+
+
+def _mes(indice: int, dia: int) -> datetime.date:
+    return datetime.date(2022 + indice // 12, indice % 12 + 1, dia)
+
+
+def _libro():
+    aleatorio = random.Random(5)
+    transacciones = []
+
+    def agregar(fecha, descripcion, centavos, categoria):
+        transacciones.append(Transaccion(fecha, descripcion, categoria, centavos=centavos))
+
+    for mes in range(MESES):
+        agregar(_mes(mes, 5), "Alquiler piso", -80_000, "Vivienda")
+        agregar(_mes(mes, 28), "NÓMINA Empresa", 250_000, "Ingreso")
+        luz = -60_000 if _mes(mes, 12) == LUZ_DISPARADA else -6_000 + aleatorio.randint(-200, 200)
+        agregar(_mes(mes, 12), "Luz", luz, "Suministros")
+        if mes < 12:
+            agregar(_mes(mes, 20), "Streaming", -1_299, "Ocio")
+    dia = datetime.date(2022, 1, 1)
+    while dia <= FIN_DEL_LIBRO:
+        agregar(dia, "Supermercado", -aleatorio.randint(1_000, 20_000), "Alimentación")
+        dia += datetime.timedelta(days=aleatorio.randint(1, 9))
+    aleatorio.shuffle(transacciones)
+    return transacciones
+
+
+@pytest.fixture(scope="module")
+def analisis():
+    return analizar_columnas(columnas_transacciones(_libro()))
+
+
+def test_series_mensuales(analisis):
+    series = {serie.grupo: serie for serie in analisis.recurrentes}
+    # El nombre del grupo es la descripción tal como se escribió
+    assert set(series) == {"Alquiler piso", "NÓMINA Empresa", "Luz", "Streaming"}
+
+    alquiler = series["Alquiler piso"]
+    assert alquiler.ocurrencias == MESES
+    assert alquiler.periodo_dias == pytest.approx(30.4, abs=1)
+    assert alquiler.categoria == "Vivienda"
+    assert alquiler.centavos_esperados == -80_000
+    assert alquiler.proxima_fecha == datetime.date(2024, 1, 5)
+    assert alquiler.activa
+
+    nomina = series["NÓMINA Empresa"]
+    assert nomina.centavos_esperados == 250_000
+    assert nomina.proxima_fecha == datetime.date(2024, 1, 28)
+
+    # Dejó de aparecer hace un año
+    assert not series["Streaming"].activa
+    assert series["Streaming"].ultimo_dia == _mes(11, 20).toordinal()
+
+
+def test_anomalias(analisis):
+    # Entre los importes regulares, solo el mes disparado
+    regulares = [anomalia for anomalia in analisis.anomalias
+                 if anomalia.descripcion != "Supermercado"]
+    assert [(anomalia.fecha, anomalia.descripcion) for anomalia in regulares] == \
+        [(LUZ_DISPARADA, "Luz")]
+    luz = regulares[0]
+    assert luz.centavos == -60_000
+    assert luz.centavos_esperados == pytest.approx(-6_000, abs=200)
+    assert luz.puntaje > 0
+
+
+def test_por_categoria_desde_el_servicio():
+    repositorio = TransactionRepository()
+    repositorio.agregar_lote(_libro())
+    analisis = ServicioRecurrencias(repositorio).analizar("categoria")
+    grupos = {serie.grupo for serie in analisis.recurrentes}
+    assert {"Vivienda", "Ingreso", "Suministros"} <= grupos
+    assert "Alimentación" not in grupos
+    with pytest.raises(ValueError):
+        ServicioRecurrencias(repositorio).analizar("monto")
+
+
+def test_proximo_dia_en_meses_cortos():
+    assert proximo_dia(datetime.date(2024, 1, 31).toordinal(), 30.5) == \
+        datetime.date(2024, 2, 29).toordinal()
+    assert proximo_dia(datetime.date(2024, 3, 15).toordinal(), 91.0) == \
+        datetime.date(2024, 6, 15).toordinal()
+    assert proximo_dia(datetime.date(2024, 3, 15).toordinal(), 14.0) == \
+        datetime.date(2024, 3, 29).toordinal()
@@ -0,0 +1,118 @@
+# tests/test_regresion_incremental.py
+"""
+La regresión incremental debe dar los mismos coeficientes que
+reentrenar con sklearn sobre la serie diaria completa, sin acumular
+error al quitar puntos, y la serie diaria es una instantánea.
+"""
+import datetime
+import random
+
+import numpy as np
+import pytest
+
+from common.dinero import a_unidades
+from common.models.resumen import calcular_gastos_diarios
+from servicio_prediccion.RegresionIncremental import PronosticoIncremental, RegresionLinealIncremental
+from servicio_prediccion.SklearnAdapter import SklearnPredictorAdapter
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+from servicio_transaccion.TransactionServiceImpl import LogicaFinanciera
+
+
+def _fila(aleatorio: random.Random):
+    return (datetime.date(2020, 1, 1) + datetime.timedelta(days=aleatorio.randrange(700)),
+            "Movimiento", aleatorio.randint(-50_000, 50_000), "General")
+
+
+def _coeficientes_sklearn(transacciones):
+    dias, centavos = calcular_gastos_diarios(transacciones)
+    return SklearnPredictorAdapter().ajustar(dias, a_unidades(np.asarray(centavos)))
+
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_coeficientes_igual_a_sklearn(semilla):
+    aleatorio = random.Random(semilla)
+    repositorio = TransactionRepository()
+    logica = LogicaFinanciera(TransaccionFactory(), repositorio, datos_ejemplo=False)
+    pronostico = PronosticoIncremental()
+    logica.attach(pronostico, agrupar=True)
+
+    # Sueltas y por lote, en fechas desordenadas y con días repetidos
+    for _ in range(100):
+        if aleatorio.random() < 0.5:
+            logica.agregar_transaccion_centavos(*_fila(aleatorio))
+        else:
+            logica.agregar_lote([_fila(aleatorio) for _ in range(aleatorio.randrange(40))])
+
+    transacciones = repositorio.obtener_todas()
+    np.testing.assert_allclose(pronostico.coeficientes(), _coeficientes_sklearn(transacciones),
+                               rtol=1e-9, atol=1e-9)
+    assert pronostico.cantidad_transacciones == len(transacciones)
+
+    dias, centavos = calcular_gastos_diarios(transacciones)
+    serie_dias, serie_montos = pronostico.serie_diaria()
+    assert list(serie_dias) == list(dias)
+    np.testing.assert_array_equal(serie_montos, a_unidades(np.asarray(centavos)))
+
+
+def test_reconstruir_igual_a_acumular():
+    aleatorio = random.Random(11)
+    transacciones = [TransaccionFactory().crear(*_fila(aleatorio)) for _ in range(2_000)]
+
+    acumulado = PronosticoIncremental()
+    for transaccion in transacciones:
+        acumulado.acumular(transaccion)
+    reconstruido = PronosticoIncremental()
+    reconstruido.reconstruir(transacciones)
+
+    assert reconstruido.coeficientes() == pytest.approx(acumulado.coeficientes())
+    np.testing.assert_allclose(reconstruido.coeficientes(), _coeficientes_sklearn(transacciones),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_sin_gastos_no_hay_coeficientes():
+    pronostico = PronosticoIncremental()
+    pronostico.acumular(TransaccionFactory().crear(datetime.date(2024, 1, 1), "Salario",
+                                                   100_000, "Ingreso"))
+    assert pronostico.coeficientes() is None
+    assert pronostico.predecir(30) is None
+
+
+def test_agregar_y_quitar_no_acumula_error():
+    aleatorio = random.Random(3)
+    puntos = [(738_000 + aleatorio.randrange(3650), aleatorio.randint(1, 10**9))
+              for _ in range(50_000)]
+    regresion = RegresionLinealIncremental()
+    for x, y in puntos:
+        regresion.agregar_punto(x, y)
+    # Se quitan casi todos: quedan los estadísticos exactos de los restantes
+    for x, y in puntos[:-3]:
+        regresion.quitar_punto(x, y)
+    desde_cero = RegresionLinealIncremental()
+    for x, y in puntos[-3:]:
+        desde_cero.agregar_punto(x, y)
+    origen = puntos[-1][0]
+    assert regresion.coeficientes(origen, 100) == desde_cero.coeficientes(origen, 100)
+
+
+def test_serie_diaria_es_una_instantanea():
+    pronostico = PronosticoIncremental()
+    fabrica = TransaccionFactory()
+    hoy = datetime.date(2024, 3, 1)
+    for dias, centavos in ((2, -500), (0, -100), (1, -250)):
+        pronostico.acumular(fabrica.crear(hoy - datetime.timedelta(days=dias),
+                                          "Gasto", centavos, "General"))
+    dias, montos = pronostico.serie_diaria()
+
+    # Cambia un día ya visto y llega uno nuevo: la instantánea no cambia
+    pronostico.acumular(fabrica.crear(hoy, "Gasto", -1_000, "General"))
+    pronostico.acumular(fabrica.crear(hoy + datetime.timedelta(days=1), "Gasto", -50, "General"))
+    primero = hoy.toordinal() - 2
+    assert list(dias) == [primero, primero + 1, primero + 2]
+    assert list(montos) == [5.0, 2.5, 1.0]
+    assert montos.tolist()[-1] == 1.0 and dias[-1] == primero + 2
+
+    nuevos_dias, nuevos_montos = pronostico.serie_diaria()
+    assert list(nuevos_dias) == [primero, primero + 1, primero + 2, primero + 3]
+    assert list(nuevos_montos) == [5.0, 2.5, 11.0, 0.5]
+    assert pronostico.dias_con_gasto == 4
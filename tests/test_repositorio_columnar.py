@@ -0,0 +1,95 @@
+# tests/test_repositorio_columnar.py
+"""
+ColumnarTransactionRepository frente a TransactionRepository (memoria)
+con las mismas filas:
+
+- la codificación por diccionario de descripciones y categorías se
+  deshace sin pérdidas (textos repetidos, con tildes, vacíos);
+- obtener_todas, obtener_rango, consultar, resumen_totales y
+  gastos_diarios dan lo mismo que el repositorio en memoria.
+"""
+import datetime
+import random
+
+import numpy as np
+import pytest
+
+from servicio_transaccion.ColumnarTransactionRepository import (
+    ColumnarTransactionRepository, ColumnasTransacciones
+)
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+DESCRIPCIONES = ("Supermercado", "Café", "café", "", "Nómina", "Alquiler piso")
+CATEGORIAS = ("Alimentación", "Ocio", "Ingreso", "Vivienda")
+PRIMER_DIA = datetime.date(2023, 1, 1)
+
+
+def _transacciones(cantidad: int, semilla: int):
+    aleatorio = random.Random(semilla)
+    fabrica = TransaccionFactory()
+    return [fabrica.crear(PRIMER_DIA + datetime.timedelta(days=aleatorio.randrange(400)),
+                          aleatorio.choice(DESCRIPCIONES),
+                          aleatorio.randint(-20_000, 20_000),
+                          aleatorio.choice(CATEGORIAS))
+            for _ in range(cantidad)]
+
+
+def _tuplas(transacciones):
+    return [(t.fecha, t.descripcion, t.centavos, t.categoria, type(t).__name__)
+            for t in transacciones]
+
+
+@pytest.fixture
+def repositorios():
+    transacciones = _transacciones(3_000, 7)
+    memoria, columnar = TransactionRepository(), ColumnarTransactionRepository()
+    # Sueltas y por lote, y más filas que la capacidad inicial
+    for repositorio in (memoria, columnar):
+        for transaccion in transacciones[:100]:
+            repositorio.agregar(transaccion)
+        repositorio.agregar_lote(transacciones[100:])
+    return transacciones, memoria, columnar
+
+
+def test_diccionario_ida_y_vuelta(repositorios):
+    transacciones, _, columnar = repositorios
+    codigos, textos = columnar.descripciones()
+    assert [textos[c] for c in codigos] == [t.descripcion for t in transacciones]
+    assert sorted(textos) == sorted(DESCRIPCIONES)
+
+    columnas = columnar.columnas()
+    assert [columnas.nombres_categoria[c] for c in columnas.categorias] == \
+        [t.categoria for t in transacciones]
+    assert columnas.centavos.tolist() == [t.centavos for t in transacciones]
+    assert columnas.fechas.tolist() == [t.fecha.toordinal() for t in transacciones]
+
+    compactas = ColumnasTransacciones.desde_transacciones(transacciones)
+    assert [compactas.nombres_categoria[c] for c in compactas.categorias] == \
+        [t.categoria for t in transacciones]
+
+
+def test_lecturas_iguales_a_memoria(repositorios):
+    _, memoria, columnar = repositorios
+    assert len(columnar) == len(memoria)
+    assert _tuplas(columnar.obtener_todas()) == _tuplas(memoria.obtener_todas())
+    assert _tuplas(columnar.obtener_rango(1_234, 50)) == _tuplas(memoria.obtener_rango(1_234, 50))
+    assert columnar.resumen_totales() == memoria.resumen_totales()
+
+    dias_c, centavos_c = columnar.gastos_diarios()
+    dias_m, centavos_m = memoria.gastos_diarios()
+    np.testing.assert_array_equal(dias_c, dias_m)
+    np.testing.assert_array_equal(centavos_c, centavos_m)
+
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"desde": datetime.date(2023, 3, 1), "hasta": datetime.date(2023, 5, 31)},
+    {"categorias": ["Ocio", "Vivienda"], "tipo": "gasto"},
+    {"categorias": ["No existe"]},
+    {"hasta": datetime.date(2023, 2, 1), "tipo": "ingreso", "offset": 10, "limit": 25},
+    {"offset": 2_990, "limit": 50},
+])
+def test_consultar_igual_a_memoria(repositorios, filtros):
+    _, memoria, columnar = repositorios
+    assert _tuplas(columnar.consultar(**filtros)) == _tuplas(memoria.consultar(**filtros))
@@ -0,0 +1,106 @@
+# tests/test_repositorio_sqlite.py
+"""
+SqliteTransactionRepository frente a TransactionRepository (memoria)
+con las mismas filas, con páginas pequeñas para que cada lectura
+cruce varias:
+
+- obtener_rango y obtener_todas (recorrida, indexada y cortada) dan el
+  mismo orden: fecha descendente y, a igual fecha, orden de llegada;
+- consultar con ventana de fechas, categorías, tipo y paginación da
+  las mismas filas;
+- una vista no cambia con las escrituras posteriores.
+"""
+import datetime
+import random
+
+import pytest
+
+from servicio_transaccion.SqliteTransactionRepository import (
+    SqliteTransactionRepository, VistaConsulta
+)
+from servicio_transaccion.TransactionFactory import TransaccionFactory
+from servicio_transaccion.TransactionRepository import TransactionRepository
+
+CATEGORIAS = ("Alimentación", "Ocio", "Ingreso", "Vivienda")
+PRIMER_DIA = datetime.date(2024, 1, 1)
+
+
+def _transacciones(cantidad: int, semilla: int, prefijo: str = "t"):
+    aleatorio = random.Random(semilla)
+    fabrica = TransaccionFactory()
+    # Pocos días distintos: muchas filas con la misma fecha
+    return [fabrica.crear(PRIMER_DIA + datetime.timedelta(days=aleatorio.randrange(30)),
+                          f"{prefijo}-{i}", aleatorio.randint(-20_000, 20_000),
+                          aleatorio.choice(CATEGORIAS))
+            for i in range(cantidad)]
+
+
+def _tuplas(transacciones):
+    return [(t.fecha, t.descripcion, t.centavos, t.categoria) for t in transacciones]
+
+
+@pytest.fixture
+def repositorios(monkeypatch, tmp_path):
+    monkeypatch.setattr(VistaConsulta, "FILAS_POR_PAGINA", 7)
+    memoria = TransactionRepository()
+    sqlite = SqliteTransactionRepository(str(tmp_path / "transacciones.db"))
+    transacciones = _transacciones(500, 3)
+    for repositorio in (memoria, sqlite):
+        for transaccion in transacciones[:50]:
+            repositorio.agregar(transaccion)
+        repositorio.agregar_lote(transacciones[50:])
+    yield memoria, sqlite
+    sqlite.cerrar()
+
+
+def test_paginas_en_el_mismo_orden(repositorios):
+    memoria, sqlite = repositorios
+    esperadas = _tuplas(memoria.obtener_todas())
+    vista = sqlite.obtener_todas()
+
+    assert len(vista) == len(sqlite) == 500
+    assert _tuplas(vista) == esperadas
+    assert _tuplas(vista[123:140]) == esperadas[123:140]
+    assert _tuplas(vista[::50]) == esperadas[::50]
+    assert _tuplas([vista[0], vista[-1]]) == [esperadas[0], esperadas[-1]]
+    with pytest.raises(IndexError):
+        vista[500]
+
+    paginas = []
+    for inicio in range(0, 510, 20):
+        paginas.extend(sqlite.obtener_rango(inicio, 20))
+    assert _tuplas(paginas) == esperadas
+
+
+@pytest.mark.parametrize("filtros", [
+    {},
+    {"desde": datetime.date(2024, 1, 5), "hasta": datetime.date(2024, 1, 12)},
+    {"categorias": ["Ocio", "Vivienda"], "tipo": "gasto"},
+    {"categorias": []},
+    {"tipo": "ingreso", "offset": 13, "limit": 30},
+    {"hasta": datetime.date(2024, 1, 20), "offset": 490},
+    {"limit": 0},
+])
+def test_consultar_igual_a_memoria(repositorios, filtros):
+    memoria, sqlite = repositorios
+    esperadas = _tuplas(memoria.consultar(**filtros))
+    vista = sqlite.consultar(**filtros)
+    assert len(vista) == len(esperadas)
+    assert _tuplas(vista) == esperadas
+    assert _tuplas(vista[5:12]) == esperadas[5:12]
+
+
+def test_vista_no_cambia_con_escrituras(repositorios):
+    _, sqlite = repositorios
+    vista = sqlite.obtener_todas()
+    gastos = sqlite.consultar(tipo="gasto")
+    antes, gastos_antes = _tuplas(vista), _tuplas(gastos)
+
+    recorrido = iter(vista)
+    primeras = [next(recorrido) for _ in range(10)]
+    sqlite.agregar_lote(_transacciones(100, 4, "nueva"))
+
+    assert _tuplas(primeras + list(recorrido)) == antes
+    assert _tuplas(vista) == antes and len(vista) == 500
+    assert _tuplas(gastos) == gastos_antes
+    assert len(sqlite.obtener_todas()) == 600
@@ -0,0 +1,56 @@
+# tests/test_servicio_http.py
+"""
+Servidor HTTP mínimo: una ruta responde por una conexión persistente,
+y una línea de cabecera demasiado larga o un cuerpo de más de
+MAX_CUERPO se contestan con 431 y 413 en lugar de cortar la conexión
+sin respuesta.
+"""
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from common.servicio_http import MAX_CUERPO, MAX_LINEA, ClienteHttp, ServidorHttp
+
+
+@pytest.fixture
+def puerto():
+    servidor = ServidorHttp("prueba")
+    servidor.ruta("POST", "/eco", en_hilo=True)(lambda consulta, cuerpo: cuerpo)
+    bucle = asyncio.new_event_loop()
+    iniciado = bucle.run_until_complete(servidor.iniciar("127.0.0.1", 0))
+    hilo = threading.Thread(target=bucle.run_forever, daemon=True)
+    hilo.start()
+    yield iniciado.sockets[0].getsockname()[1]
+    bucle.call_soon_threadsafe(bucle.stop)
+    hilo.join(5)
+    iniciado.close()
+    bucle.run_until_complete(iniciado.wait_closed())
+    bucle.close()
+
+
+def _estado(puerto: int, cabecera: bytes) -> int:
+    with socket.create_connection(("127.0.0.1", puerto), timeout=5) as conexion:
+        conexion.sendall(cabecera)
+        linea = conexion.makefile("rb").readline()
+    return int(linea.split()[1])
+
+
+def test_ruta_en_hilo_con_conexion_persistente(puerto):
+    cliente = ClienteHttp(f"http://127.0.0.1:{puerto}", conexiones=1)
+    assert cliente.pedir("POST", "/eco", cuerpo={"a": 1}) == {"a": 1}
+    assert cliente.pedir_varias([("POST", "/eco", None, [i]) for i in range(3)]) == [
+        [0], [1], [2]]
+    assert cliente.pedir("GET", "/salud") == {"servicio": "prueba"}
+    cliente.cerrar()
+
+
+def test_cabecera_demasiado_larga(puerto):
+    cabecera = b"GET /salud HTTP/1.1\r\nX-Relleno: " + b"a" * MAX_LINEA + b"\r\n\r\n"
+    assert _estado(puerto, cabecera) == 431
+
+
+def test_cuerpo_demasiado_grande(puerto):
+    cabecera = f"POST /eco HTTP/1.1\r\nContent-Length: {MAX_CUERPO + 1}\r\n\r\n"
+    assert _estado(puerto, cabecera.encode("latin-1")) == 413
@@ -1,4 +1,5 @@
 # ui/AppGraficaFinanzas/Main.py
+from common import config
 from gateway.AppGraficaFinanzas.main import crear_gateway
 from ui.AppGraficaFinanzas.components.app import AppGraficaFinanzas
 
@@ -6,7 +7,11 @@ from ui.AppGraficaFinanzas.components.app import AppGraficaFinanzas
 def main():
     gateway = crear_gateway()
     app = AppGraficaFinanzas(gateway)
+    if config.PRECARGAR_SERVICIOS:
+        # Se espera a que la ventana se dibuje antes de cargar lo pesado
+        app.after(200, gateway.precalentar)
     app.mainloop()
+    gateway.cerrar()
 
 
 if __name__ == "__main__":
@@ -1,13 +1,20 @@
 # ui/AppGraficaFinanzas/components/app.py
 import datetime
+import queue
+import threading
 import tkinter as tk
+from concurrent.futures import Future
 from tkinter import ttk, messagebox
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-
+from common import config, metricas
+from common.dinero import centavos_desde_unidades
 from common.utils import Observer
 from gateway.AppGraficaFinanzas.main import FinanzasGateway
+from ui.AppGraficaFinanzas.components.tabla_transacciones import TablaTransacciones
 
+# Opción del filtro de categoría que no filtra
+TODAS_LAS_CATEGORIAS = "(todas)"
 
 class AppGraficaFinanzas(tk.Tk, Observer):
     """
@@ -21,24 +28,63 @@ class AppGraficaFinanzas(tk.Tk, Observer):
         self.geometry("1000x600")
 
         self.gateway = gateway
-
-        # La UI se suscribe a los cambios de transacciones
-        self.gateway.logica_financiera.attach(self)
+        # Último Future pedido por cada acción (resumen, predicción)
+        self._futuros: Dict[str, Future] = {}
+        # Eventos notificados desde otros hilos; se atienden en el hilo de Tk
+        self._eventos_pendientes: "queue.SimpleQueue[Tuple[str, Any]]" = queue.SimpleQueue()
+        # Ventana, lienzo y gráfico de la predicción: se crean la primera
+        # vez y las predicciones siguientes solo cambian los datos
+        self._ventana_prediccion = None
+        self._lienzo_prediccion = None
+        self._grafico_prediccion = None
+        # (texto, categoría) del filtro de la tabla; None muestra todas
+        self._filtro: Optional[Tuple[str, Optional[str]]] = None
+        # after() de la búsqueda que espera a que se deje de escribir
+        self._busqueda_pendiente: Optional[str] = None
+        self._busqueda_preparada = False
+
+        # La UI se suscribe a los cambios de transacciones (agrupados en
+        # un solo evento cuando se cargan varias de una vez)
+        self.gateway.logica_financiera.attach(self, agrupar=True)
 
         self._configurar_estilos()
         self._crear_widgets()
         self._actualizar_vista_transacciones()
+        self.after(50, self._atender_eventos_pendientes)
 
     # --- Métodos del Observer ---
     def update(self, event: str, data=None) -> None:
         """
         Método invocado cuando el Subject (LogicaFinanciera) notifica cambios.
+        Tk solo se puede usar desde su hilo: si la notificación llega de
+        otro, el evento se encola y se atiende en el siguiente after().
         """
+        if threading.current_thread() is not threading.main_thread():
+            self._eventos_pendientes.put((event, data))
+            return
+        if self._filtro is not None and event in ("TRANSACCION_AGREGADA",
+                                                  "TRANSACCION_LOTE_AGREGADO"):
+            # Se repite la búsqueda cuando el índice ya recibió el evento
+            # (puede estar suscrito después que la UI)
+            self.after_idle(self._buscar)
+            return
+        # Se usa la transacción que viene en el evento: no se recarga la tabla
         if event == "TRANSACCION_AGREGADA":
-            self._actualizar_vista_transacciones()
+            self.tabla.insertar(data)
+        elif event == "TRANSACCION_LOTE_AGREGADO":
+            self.tabla.insertar_lote(data)
             # Podríamos refrescar el resumen automáticamente si quieres:
             # self._mostrar_resumen()
 
+    def _atender_eventos_pendientes(self) -> None:
+        while True:
+            try:
+                event, data = self._eventos_pendientes.get_nowait()
+            except queue.Empty:
+                break
+            self.update(event, data)
+        self.after(50, self._atender_eventos_pendientes)
+
     # --- Configuración de estilos ---
     def _configurar_estilos(self) -> None:
         estilo = ttk.Style(self)
@@ -96,8 +142,19 @@ class AppGraficaFinanzas(tk.Tk, Observer):
 
         ttk.Button(marco_acciones, text="Ver Resumen",
                 command=self._mostrar_resumen).pack(fill=tk.X, pady=5)
+        ttk.Button(marco_acciones, text="Resumen del Mes",
+                command=self._mostrar_resumen_mes).pack(fill=tk.X, pady=5)
+        ttk.Button(marco_acciones, text="Últimos 12 Meses",
+                command=self._mostrar_resumen_anual).pack(fill=tk.X, pady=5)
+        ttk.Button(marco_acciones, text=f"Últimos {config.DIAS_VENTANA_RESUMEN} Días",
+                command=self._mostrar_resumen_dias).pack(fill=tk.X, pady=5)
         ttk.Button(marco_acciones, text="Análisis Predictivo",
                 command=self._ejecutar_prediccion).pack(fill=tk.X, pady=5)
+        ttk.Button(marco_acciones, text="Pronóstico por Categoría",
+                command=self._mostrar_pronostico_categorias).pack(fill=tk.X, pady=5)
+
+        # Se muestra solo mientras hay cálculos en segundo plano
+        self.barra_progreso = ttk.Progressbar(marco_acciones, mode="indeterminate")
 
     def _crear_resumen(self, parent: ttk.Frame) -> None:
         marco_resumen = ttk.LabelFrame(parent, text="Resumen", padding="10")
@@ -113,32 +170,38 @@ class AppGraficaFinanzas(tk.Tk, Observer):
         self.texto_resumen.config(state=tk.DISABLED)
 
     def _crear_tabla(self, parent: ttk.Frame) -> None:
-        marco_derecho = ttk.Frame(parent)
-        marco_derecho.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
-
-        columnas = ("Fecha", "Descripción", "Categoría", "Monto")
-        self.arbol = ttk.Treeview(marco_derecho,
-                                columns=columnas,
-                                show="headings",
-                                selectmode="browse")
-
-        for col in columnas:
-            self.arbol.heading(col, text=col)
-        self.arbol.column("Fecha", width=100, anchor=tk.CENTER)
-        self.arbol.column("Descripción", width=250)
-        self.arbol.column("Categoría", width=120)
-        self.arbol.column("Monto", width=100, anchor=tk.E)
-
-        self.arbol.tag_configure("ingreso", foreground="green")
-        self.arbol.tag_configure("gasto", foreground="red")
-
-        barra_scroll = ttk.Scrollbar(marco_derecho,
-                                    orient=tk.VERTICAL,
-                                    command=self.arbol.yview)
-        self.arbol.configure(yscroll=barra_scroll.set)
-
-        barra_scroll.pack(side=tk.RIGHT, fill=tk.Y)
-        self.arbol.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        marco_tabla = ttk.Frame(parent)
+        marco_tabla.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
+        self._crear_busqueda(marco_tabla)
+
+        self.tabla = TablaTransacciones(marco_tabla,
+                                        self.gateway.contar_transacciones,
+                                        self.gateway.obtener_pagina,
+                                        umbral_virtual=config.UMBRAL_TABLA_VIRTUAL)
+        self.tabla.pack(fill=tk.BOTH, expand=True)
+
+    def _crear_busqueda(self, parent: ttk.Frame) -> None:
+        marco_busqueda = ttk.Frame(parent)
+        marco_busqueda.pack(fill=tk.X, pady=(0, 5))
+
+        ttk.Label(marco_busqueda, text="Buscar:").pack(side=tk.LEFT)
+        self.texto_busqueda = tk.StringVar()
+        entrada = ttk.Entry(marco_busqueda, textvariable=self.texto_busqueda)
+        entrada.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        entrada.bind("<FocusIn>", self._preparar_busqueda)
+
+        self.categoria_busqueda = tk.StringVar(value=TODAS_LAS_CATEGORIAS)
+        self.combo_categoria = ttk.Combobox(marco_busqueda,
+                                            textvariable=self.categoria_busqueda,
+                                            values=(TODAS_LAS_CATEGORIAS,),
+                                            state="readonly",
+                                            width=18,
+                                            postcommand=self._cargar_categorias)
+        self.combo_categoria.pack(side=tk.LEFT)
+
+        # Cada tecla (o cambio de categoría) vuelve a filtrar, con retardo
+        self.texto_busqueda.trace_add("write", lambda *_: self._filtrar())
+        self.categoria_busqueda.trace_add("write", lambda *_: self._filtrar())
 
     # --- Lógica conectada al Gateway ---
 
@@ -148,7 +211,7 @@ class AppGraficaFinanzas(tk.Tk, Observer):
                 self.entrada_fecha.get(), "%Y-%m-%d"
             ).date()
             descripcion = self.entrada_descripcion.get().strip()
-            monto = float(self.entrada_monto.get())
+            centavos = centavos_desde_unidades(self.entrada_monto.get())
             categoria = self.entrada_categoria.get().strip()
 
             if not descripcion or not categoria:
@@ -158,7 +221,7 @@ class AppGraficaFinanzas(tk.Tk, Observer):
                 )
                 return
 
-            self.gateway.agregar_transaccion(fecha, descripcion, monto, categoria)
+            self.gateway.agregar_transaccion_centavos(fecha, descripcion, centavos, categoria)
 
             # Limpiar campos del formulario
             self.entrada_descripcion.delete(0, tk.END)
@@ -172,37 +235,192 @@ class AppGraficaFinanzas(tk.Tk, Observer):
             )
 
     def _actualizar_vista_transacciones(self) -> None:
-        for item in self.arbol.get_children():
-            self.arbol.delete(item)
-
-        for t in self.gateway.obtener_transacciones():
-            monto_texto = f"${t.monto:,.2f}"
-            etiqueta = "ingreso" if t.es_ingreso() else "gasto"
-            self.arbol.insert(
-                "",
-                tk.END,
-                values=(t.fecha, t.descripcion, t.categoria, monto_texto),
-                tags=(etiqueta,)
-            )
+        self.tabla.recargar()
+
+    # --- Búsqueda ---
+
+    def _preparar_busqueda(self, _evento=None) -> None:
+        # El índice se construye en segundo plano la primera vez que se
+        # entra al buscador (el gateway remoto no lo necesita)
+        if not self._busqueda_preparada:
+            self._busqueda_preparada = True
+            preparar = getattr(self.gateway, "preparar_busqueda", None)
+            if preparar is not None:
+                preparar()
+
+    def _cargar_categorias(self) -> None:
+        self.combo_categoria.configure(
+            values=(TODAS_LAS_CATEGORIAS, *self.gateway.obtener_categorias()))
+
+    def _filtrar(self) -> None:
+        """
+        Cada tecla reinicia la espera: se busca cuando pasan
+        RETARDO_BUSQUEDA_MS sin escribir, no una vez por tecla.
+        """
+        if self._busqueda_pendiente is not None:
+            self.after_cancel(self._busqueda_pendiente)
+        self._busqueda_pendiente = self.after(config.RETARDO_BUSQUEDA_MS, self._buscar)
+
+    def _buscar(self) -> None:
+        """
+        Pide al gateway, en una sola llamada y en su pool de hilos, el
+        total y la primera página de la búsqueda.
+        """
+        self._busqueda_pendiente = None
+        texto = self.texto_busqueda.get()
+        categoria = self.categoria_busqueda.get()
+        if categoria == TODAS_LAS_CATEGORIAS:
+            categoria = None
+
+        if not texto.strip() and categoria is None:
+            self._filtro = None
+            # Una búsqueda que siga en curso ya no se muestra
+            self._futuros.pop("busqueda", None)
+            self._actualizar_progreso()
+            self.tabla.cambiar_fuente(self.gateway.contar_transacciones,
+                                      self.gateway.obtener_pagina,
+                                      config.UMBRAL_TABLA_VIRTUAL)
+            return
+        self._filtro = (texto, categoria)
+        self._en_segundo_plano(
+            "busqueda",
+            lambda: self.gateway.buscar_futuro(texto, categoria, 0, config.PAGINA_BUSQUEDA),
+            lambda resultado: self._mostrar_busqueda(texto, categoria, resultado))
+
+    def _mostrar_busqueda(self, texto: str, categoria: Optional[str], resultado) -> None:
+        """
+        Muestra el resultado en la tabla. Las filas de la primera página
+        ya llegaron con el total; solo las siguientes se piden al
+        gateway, al desplazarse.
+        """
+        primera = resultado.transacciones
+
+        def obtener_pagina(inicio: int, cantidad: int):
+            if inicio + cantidad <= len(primera) or len(primera) == resultado.total:
+                return primera[inicio:inicio + cantidad]
+            return self.gateway.buscar(texto, categoria, inicio, cantidad).transacciones
+
+        with metricas.cronometro("ui.filtrar"):
+            self.tabla.cambiar_fuente(lambda: resultado.total, obtener_pagina,
+                                      umbral_virtual=0)
 
     def _mostrar_resumen(self) -> None:
-        texto = self.gateway.obtener_resumen_por_categoria()
+        self._en_segundo_plano("resumen",
+                               self.gateway.obtener_resumen_por_categoria_futuro,
+                               self._mostrar_texto_resumen)
+
+    def _mostrar_resumen_mes(self) -> None:
+        self._mostrar_texto_resumen(self.gateway.obtener_resumen_mes_actual())
+
+    def _mostrar_resumen_anual(self) -> None:
+        self._mostrar_texto_resumen(self.gateway.obtener_resumen_ultimos_meses(12))
+
+    def _mostrar_resumen_dias(self) -> None:
+        self._mostrar_texto_resumen(
+            self.gateway.obtener_resumen_ultimos_dias(config.DIAS_VENTANA_RESUMEN))
+
+    def _mostrar_texto_resumen(self, texto: str) -> None:
         self.texto_resumen.config(state=tk.NORMAL)
         self.texto_resumen.delete("1.0", tk.END)
         self.texto_resumen.insert(tk.END, texto)
         self.texto_resumen.config(state=tk.DISABLED)
 
     def _ejecutar_prediccion(self) -> None:
-        figura, mensaje = self.gateway.analisis_predictivo()
+        self._en_segundo_plano("prediccion",
+                               self.gateway.analisis_predictivo_futuro,
+                               self._mostrar_prediccion)
+
+    def _mostrar_pronostico_categorias(self) -> None:
+        self._en_segundo_plano("pronostico_categorias",
+                               lambda: self.gateway.obtener_pronostico_por_categoria_futuro(
+                                   config.DIAS_POR_DEFECTO_PREDICCION),
+                               self._mostrar_texto_resumen)
+
+    def _mostrar_prediccion(self, respuesta) -> None:
+        resultado, mensaje = respuesta
 
         if mensaje:
             messagebox.showinfo("Análisis Predictivo", mensaje)
             return
 
-        ventana = tk.Toplevel(self)
-        ventana.title("Gráfico Predictivo")
-        ventana.geometry("800x600")
+        if self._ventana_prediccion is None:
+            # Matplotlib se carga solo cuando realmente hay que dibujar
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from servicio_prediccion.GraficoPrediccion import GraficoPrediccion
+
+            ventana = tk.Toplevel(self)
+            ventana.title("Gráfico Predictivo")
+            ventana.geometry("800x600")
+            ventana.protocol("WM_DELETE_WINDOW", self._cerrar_prediccion)
+            grafico = GraficoPrediccion()
+            lienzo = FigureCanvasTkAgg(grafico.figura, master=ventana)
+            lienzo.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self._ventana_prediccion = ventana
+            self._lienzo_prediccion = lienzo
+            self._grafico_prediccion = grafico
+        else:
+            self._ventana_prediccion.deiconify()
+            self._ventana_prediccion.lift()
+
+        self._grafico_prediccion.actualizar(resultado)
+        with metricas.cronometro("ui.dibujar_prediccion"):
+            self._grafico_prediccion.dibujar()
+
+    def _cerrar_prediccion(self) -> None:
+        """Cierra la ventana del gráfico y libera la figura."""
+        self._grafico_prediccion.cerrar()
+        self._ventana_prediccion.destroy()
+        self._ventana_prediccion = None
+        self._lienzo_prediccion = None
+        self._grafico_prediccion = None
+
+    # --- Ejecución en segundo plano ---
+
+    def _en_segundo_plano(self,
+                          accion: str,
+                          pedir: Callable[[], Future],
+                          al_terminar: Callable[[Any], None]) -> None:
+        """
+        Pide el cálculo al gateway (que lo ejecuta en su pool de hilos) y
+        revisa el Future con after(), de modo que el resultado siempre se
+        procesa en el hilo de Tk y la ventana no se congela.
+        """
+        futuro = pedir()
+        self._futuros[accion] = futuro
+        self._actualizar_progreso()
+        self.after(50, self._revisar_futuro, accion, futuro, pedir, al_terminar)
+
+    def _revisar_futuro(self,
+                        accion: str,
+                        futuro: Future,
+                        pedir: Callable[[], Future],
+                        al_terminar: Callable[[Any], None]) -> None:
+        if not futuro.done():
+            self.after(50, self._revisar_futuro, accion, futuro, pedir, al_terminar)
+            return
+
+        if self._futuros.get(accion) is not futuro:
+            return  # Hay una petición más reciente para la misma acción
 
-        lienzo = FigureCanvasTkAgg(figura, master=ventana)
-        lienzo.draw()
-        lienzo.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        if futuro.cancelled():
+            # El gateway lo canceló porque llegaron datos nuevos: se repite
+            self._en_segundo_plano(accion, pedir, al_terminar)
+            return
+
+        del self._futuros[accion]
+        self._actualizar_progreso()
+        error = futuro.exception()
+        if error is not None:
+            messagebox.showerror("Error", str(error))
+            return
+        al_terminar(futuro.result())
+
+    def _actualizar_progreso(self) -> None:
+        visible = bool(self.barra_progreso.winfo_manager())
+        if self._futuros:
+            if not visible:
+                self.barra_progreso.pack(fill=tk.X, pady=5)
+                self.barra_progreso.start(10)
+        elif visible:
+            self.barra_progreso.stop()
+            self.barra_progreso.pack_forget()
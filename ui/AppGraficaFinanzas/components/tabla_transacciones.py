@@ -0,0 +1,179 @@
+# ui/AppGraficaFinanzas/components/tabla_transacciones.py
+import tkinter as tk
+from bisect import bisect_right
+from tkinter import ttk
+from typing import Callable, List, Sequence
+
+from common.dinero import formatear
+from common.models.transaccion import Transaccion
+
+
+def _valores(transaccion: Transaccion):
+    monto_texto = formatear(transaccion.centavos)
+    etiqueta = "ingreso" if transaccion.es_ingreso() else "gasto"
+    return (transaccion.fecha, transaccion.descripcion,
+            transaccion.categoria, monto_texto), (etiqueta,)
+
+
+class TablaTransacciones(ttk.Frame):
+    """
+    Tabla de transacciones (Treeview + barra de desplazamiento).
+
+    Modo completo: todas las filas están en el Treeview y cada
+    transacción nueva se inserta directamente en su posición.
+    Modo virtual (a partir de `umbral_virtual` filas): el Treeview solo
+    contiene las filas visibles y, al desplazarse, se piden al gateway
+    por páginas.
+    """
+    COLUMNAS = ("Fecha", "Descripción", "Categoría", "Monto")
+    # Un lote más grande que esto se pinta recargando la tabla entera
+    LOTE_MAXIMO_INCREMENTAL = 500
+
+    def __init__(self,
+                 parent: tk.Misc,
+                 contar: Callable[[], int],
+                 obtener_pagina: Callable[[int, int], List[Transaccion]],
+                 umbral_virtual: int = 5000,
+                 alto_fila: int = 25) -> None:
+        super().__init__(parent)
+        self._contar = contar
+        self._obtener_pagina = obtener_pagina
+        self._umbral_virtual = umbral_virtual
+        self._alto_fila = alto_fila
+
+        self._virtual = False
+        self._total = 0
+        # Modo completo: clave (-ordinal de la fecha) de cada fila, en el orden del Treeview
+        self._claves: List[int] = []
+        # Modo virtual: primera fila visible y cuántas caben
+        self._inicio = 0
+        self._filas_visibles = 20
+
+        self.arbol = ttk.Treeview(self,
+                                columns=self.COLUMNAS,
+                                show="headings",
+                                selectmode="browse")
+
+        for col in self.COLUMNAS:
+            self.arbol.heading(col, text=col)
+        self.arbol.column("Fecha", width=100, anchor=tk.CENTER)
+        self.arbol.column("Descripción", width=250)
+        self.arbol.column("Categoría", width=120)
+        self.arbol.column("Monto", width=100, anchor=tk.E)
+
+        self.arbol.tag_configure("ingreso", foreground="green")
+        self.arbol.tag_configure("gasto", foreground="red")
+
+        self.barra_scroll = ttk.Scrollbar(self, orient=tk.VERTICAL)
+        self.barra_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.arbol.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.arbol.bind("<Configure>", self._al_redimensionar)
+        for evento in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.arbol.bind(evento, self._rueda)
+
+    # --- API ---
+    def recargar(self) -> None:
+        self._total = self._contar()
+        self._virtual = self._total > self._umbral_virtual
+        self.arbol.delete(*self.arbol.get_children())
+
+        if self._virtual:
+            self._claves = []
+            self.barra_scroll.configure(command=self._desplazar)
+            self.arbol.configure(yscrollcommand="")
+            self._pintar_ventana()
+            return
+
+        self.barra_scroll.configure(command=self.arbol.yview)
+        self.arbol.configure(yscrollcommand=self.barra_scroll.set)
+        transacciones = self._obtener_pagina(0, self._total)
+        self._claves = [-t.fecha.toordinal() for t in transacciones]
+        for t in transacciones:
+            valores, etiquetas = _valores(t)
+            self.arbol.insert("", tk.END, values=valores, tags=etiquetas)
+
+    def cambiar_fuente(self,
+                       contar: Callable[[], int],
+                       obtener_pagina: Callable[[int, int], List[Transaccion]],
+                       umbral_virtual: int) -> None:
+        """
+        Cambia de dónde salen las filas (por ejemplo, los resultados de
+        una búsqueda) y recarga desde la primera.
+        """
+        self._contar = contar
+        self._obtener_pagina = obtener_pagina
+        self._umbral_virtual = umbral_virtual
+        self._inicio = 0
+        self.recargar()
+
+    def insertar(self, transaccion: Transaccion) -> None:
+        """
+        Agrega una sola fila: O(log N) para ubicarla y una llamada a Tk
+        (modo completo), o repintar solo la ventana visible (modo virtual).
+        """
+        self._total += 1
+        if self._virtual:
+            self._pintar_ventana()
+            return
+        if self._total > self._umbral_virtual:
+            self.recargar()
+            return
+
+        # Misma regla que el repositorio: fecha descendente y, a igual
+        # fecha, en orden de llegada.
+        clave = -transaccion.fecha.toordinal()
+        posicion = bisect_right(self._claves, clave)
+        self._claves.insert(posicion, clave)
+        valores, etiquetas = _valores(transaccion)
+        self.arbol.insert("", posicion, values=valores, tags=etiquetas)
+
+    def insertar_lote(self, transacciones: Sequence[Transaccion]) -> None:
+        if (self._virtual
+                or len(transacciones) > self.LOTE_MAXIMO_INCREMENTAL
+                or self._total + len(transacciones) > self._umbral_virtual):
+            self.recargar()
+            return
+        for transaccion in transacciones:
+            self.insertar(transaccion)
+
+    # --- Modo virtual ---
+    def _pintar_ventana(self) -> None:
+        maximo_inicio = max(self._total - self._filas_visibles, 0)
+        self._inicio = min(max(self._inicio, 0), maximo_inicio)
+
+        self.arbol.delete(*self.arbol.get_children())
+        for t in self._obtener_pagina(self._inicio, self._filas_visibles):
+            valores, etiquetas = _valores(t)
+            self.arbol.insert("", tk.END, values=valores, tags=etiquetas)
+
+        if self._total:
+            self.barra_scroll.set(self._inicio / self._total,
+                                  min((self._inicio + self._filas_visibles) / self._total, 1.0))
+        else:
+            self.barra_scroll.set(0.0, 1.0)
+
+    def _desplazar(self, accion: str, cantidad: str, unidad: str = "units") -> None:
+        if accion == "moveto":
+            self._inicio = int(float(cantidad) * self._total)
+        elif accion == "scroll":
+            paso = self._filas_visibles if unidad == "pages" else 1
+            self._inicio += int(cantidad) * paso
+        self._pintar_ventana()
+
+    def _rueda(self, evento: tk.Event):
+        if not self._virtual:
+            return None
+        if evento.num == 4 or getattr(evento, "delta", 0) > 0:
+            self._desplazar("scroll", "-3")
+        else:
+            self._desplazar("scroll", "3")
+        return "break"
+
+    def _al_redimensionar(self, evento: tk.Event) -> None:
+        # Se descuenta la fila de encabezados
+        filas = max(evento.height // self._alto_fila - 1, 1)
+        if filas != self._filas_visibles:
+            self._filas_visibles = filas
+            if self._virtual:
+                self._pintar_ventana()